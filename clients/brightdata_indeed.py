@@ -2,10 +2,12 @@
 
 import httpx
 import asyncio
+import json
 import time
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, AsyncIterator
 from loguru import logger
 from config.settings import settings
+from clients.snapshot_stream import iter_ndjson
 
 
 class BrightDataError(Exception):
@@ -253,22 +255,63 @@ class BrightDataIndeedClient:
         except httpx.HTTPStatusError as e:
             raise BrightDataError(f"Failed to download results: {e}")
     
-    async def wait_for_completion(
+    async def stream_results(self, snapshot_id: str) -> AsyncIterator[Dict]:
+        """
+        Stream results of a completed snapshot as NDJSON, one job at a time.
+        
+        Same filtering as download_results, but jobs are yielded while the
+        download is still running so ingestion can start on the first records.
+        
+        Yields:
+            Job postings (Indeed JSON format)
+        """
+        logger.info(f"Streaming Indeed results for snapshot {snapshot_id}")
+        
+        job_count = 0
+        error_count = 0
+        try:
+            async with self.client.stream(
+                "GET",
+                f"{self.BASE_URL}/snapshot/{snapshot_id}",
+                params={"format": "ndjson"}
+            ) as response:
+                response.raise_for_status()
+                
+                async for item in iter_ndjson(response):
+                    if isinstance(item, dict) and item.get("status") == "building":
+                        raise BrightDataError(f"Snapshot still building: {item}")
+                    
+                    if isinstance(item, dict) and ('error' in item or 'error_code' in item):
+                        error_count += 1
+                        logger.warning(f"Bright Data error item: {item.get('error', 'Unknown error')}")
+                        continue
+                    
+                    job_count += 1
+                    yield item
+        
+        except httpx.HTTPStatusError as e:
+            raise BrightDataError(f"Failed to download results: {e}")
+        except json.JSONDecodeError as e:
+            raise BrightDataError(f"Invalid NDJSON in snapshot {snapshot_id}: {e}")
+        
+        if error_count > 0:
+            logger.warning(f"Filtered out {error_count} error items from Bright Data response")
+        
+        logger.info(f"Streamed {job_count} Indeed jobs from snapshot {snapshot_id} ({error_count} errors filtered)")
+    
+    async def wait_until_ready(
         self,
         snapshot_id: str,
         poll_interval: Optional[int] = None,
         timeout: Optional[int] = None
-    ) -> List[Dict]:
+    ) -> None:
         """
-        Poll until collection is complete, then download results.
+        Poll until collection is complete (without downloading it).
         
         Args:
             snapshot_id: Snapshot to wait for
             poll_interval: Seconds between polls (default: self.poll_interval)
             timeout: Max wait time in seconds (default: self.timeout)
-        
-        Returns:
-            List of job postings
         """
         poll_interval = poll_interval or self.poll_interval
         timeout = timeout or self.timeout
@@ -288,7 +331,7 @@ class BrightDataIndeedClient:
                 
                 if status == "ready":
                     logger.success(f"Indeed snapshot {snapshot_id} completed after {elapsed:.0f}s")
-                    return await self.download_results(snapshot_id)
+                    return
                 
                 elif status == "failed":
                     error_msg = status_data.get("error", "Unknown error")
@@ -306,6 +349,26 @@ class BrightDataIndeedClient:
         elapsed = time.time() - start_time
         raise SnapshotTimeoutError(f"Indeed snapshot {snapshot_id} did not complete in {timeout}s (elapsed: {elapsed:.0f}s, polls: {poll_count})")
     
+    async def wait_for_completion(
+        self,
+        snapshot_id: str,
+        poll_interval: Optional[int] = None,
+        timeout: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Poll until collection is complete, then download results.
+        
+        Args:
+            snapshot_id: Snapshot to wait for
+            poll_interval: Seconds between polls (default: self.poll_interval)
+            timeout: Max wait time in seconds (default: self.timeout)
+        
+        Returns:
+            List of job postings
+        """
+        await self.wait_until_ready(snapshot_id, poll_interval, timeout)
+        return await self.download_results(snapshot_id)
+    
     async def close(self):
         """Close the HTTP client."""
         await self.client.aclose()
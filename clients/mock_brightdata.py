@@ -3,7 +3,7 @@
 import asyncio
 import json
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, AsyncIterator
 from loguru import logger
 from uuid import uuid4
 
@@ -137,22 +137,31 @@ class MockBrightDataLinkedInClient:
         logger.info(f"[MOCK] Downloaded {len(snapshot['data'])} jobs from snapshot {snapshot_id}")
         return snapshot["data"]
     
-    async def wait_for_completion(
+    async def stream_results(self, snapshot_id: str) -> AsyncIterator[Dict]:
+        """
+        Stream results of a completed mock snapshot one job at a time.
+        
+        Yields:
+            Job postings (LinkedIn JSON format)
+        """
+        for job in await self.download_results(snapshot_id):
+            # Let the consumer run between records, like a real network stream
+            await asyncio.sleep(0)
+            yield job
+    
+    async def wait_until_ready(
         self,
         snapshot_id: str,
         poll_interval: Optional[int] = None,
         timeout: Optional[int] = None
-    ) -> List[Dict]:
+    ) -> None:
         """
-        Poll until mock collection is complete, then download results.
+        Poll until mock collection is complete (without downloading it).
         
         Args:
             snapshot_id: Snapshot to wait for
             poll_interval: Seconds between polls (default: self.poll_interval)
             timeout: Max wait time in seconds (default: self.timeout)
-        
-        Returns:
-            List of job postings
         """
         poll_interval = poll_interval or self.poll_interval
         timeout = timeout or self.timeout
@@ -167,7 +176,7 @@ class MockBrightDataLinkedInClient:
             
             if status == "ready":
                 logger.success(f"[MOCK] Snapshot {snapshot_id} completed successfully")
-                return await self.download_results(snapshot_id)
+                return
             
             elif status == "failed":
                 error_msg = status_data.get("error", "Unknown error")
@@ -178,6 +187,26 @@ class MockBrightDataLinkedInClient:
         
         raise TimeoutError(f"Snapshot {snapshot_id} did not complete in {timeout}s")
     
+    async def wait_for_completion(
+        self,
+        snapshot_id: str,
+        poll_interval: Optional[int] = None,
+        timeout: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Poll until mock collection is complete, then download results.
+        
+        Args:
+            snapshot_id: Snapshot to wait for
+            poll_interval: Seconds between polls (default: self.poll_interval)
+            timeout: Max wait time in seconds (default: self.timeout)
+        
+        Returns:
+            List of job postings
+        """
+        await self.wait_until_ready(snapshot_id, poll_interval, timeout)
+        return await self.download_results(snapshot_id)
+    
     async def close(self):
         """Close the mock client (no-op)."""
         logger.info("[MOCK] Client closed")
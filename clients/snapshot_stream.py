@@ -0,0 +1,19 @@
+"""Incremental parsing of Bright Data snapshots downloaded as NDJSON."""
+
+import json
+from typing import Any, AsyncIterator
+
+import httpx
+
+
+async def iter_ndjson(response: httpx.Response) -> AsyncIterator[Any]:
+    """
+    Yield one decoded JSON value per line of a streamed response.
+    
+    Only the current line is held in memory, so snapshot size does not affect
+    peak memory. Raises json.JSONDecodeError on a malformed line.
+    """
+    async for line in response.aiter_lines():
+        line = line.strip()
+        if line:
+            yield json.loads(line)
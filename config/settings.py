@@ -7,6 +7,11 @@ class Settings(BaseSettings):
     # Supabase
     supabase_url: str
     supabase_key: str
+    master_data_cache_enabled: bool = True
+    master_data_cache_ttl_seconds: int = 900
+    master_data_cache_negative_ttl_seconds: int = 60
+    db_async_client_enabled: bool = True  # Async PostgREST client for web routes; False = thread pool only
+    db_thread_pool_size: int = 16
     
     # Bright Data
     brightdata_api_token: str
@@ -16,9 +21,32 @@ class Settings(BaseSettings):
     brightdata_poll_interval: int = 30
     brightdata_timeout: int = 1800
     brightdata_daily_quota: int = 10000
+    brightdata_stream_snapshots: bool = True
     
     # OpenAI
     openai_api_key: Optional[str] = None
+    llm_enrichment_concurrency: int = 8
+    llm_enrichment_job_timeout: float = 120.0
+    llm_enrichment_max_retries: int = 3
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = ".cache/llm_responses.sqlite3"
+    llm_cache_max_entries: int = 100000
+    llm_cache_max_age_days: int = 90
+    
+    # Dashboard stats response cache (in-process, invalidated by writers)
+    response_cache_enabled: bool = True
+    response_cache_ttl_seconds: int = 300
+    
+    # Logo thumbnails (content-hashed files on disk + LRU memory tier)
+    logo_cache_enabled: bool = True
+    logo_cache_dir: str = ".cache/logos"
+    logo_cache_memory_items: int = 512
+    logo_cache_version_ttl_seconds: int = 300
+    logo_max_age_seconds: int = 86400
+    
+    # Jobs list facet index (in-process bitmaps over active jobs, refreshed by writers)
+    job_facet_index_enabled: bool = True
+    job_facet_index_ttl_seconds: int = 900
     
     # Application
     environment: str = "development"
@@ -1,3 +1,4 @@
 from database.client import get_supabase_client, db, SupabaseClient
+from database.async_client import adb, AsyncDatabase
 
-__all__ = ["get_supabase_client", "db", "SupabaseClient"]
+__all__ = ["get_supabase_client", "db", "SupabaseClient", "adb", "AsyncDatabase"]
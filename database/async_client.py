@@ -0,0 +1,220 @@
+"""
+Non-blocking database access for async code (FastAPI routes, background services).
+
+The supabase client is synchronous: every `.execute()` blocks the event loop for
+the whole PostgREST round trip, stalling all other requests and the in-process
+background services. `adb` exposes the same query-builder API, but `execute()`
+is a coroutine:
+
+    result = await adb.table("companies")\\
+        .select("id, name")\\
+        .eq("id", company_id)\\
+        .execute()
+
+Queries run on postgrest's AsyncPostgrestClient (a pooled httpx.AsyncClient).
+When that client is disabled (db_async_client_enabled=False) or cannot be
+created, the same query runs on the synchronous client in a bounded thread pool.
+`adb.run(fn, *args)` offloads any other blocking call, such as the
+SupabaseClient helpers, to that pool.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from config.settings import settings
+from database.client import db, SupabaseClient, COMPANY_SEARCH_MAX_RESULTS
+from utils.response_cache import response_cache, TAG_JOBS, TAG_COMPANIES, TAG_SCRAPE_RUNS
+
+
+class AsyncQuery:
+    """
+    Query-builder chain recorded for later execution.
+    
+    Builder calls (select, eq, not_, order, range, ...) are recorded without
+    touching a client and replayed by execute() on the async client or, as a
+    fallback, on the synchronous one. Each step returns a new AsyncQuery, so a
+    base query can be extended in branches like the sync builders.
+    """
+    
+    def __init__(self, database: "AsyncDatabase", steps: Tuple = ()):
+        self._database = database
+        self._steps = steps
+    
+    def __getattr__(self, name: str) -> "AsyncQuery":
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return AsyncQuery(self._database, self._steps + ((name, None),))
+    
+    def __call__(self, *args, **kwargs) -> "AsyncQuery":
+        name, _ = self._steps[-1]
+        return AsyncQuery(self._database, self._steps[:-1] + ((name, (args, kwargs)),))
+    
+    async def execute(self):
+        """Run the query without blocking the event loop."""
+        return await self._database.execute_steps(self._steps)
+
+
+def _replay(root: Any, steps: Tuple) -> Any:
+    """Apply recorded attribute accesses and calls to a client."""
+    builder = root
+    for name, call in steps:
+        builder = getattr(builder, name)
+        if call is not None:
+            args, kwargs = call
+            builder = builder(*args, **kwargs)
+    return builder
+
+
+class AsyncDatabase:
+    """Async facade over the Supabase database (see module docstring)."""
+    
+    def __init__(self, sync_db: SupabaseClient, max_workers: int = 16, use_async_client: bool = True):
+        self.sync_db = sync_db
+        self.use_async_client = use_async_client
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+        self._client = None
+        self._client_loop = None
+    
+    def table(self, name: str) -> AsyncQuery:
+        """Start a query on a table."""
+        return AsyncQuery(self, (("table", ((name,), {})),))
+    
+    def rpc(self, fn: str, params: Optional[dict] = None) -> AsyncQuery:
+        """Start a call to a Postgres function."""
+        return AsyncQuery(self, (("rpc", ((fn, params or {}), {})),))
+    
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call (e.g. a SupabaseClient helper) in the database thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+    
+    async def get_stats(self) -> dict:
+        """Dashboard counts (SupabaseClient.get_stats), cached until jobs, companies or runs change."""
+        return await response_cache.get_or_compute(
+            "db_stats",
+            lambda: self.run(self.sync_db.get_stats),
+            tags=(TAG_JOBS, TAG_COMPANIES, TAG_SCRAPE_RUNS)
+        )
+    
+    async def get_query_run_stats(self, queries: List[dict], match_by_text: bool = False) -> Dict[str, dict]:
+        """
+        Last run, run count and total jobs per search query, keyed by query id.
+        
+        One get_query_run_stats RPC call for all queries (migration 070). Without
+        the RPC, falls back to two scrape_runs queries per search query.
+        
+        Args:
+            queries: search_queries rows (id, search_query, location_query)
+            match_by_text: Match runs on (search_query, location_query) instead of search_query_id
+        """
+        if not queries:
+            return {}
+        
+        try:
+            result = await self.rpc("get_query_run_stats", {
+                "p_query_ids": [query["id"] for query in queries],
+                "p_match_by_text": match_by_text
+            }).execute()
+            return {
+                row["search_query_id"]: {
+                    "last_run": row["last_run"],
+                    "total_jobs": row["total_jobs"],
+                    "run_count": row["run_count"]
+                }
+                for row in result.data or []
+            }
+        except Exception as e:
+            logger.warning(f"get_query_run_stats unavailable, querying runs per search query: {e}")
+        
+        stats = await asyncio.gather(*[self._query_run_stats(query, match_by_text) for query in queries])
+        return {query["id"]: query_stats for query, query_stats in zip(queries, stats)}
+    
+    async def search_company_ids(self, search_text: str, max_results: int = COMPANY_SEARCH_MAX_RESULTS) -> Optional[List[str]]:
+        """
+        Ids of companies whose name contains or fuzzily matches search_text, best first.
+        
+        One search_company_ids RPC call (migration 074); None when the RPC is unavailable.
+        """
+        try:
+            result = await self.rpc("search_company_ids", {
+                "p_search_text": search_text,
+                "p_max_results": max_results
+            }).execute()
+        except Exception as e:
+            logger.warning(f"search_company_ids unavailable, falling back to name search: {e}")
+            return None
+        return [row["company_id"] for row in result.data or []]
+    
+    async def _query_run_stats(self, query: dict, match_by_text: bool) -> dict:
+        def runs(columns: str) -> AsyncQuery:
+            builder = self.table("scrape_runs").select(columns)
+            if match_by_text:
+                return builder.eq("search_query", query["search_query"]).eq("location_query", query["location_query"])
+            return builder.eq("search_query_id", query["id"])
+        
+        latest_run, all_runs = await asyncio.gather(
+            runs("*").order("started_at", desc=True).limit(1).execute(),
+            runs("jobs_found").execute()
+        )
+        return {
+            "last_run": latest_run.data[0] if latest_run.data else None,
+            "total_jobs": sum(r.get("jobs_found") or 0 for r in all_runs.data),
+            "run_count": len(all_runs.data)
+        }
+    
+    async def execute_steps(self, steps: Tuple) -> Any:
+        client = self._async_client()
+        if client is not None:
+            return await _replay(client, steps).execute()
+        return await self.run(lambda: _replay(self.sync_db.client, steps).execute())
+    
+    def _async_client(self):
+        """AsyncPostgrestClient bound to the running event loop, or None to use the thread pool."""
+        if not self.use_async_client:
+            return None
+        
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._client_loop is loop:
+            return self._client
+        
+        try:
+            from postgrest import AsyncPostgrestClient
+            
+            # httpx connections belong to one event loop (scripts may call asyncio.run repeatedly)
+            self._client = AsyncPostgrestClient(
+                f"{settings.supabase_url.rstrip('/')}/rest/v1",
+                headers={
+                    "Accept": "application/json",
+                    "Content-Type": "application/json",
+                    "apiKey": settings.supabase_key,
+                    "Authorization": f"Bearer {settings.supabase_key}"
+                }
+            )
+            self._client_loop = loop
+            return self._client
+        except Exception as e:
+            logger.warning(f"Async database client unavailable, using thread pool: {e}")
+            self.use_async_client = False
+            return None
+    
+    async def aclose(self):
+        """Close pooled connections (call on application shutdown)."""
+        if self._client is not None:
+            try:
+                await self._client.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close async database client: {e}")
+            self._client = None
+            self._client_loop = None
+
+
+# Global async facade over the global sync client
+adb = AsyncDatabase(
+    db,
+    max_workers=settings.db_thread_pool_size,
+    use_async_client=settings.db_async_client_enabled
+)
@@ -1,13 +1,370 @@
 """Supabase client wrapper for database operations."""
 
+import threading
+import time
+from collections import Counter
 from supabase import create_client, Client
+from postgrest.types import ReturnMethod
 from config.settings import settings
-from typing import Optional, List, Dict, Any
+from database.pagination import InvalidCursorError, SortKey, apply_keyset, count_method
+from utils.response_cache import response_cache, TAG_JOBS
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Literal, Tuple, Callable
 from uuid import UUID
 from datetime import datetime, timedelta
 from loguru import logger
 
 
+# Max rows per multi-row INSERT/UPSERT request
+BULK_WRITE_CHUNK_SIZE = 500
+
+# Max values per in_() filter (keeps the request URL well below proxy limits)
+IN_FILTER_CHUNK_SIZE = 100
+
+# Rows per page when warm-loading master data
+MASTER_DATA_PAGE_SIZE = 1000
+
+# Column lists without the logo_data blob (logos are served by /logo endpoints, see web.logos)
+COMPANY_COLUMNS = (
+    "id, linkedin_company_id, name, industry, company_url, logo_url, logo_filename, logo_content_type, "
+    "employee_count_range, rating, reviews_count, indeed_company_url, created_at, updated_at"
+)
+TECH_STACK_COLUMNS = (
+    "id, name, display_name, logo_url, logo_filename, logo_content_type, category, description, "
+    "relevance_score, is_active, created_at, updated_at"
+)
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield successive lists of at most `size` items."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def select_best_company(companies: List[Dict], has_logo=None) -> Optional[Dict]:
+    """
+    Pick the company to reuse when several share the same name.
+    
+    Priority: company with logo_data > company with linkedin_company_id > first match.
+    `has_logo` can be passed when the rows don't carry the logo_data blob itself.
+    """
+    if not companies:
+        return None
+    
+    if has_logo is None:
+        has_logo = lambda c: bool(c.get('logo_data'))
+    
+    # First try: company with logo
+    with_logo = [c for c in companies if has_logo(c)]
+    if with_logo:
+        return with_logo[0]
+    
+    # Second try: company with LinkedIn ID
+    with_linkedin = [c for c in companies if c.get('linkedin_company_id')]
+    if with_linkedin:
+        return with_linkedin[0]
+    
+    # Fallback: first one
+    return companies[0]
+
+
+class MasterDataCache:
+    """
+    Process-wide cache for small, slowly changing dimension tables.
+    
+    Entries live in namespaces (e.g. "locations") keyed by their natural key:
+    LinkedIn ID, company name, full location string or tech name. A namespace
+    can be warm-loaded in bulk; until its TTL expires, a key missing from a
+    loaded namespace is known not to exist and costs no query. Per-key misses
+    are cached as negative entries with a shorter TTL.
+    
+    Shared between threads (enrichment runs database helpers in worker threads).
+    """
+    
+    def __init__(self, ttl_seconds: float = 900, negative_ttl_seconds: float = 60, enabled: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.enabled = enabled
+        self.hits = Counter()    # Per namespace
+        self.misses = Counter()  # Per namespace
+        self._entries: Dict[str, Dict[str, Tuple[Any, float]]] = {}
+        self._loaded_until: Dict[str, float] = {}
+        self._retry_load_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, namespace: str, key: str) -> Tuple[bool, Optional[Any]]:
+        """
+        Look up a key.
+        
+        Returns:
+            Tuple of (found, value). found=True with value None is a cached "does not exist".
+        """
+        if not self.enabled:
+            return False, None
+        
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(namespace, {}).get(key)
+            if entry and entry[1] > now:
+                self.hits[namespace] += 1
+                return True, entry[0]
+            if self._loaded_until.get(namespace, 0) > now:
+                # Namespace holds the complete table: absent means it doesn't exist
+                self.hits[namespace] += 1
+                return True, None
+            self.misses[namespace] += 1
+            return False, None
+    
+    def put(self, namespace: str, key: str, value: Optional[Any], replace: bool = True):
+        """
+        Store a looked-up or newly inserted row; None caches a miss for the negative TTL.
+        
+        With replace=False an existing (unexpired) positive entry is kept.
+        """
+        if not self.enabled:
+            return
+        
+        now = time.monotonic()
+        ttl = self.ttl_seconds if value is not None else self.negative_ttl_seconds
+        with self._lock:
+            entries = self._entries.setdefault(namespace, {})
+            existing = entries.get(key)
+            if not replace and existing and existing[0] is not None and existing[1] > now:
+                return
+            entries[key] = (value, now + ttl)
+    
+    def load(self, namespace: str, entries: Dict[str, Any]):
+        """Replace a namespace with a complete bulk-loaded snapshot of its table."""
+        if not self.enabled:
+            return
+        
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[namespace] = {key: (value, expires_at) for key, value in entries.items()}
+            self._loaded_until[namespace] = expires_at
+    
+    def should_load(self, namespace: str) -> bool:
+        """True when a namespace is not (or no longer) loaded and no recent load failed."""
+        if not self.enabled:
+            return False
+        now = time.monotonic()
+        return self._loaded_until.get(namespace, 0) <= now and self._retry_load_at.get(namespace, 0) <= now
+    
+    def mark_load_failed(self, namespace: str):
+        """Fall back to per-key lookups for a while instead of retrying the bulk load every call."""
+        self._retry_load_at[namespace] = time.monotonic() + self.negative_ttl_seconds
+    
+    def invalidate(self, namespace: Optional[str] = None):
+        """Drop one namespace (or everything); it is reloaded on next use."""
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+                self._loaded_until.clear()
+            else:
+                self._entries.pop(namespace, None)
+                self._loaded_until.pop(namespace, None)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of this process, overall and per namespace."""
+        now = time.monotonic()
+        hits = sum(self.hits.values())
+        misses = sum(self.misses.values())
+        with self._lock:
+            namespaces = sorted(set(self._entries) | set(self.hits) | set(self.misses))
+            return {
+                "enabled": self.enabled,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+                "by_namespace": {
+                    namespace: {
+                        "entries": len(self._entries.get(namespace, {})),
+                        "loaded": self._loaded_until.get(namespace, 0) > now,
+                        "hits": self.hits[namespace],
+                        "misses": self.misses[namespace]
+                    }
+                    for namespace in namespaces
+                }
+            }
+
+
+def with_has_logo(row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Add a has_logo flag to a row selected without logo_data (logo_filename is set with every upload)."""
+    if row is not None:
+        row["has_logo"] = bool(row.get("logo_filename"))
+    return row
+
+
+# Search modes of the job and company lists (migration 074):
+# basic    - substring match on the job title / company name (ILIKE, trigram-indexed)
+# fulltext - jobs: websearch syntax over title, enrichment summaries and description;
+#            companies: substring and fuzzy name matches, best match first
+SearchMode = Literal["basic", "fulltext"]
+
+# sort_field for full-text job searches ordered by relevance
+RELEVANCE_SORT = "relevance"
+
+# Ranked matches fetched for relevance ordering (later pages are not reachable, and
+# relevance totals count at most this many jobs)
+JOB_SEARCH_MAX_RESULTS = 500
+COMPANY_SEARCH_MAX_RESULTS = 100
+
+# Newest runs first; id breaks ties between runs started at the same time
+SCRAPE_RUN_SORT_KEYS = [SortKey("started_at", desc=True), SortKey("id", desc=True)]
+
+
+def job_sort_keys(sort_field: str = "ranking_position", sort_direction: str = "asc") -> List[SortKey]:
+    """
+    Sort keys of search_jobs: the sort field, then id as unique tie-breaker.
+    
+    Ranking sorts add ranking_score DESC so duplicate positions keep the best
+    score first.
+    """
+    keys = [SortKey(sort_field, desc=sort_direction.lower() == "desc")]
+    if sort_field == "ranking_position":
+        keys.append(SortKey("ranking_score", desc=True))
+    keys.append(SortKey("id"))
+    return keys
+
+
+def job_filter_embeds(type_ids: Optional[List[str]] = None, ai_enriched: Optional[bool] = None) -> str:
+    """Extra embeds (aliases) that the job type and AI enrichment filters of apply_job_filters need."""
+    embeds = ""
+    
+    # Filter by job types: separate inner-joined alias so the embedded job_types
+    # list of the search select still contains ALL types of each matching job
+    if type_ids and len(type_ids) > 0:
+        embeds += ", type_filter:job_type_assignments!inner(job_type_id)"
+    
+    # Filter by AI enrichment status: alias embedding only completed enrichments
+    if ai_enriched is not None:
+        embeds += ", enrichment_filter:llm_enrichment(enrichment_completed_at)"
+    
+    return embeds
+
+
+def apply_job_filters(
+    query,
+    search_query: Optional[str] = None,
+    company_ids: Optional[List[str]] = None,
+    location_ids: Optional[List[str]] = None,
+    type_ids: Optional[List[str]] = None,
+    seniority: Optional[List[str]] = None,
+    employment: Optional[List[str]] = None,
+    posted_date: Optional[str] = None,
+    ai_enriched: Optional[bool] = None,
+    title_classification: Optional[str] = None,
+    type_datarol: Optional[str] = None,
+    contract: Optional[str] = None,
+    subdivision_name_en: Optional[str] = None,
+    source: Optional[str] = None,
+    active_only: bool = True,
+    job_ids: Optional[List[str]] = None,
+    search_mode: SearchMode = "basic"
+):
+    """
+    Apply the job search filters to a job_postings query (sync builder or adb query).
+    
+    The select must include job_filter_embeds(type_ids, ai_enriched), and
+    llm_enrichment / locations when filtering on their columns.
+    """
+    if type_ids and len(type_ids) > 0:
+        query = query.in_("type_filter.job_type_id", type_ids)
+    
+    if ai_enriched is not None:
+        query = query.not_.is_("enrichment_filter.enrichment_completed_at", "null")
+        if ai_enriched:
+            # Keep jobs with a completed enrichment
+            query = query.not_.is_("enrichment_filter", "null")
+        else:
+            # Keep jobs without one (no llm_enrichment row, or not completed yet)
+            query = query.is_("enrichment_filter", "null")
+    
+    # Filter by job IDs if provided (for run_id filtering)
+    if job_ids is not None:
+        query = query.in_("id", job_ids)
+    
+    if active_only:
+        query = query.eq("is_active", True)
+    
+    if search_query and search_mode == "fulltext":
+        # websearch_to_tsquery on the search document; 'simple' matches words as written
+        # in any language (relevance-ordered searches also match stemmed forms, see search_job_ids)
+        query = query.filter("search_vector", "wfts(simple)", search_query)
+    elif search_query:
+        # Simple text search in title
+        query = query.ilike("title", f"%{search_query}%")
+    
+    # Filter by company IDs
+    if company_ids and len(company_ids) > 0:
+        query = query.in_("company_id", company_ids)
+    
+    # Filter by location IDs
+    if location_ids and len(location_ids) > 0:
+        query = query.in_("location_id", location_ids)
+    
+    # Filter by seniority (can be multiple)
+    if seniority and len(seniority) > 0:
+        query = query.in_("seniority_level", seniority)
+    
+    # Filter by employment type (can be multiple)
+    if employment and len(employment) > 0:
+        query = query.in_("employment_type", employment)
+    
+    # Filter by posted date
+    if posted_date and posted_date != 'all':
+        now = datetime.now()
+        if posted_date == 'today':
+            date_threshold = now - timedelta(days=1)
+        elif posted_date == 'week':
+            date_threshold = now - timedelta(days=7)
+        elif posted_date == 'month':
+            date_threshold = now - timedelta(days=30)
+        else:
+            date_threshold = None
+        
+        if date_threshold:
+            query = query.gte("posted_date", date_threshold.isoformat())
+    
+    # Filter by title classification
+    if title_classification:
+        query = query.eq("title_classification", title_classification)
+    
+    # Filter by data role type (requires join with llm_enrichment)
+    if type_datarol:
+        # Note: This requires llm_enrichment to be joined in the select
+        query = query.eq("llm_enrichment.type_datarol", type_datarol)
+    
+    # Filter by contract type (requires join with llm_enrichment)
+    if contract:
+        query = query.eq("llm_enrichment.contract", contract)
+    
+    # Filter by subdivision (province/region) in English
+    if subdivision_name_en:
+        query = query.eq("locations.subdivision_name_en", subdivision_name_en)
+    
+    # Filter by source (linkedin or indeed)
+    if source:
+        query = query.eq("source", source)
+    
+    return query
+
+
+def slim_company(company: Dict[str, Any]) -> Dict[str, Any]:
+    """Company row as kept in the master-data cache (logo_data blob replaced by a has_logo flag)."""
+    return {
+        "id": str(company["id"]),
+        "name": company.get("name"),
+        "linkedin_company_id": company.get("linkedin_company_id"),
+        "has_logo": bool(company.get("has_logo") or company.get("logo_data"))
+    }
+
+
 class SupabaseClient:
     """Wrapper around Supabase client for database operations."""
     
@@ -16,6 +373,11 @@ class SupabaseClient:
             settings.supabase_url,
             settings.supabase_key
         )
+        self.master_data = MasterDataCache(
+            ttl_seconds=settings.master_data_cache_ttl_seconds,
+            negative_ttl_seconds=settings.master_data_cache_negative_ttl_seconds,
+            enabled=settings.master_data_cache_enabled
+        )
         logger.info("Supabase client initialized")
     
     def test_connection(self) -> bool:
@@ -34,7 +396,9 @@ class SupabaseClient:
     def insert_company(self, data: Dict[str, Any]) -> UUID:
         """Insert a new company, return UUID."""
         result = self.client.table("companies").insert(data).execute()
-        return UUID(result.data[0]["id"])
+        company_id = UUID(result.data[0]["id"])
+        self._remember_company({**data, "id": company_id})
+        return company_id
     
     def get_company_by_linkedin_id(self, linkedin_id: str) -> Optional[Dict]:
         """Get company by LinkedIn company ID."""
@@ -64,28 +428,80 @@ class SupabaseClient:
             return result.data[0]
         
         # Multiple companies with same name - return best one
-        # Priority: logo_data > linkedin_company_id > first
-        companies = result.data
-        
-        # First try: company with logo
-        with_logo = [c for c in companies if c.get('logo_data')]
-        if with_logo:
-            return with_logo[0]
-        
-        # Second try: company with LinkedIn ID
-        with_linkedin = [c for c in companies if c.get('linkedin_company_id')]
-        if with_linkedin:
-            return with_linkedin[0]
-        
-        # Fallback: first one
-        return companies[0]
+        return select_best_company(result.data)
     
     def upsert_company(self, data: Dict[str, Any]) -> UUID:
         """Insert or update company, return UUID."""
         result = self.client.table("companies")\
             .upsert(data, on_conflict="linkedin_company_id")\
             .execute()
-        return UUID(result.data[0]["id"])
+        company_id = UUID(result.data[0]["id"])
+        self._remember_company({**data, "id": company_id})
+        return company_id
+    
+    def get_companies_by_linkedin_ids(self, linkedin_ids: Iterable[str]) -> Dict[str, Dict]:
+        """Get companies for many LinkedIn company IDs, keyed by LinkedIn ID."""
+        companies = {}
+        for chunk in chunked(set(linkedin_ids), IN_FILTER_CHUNK_SIZE):
+            result = self.client.table("companies")\
+                .select("id, name, linkedin_company_id")\
+                .in_("linkedin_company_id", chunk)\
+                .execute()
+            for row in result.data or []:
+                companies[row["linkedin_company_id"]] = row
+        return companies
+    
+    def get_companies_by_names(self, names: Iterable[str]) -> Dict[str, List[Dict]]:
+        """
+        Get all companies matching any of the given exact names, grouped by name.
+        
+        Rows carry a `has_logo` flag instead of the logo_data blob so callers can
+        apply the same preference as get_company_by_name via select_best_company.
+        """
+        companies: Dict[str, List[Dict]] = {}
+        for chunk in chunked(set(names), IN_FILTER_CHUNK_SIZE):
+            result = self.client.table("companies")\
+                .select("id, name, linkedin_company_id")\
+                .in_("name", chunk)\
+                .execute()
+            rows = result.data or []
+            if not rows:
+                continue
+            
+            with_logo = self.client.table("companies")\
+                .select("id")\
+                .in_("id", [row["id"] for row in rows])\
+                .not_.is_("logo_data", "null")\
+                .execute()
+            logo_ids = {row["id"] for row in with_logo.data or []}
+            
+            for row in rows:
+                row["has_logo"] = row["id"] in logo_ids
+                companies.setdefault(row["name"], []).append(row)
+        return companies
+    
+    def get_company_locations(self, company_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Get company_master_data.locatie_belgie for many companies, keyed by company ID."""
+        locations = {}
+        for chunk in chunked(set(company_ids), IN_FILTER_CHUNK_SIZE):
+            result = self.client.table("company_master_data")\
+                .select("company_id, locatie_belgie")\
+                .in_("company_id", chunk)\
+                .execute()
+            for row in result.data or []:
+                locations[row["company_id"]] = row.get("locatie_belgie")
+        return locations
+    
+    def get_company_ids_with_master_data(self, company_ids: Iterable[str]) -> set:
+        """Subset of company IDs that already have a company_master_data row."""
+        existing = set()
+        for chunk in chunked(set(company_ids), IN_FILTER_CHUNK_SIZE):
+            result = self.client.table("company_master_data")\
+                .select("company_id")\
+                .in_("company_id", chunk)\
+                .execute()
+            existing.update(row["company_id"] for row in result.data or [])
+        return existing
     
     # ==================== LOCATIONS ====================
     
@@ -101,7 +517,21 @@ class SupabaseClient:
     def insert_location(self, data: Dict[str, Any]) -> UUID:
         """Insert a new location, return UUID."""
         result = self.client.table("locations").insert(data).execute()
-        return UUID(result.data[0]["id"])
+        location_id = UUID(result.data[0]["id"])
+        self.remember_locations([{**data, "id": location_id}])
+        return location_id
+    
+    def get_locations_by_strings(self, location_strings: Iterable[str]) -> Dict[str, Dict]:
+        """Get locations for many full_location_string values, keyed by that string."""
+        locations = {}
+        for chunk in chunked(set(location_strings), IN_FILTER_CHUNK_SIZE):
+            result = self.client.table("locations")\
+                .select("id, full_location_string")\
+                .in_("full_location_string", chunk)\
+                .execute()
+            for row in result.data or []:
+                locations.setdefault(row["full_location_string"], row)
+        return locations
     
     # ==================== PROGRAMMING LANGUAGES ====================
     
@@ -118,6 +548,7 @@ class SupabaseClient:
     def insert_programming_language(self, data: Dict[str, Any]) -> UUID:
         """Insert a new programming language, return UUID."""
         result = self.client.table("programming_languages").insert(data).execute()
+        self._remember_tech("programming_languages", result.data[0])
         return UUID(result.data[0]["id"])
     
     def upsert_programming_language(self, data: Dict[str, Any]) -> UUID:
@@ -125,15 +556,28 @@ class SupabaseClient:
         result = self.client.table("programming_languages")\
             .upsert(data, on_conflict="name")\
             .execute()
+        self._remember_tech("programming_languages", result.data[0])
         return UUID(result.data[0]["id"])
     
+    def get_programming_languages_by_names(self, names: Iterable[str]) -> Dict[str, Dict]:
+        """Get programming languages (active or not) for many canonical names, keyed by name."""
+        rows = {}
+        for chunk in chunked(set(names), IN_FILTER_CHUNK_SIZE):
+            result = self.client.table("programming_languages")\
+                .select("id, name, is_active")\
+                .in_("name", chunk)\
+                .execute()
+            for row in result.data or []:
+                rows[row["name"]] = row
+        return rows
+    
     def get_all_programming_languages(self, active_only: bool = True) -> List[Dict]:
-        """Get all programming languages."""
-        query = self.client.table("programming_languages").select("*")
+        """Get all programming languages (without logo blobs, with a has_logo flag)."""
+        query = self.client.table("programming_languages").select(TECH_STACK_COLUMNS)
         if active_only:
             query = query.eq("is_active", True)
         result = query.order("name").execute()
-        return result.data if result.data else []
+        return [with_has_logo(row) for row in result.data or []]
     
     # ==================== ECOSYSTEMS ====================
     
@@ -150,6 +594,7 @@ class SupabaseClient:
     def insert_ecosystem(self, data: Dict[str, Any]) -> UUID:
         """Insert a new ecosystem, return UUID."""
         result = self.client.table("ecosystems").insert(data).execute()
+        self._remember_tech("ecosystems", result.data[0])
         return UUID(result.data[0]["id"])
     
     def upsert_ecosystem(self, data: Dict[str, Any]) -> UUID:
@@ -157,15 +602,47 @@ class SupabaseClient:
         result = self.client.table("ecosystems")\
             .upsert(data, on_conflict="name")\
             .execute()
+        self._remember_tech("ecosystems", result.data[0])
         return UUID(result.data[0]["id"])
     
+    def get_ecosystems_by_names(self, names: Iterable[str]) -> Dict[str, Dict]:
+        """Get ecosystems (active or not) for many canonical names, keyed by name."""
+        rows = {}
+        for chunk in chunked(set(names), IN_FILTER_CHUNK_SIZE):
+            result = self.client.table("ecosystems")\
+                .select("id, name, is_active")\
+                .in_("name", chunk)\
+                .execute()
+            for row in result.data or []:
+                rows[row["name"]] = row
+        return rows
+    
     def get_all_ecosystems(self, active_only: bool = True) -> List[Dict]:
-        """Get all ecosystems."""
-        query = self.client.table("ecosystems").select("*")
+        """Get all ecosystems (without logo blobs, with a has_logo flag)."""
+        query = self.client.table("ecosystems").select(TECH_STACK_COLUMNS)
         if active_only:
             query = query.eq("is_active", True)
         result = query.order("name").execute()
-        return result.data if result.data else []
+        return [with_has_logo(row) for row in result.data or []]
+    
+    # ==================== JOB TYPES ====================
+    
+    def get_job_type_by_id(self, job_type_id: str) -> Optional[Dict]:
+        """Get job type (id, name, color) by ID."""
+        result = self.client.table("job_types")\
+            .select("id, name, color")\
+            .eq("id", job_type_id)\
+            .maybe_single()\
+            .execute()
+        return result.data if result else None
+    
+    def assign_job_type(self, job_ids: List[str], job_type_id: str, assigned_via: str = "scrape") -> int:
+        """Assign a job type to many jobs; existing assignments are skipped (ON CONFLICT DO NOTHING)."""
+        rows = [
+            {"job_posting_id": str(job_id), "job_type_id": str(job_type_id), "assigned_via": assigned_via}
+            for job_id in dict.fromkeys(job_ids)
+        ]
+        return self.bulk_upsert("job_type_assignments", rows, on_conflict="job_posting_id,job_type_id", ignore_duplicates=True)
     
     # ==================== JOB TECH STACK ASSIGNMENTS ====================
     
@@ -198,7 +675,7 @@ class SupabaseClient:
     def get_job_programming_languages(self, job_id: UUID) -> List[Dict]:
         """Get all programming languages for a job with requirement levels."""
         result = self.client.table("job_programming_languages")\
-            .select("*, programming_languages(*)")\
+            .select(f"*, programming_languages({TECH_STACK_COLUMNS})")\
             .eq("job_posting_id", str(job_id))\
             .execute()
         return result.data if result.data else []
@@ -206,7 +683,7 @@ class SupabaseClient:
     def get_job_ecosystems(self, job_id: UUID) -> List[Dict]:
         """Get all ecosystems for a job with requirement levels."""
         result = self.client.table("job_ecosystems")\
-            .select("*, ecosystems(*)")\
+            .select(f"*, ecosystems({TECH_STACK_COLUMNS})")\
             .eq("job_posting_id", str(job_id))\
             .execute()
         return result.data if result.data else []
@@ -243,6 +720,14 @@ class SupabaseClient:
             .eq("id", str(job_id))\
             .execute()
     
+    def update_jobs_last_seen(self, job_ids: List[UUID], last_seen_at: str) -> None:
+        """Set last_seen_at to the same timestamp for many job postings."""
+        for chunk in chunked([str(jid) for jid in job_ids], IN_FILTER_CHUNK_SIZE):
+            self.client.table("job_postings")\
+                .update({"last_seen_at": last_seen_at})\
+                .in_("id", chunk)\
+                .execute()
+    
     def mark_jobs_inactive(self, job_ids: List[UUID]) -> int:
         """Mark multiple jobs as inactive."""
         result = self.client.table("job_postings")\
@@ -252,6 +737,7 @@ class SupabaseClient:
             })\
             .in_("id", [str(jid) for jid in job_ids])\
             .execute()
+        response_cache.invalidate(TAG_JOBS)
         return len(result.data)
     
     # ==================== JOB DESCRIPTIONS ====================
@@ -308,19 +794,27 @@ class SupabaseClient:
         self,
         status: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[Dict]:
-        """Get scrape runs with optional filtering."""
+        """
+        Get scrape runs with optional filtering, newest first.
+        
+        With a cursor (see database.pagination) the page starts after the
+        cursor's run instead of at offset.
+        """
         query = self.client.table("scrape_runs").select("*")
         
         if status:
             query = query.eq("status", status)
         
-        result = query.order("started_at", desc=True)\
-            .range(offset, offset + limit - 1)\
-            .execute()
+        query = apply_keyset(query, SCRAPE_RUN_SORT_KEYS, cursor)
+        if cursor:
+            query = query.limit(limit)
+        else:
+            query = query.range(offset, offset + limit - 1)
         
-        return result.data
+        return query.execute().data
     
     # ==================== JOB SCRAPE HISTORY ====================
     
@@ -331,6 +825,56 @@ class SupabaseClient:
             "scrape_run_id": str(run_id)
         }).execute()
     
+    # ==================== BULK WRITES ====================
+    
+    def bulk_insert(
+        self,
+        table: str,
+        rows: List[Dict[str, Any]],
+        chunk_size: int = BULK_WRITE_CHUNK_SIZE
+    ) -> int:
+        """
+        Insert many rows with chunked multi-row INSERTs.
+        
+        Keys missing from a row fall back to the column default (same as a
+        single-row insert). Returns the number of rows written.
+        """
+        written = 0
+        for chunk in chunked(rows, chunk_size):
+            self.client.table(table)\
+                .insert(chunk, returning=ReturnMethod.minimal, default_to_null=False)\
+                .execute()
+            written += len(chunk)
+        return written
+    
+    def bulk_upsert(
+        self,
+        table: str,
+        rows: List[Dict[str, Any]],
+        on_conflict: str,
+        ignore_duplicates: bool = False,
+        chunk_size: int = BULK_WRITE_CHUNK_SIZE
+    ) -> int:
+        """
+        Upsert many rows with chunked multi-row INSERT ... ON CONFLICT.
+        
+        With ignore_duplicates=True conflicting rows are skipped (DO NOTHING),
+        otherwise the provided columns are merged into the existing row.
+        """
+        written = 0
+        for chunk in chunked(rows, chunk_size):
+            self.client.table(table)\
+                .upsert(
+                    chunk,
+                    on_conflict=on_conflict,
+                    ignore_duplicates=ignore_duplicates,
+                    returning=ReturnMethod.minimal,
+                    default_to_null=False
+                )\
+                .execute()
+            written += len(chunk)
+        return written
+    
     # ==================== STATISTICS ====================
     
     def get_stats(self) -> Dict[str, int]:
@@ -385,150 +929,359 @@ class SupabaseClient:
         sort_field: str = "ranking_position",  # Changed from posted_date to ranking_position
         sort_direction: str = "asc",  # Changed from desc to asc (lower rank = better)
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        count: str = "exact",
+        search_mode: SearchMode = "basic",
+        ranks: Optional[Dict[str, float]] = None
     ) -> tuple[List[Dict], int]:
         """
         Search jobs with filters. Returns (jobs, total_count).
         Default sort is by ranking_position (ASC) to show best jobs first.
+        
+        With a cursor (from next_cursor(jobs, job_sort_keys(...), limit)) the
+        page starts after the cursor's job instead of at offset. count is a
+        count mode of database.pagination; total_count is None for "none".
+        
+        search_mode="fulltext" with sort_field="relevance" returns the best
+        matches first (search_job_ids, offset paging only; pass its result as
+        ranks when it was already fetched); relevance without a full-text
+        search falls back to the ranking sort.
+        
+        The two full-text modes match different sets: the other sorts filter on
+        search_vector @@ websearch_to_tsquery('simple', ...), while relevance
+        also matches stemmed (nl/fr/en) and fuzzy title matches, and its total
+        only counts the JOB_SEARCH_MAX_RESULTS best matches.
         """
         # Build query - include job_sources for multi-source support and llm_enrichment for type_datarol/contract filtering
         # Use explicit relationship name for locations to avoid ambiguity with location_id_override
-        query = self.client.table("job_postings")\
-            .select("*, companies(id, name, logo_url), locations!job_postings_location_id_fkey(id, city, country_code, subdivision_name_en), job_sources(source, source_job_id), llm_enrichment(type_datarol, seniority, rolniveau, contract)", count="exact")
+        # Job types and enrichment status are embedded too, so a page costs a single round trip
+        select = (
+            "*, companies(id, name, logo_url), "
+            "locations!job_postings_location_id_fkey(id, city, country_code, subdivision_name_en), "
+            "job_sources(source, source_job_id), "
+            "llm_enrichment(enrichment_completed_at, type_datarol, seniority, rolniveau, contract), "
+            "job_type_assignments(job_types(id, name, color))"
+        )
         
-        # NEW: Filter by job IDs if provided (for run_id filtering)
-        if job_ids is not None:
-            if len(job_ids) == 0:
-                # No jobs in this run, return empty
-                return [], 0
-            query = query.in_("id", job_ids)
+        select += job_filter_embeds(type_ids, ai_enriched)
         
-        if active_only:
-            query = query.eq("is_active", True)
+        # Filter by job IDs if provided (for run_id filtering)
+        if job_ids is not None and len(job_ids) == 0:
+            # No jobs in this run, return empty
+            return [], 0
         
-        if search_query:
-            # Simple text search in title
-            query = query.ilike("title", f"%{search_query}%")
-        
-        # Filter by company IDs
-        if company_ids and len(company_ids) > 0:
-            query = query.in_("company_id", company_ids)
-        
-        # Filter by location IDs
-        if location_ids and len(location_ids) > 0:
-            query = query.in_("location_id", location_ids)
-        
-        # Filter by seniority (can be multiple)
-        if seniority and len(seniority) > 0:
-            query = query.in_("seniority_level", seniority)
-        
-        # Filter by employment type (can be multiple)
-        if employment and len(employment) > 0:
-            query = query.in_("employment_type", employment)
-        
-        # Filter by posted date
-        if posted_date and posted_date != 'all':
-            from datetime import datetime, timedelta
-            now = datetime.now()
-            if posted_date == 'today':
-                date_threshold = now - timedelta(days=1)
-            elif posted_date == 'week':
-                date_threshold = now - timedelta(days=7)
-            elif posted_date == 'month':
-                date_threshold = now - timedelta(days=30)
-            else:
-                date_threshold = None
-            
-            if date_threshold:
-                query = query.gte("posted_date", date_threshold.isoformat())
+        filters = dict(
+            company_ids=company_ids,
+            location_ids=location_ids,
+            type_ids=type_ids,
+            seniority=seniority,
+            employment=employment,
+            posted_date=posted_date,
+            ai_enriched=ai_enriched,
+            title_classification=title_classification,
+            type_datarol=type_datarol,
+            contract=contract,
+            subdivision_name_en=subdivision_name_en,
+            source=source,
+            active_only=active_only
+        )
         
-        # Filter by title classification
-        if title_classification:
-            query = query.eq("title_classification", title_classification)
+        if sort_field == RELEVANCE_SORT:
+            if ranks is None and search_query and search_mode == "fulltext":
+                ranks = self.search_job_ids(search_query)
+            if ranks is not None:
+                if cursor:
+                    raise InvalidCursorError("Relevance-sorted results are paged with offset")
+                jobs, total = self._search_jobs_by_relevance(ranks, select, filters, job_ids, limit, offset)
+                return self._flatten_job_rows(jobs), total
+            # No ranking available: best ranked jobs first
+            sort_field, sort_direction = "ranking_position", "asc"
         
-        # Filter by data role type (requires join with llm_enrichment)
-        if type_datarol:
-            # Note: This requires llm_enrichment to be joined in the select
-            query = query.eq("llm_enrichment.type_datarol", type_datarol)
+        query = self.client.table("job_postings").select(select, count=count_method(count))
+        query = apply_job_filters(
+            query,
+            search_query=search_query,
+            job_ids=job_ids,
+            search_mode=search_mode,
+            **filters
+        )
+        
+        # Execute with pagination and sorting (see job_sort_keys)
+        # NULLS LAST ensures unranked jobs appear at the bottom
+        query = apply_keyset(query, job_sort_keys(sort_field, sort_direction), cursor)
+        if cursor:
+            result = query.limit(limit).execute()
+        else:
+            result = query.range(offset, offset + limit - 1).execute()
         
-        # Filter by contract type (requires join with llm_enrichment)
-        if contract:
-            query = query.eq("llm_enrichment.contract", contract)
+        return self._flatten_job_rows(result.data), result.count
+    
+    def search_job_ids(self, search_text: str, max_results: int = JOB_SEARCH_MAX_RESULTS) -> Optional[Dict[str, float]]:
+        """
+        Relevance per matching job id, best first (search_job_ids RPC, migration 074).
         
-        # Filter by subdivision (province/region) in English
-        if subdivision_name_en:
-            query = query.eq("locations.subdivision_name_en", subdivision_name_en)
+        Returns None when the RPC is unavailable.
+        """
+        try:
+            result = self.client.rpc("search_job_ids", {
+                "p_search_text": search_text,
+                "p_max_results": max_results
+            }).execute()
+        except Exception as e:
+            logger.warning(f"search_job_ids unavailable, falling back to the default job search: {e}")
+            return None
+        return {row["job_id"]: row["rank"] for row in result.data or []}
+    
+    def _search_jobs_by_relevance(
+        self,
+        ranks: Dict[str, float],
+        select: str,
+        filters: Dict[str, Any],
+        job_ids: Optional[List[str]],
+        limit: int,
+        offset: int
+    ) -> Tuple[List[Dict], int]:
+        """One page of the ranked jobs that pass the filters, in rank order, and their total."""
+        ranked_ids = list(ranks)
+        if job_ids is not None:
+            allowed = set(job_ids)
+            ranked_ids = [job_id for job_id in ranked_ids if job_id in allowed]
         
-        # Filter by source (linkedin or indeed)
-        if source:
-            query = query.eq("source", source)
+        # Which ranked jobs pass the other filters (ids only, chunked in_() lookups)
+        filter_select = (
+            "id, llm_enrichment(type_datarol, contract), "
+            "locations!job_postings_location_id_fkey(subdivision_name_en)"
+            + job_filter_embeds(filters.get("type_ids"), filters.get("ai_enriched"))
+        )
+        matching = set()
+        for chunk in chunked(ranked_ids, IN_FILTER_CHUNK_SIZE):
+            query = apply_job_filters(self.client.table("job_postings").select(filter_select), job_ids=chunk, **filters)
+            matching.update(row["id"] for row in query.execute().data or [])
         
-        # Execute with pagination and sorting
-        # Apply sorting based on parameters
-        is_desc = sort_direction.lower() == "desc"
+        ordered = [job_id for job_id in ranked_ids if job_id in matching]
+        page_ids = ordered[offset:offset + limit]
         
-        # If sorting by ranking_position, add secondary sort by ranking_score DESC
-        # This ensures correct order even if there are duplicate positions
-        # NULLS LAST ensures unranked jobs appear at the bottom
-        if sort_field == "ranking_position":
-            result = query.order(sort_field, desc=is_desc, nullsfirst=False)\
-                .order("ranking_score", desc=True)\
-                .range(offset, offset + limit - 1)\
-                .execute()
-        else:
-            result = query.order(sort_field, desc=is_desc)\
-                .range(offset, offset + limit - 1)\
-                .execute()
+        jobs = []
+        for chunk in chunked(page_ids, IN_FILTER_CHUNK_SIZE):
+            jobs.extend(self.client.table("job_postings").select(select).in_("id", chunk).execute().data or [])
         
-        # Enrich jobs with their types and AI enrichment status
-        jobs_with_types = []
-        for job in result.data:
-            # Get job types for this job
-            types_result = self.client.table("job_type_assignments")\
-                .select("job_types(id, name, color)")\
-                .eq("job_posting_id", job["id"])\
-                .execute()
-            
-            # Extract types from nested structure
-            job_types = []
-            if types_result.data:
-                for assignment in types_result.data:
-                    if assignment.get("job_types"):
-                        job_types.append(assignment["job_types"])
-            
-            job["job_types"] = job_types
-            
-            # Filter by type_ids if specified
-            if type_ids and len(type_ids) > 0:
-                job_type_ids = [jt["id"] for jt in job_types]
-                # Check if any of the job's types match the filter
-                if not any(type_id in job_type_ids for type_id in type_ids):
-                    continue  # Skip this job
-            
-            # Get AI enrichment status
-            enrichment_result = self.client.table("llm_enrichment")\
-                .select("enrichment_completed_at, type_datarol, rolniveau")\
-                .eq("job_posting_id", job["id"])\
-                .single()\
-                .execute()
+        position = {job_id: i for i, job_id in enumerate(page_ids)}
+        jobs.sort(key=lambda job: position[job["id"]])
+        for job in jobs:
+            job["search_rank"] = ranks[job["id"]]
+        return jobs, len(ordered)
+    
+    @staticmethod
+    def _flatten_job_rows(jobs: List[Dict]) -> List[Dict]:
+        """Flatten embedded job types and enrichment status into the response shape."""
+        for job in jobs:
+            assignments = job.pop("job_type_assignments", None) or []
+            job["job_types"] = [a["job_types"] for a in assignments if a.get("job_types")]
             
-            if enrichment_result.data:
-                job["ai_enriched"] = enrichment_result.data.get("enrichment_completed_at") is not None
-                job["ai_data"] = enrichment_result.data if job["ai_enriched"] else None
-            else:
-                job["ai_enriched"] = False
-                job["ai_data"] = None
+            job.pop("type_filter", None)
+            job.pop("enrichment_filter", None)
             
-            # Filter by AI enrichment status if specified
-            if ai_enriched is not None:
-                if ai_enriched and not job["ai_enriched"]:
-                    continue  # Skip unenriched jobs
-                if not ai_enriched and job["ai_enriched"]:
-                    continue  # Skip enriched jobs
+            enrichment = job.get("llm_enrichment")
+            if isinstance(enrichment, list):
+                enrichment = enrichment[0] if enrichment else None
             
-            jobs_with_types.append(job)
+            job["ai_enriched"] = bool(enrichment and enrichment.get("enrichment_completed_at"))
+            job["ai_data"] = {
+                "enrichment_completed_at": enrichment.get("enrichment_completed_at"),
+                "type_datarol": enrichment.get("type_datarol"),
+                "rolniveau": enrichment.get("rolniveau")
+            } if job["ai_enriched"] else None
         
-        return jobs_with_types, result.count
+        return jobs
+    
+    # ==================== MASTER DATA CACHE ====================
+    
+    def warm_master_data_cache(self) -> None:
+        """Bulk-load every master-data namespace (e.g. before a scrape or enrichment batch)."""
+        for namespace in self._master_data_loaders():
+            self._ensure_master_data(namespace)
+        logger.info(f"Master-data cache warm: {self.master_data.stats()['by_namespace']}")
+    
+    def remember_companies(self, companies: Iterable[Dict[str, Any]]) -> None:
+        """Add companies written without insert_company/upsert_company (e.g. bulk upserts) to the cache."""
+        for company in companies:
+            self._remember_company(company)
+    
+    def remember_locations(self, locations: Iterable[Dict[str, Any]]) -> None:
+        """Add locations written without insert_location (e.g. bulk upserts) to the cache."""
+        for location in locations:
+            if location.get("full_location_string"):
+                self.master_data.put("locations", location["full_location_string"], {
+                    "id": str(location["id"]),
+                    "full_location_string": location["full_location_string"]
+                })
+    
+    def get_cached_company_by_linkedin_id(self, linkedin_id: str) -> Optional[Dict]:
+        """Cached get_company_by_linkedin_id; returns a slim row (id, name, linkedin_company_id, has_logo)."""
+        return self._cached_lookup(
+            "companies_by_linkedin_id",
+            linkedin_id,
+            lambda key: self._slim_or_none(self.get_company_by_linkedin_id(key))
+        )
+    
+    def get_cached_company_by_name(self, name: str) -> Optional[Dict]:
+        """Cached get_company_by_name (same best-company preference); returns a slim row."""
+        return self._cached_lookup(
+            "companies_by_name",
+            name,
+            lambda key: self._slim_or_none(self.get_company_by_name(key))
+        )
+    
+    def get_cached_location_by_string(self, location_string: str) -> Optional[Dict]:
+        """Cached get_location_by_string; returns {id, full_location_string}."""
+        return self._cached_lookup(
+            "locations",
+            location_string,
+            lambda key: self.get_locations_by_strings([key]).get(key)
+        )
+    
+    def get_cached_company_location(self, company_id: str) -> Optional[str]:
+        """Cached company_master_data.locatie_belgie of one company."""
+        return self._cached_lookup(
+            "company_locations",
+            str(company_id),
+            lambda key: self.get_company_locations([key]).get(key)
+        )
+    
+    def get_cached_programming_language(self, name: str) -> Optional[Dict]:
+        """Cached get_programming_language_by_name (active languages only)."""
+        return self._cached_lookup("programming_languages", name, self.get_programming_language_by_name)
+    
+    def get_cached_ecosystem(self, name: str) -> Optional[Dict]:
+        """Cached get_ecosystem_by_name (active ecosystems only)."""
+        return self._cached_lookup("ecosystems", name, self.get_ecosystem_by_name)
+    
+    def get_cached_job_type(self, job_type_id: str) -> Optional[Dict]:
+        """Cached get_job_type_by_id."""
+        return self._cached_lookup("job_types", str(job_type_id), self.get_job_type_by_id)
+    
+    def get_cached_job_types(self, job_type_ids: Iterable[str]) -> Dict[str, Dict]:
+        """Cached job types by ID (one warm load of the small job_types table); unknown IDs are left out."""
+        job_types = {}
+        for job_type_id in set(job_type_ids):
+            job_type = self.get_cached_job_type(job_type_id)
+            if job_type:
+                job_types[job_type_id] = job_type
+        return job_types
+    
+    def _cached_lookup(self, namespace: str, key: str, fetch: Callable[[str], Optional[Any]]) -> Optional[Any]:
+        self._ensure_master_data(namespace)
+        found, value = self.master_data.get(namespace, key)
+        if found:
+            return value
+        
+        value = fetch(key)
+        self.master_data.put(namespace, key, value)
+        return value
+    
+    def _master_data_loaders(self) -> Dict[str, Callable[[], None]]:
+        return {
+            "companies_by_linkedin_id": self._load_companies,
+            "companies_by_name": self._load_companies,
+            "locations": self._load_locations,
+            "company_locations": self._load_company_locations,
+            "programming_languages": self._load_programming_languages,
+            "ecosystems": self._load_ecosystems,
+            "job_types": self._load_job_types
+        }
+    
+    def _ensure_master_data(self, namespace: str) -> None:
+        """Warm-load a namespace on first use and again once its TTL has expired."""
+        if not self.master_data.should_load(namespace):
+            return
+        try:
+            self._master_data_loaders()[namespace]()
+        except Exception as e:
+            logger.warning(f"Could not warm master-data cache '{namespace}', using per-key lookups: {e}")
+            self.master_data.mark_load_failed(namespace)
+    
+    def _select_all(
+        self,
+        table: str,
+        columns: str,
+        where: Optional[Callable[[Any], Any]] = None,
+        page_size: int = MASTER_DATA_PAGE_SIZE
+    ) -> List[Dict]:
+        """Read a whole table in keyset pages on id."""
+        rows = []
+        last_id = None
+        while True:
+            query = self.client.table(table).select(columns)
+            if where:
+                query = where(query)
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            page = query.order("id").limit(page_size).execute().data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+            last_id = page[-1]["id"]
+    
+    def _load_companies(self) -> None:
+        rows = self._select_all("companies", "id, name, linkedin_company_id")
+        logo_ids = {
+            row["id"]
+            for row in self._select_all("companies", "id", lambda query: query.not_.is_("logo_data", "null"))
+        }
+        
+        by_linkedin_id = {}
+        by_name: Dict[str, List[Dict]] = {}
+        for row in rows:
+            row["has_logo"] = row["id"] in logo_ids
+            if row.get("linkedin_company_id"):
+                by_linkedin_id[row["linkedin_company_id"]] = row
+            by_name.setdefault(row["name"], []).append(row)
+        
+        self.master_data.load("companies_by_linkedin_id", by_linkedin_id)
+        self.master_data.load("companies_by_name", {
+            name: select_best_company(companies, has_logo=lambda c: c["has_logo"])
+            for name, companies in by_name.items()
+        })
+    
+    def _load_locations(self) -> None:
+        locations = {}
+        for row in self._select_all("locations", "id, full_location_string"):
+            locations.setdefault(row["full_location_string"], row)
+        self.master_data.load("locations", locations)
+    
+    def _load_company_locations(self) -> None:
+        rows = self._select_all("company_master_data", "id, company_id, locatie_belgie")
+        self.master_data.load("company_locations", {row["company_id"]: row.get("locatie_belgie") for row in rows})
+    
+    def _load_programming_languages(self) -> None:
+        languages = self.get_all_programming_languages(active_only=True)
+        self.master_data.load("programming_languages", {row["name"]: row for row in languages})
+    
+    def _load_ecosystems(self) -> None:
+        ecosystems = self.get_all_ecosystems(active_only=True)
+        self.master_data.load("ecosystems", {row["name"]: row for row in ecosystems})
+    
+    def _load_job_types(self) -> None:
+        job_types = self._select_all("job_types", "id, name, color")
+        self.master_data.load("job_types", {row["id"]: row for row in job_types})
+    
+    @staticmethod
+    def _slim_or_none(company: Optional[Dict]) -> Optional[Dict]:
+        return slim_company(company) if company else None
+    
+    def _remember_company(self, company: Dict[str, Any]) -> None:
+        """Add a written company to the cache (an existing best match for its name is kept)."""
+        row = slim_company(company)
+        if row["linkedin_company_id"]:
+            self.master_data.put("companies_by_linkedin_id", row["linkedin_company_id"], row)
+        if row["name"]:
+            self.master_data.put("companies_by_name", row["name"], row, replace=False)
+    
+    def _remember_tech(self, namespace: str, row: Dict[str, Any]) -> None:
+        """Add a written programming language/ecosystem to the cache (inactive ones are not looked up)."""
+        if row.get("name"):
+            self.master_data.put(namespace, row["name"], row if row.get("is_active", True) else None)
     
     # ==================== VAGUE LOCATIONS CONFIG ====================
     
@@ -538,6 +1291,10 @@ class SupabaseClient:
         Returns list of pattern strings (e.g., ['Flemish Region', 'Belgium']).
         Falls back to hardcoded defaults if table doesn't exist or is empty.
         """
+        found, patterns = self.master_data.get("vague_location_patterns", "active")
+        if found and patterns:
+            return patterns
+        
         try:
             result = self.client.table("vague_locations_config")\
                 .select("pattern")\
@@ -547,6 +1304,7 @@ class SupabaseClient:
             if result.data:
                 patterns = [row["pattern"] for row in result.data]
                 logger.debug(f"Loaded {len(patterns)} vague location patterns from config")
+                self.master_data.put("vague_location_patterns", "active", patterns)
                 return patterns
             else:
                 logger.warning("No vague location patterns found in config, using defaults")
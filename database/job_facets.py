@@ -0,0 +1,454 @@
+"""
+In-memory faceted index over active jobs for the jobs listing.
+
+Every active job gets a document number; per facet value (seniority, job type,
+contract, ...) the index keeps a bitmap of the documents that have it, as a
+Python int (bit i = document i). A filtered list is the AND of the selected
+facets (OR within a facet), and the count of every facet value under the other
+filters is one AND + popcount, so a page of job ids, the total and all facet
+counts come from one pass over the bitmaps instead of a filtered + counted
+query plus one count query per facet. The page rows are then read by id.
+
+The shared `job_facets` cache builds the index in a background thread and
+serves it until it expires or is invalidated (stale-while-revalidate):
+
+    job_facets.refresh_jobs(job_ids)  # ingestion/enrichment: re-read these jobs on the next query
+    job_facets.invalidate()           # ranking: order changed, rebuild in the background
+
+Writers in other processes (scripts) cannot reach the index; its TTL bounds how
+stale their changes can appear.
+"""
+
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from config.settings import settings
+from database.client import IN_FILTER_CHUNK_SIZE, chunked, db, job_sort_keys
+
+# Facets by list filter name (OR within a facet, AND across facets)
+JOB_FACETS = (
+    "seniority",
+    "employment",
+    "type_ids",
+    "type_datarol",
+    "contract",
+    "subdivision_name_en",
+    "source",
+    "title_classification",
+    "ai_enriched",
+    "company_ids",
+    "location_ids"
+)
+
+# Facets returned with counts (companies and locations have too many values)
+COUNTED_FACETS = tuple(facet for facet in JOB_FACETS if facet not in ("company_ids", "location_ids"))
+
+# posted_date filter values and their window in days
+POSTED_DATE_DAYS = {"today": 1, "week": 7, "month": 30}
+
+# Sort fields the index can order by (the jobs page columns)
+INDEX_SORT_FIELDS = ("ranking_position", "ranking_score", "title", "posted_date")
+
+# Text sort fields, ordered case-insensitively like the database collation
+COLLATED_SORT_FIELDS = ("title",)
+
+JOB_INDEX_SELECT = (
+    "id, title, seniority_level, employment_type, posted_date, source, title_classification, "
+    "company_id, location_id, ranking_position, ranking_score, "
+    "locations!job_postings_location_id_fkey(subdivision_name_en), "
+    "llm_enrichment(type_datarol, contract, enrichment_completed_at), "
+    "job_type_assignments(job_type_id)"
+)
+
+# Rows per database round trip while building the index
+INDEX_PAGE_SIZE = 1000
+
+
+def bitmap_of(docs: Iterable[int]) -> int:
+    """Bitmap with the bits of docs set (built in one pass, not one shift per doc)."""
+    docs = list(docs)
+    if not docs:
+        return 0
+    buffer = bytearray(max(docs) // 8 + 1)
+    for doc in docs:
+        buffer[doc >> 3] |= 1 << (doc & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def popcount(bitmap: int) -> int:
+    return bin(bitmap).count("1")
+
+
+def _one(value: Any) -> Optional[Dict[str, Any]]:
+    """One-to-one embeds come back as a dict or a one-element list."""
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    """Seconds since the epoch of a PostgREST date/timestamp (naive values are UTC)."""
+    if not value:
+        return None
+    # Python 3.9 fromisoformat: no "Z" and only 3 or 6 fractional digits
+    text = re.sub(r"\.(\d+)", lambda m: "." + (m.group(1) + "000000")[:6], value.replace("Z", "+00:00"), count=1)
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def job_facet_values(row: Dict[str, Any]) -> Dict[str, Tuple[str, ...]]:
+    """Facet values of a job row selected with JOB_INDEX_SELECT."""
+    enrichment = _one(row.get("llm_enrichment")) or {}
+    location = _one(row.get("locations")) or {}
+    contract = enrichment.get("contract")
+    values = {
+        "seniority": (row.get("seniority_level"),),
+        "employment": (row.get("employment_type"),),
+        "type_ids": tuple(a.get("job_type_id") for a in row.get("job_type_assignments") or []),
+        "type_datarol": (enrichment.get("type_datarol"),),
+        "contract": tuple(contract) if isinstance(contract, list) else (contract,),
+        "subdivision_name_en": (location.get("subdivision_name_en"),),
+        "source": (row.get("source"),),
+        "title_classification": (row.get("title_classification"),),
+        "ai_enriched": ("true" if enrichment.get("enrichment_completed_at") else "false",),
+        "company_ids": (row.get("company_id"),),
+        "location_ids": (row.get("location_id"),)
+    }
+    return {facet: tuple(str(v) for v in facet_values if v is not None) for facet, facet_values in values.items()}
+
+
+class JobFacetIndex:
+    """Facet bitmaps, titles and sort values of active jobs (not thread-safe; see JobFacetCache)."""
+    
+    def __init__(self):
+        self.doc_ids: List[Optional[str]] = []  # None = removed document
+        self.docs: Dict[str, int] = {}
+        self.values: List[Dict[str, Tuple[str, ...]]] = []
+        self.sort_values: List[Dict[str, Any]] = []
+        self.titles: List[str] = []
+        self.posted: List[Optional[float]] = []
+        self.bitmaps: Dict[str, Dict[str, int]] = {facet: {} for facet in JOB_FACETS}
+        self.alive = 0
+        self._orders: Dict[Tuple[str, str], List[int]] = {}
+    
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "JobFacetIndex":
+        """Bulk build: collect the documents per value, then make each bitmap once."""
+        index = cls()
+        members: Dict[str, Dict[str, List[int]]] = {facet: {} for facet in JOB_FACETS}
+        for row in rows:
+            doc = index._append(row)
+            for facet, facet_values in index.values[doc].items():
+                for value in facet_values:
+                    members[facet].setdefault(value, []).append(doc)
+        index.bitmaps = {
+            facet: {value: bitmap_of(docs) for value, docs in by_value.items()}
+            for facet, by_value in members.items()
+        }
+        index.alive = bitmap_of(index.docs.values())
+        return index
+    
+    @property
+    def size(self) -> int:
+        return len(self.docs)
+    
+    def _append(self, row: Dict[str, Any]) -> int:
+        doc = len(self.doc_ids)
+        self.doc_ids.append(row["id"])
+        self.docs[row["id"]] = doc
+        self.values.append(job_facet_values(row))
+        self.sort_values.append({field: row.get(field) for field in INDEX_SORT_FIELDS + ("id",)})
+        self.titles.append((row.get("title") or "").lower())
+        self.posted.append(_timestamp(row.get("posted_date")))
+        return doc
+    
+    def _set_bits(self, doc: int, on: bool):
+        bit = 1 << doc
+        for facet, facet_values in self.values[doc].items():
+            bitmaps = self.bitmaps[facet]
+            for value in facet_values:
+                if on:
+                    bitmaps[value] = bitmaps.get(value, 0) | bit
+                else:
+                    bitmaps[value] = bitmaps.get(value, 0) & ~bit
+                    if not bitmaps[value]:
+                        del bitmaps[value]
+        self.alive = self.alive | bit if on else self.alive & ~bit
+    
+    def upsert(self, row: Dict[str, Any]):
+        """Add a job or update its facet values in place (its document keeps its number)."""
+        doc = self.docs.get(row["id"])
+        if doc is None:
+            doc = self._append(row)
+        else:
+            self._set_bits(doc, False)
+            self.values[doc] = job_facet_values(row)
+            self.sort_values[doc] = {field: row.get(field) for field in INDEX_SORT_FIELDS + ("id",)}
+            self.titles[doc] = (row.get("title") or "").lower()
+            self.posted[doc] = _timestamp(row.get("posted_date"))
+        self._set_bits(doc, True)
+        self._orders.clear()
+    
+    def remove(self, job_id: str):
+        doc = self.docs.pop(job_id, None)
+        if doc is None:
+            return
+        self._set_bits(doc, False)
+        self.doc_ids[doc] = None
+        self._orders.clear()
+    
+    def _posted_since(self, days: int) -> int:
+        threshold = time.time() - timedelta(days=days).total_seconds()
+        return bitmap_of(doc for doc, posted in enumerate(self.posted) if posted is not None and posted >= threshold) & self.alive
+    
+    def _order(self, sort_field: str, sort_direction: str) -> List[int]:
+        """Live documents in the order of search_jobs (job_sort_keys), cached until the next change."""
+        key = (sort_field, sort_direction)
+        if key not in self._orders:
+            docs = list(self.docs.values())
+            # Stable sorts, least significant key first; NULLs sort like Postgres (last ASC, first DESC)
+            for sort_key in reversed(job_sort_keys(sort_field, sort_direction)):
+                def value(doc, column=sort_key.column):
+                    v = self.sort_values[doc].get(column)
+                    if v is None:
+                        return (True,)
+                    if column in COLLATED_SORT_FIELDS:
+                        # Approximates the database collation: case only breaks ties
+                        return (False, v.casefold(), v)
+                    return (False, v)
+                docs.sort(key=value, reverse=sort_key.desc)
+            self._orders[key] = docs
+        return self._orders[key]
+    
+    def query(
+        self,
+        filters: Dict[str, List[str]],
+        posted_date: Optional[str] = None,
+        search: Optional[str] = None,
+        job_ids: Optional[List[str]] = None,
+        sort_field: str = "ranking_position",
+        sort_direction: str = "asc",
+        offset: int = 0,
+        limit: int = 50,
+        facets: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Page of job ids, total and (optionally) facet counts for the filters.
+        
+        Facet counts apply every filter except the facet's own, so each value
+        shows how many jobs selecting it (too) would give.
+        """
+        # One bitmap per active filter
+        selected: Dict[str, int] = {}
+        for facet, wanted in filters.items():
+            if wanted:
+                bitmaps = self.bitmaps[facet]
+                selected[facet] = 0
+                for value in wanted:
+                    selected[facet] |= bitmaps.get(str(value), 0)
+        
+        base = self.alive
+        if search:
+            needle = search.lower()
+            base &= bitmap_of(doc for doc, title in enumerate(self.titles) if needle in title)
+        if job_ids is not None:
+            base &= bitmap_of(self.docs[job_id] for job_id in job_ids if job_id in self.docs)
+        
+        posted_bitmaps = {name: self._posted_since(days) for name, days in POSTED_DATE_DAYS.items()}
+        if posted_date in posted_bitmaps:
+            selected["posted_date"] = posted_bitmaps[posted_date]
+        
+        def matching(excluding: Optional[str] = None) -> int:
+            bitmap = base
+            for facet, facet_bitmap in selected.items():
+                if facet != excluding:
+                    bitmap &= facet_bitmap
+            return bitmap
+        
+        result = matching()
+        
+        # Page: walk the sort order and keep matching documents
+        bits = bin(result)[2:][::-1]
+        page = []
+        skipped = 0
+        for doc in (self._order(sort_field, sort_direction) if limit > 0 else ()):
+            if doc < len(bits) and bits[doc] == "1":
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                page.append(self.doc_ids[doc])
+                if len(page) >= limit:
+                    break
+        
+        response = {"job_ids": page, "total": popcount(result)}
+        
+        if facets:
+            counts = {}
+            for facet in COUNTED_FACETS:
+                others = matching(excluding=facet)
+                counts[facet] = {
+                    value: count
+                    for value, count in ((value, popcount(bitmap & others)) for value, bitmap in self.bitmaps[facet].items())
+                    if count
+                }
+            others = matching(excluding="posted_date")
+            counts["posted_date"] = {name: popcount(bitmap & others) for name, bitmap in posted_bitmaps.items()}
+            response["facets"] = counts
+        
+        return response
+
+
+def load_active_jobs(page_size: int = INDEX_PAGE_SIZE) -> List[Dict[str, Any]]:
+    """All active jobs with the indexed columns, in keyset pages on id."""
+    rows = []
+    last_id = None
+    while True:
+        query = db.client.table("job_postings").select(JOB_INDEX_SELECT).eq("is_active", True)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        page = query.order("id").limit(page_size).execute().data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        last_id = page[-1]["id"]
+
+
+def load_jobs(job_ids: List[str]) -> List[Dict[str, Any]]:
+    """Current rows of some jobs (chunked in_() lookups); deleted jobs are absent."""
+    rows = []
+    for chunk in chunked(job_ids, IN_FILTER_CHUNK_SIZE):
+        rows.extend(db.client.table("job_postings").select(JOB_INDEX_SELECT + ", is_active").in_("id", chunk).execute().data or [])
+    return rows
+
+
+class JobFacetCache:
+    """
+    The current JobFacetIndex of this process (see module docstring).
+    
+    query() never waits for a full build: without an index it starts one in
+    the background and returns None, so callers use the database meanwhile.
+    """
+    
+    def __init__(
+        self,
+        ttl_seconds: float = 900,
+        enabled: bool = True,
+        load_all: Callable[[], List[Dict[str, Any]]] = load_active_jobs,
+        load_some: Callable[[List[str]], List[Dict[str, Any]]] = load_jobs
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._load_all = load_all
+        self._load_some = load_some
+        self._index: Optional[JobFacetIndex] = None
+        self._expires_at = 0.0
+        self._pending: Set[str] = set()
+        # Refreshes requested while a build is loading (None when no build runs)
+        self._refreshed_during_build: Optional[Set[str]] = None
+        self._building = False
+        self._lock = threading.Lock()
+    
+    def refresh_jobs(self, job_ids: Iterable[Any]):
+        """Re-read these jobs (new, changed, deactivated or deleted) before the next query."""
+        job_ids = {str(job_id) for job_id in job_ids}
+        with self._lock:
+            self._pending.update(job_ids)
+            if self._refreshed_during_build is not None:
+                self._refreshed_during_build.update(job_ids)
+    
+    def invalidate(self):
+        """Rebuild the whole index in the background (e.g. after ranking changed the order)."""
+        with self._lock:
+            self._expires_at = 0.0
+    
+    def build(self):
+        """Load all active jobs and swap in a new index (blocking)."""
+        started = time.monotonic()
+        with self._lock:
+            # Refreshes requested before this point are covered by the full load; later
+            # ones may have been read before their change, so they are re-applied after the swap
+            covered, self._pending = self._pending, set()
+            self._refreshed_during_build = set()
+        try:
+            index = JobFacetIndex.from_rows(self._load_all())
+        except Exception as e:
+            logger.warning(f"Job facet index build failed: {e}")
+            with self._lock:
+                # The old index still needs them
+                self._pending.update(covered, self._refreshed_during_build)
+                self._refreshed_during_build = None
+                self._building = False
+            return
+        with self._lock:
+            self._index = index
+            self._pending.update(self._refreshed_during_build)
+            self._refreshed_during_build = None
+            self._expires_at = time.monotonic() + self.ttl_seconds
+            self._building = False
+        logger.info(f"🔎 Job facet index built: {index.size} active jobs in {time.monotonic() - started:.1f}s")
+    
+    def _build_in_background(self):
+        # Caller holds the lock
+        if self._building:
+            return
+        self._building = True
+        threading.Thread(target=self.build, name="job-facets", daemon=True).start()
+    
+    def _apply_pending(self):
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        if not pending:
+            return
+        try:
+            rows = {row["id"]: row for row in self._load_some(sorted(pending))}
+        except Exception as e:
+            logger.warning(f"Job facet index refresh failed, rebuilding: {e}")
+            self.invalidate()
+            return
+        with self._lock:
+            for job_id in pending:
+                row = rows.get(job_id)
+                if row and row.get("is_active", True):
+                    self._index.upsert(row)
+                else:
+                    self._index.remove(job_id)
+    
+    def query(self, **kwargs) -> Optional[Dict[str, Any]]:
+        """JobFacetIndex.query on the current index, or None while no index is available."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._index is None or time.monotonic() >= self._expires_at:
+                self._build_in_background()
+            if self._index is None:
+                return None
+        self._apply_pending()
+        with self._lock:
+            return self._index.query(**kwargs)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "ready": self._index is not None,
+                "jobs": self._index.size if self._index else 0,
+                "pending_refreshes": len(self._pending),
+                "building": self._building
+            }
+
+
+# Shared index of the web process
+job_facets = JobFacetCache(
+    ttl_seconds=settings.job_facet_index_ttl_seconds,
+    enabled=settings.job_facet_index_enabled
+)
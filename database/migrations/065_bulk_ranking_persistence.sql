@@ -0,0 +1,62 @@
+-- Migration 065: Bulk ranking persistence with atomic swap
+-- Date: 2026-10-17
+-- Description: The ranker used to issue one UPDATE per job every hour, so readers saw a mix
+--              of old and new ranking_position values for minutes. Rankings are now written
+--              to a staging table with chunked multi-row inserts, then swapped into
+--              job_postings with a single UPDATE inside apply_job_rankings().
+
+-- 1. Staging table (one set of rows per ranking run)
+--    UNLOGGED: contents are transient and rebuilt every run, no need for WAL
+CREATE UNLOGGED TABLE IF NOT EXISTS job_rankings_staging (
+    ranking_run_id UUID NOT NULL,
+    job_posting_id UUID NOT NULL,
+    base_score NUMERIC(10, 2),
+    ranking_score NUMERIC(10, 2),
+    ranking_position INTEGER,
+    ranking_metadata JSONB,
+    hourly_multiplier DECIMAL(4,3),
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (ranking_run_id, job_posting_id)
+);
+
+COMMENT ON TABLE job_rankings_staging IS 'Transient staging area for ranking runs. Filled by ranking/job_ranker.save_rankings_to_database, emptied by apply_job_rankings().';
+
+-- 2. Swap a staged ranking run into job_postings in one statement
+CREATE OR REPLACE FUNCTION apply_job_rankings(
+    p_ranking_run_id UUID,
+    p_ranking_updated_at TIMESTAMPTZ
+)
+RETURNS INTEGER AS $$
+DECLARE
+    updated_count INTEGER;
+BEGIN
+    -- Single UPDATE: readers see either the previous ranking or the new one, never a mix
+    UPDATE job_postings jp
+    SET base_score = s.base_score,
+        ranking_score = s.ranking_score,
+        ranking_position = s.ranking_position,
+        ranking_metadata = s.ranking_metadata,
+        hourly_multiplier = s.hourly_multiplier,
+        ranking_updated_at = p_ranking_updated_at,
+        needs_ranking = FALSE
+    FROM job_rankings_staging s
+    WHERE s.ranking_run_id = p_ranking_run_id
+      AND jp.id = s.job_posting_id;
+
+    GET DIAGNOSTICS updated_count = ROW_COUNT;
+
+    -- Clean up this run and anything left behind by crashed runs
+    DELETE FROM job_rankings_staging
+    WHERE ranking_run_id = p_ranking_run_id
+       OR created_at < NOW() - INTERVAL '1 day';
+
+    RETURN updated_count;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION apply_job_rankings(UUID, TIMESTAMPTZ) IS 'Atomically applies a staged ranking run (job_rankings_staging) to job_postings and returns the number of jobs updated.';
+
+-- Summary
+-- ✅ job_rankings_staging receives ranking rows in chunked multi-row inserts
+-- ✅ apply_job_rankings() swaps a whole run in with one UPDATE (atomic for readers)
+-- ✅ Staging rows are deleted after the swap; abandoned runs expire after 1 day
@@ -0,0 +1,70 @@
+-- Migration 066: Slim ranking projection
+-- Date: 2026-10-17
+-- Description: job_ranking_view ships the full job description and the binary company logo
+--              for every active job, while the ranker only checks len(description) > 500 and
+--              whether a logo exists. job_ranking_input_view returns has_logo and
+--              description_len instead of the blobs. The ranker pages it by keyset on id.
+--              job_ranking_view is kept unchanged for ad-hoc queries.
+
+CREATE OR REPLACE VIEW job_ranking_input_view AS
+SELECT
+    -- Job posting fields
+    jp.id,
+    jp.title,
+    jp.company_id,
+    jp.location_id,
+    jp.posted_date,
+    jp.seniority_level,
+    jp.employment_type,
+    jp.function_areas,
+    jp.base_salary_min,
+    jp.base_salary_max,
+    jp.apply_url,
+    jp.num_applicants,
+    jp.is_active,
+    jp.title_classification,
+    
+    -- Company fields (logo reduced to a flag)
+    c.name as company_name,
+    c.industry as company_industry,
+    c.company_url,
+    (c.logo_data IS NOT NULL) as has_logo,
+    c.employee_count_range as company_employee_count_range,
+    c.rating as company_rating,
+    c.reviews_count as company_reviews_count,
+    
+    -- Company master data
+    cmd.hiring_model,
+    
+    -- Location fields
+    l.city as location_city,
+    
+    -- LLM Enrichment fields
+    e.enrichment_completed_at,
+    e.type_datarol as data_role_type,
+    e.hard_skills as skills_must_have,
+    e.samenvatting_kort_nl as samenvatting_kort,
+    e.samenvatting_lang_nl as samenvatting_lang,
+    e.must_have_programmeertalen,
+    e.nice_to_have_programmeertalen,
+    e.must_have_ecosystemen,
+    e.nice_to_have_ecosystemen,
+    e.labels,
+    
+    -- Job description reduced to its length (characters, same as Python len())
+    COALESCE(length(jd.full_description_text), 0) as description_len
+    
+FROM job_postings jp
+LEFT JOIN companies c ON jp.company_id = c.id
+LEFT JOIN company_master_data cmd ON c.id = cmd.company_id
+LEFT JOIN locations l ON jp.location_id = l.id
+LEFT JOIN llm_enrichment e ON jp.id = e.job_posting_id
+LEFT JOIN job_descriptions jd ON jp.id = jd.job_posting_id
+WHERE jp.is_active = true;
+
+COMMENT ON VIEW job_ranking_input_view IS 'Ranking input per active job: job_ranking_view without the description/logo blobs (has_logo, description_len instead). Read with keyset pagination on id.';
+
+-- Summary
+-- ✅ job_ranking_input_view returns has_logo / description_len instead of logo_data / full_description_text
+-- ✅ Keyset pagination (id > last_id ORDER BY id) uses the job_postings primary key
+-- ✅ job_ranking_view unchanged
@@ -0,0 +1,120 @@
+-- Migration 067: Maintained last_scraped_at per job
+-- Date: 2026-10-17
+-- Description: The ranker fetched job_scrape_history in batches of 100 job ids and pulled every
+--              history row just to keep the newest detected_at per job. That work grows
+--              linearly with the number of scrape runs. job_postings.last_scraped_at is now
+--              kept up to date by a statement-level trigger on job_scrape_history, and
+--              job_ranking_input_view exposes it, so the ranker reads one value per job in
+--              the same call.
+
+-- 1. Column
+ALTER TABLE job_postings
+ADD COLUMN IF NOT EXISTS last_scraped_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN job_postings.last_scraped_at IS 'Most recent job_scrape_history.detected_at for this job. Maintained by trigger_update_last_scraped_at.';
+
+-- 2. Backfill (one aggregate pass over the history)
+UPDATE job_postings jp
+SET last_scraped_at = h.last_detected_at
+FROM (
+    SELECT job_posting_id, MAX(detected_at) AS last_detected_at
+    FROM job_scrape_history
+    GROUP BY job_posting_id
+) h
+WHERE jp.id = h.job_posting_id
+  AND jp.last_scraped_at IS DISTINCT FROM h.last_detected_at;
+
+-- 3. Keep it up to date: one UPDATE per INSERT statement (bulk history inserts stay set-based)
+CREATE OR REPLACE FUNCTION update_last_scraped_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE job_postings jp
+    SET last_scraped_at = n.last_detected_at
+    FROM (
+        SELECT job_posting_id, MAX(detected_at) AS last_detected_at
+        FROM new_history
+        GROUP BY job_posting_id
+    ) n
+    WHERE jp.id = n.job_posting_id
+      AND (jp.last_scraped_at IS NULL OR jp.last_scraped_at < n.last_detected_at);
+    
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_update_last_scraped_at ON job_scrape_history;
+
+CREATE TRIGGER trigger_update_last_scraped_at
+    AFTER INSERT ON job_scrape_history
+    REFERENCING NEW TABLE AS new_history
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION update_last_scraped_at();
+
+-- 4. Index for the newest-history-row lookups that remain (ad-hoc queries, fallbacks)
+CREATE INDEX IF NOT EXISTS idx_scrape_history_job_detected
+ON job_scrape_history(job_posting_id, detected_at DESC);
+
+-- 5. Expose it in the ranking projection (column appended, rest unchanged from migration 066)
+CREATE OR REPLACE VIEW job_ranking_input_view AS
+SELECT
+    -- Job posting fields
+    jp.id,
+    jp.title,
+    jp.company_id,
+    jp.location_id,
+    jp.posted_date,
+    jp.seniority_level,
+    jp.employment_type,
+    jp.function_areas,
+    jp.base_salary_min,
+    jp.base_salary_max,
+    jp.apply_url,
+    jp.num_applicants,
+    jp.is_active,
+    jp.title_classification,
+    
+    -- Company fields (logo reduced to a flag)
+    c.name as company_name,
+    c.industry as company_industry,
+    c.company_url,
+    (c.logo_data IS NOT NULL) as has_logo,
+    c.employee_count_range as company_employee_count_range,
+    c.rating as company_rating,
+    c.reviews_count as company_reviews_count,
+    
+    -- Company master data
+    cmd.hiring_model,
+    
+    -- Location fields
+    l.city as location_city,
+    
+    -- LLM Enrichment fields
+    e.enrichment_completed_at,
+    e.type_datarol as data_role_type,
+    e.hard_skills as skills_must_have,
+    e.samenvatting_kort_nl as samenvatting_kort,
+    e.samenvatting_lang_nl as samenvatting_lang,
+    e.must_have_programmeertalen,
+    e.nice_to_have_programmeertalen,
+    e.must_have_ecosystemen,
+    e.nice_to_have_ecosystemen,
+    e.labels,
+    
+    -- Job description reduced to its length (characters, same as Python len())
+    COALESCE(length(jd.full_description_text), 0) as description_len,
+    
+    -- Most recent scrape (migration 067)
+    jp.last_scraped_at
+    
+FROM job_postings jp
+LEFT JOIN companies c ON jp.company_id = c.id
+LEFT JOIN company_master_data cmd ON c.id = cmd.company_id
+LEFT JOIN locations l ON jp.location_id = l.id
+LEFT JOIN llm_enrichment e ON jp.id = e.job_posting_id
+LEFT JOIN job_descriptions jd ON jp.id = jd.job_posting_id
+WHERE jp.is_active = true;
+
+-- Summary
+-- ✅ job_postings.last_scraped_at backfilled from job_scrape_history
+-- ✅ Statement-level trigger keeps it current (one UPDATE per history INSERT statement)
+-- ✅ job_ranking_input_view returns last_scraped_at, no separate history queries needed
@@ -0,0 +1,43 @@
+-- Migration 068: Title classification memo
+-- Date: 2026-10-17
+-- Description: Every ingested job used to trigger a blocking title classification call inside
+--              the scrape pipeline, even when the same title had just been classified. Titles
+--              are now classified in a deferred step (auto-enrich service) once per distinct
+--              normalized title, and the result is remembered here so the same title is never
+--              sent to the LLM again for the same prompt version.
+
+-- 1. Memo table: normalized title -> classification
+CREATE TABLE IF NOT EXISTS job_title_classifications (
+    normalized_title TEXT PRIMARY KEY,
+    classification TEXT NOT NULL CHECK (classification IN ('Data', 'NIS')),
+    prompt_version TEXT NOT NULL,
+    classified_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+COMMENT ON TABLE job_title_classifications IS 'Title classification per normalized title (whitespace collapsed, casefolded). Maintained by ingestion/job_title_classifier.classify_pending_jobs.';
+
+-- 2. Backfill from jobs that are already classified
+--    (lower() approximates the Python casefold normalization; a mismatch only costs one LLM call)
+INSERT INTO job_title_classifications (normalized_title, classification, prompt_version)
+SELECT DISTINCT ON (normalized_title) normalized_title, title_classification, 'backfill'
+FROM (
+    SELECT
+        lower(regexp_replace(btrim(title), '\s+', ' ', 'g')) AS normalized_title,
+        title_classification,
+        title_classification_at
+    FROM job_postings
+    WHERE title IS NOT NULL
+      AND title_classification IN ('Data', 'NIS')
+) t
+ORDER BY normalized_title, title_classification_at DESC NULLS LAST
+ON CONFLICT (normalized_title) DO NOTHING;
+
+-- 3. Index for the deferred classification step (pending jobs only)
+CREATE INDEX IF NOT EXISTS idx_job_postings_title_unclassified
+ON job_postings(id)
+WHERE title_classification IS NULL;
+
+-- Summary
+-- ✅ job_title_classifications memo table (normalized title -> Data/NIS)
+-- ✅ Backfilled from existing job_postings classifications
+-- ✅ Partial index for jobs awaiting classification
@@ -0,0 +1,137 @@
+-- Migration 069: Ranking epoch instead of per-row re-ranking cascades
+-- Date: 2026-10-17
+-- Description: Migration 037 marked ALL active jobs needs_ranking = TRUE from a row-level trigger,
+--              once for every inserted job and for every relevant update. A 1,000-job snapshot
+--              rewrote the whole active table ~1,000 times (O(N²) writes plus table bloat).
+--              Rankings are relative, but the incremental ranker already re-applies diversity
+--              and positions over all jobs every run; it only needs per-job flags for rows whose
+--              own data changed. Set-level changes are now tracked by a ranking epoch: a sequence
+--              bumped once per INSERT/UPDATE/DELETE statement that changes ranking inputs, which
+--              the ranker compares against the epoch of its last run.
+
+-- 1. Remove the cascading triggers from migration 037
+DROP TRIGGER IF EXISTS trigger_mark_for_reranking_on_insert ON job_postings;
+DROP TRIGGER IF EXISTS trigger_mark_for_reranking_on_update ON job_postings;
+DROP FUNCTION IF EXISTS mark_jobs_for_reranking();
+
+-- New rows are flagged by the column default (needs_ranking DEFAULT TRUE, migration 040)
+
+-- 2. Row trigger on UPDATE: flag only the row whose ranking fields changed
+CREATE OR REPLACE FUNCTION mark_for_reranking_on_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF (
+        OLD.posted_date IS DISTINCT FROM NEW.posted_date OR
+        OLD.is_active IS DISTINCT FROM NEW.is_active OR
+        OLD.title IS DISTINCT FROM NEW.title OR
+        OLD.company_id IS DISTINCT FROM NEW.company_id OR
+        OLD.location_id IS DISTINCT FROM NEW.location_id
+    ) THEN
+        NEW.needs_ranking := TRUE;
+    END IF;
+    
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_mark_for_reranking_on_update
+    BEFORE UPDATE ON job_postings
+    FOR EACH ROW
+    EXECUTE FUNCTION mark_for_reranking_on_update();
+
+-- 3. Ranking epoch: a sequence (no row lock shared by concurrent writers) + the epoch last ranked
+CREATE SEQUENCE IF NOT EXISTS ranking_epoch_seq;
+
+CREATE TABLE IF NOT EXISTS ranking_epoch_state (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),  -- Single row
+    ranked_epoch BIGINT NOT NULL DEFAULT 0,
+    ranked_at TIMESTAMPTZ
+);
+
+INSERT INTO ranking_epoch_state (id) VALUES (TRUE)
+ON CONFLICT (id) DO NOTHING;
+
+COMMENT ON TABLE ranking_epoch_state IS 'Epoch (ranking_epoch_seq) covered by the last ranking run. Rankings are stale when the sequence has moved past ranked_epoch.';
+
+-- 4. Statement-level triggers: one sequence bump per statement, only if it touched ranking inputs
+--    INSERT and DELETE share a function (changed_rows = the inserted or deleted rows)
+CREATE OR REPLACE FUNCTION bump_ranking_epoch()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM changed_rows) THEN
+        PERFORM nextval('ranking_epoch_seq');
+    END IF;
+    
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bump_ranking_epoch_on_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Ranking writes (scores, positions, needs_ranking) and last_seen updates do not move the epoch
+    IF EXISTS (
+        SELECT 1
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id
+        WHERE (o.posted_date, o.is_active, o.title, o.company_id, o.location_id)
+              IS DISTINCT FROM
+              (n.posted_date, n.is_active, n.title, n.company_id, n.location_id)
+    ) THEN
+        PERFORM nextval('ranking_epoch_seq');
+    END IF;
+    
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_ranking_epoch_on_insert ON job_postings;
+DROP TRIGGER IF EXISTS trigger_ranking_epoch_on_delete ON job_postings;
+DROP TRIGGER IF EXISTS trigger_ranking_epoch_on_update ON job_postings;
+
+CREATE TRIGGER trigger_ranking_epoch_on_insert
+    AFTER INSERT ON job_postings
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bump_ranking_epoch();
+
+CREATE TRIGGER trigger_ranking_epoch_on_delete
+    AFTER DELETE ON job_postings
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bump_ranking_epoch();
+
+CREATE TRIGGER trigger_ranking_epoch_on_update
+    AFTER UPDATE ON job_postings
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bump_ranking_epoch_on_update();
+
+-- 5. RPCs used by the ranker
+CREATE OR REPLACE FUNCTION get_ranking_epoch()
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'epoch', (SELECT last_value FROM ranking_epoch_seq),
+        'ranked_epoch', s.ranked_epoch,
+        'ranked_at', s.ranked_at
+    )
+    FROM ranking_epoch_state s;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION get_ranking_epoch() IS 'Current ranking epoch and the epoch covered by the last ranking run.';
+
+CREATE OR REPLACE FUNCTION record_ranked_epoch(p_epoch BIGINT)
+RETURNS VOID AS $$
+    -- GREATEST: a slow run that finishes after a newer one must not move the marker back
+    UPDATE ranking_epoch_state
+    SET ranked_epoch = GREATEST(ranked_epoch, p_epoch),
+        ranked_at = NOW();
+$$ LANGUAGE sql;
+
+COMMENT ON FUNCTION record_ranked_epoch(BIGINT) IS 'Called by the ranker after a run with the epoch read before loading its input.';
+
+-- Summary
+-- ✅ Migration 037 cascades removed: an insert/update no longer rewrites all active jobs
+-- ✅ needs_ranking is only set on rows whose own ranking fields changed (or new rows)
+-- ✅ ranking_epoch_seq bumped once per statement that changes ranking inputs
+-- ✅ get_ranking_epoch() / record_ranked_epoch() let the ranker detect set-level changes
@@ -0,0 +1,85 @@
+-- Migration 070: Per-query run statistics in one call
+-- Date: 2026-10-17
+-- Description: The queries pages ran two scrape_runs queries per search query (latest run, and
+--              every run to sum jobs_found), so a page of N queries cost 2N round trips and
+--              rescanned the run history each time. get_query_run_stats() returns last run,
+--              run count and total jobs for a whole page of queries in one call. Both lookups
+--              are index range scans per query (indexes below).
+--
+--              LinkedIn runs are matched to queries by (search_query, location_query) text, as the
+--              page did before; Indeed runs by search_query_id.
+
+-- 1. Indexes: per-query runs, newest first
+CREATE INDEX IF NOT EXISTS idx_scrape_runs_query_id_started
+    ON scrape_runs(search_query_id, started_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_scrape_runs_query_text_started
+    ON scrape_runs(search_query, location_query, started_at DESC);
+
+-- 2. Grouped stats RPC
+CREATE OR REPLACE FUNCTION get_query_run_stats(
+    p_query_ids UUID[],
+    p_match_by_text BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (
+    search_query_id UUID,
+    run_count BIGINT,
+    total_jobs BIGINT,
+    last_run JSONB
+) AS $$
+#variable_conflict use_column
+BEGIN
+    IF p_match_by_text THEN
+        RETURN QUERY
+        SELECT
+            q.id,
+            COALESCE(agg.run_count, 0),
+            COALESCE(agg.total_jobs, 0),
+            latest.last_run
+        FROM search_queries q
+        LEFT JOIN LATERAL (
+            SELECT COUNT(*) AS run_count, SUM(r.jobs_found)::BIGINT AS total_jobs
+            FROM scrape_runs r
+            WHERE r.search_query = q.search_query
+              AND r.location_query = q.location_query
+        ) agg ON TRUE
+        LEFT JOIN LATERAL (
+            SELECT to_jsonb(r) AS last_run
+            FROM scrape_runs r
+            WHERE r.search_query = q.search_query
+              AND r.location_query = q.location_query
+            ORDER BY r.started_at DESC
+            LIMIT 1
+        ) latest ON TRUE
+        WHERE q.id = ANY(p_query_ids);
+    ELSE
+        RETURN QUERY
+        SELECT
+            q.id,
+            COALESCE(agg.run_count, 0),
+            COALESCE(agg.total_jobs, 0),
+            latest.last_run
+        FROM search_queries q
+        LEFT JOIN LATERAL (
+            SELECT COUNT(*) AS run_count, SUM(r.jobs_found)::BIGINT AS total_jobs
+            FROM scrape_runs r
+            WHERE r.search_query_id = q.id
+        ) agg ON TRUE
+        LEFT JOIN LATERAL (
+            SELECT to_jsonb(r) AS last_run
+            FROM scrape_runs r
+            WHERE r.search_query_id = q.id
+            ORDER BY r.started_at DESC
+            LIMIT 1
+        ) latest ON TRUE
+        WHERE q.id = ANY(p_query_ids);
+    END IF;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+COMMENT ON FUNCTION get_query_run_stats(UUID[], BOOLEAN) IS 'Run count, SUM(jobs_found) and latest scrape_runs row per search query. p_match_by_text matches runs on (search_query, location_query) instead of search_query_id.';
+
+-- Summary
+-- ✅ get_query_run_stats(): last run, run count and total jobs for a page of queries in one round trip
+-- ✅ Index range scans per query instead of rescanning scrape_runs per page load
+-- ✅ Same run-matching rules as the LinkedIn and Indeed queries pages
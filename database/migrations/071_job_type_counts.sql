@@ -0,0 +1,21 @@
+-- Migration 071: Job counts per job type in one grouped query
+-- Date: 2026-10-17
+-- Description: The job types page ran an exact COUNT on job_type_assignments once per job type.
+--              get_job_type_counts() returns all counts from one GROUP BY, answered from
+--              idx_job_type_assignments_type (migration 002).
+
+CREATE OR REPLACE FUNCTION get_job_type_counts()
+RETURNS TABLE (
+    job_type_id UUID,
+    job_count BIGINT
+) AS $$
+    SELECT a.job_type_id, COUNT(*)
+    FROM job_type_assignments a
+    WHERE a.job_type_id IS NOT NULL
+    GROUP BY a.job_type_id;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION get_job_type_counts() IS 'Number of job_type_assignments per job type (types without jobs are absent).';
+
+-- Summary
+-- ✅ get_job_type_counts(): one grouped query instead of one COUNT per job type
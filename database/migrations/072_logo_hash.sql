@@ -0,0 +1,70 @@
+-- Migration 072: Content hash for uploaded logos
+-- Date: 2026-10-17
+-- Description: The logo endpoints fetched the logo_data blob on every request just to find out
+--              whether (and which) logo a row has. logo_hash is the SHA-256 of logo_data, kept up
+--              to date by a trigger, so the web app can check the logo version (ETag) with a tiny
+--              query and serve thumbnails from its local cache. logo_filename is backfilled for
+--              rows with a logo so list endpoints can report has_logo without reading the blob.
+
+-- 1. Hash columns
+ALTER TABLE companies ADD COLUMN IF NOT EXISTS logo_hash TEXT;
+ALTER TABLE programming_languages ADD COLUMN IF NOT EXISTS logo_hash TEXT;
+ALTER TABLE ecosystems ADD COLUMN IF NOT EXISTS logo_hash TEXT;
+
+COMMENT ON COLUMN companies.logo_hash IS 'SHA-256 (hex) of logo_data, maintained by trigger';
+COMMENT ON COLUMN programming_languages.logo_hash IS 'SHA-256 (hex) of logo_data, maintained by trigger';
+COMMENT ON COLUMN ecosystems.logo_hash IS 'SHA-256 (hex) of logo_data, maintained by trigger';
+
+-- 2. Trigger: recompute the hash whenever logo_data is written
+CREATE OR REPLACE FUNCTION set_logo_hash()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.logo_data IS NULL THEN
+        NEW.logo_hash := NULL;
+    ELSE
+        NEW.logo_hash := encode(sha256(NEW.logo_data), 'hex');
+    END IF;
+    
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_companies_logo_hash ON companies;
+DROP TRIGGER IF EXISTS trigger_programming_languages_logo_hash ON programming_languages;
+DROP TRIGGER IF EXISTS trigger_ecosystems_logo_hash ON ecosystems;
+
+CREATE TRIGGER trigger_companies_logo_hash
+    BEFORE INSERT OR UPDATE OF logo_data ON companies
+    FOR EACH ROW
+    EXECUTE FUNCTION set_logo_hash();
+
+CREATE TRIGGER trigger_programming_languages_logo_hash
+    BEFORE INSERT OR UPDATE OF logo_data ON programming_languages
+    FOR EACH ROW
+    EXECUTE FUNCTION set_logo_hash();
+
+CREATE TRIGGER trigger_ecosystems_logo_hash
+    BEFORE INSERT OR UPDATE OF logo_data ON ecosystems
+    FOR EACH ROW
+    EXECUTE FUNCTION set_logo_hash();
+
+-- 3. Backfill existing logos
+UPDATE companies
+SET logo_hash = encode(sha256(logo_data), 'hex'),
+    logo_filename = COALESCE(logo_filename, 'logo')
+WHERE logo_data IS NOT NULL;
+
+UPDATE programming_languages
+SET logo_hash = encode(sha256(logo_data), 'hex'),
+    logo_filename = COALESCE(logo_filename, 'logo')
+WHERE logo_data IS NOT NULL;
+
+UPDATE ecosystems
+SET logo_hash = encode(sha256(logo_data), 'hex'),
+    logo_filename = COALESCE(logo_filename, 'logo')
+WHERE logo_data IS NOT NULL;
+
+-- Summary
+-- ✅ logo_hash on companies, programming_languages and ecosystems (SHA-256 of logo_data)
+-- ✅ Trigger keeps logo_hash in sync with every logo_data write
+-- ✅ Existing logos backfilled; logo_filename is set for every row with logo_data
@@ -0,0 +1,30 @@
+-- Migration 073: Indexes for keyset (cursor) pagination
+-- Date: 2026-10-17
+-- Description: The job, company, location and scrape run lists can page with a cursor
+--              (WHERE (sort columns, id) > last row ORDER BY sort columns, id LIMIT n) instead
+--              of OFFSET. These indexes match those sort orders, id included as tie-breaker,
+--              so every page is an index range scan that costs the same at any depth.
+
+-- 1. Jobs: default ranking sort (ranking_position ASC NULLS LAST, ranking_score DESC, id)
+CREATE INDEX IF NOT EXISTS idx_job_postings_ranking_keyset
+ON job_postings(ranking_position ASC NULLS LAST, ranking_score DESC, id)
+WHERE is_active = true;
+
+CREATE INDEX IF NOT EXISTS idx_job_postings_posted_date_keyset
+ON job_postings(posted_date DESC, id);
+
+-- 2. Companies (companies_list_view sorts on the companies table)
+CREATE INDEX IF NOT EXISTS idx_companies_name_keyset
+ON companies(name, id);
+
+-- 3. Locations
+CREATE INDEX IF NOT EXISTS idx_locations_city_keyset
+ON locations(city, id);
+
+-- 4. Scrape runs: newest first
+CREATE INDEX IF NOT EXISTS idx_scrape_runs_started_at_keyset
+ON scrape_runs(started_at DESC, id DESC);
+
+-- Summary
+-- ✅ Composite indexes on the sort keys of the paginated lists (sort columns + id)
+-- ✅ Cursor pages read only the rows they return, independent of page depth
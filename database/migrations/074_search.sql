@@ -0,0 +1,150 @@
+-- Migration 074: Full-text and trigram search for jobs and companies
+-- Date: 2026-10-17
+-- Description: Job search was ILIKE '%q%' on the title and company search ILIKE '%q%' on the
+--              name. A leading wildcard cannot use idx_job_title (to_tsvector('english', title)),
+--              so every search was a sequential scan, and descriptions were not searched at all.
+--              - job_postings.search_vector: weighted tsvector over the title (A), the nl/fr/en
+--                enrichment summaries with their own text search config (B) and the job
+--                description (C), kept up to date by triggers and GIN-indexed.
+--              - pg_trgm GIN indexes on job titles and company names: ILIKE '%q%' becomes an
+--                index scan, and similarity() enables fuzzy (typo-tolerant) matching.
+--              - search_job_ids() / search_company_ids(): ranked matches for relevance ordering.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- 1. Search document of a job
+--    Titles and descriptions are in Dutch, French or English, so they use the 'simple' config
+--    (no stemming, every language matches); the enrichment summaries are stemmed per language.
+CREATE OR REPLACE FUNCTION build_job_search_vector(p_job_id UUID, p_title TEXT)
+RETURNS TSVECTOR AS $$
+    SELECT
+        setweight(to_tsvector('simple', COALESCE(p_title, '')), 'A')
+        || setweight(to_tsvector('dutch', COALESCE(e.samenvatting_kort_nl, '') || ' ' || COALESCE(e.samenvatting_lang_nl, '')), 'B')
+        || setweight(to_tsvector('french', COALESCE(e.samenvatting_kort_fr, '') || ' ' || COALESCE(e.samenvatting_lang_fr, '')), 'B')
+        || setweight(to_tsvector('english', COALESCE(e.samenvatting_kort_en, '') || ' ' || COALESCE(e.samenvatting_lang_en, '')), 'B')
+        || setweight(to_tsvector('simple', COALESCE(d.full_description_text, d.summary, '')), 'C')
+    FROM (SELECT p_job_id AS id) j
+    LEFT JOIN llm_enrichment e ON e.job_posting_id = j.id
+    LEFT JOIN job_descriptions d ON d.job_posting_id = j.id;
+$$ LANGUAGE sql STABLE;
+
+-- Query for all configs of the search document (websearch syntax: "quoted phrase", or, -exclude)
+CREATE OR REPLACE FUNCTION job_search_query(p_search_text TEXT)
+RETURNS TSQUERY AS $$
+    SELECT websearch_to_tsquery('simple', p_search_text)
+        || websearch_to_tsquery('dutch', p_search_text)
+        || websearch_to_tsquery('french', p_search_text)
+        || websearch_to_tsquery('english', p_search_text);
+$$ LANGUAGE sql IMMUTABLE;
+
+ALTER TABLE job_postings ADD COLUMN IF NOT EXISTS search_vector TSVECTOR;
+
+COMMENT ON COLUMN job_postings.search_vector IS 'Full-text search document (title, enrichment summaries, description), maintained by triggers';
+
+-- 2. Triggers: rebuild the document when the title, description or enrichment changes
+CREATE OR REPLACE FUNCTION set_job_search_vector()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_vector := build_job_search_vector(NEW.id, NEW.title);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_job_search_vector ON job_postings;
+
+CREATE TRIGGER trigger_job_search_vector
+    BEFORE INSERT OR UPDATE OF title ON job_postings
+    FOR EACH ROW
+    EXECUTE FUNCTION set_job_search_vector();
+
+CREATE OR REPLACE FUNCTION refresh_job_search_vector()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE job_postings
+    SET search_vector = build_job_search_vector(id, title)
+    WHERE id = NEW.job_posting_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_job_search_vector_description ON job_descriptions;
+DROP TRIGGER IF EXISTS trigger_job_search_vector_enrichment ON llm_enrichment;
+
+CREATE TRIGGER trigger_job_search_vector_description
+    AFTER INSERT OR UPDATE OF summary, full_description_text ON job_descriptions
+    FOR EACH ROW
+    EXECUTE FUNCTION refresh_job_search_vector();
+
+CREATE TRIGGER trigger_job_search_vector_enrichment
+    AFTER INSERT OR UPDATE OF samenvatting_kort_nl, samenvatting_kort_fr, samenvatting_kort_en,
+                              samenvatting_lang_nl, samenvatting_lang_fr, samenvatting_lang_en
+    ON llm_enrichment
+    FOR EACH ROW
+    EXECUTE FUNCTION refresh_job_search_vector();
+
+-- 3. Backfill
+UPDATE job_postings
+SET search_vector = build_job_search_vector(id, title);
+
+-- 4. Indexes
+CREATE INDEX IF NOT EXISTS idx_job_postings_search_vector
+ON job_postings USING GIN (search_vector);
+
+CREATE INDEX IF NOT EXISTS idx_job_postings_title_trgm
+ON job_postings USING GIN (title gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_companies_name_trgm
+ON companies USING GIN (name gin_trgm_ops);
+
+-- 5. Ranked search RPCs
+--    Jobs: full-text matches ranked by ts_rank_cd, plus fuzzy title matches (word_similarity)
+--    so typos still find jobs. Companies: substring and fuzzy name matches by similarity.
+CREATE OR REPLACE FUNCTION search_job_ids(p_search_text TEXT, p_max_results INTEGER DEFAULT 500)
+RETURNS TABLE (
+    job_id UUID,
+    rank REAL
+) AS $$
+    WITH q AS (
+        SELECT job_search_query(p_search_text) AS query
+    ),
+    matches AS (
+        SELECT jp.id, ts_rank_cd(jp.search_vector, q.query) AS rank
+        FROM job_postings jp, q
+        WHERE jp.search_vector @@ q.query
+        UNION ALL
+        SELECT jp.id, word_similarity(p_search_text, jp.title) * 0.5
+        FROM job_postings jp
+        WHERE p_search_text <% jp.title
+    )
+    SELECT id, MAX(rank)::REAL
+    FROM matches
+    GROUP BY id
+    ORDER BY MAX(rank) DESC, id
+    LIMIT p_max_results;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION search_job_ids(TEXT, INTEGER) IS 'Jobs matching a websearch query (title, summaries, description) or fuzzily matching the title, best first.';
+
+CREATE OR REPLACE FUNCTION search_company_ids(p_search_text TEXT, p_max_results INTEGER DEFAULT 100)
+RETURNS TABLE (
+    company_id UUID,
+    rank REAL
+) AS $$
+    SELECT c.id, GREATEST(
+        similarity(p_search_text, c.name),
+        word_similarity(p_search_text, c.name),
+        CASE WHEN c.name ILIKE '%' || p_search_text || '%' THEN 0.9 ELSE 0 END
+    )::REAL AS rank
+    FROM companies c
+    WHERE p_search_text <% c.name
+       OR c.name ILIKE '%' || p_search_text || '%'
+    ORDER BY rank DESC, c.name, c.id
+    LIMIT p_max_results;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION search_company_ids(TEXT, INTEGER) IS 'Companies whose name contains or fuzzily matches the search text, best first.';
+
+-- Summary
+-- ✅ job_postings.search_vector (title A, nl/fr/en summaries B, description C) with triggers and backfill
+-- ✅ GIN index on search_vector; pg_trgm GIN indexes on job titles and company names
+-- ✅ search_job_ids() / search_company_ids(): ranked matches for relevance ordering
@@ -0,0 +1,29 @@
+-- Migration 075: Title classification queue and memo versions
+-- Date: 2026-10-17
+-- Description: Deferred title classification picks never-attempted jobs oldest first and
+--              retries failed ones only after a delay, so failing or untitled jobs can no
+--              longer fill every batch and keep new jobs from being classified (and enriched).
+--              The title memo is only used for the current prompt version; rows backfilled
+--              by migration 068 were labelled 'backfill' and get the version that produced them.
+
+-- 1. Queue indexes: new jobs by age, failed jobs by last attempt
+DROP INDEX IF EXISTS idx_job_postings_title_unclassified;
+
+CREATE INDEX IF NOT EXISTS idx_job_postings_title_unclassified
+ON job_postings(created_at)
+WHERE title_classification IS NULL AND title_classification_error IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_job_postings_title_classification_retry
+ON job_postings(title_classification_at)
+WHERE title_classification IS NULL AND title_classification_error IS NOT NULL;
+
+-- 2. Memo: backfilled classifications came from prompt version 4 (current when 068 ran)
+UPDATE job_title_classifications
+SET prompt_version = '4'
+WHERE prompt_version = 'backfill';
+
+COMMENT ON TABLE job_title_classifications IS 'Title classification per normalized title (whitespace collapsed, casefolded) and prompt version. Maintained by ingestion/job_title_classifier.classify_unclassified_jobs.';
+
+-- Summary
+-- ✅ Partial indexes for the classification queue (new jobs oldest first, failed jobs by last attempt)
+-- ✅ Backfilled memo rows carry their prompt version, so version bumps reclassify them
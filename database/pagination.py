@@ -0,0 +1,129 @@
+"""
+Keyset (cursor) pagination and count modes for list queries.
+
+OFFSET pagination makes Postgres read and discard every row before the page,
+so page 500 costs 500 pages. A keyset page instead continues after the sort
+values of the previous page's last row:
+
+    keys = [SortKey("name"), SortKey("id")]
+    query = apply_keyset(query, keys, cursor)     # ORDER BY + "after cursor" filter
+    rows = query.limit(limit).execute().data
+    cursor = next_cursor(rows, keys, limit)       # None on the last page
+
+which is an index range scan at any depth. The last key must be unique (id)
+so ties in the other sort columns are neither skipped nor repeated. Cursors
+are opaque to clients (url-safe base64 JSON of the key columns and values).
+
+Exact counts scan every matching row on each request; list endpoints take a
+count mode so headline totals can use the planner's estimate instead.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Dict, List, Literal, NamedTuple, Optional, Sequence, get_args
+
+# Count modes accepted by list endpoints ("none" skips the count)
+CountMode = Literal["exact", "planned", "estimated", "none"]
+COUNT_MODES = get_args(CountMode)
+
+
+class InvalidCursorError(ValueError):
+    """The cursor is malformed or belongs to a different sort order."""
+
+
+class SortKey(NamedTuple):
+    """One ORDER BY column, with the same options as the postgrest order() builder."""
+    column: str
+    desc: bool = False
+    nullsfirst: bool = False
+    
+    @property
+    def nulls_last(self) -> bool:
+        # Without an explicit NULLS FIRST Postgres puts NULLs last ascending, first descending
+        return not self.nullsfirst and not self.desc
+
+
+def count_method(mode: str) -> Optional[str]:
+    """PostgREST count method for a count mode (None = don't count)."""
+    if mode not in COUNT_MODES:
+        raise ValueError(f"Invalid count mode '{mode}', expected one of {', '.join(COUNT_MODES)}")
+    return None if mode == "none" else mode
+
+
+def encode_cursor(keys: Sequence[SortKey], row: Dict[str, Any]) -> str:
+    payload = {"k": [key.column for key in keys], "v": [row.get(key.column) for key in keys]}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(keys: Sequence[SortKey], cursor: str) -> List[Any]:
+    """Sort values stored in a cursor, checked against the current sort keys."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        columns, values = payload["k"], payload["v"]
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        raise InvalidCursorError("Invalid cursor")
+    if columns != [key.column for key in keys] or len(values) != len(keys):
+        raise InvalidCursorError("Cursor does not match the requested sort order")
+    return values
+
+
+def _literal(value: Any) -> str:
+    """Filter value, quoted so commas, dots and parentheses survive PostgREST parsing."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def _after(key: SortKey, value: Any, nullable: bool = True) -> Optional[str]:
+    """Condition for rows sorting strictly after value on one key (None: no such rows)."""
+    if value is None:
+        return None if key.nulls_last else f"{key.column}.not.is.null"
+    after = f"{key.column}.{'lt' if key.desc else 'gt'}.{_literal(value)}"
+    if nullable and key.nulls_last:
+        return f"or({after},{key.column}.is.null)"
+    return after
+
+
+def _equal(key: SortKey, value: Any) -> str:
+    if value is None:
+        return f"{key.column}.is.null"
+    return f"{key.column}.eq.{_literal(value)}"
+
+
+def keyset_filter(keys: Sequence[SortKey], values: Sequence[Any]) -> str:
+    """
+    PostgREST or() filter for rows after values in the order of keys.
+    
+    (a, b, id) > (va, vb, vid) expands to
+    a after va OR (a = va AND b after vb) OR (a = va AND b = vb AND id after vid).
+    The last key is the unique, non-null tie-breaker.
+    """
+    branches = []
+    for i, key in enumerate(keys):
+        after = _after(key, values[i], nullable=i < len(keys) - 1)
+        if after is None:
+            continue
+        conditions = [_equal(keys[j], values[j]) for j in range(i)] + [after]
+        branches.append(conditions[0] if len(conditions) == 1 else f"and({','.join(conditions)})")
+    return ",".join(branches)
+
+
+def apply_keyset(query: Any, keys: Sequence[SortKey], cursor: Optional[str] = None) -> Any:
+    """Order a query (sync builder or AsyncQuery) by keys and, with a cursor, start after it."""
+    if cursor:
+        values = decode_cursor(keys, cursor)
+        query = query.or_(keyset_filter(keys, values))
+    for key in keys:
+        query = query.order(key.column, desc=key.desc, nullsfirst=key.nullsfirst)
+    return query
+
+
+def next_cursor(rows: List[Dict[str, Any]], keys: Sequence[SortKey], limit: int) -> Optional[str]:
+    """Cursor for the page after rows, or None when rows is the last page."""
+    if not rows or len(rows) < limit:
+        return None
+    return encode_cursor(keys, rows[-1])
@@ -9,11 +9,11 @@ from typing import Optional
 from datetime import datetime, timedelta
 from loguru import logger
 
-from database.client import db
+from database.async_client import adb
 from ingestion.location_enrichment import enrich_location
-from ingestion.job_title_classifier import classify_job_title
+from ingestion.job_title_classifier import classify_unclassified_jobs
 from ingestion.relevance_scorer import score_programming_language, score_ecosystem
-from ingestion.llm_enrichment import process_job_enrichment
+from ingestion.enrichment_pool import EnrichmentPool
 from ingestion.company_enrichment import enrich_companies_batch, get_unenriched_companies
 
 
@@ -25,11 +25,20 @@ class AutoEnrichService:
         self.check_interval = 60  # Check every 60 seconds
         self.retry_check_interval = 3600  # Check for retries every hour (3600 seconds)
         self.ranking_check_interval = 3600  # Calculate rankings every hour (3600 seconds)
+        self.full_ranking_interval = 86400  # Full re-score once a day, incremental in between
         self.company_check_interval = 600  # Check for companies every 10 minutes (600 seconds)
         self.last_retry_check = datetime.utcnow()
         self.last_ranking_check = datetime.utcnow()
+        self.last_full_ranking = None  # First ranking run is always a full one
         self.last_company_check = datetime.utcnow()
         self.company_enrichment_running = False  # Flag to prevent overlapping batches
+        self.enrichment_pool = None  # Created on first use, inside the service's event loop
+    
+    def get_enrichment_pool(self) -> EnrichmentPool:
+        """Shared LLM enrichment pool (keeps learned rate limits across batches)."""
+        if self.enrichment_pool is None:
+            self.enrichment_pool = EnrichmentPool()
+        return self.enrichment_pool
     
     async def start(self):
         """Start the auto-enrichment service."""
@@ -93,7 +102,7 @@ class AutoEnrichService:
             # Find locations that need enrichment:
             # 1. Never enriched (ai_enriched is null or false) AND no error
             # 2. Has error AND error is old enough to retry (>24h)
-            result = db.client.table("locations")\
+            result = await adb.table("locations")\
                 .select("id, city, country_code, region, ai_enrichment_error, ai_enriched_at")\
                 .or_(
                     f"and(ai_enriched.is.null,ai_enrichment_error.is.null),"
@@ -129,7 +138,8 @@ class AutoEnrichService:
                         logger.info(f"Enriching: {city}, {country_code}")
                     
                     # Enrich the location
-                    enrichment_data = enrich_location(
+                    enrichment_data = await asyncio.to_thread(
+                        enrich_location,
                         location_id=location_id,
                         city=city,
                         country_code=country_code,
@@ -149,58 +159,17 @@ class AutoEnrichService:
             logger.error(f"Failed to fetch pending locations: {e}")
     
     async def process_pending_job_titles(self):
-        """Process job titles that need classification."""
+        """
+        Process job titles that need classification.
+        
+        Deferred classification step of ingestion: jobs are stored unclassified and
+        classified here, once per distinct normalized title (memo-backed).
+        """
         try:
-            # Find jobs that need title classification:
-            # title_classification is null
-            result = db.client.table("job_postings")\
-                .select("id, title")\
-                .is_("title_classification", "null")\
-                .limit(20)\
-                .execute()
-            
-            jobs = result.data if result.data else []
-            
-            if not jobs:
-                return  # No pending jobs
-            
-            logger.info(f"🏷️  Auto-classifying {len(jobs)} job titles")
-            
-            # Classify each job title
-            for job in jobs:
-                try:
-                    job_id = job["id"]
-                    title = job.get("title")
-                    
-                    if not title:
-                        logger.warning(f"Job {job_id} has no title, skipping")
-                        continue
-                    
-                    logger.debug(f"Classifying: {title}")
-                    
-                    # Classify the title
-                    classification, error = classify_job_title(title)
-                    
-                    if classification:
-                        # Save classification to database
-                        db.client.table("job_postings")\
-                            .update({
-                                "title_classification": classification
-                            })\
-                            .eq("id", job_id)\
-                            .execute()
-                        
-                        logger.success(f"✅ Classified '{title}' as {classification}")
-                    elif error:
-                        # Save error (but don't retry - classification errors are usually permanent)
-                        logger.warning(f"⚠️ Failed to classify '{title}': {error}")
-                
-                except Exception as e:
-                    logger.error(f"Failed to classify job title '{job.get('title')}': {e}")
-                    continue
+            await asyncio.to_thread(classify_unclassified_jobs, 200)
         
         except Exception as e:
-            logger.error(f"Failed to fetch pending job titles: {e}")
+            logger.error(f"Failed to classify pending job titles: {e}")
     
     async def process_pending_data_jobs(self):
         """
@@ -210,7 +179,7 @@ class AutoEnrichService:
         try:
             # Find Data jobs that don't have completed enrichment
             # Use LEFT JOIN to check for missing or incomplete enrichment
-            result = db.client.table("job_postings")\
+            result = await adb.table("job_postings")\
                 .select("id, title, llm_enrichment!left(enrichment_completed_at)")\
                 .eq("title_classification", "Data")\
                 .eq("is_active", True)\
@@ -233,35 +202,20 @@ class AutoEnrichService:
             
             logger.info(f"🧠 Auto-enriching {len(jobs)} Data jobs with LLM")
             
-            # Enrich each Data job
-            for job in jobs:
-                try:
-                    job_id = job["id"]
-                    title = job.get("title", "Unknown")
-                    
-                    logger.info(f"Enriching Data job: {title}")
-                    
-                    # Process LLM enrichment (force=False, so it won't re-enrich)
-                    result = await asyncio.to_thread(
-                        process_job_enrichment,
-                        job_id,
-                        force=False
-                    )
-                    
-                    if result and result.get("success"):
-                        if result.get("skipped"):
-                            logger.debug(f"⏭️  Skipped (already enriched): {title}")
-                        else:
-                            logger.success(f"✅ Auto-enriched Data job: {title}")
+            # Enrich Data jobs concurrently (force=False, so it won't re-enrich)
+            titles = {job["id"]: job.get("title", "Unknown") for job in jobs}
+            pool = self.get_enrichment_pool()
+            stats = await pool.run(list(titles))
+            
+            for result in stats["results"]:
+                title = titles.get(result.get("job_id"), "Unknown")
+                if result.get("success"):
+                    if result.get("skipped"):
+                        logger.debug(f"⏭️  Skipped (already enriched): {title}")
                     else:
-                        logger.warning(f"⚠️ Failed to auto-enrich Data job: {title}")
-                    
-                    # Small delay between jobs to avoid rate limiting
-                    await asyncio.sleep(2)
-                
-                except Exception as e:
-                    logger.error(f"Failed to enrich Data job '{job.get('title')}': {e}")
-                    continue
+                        logger.success(f"✅ Auto-enriched Data job: {title}")
+                else:
+                    logger.warning(f"⚠️ Failed to auto-enrich Data job: {title}")
         
         except Exception as e:
             logger.error(f"Failed to fetch pending Data jobs (check query size): {e}")
@@ -270,7 +224,7 @@ class AutoEnrichService:
         """Process programming languages and ecosystems that need relevance scoring."""
         try:
             # Find programming languages without relevance_score
-            languages_result = db.client.table("programming_languages")\
+            languages_result = await adb.table("programming_languages")\
                 .select("id, name")\
                 .is_("relevance_score", "null")\
                 .limit(10)\
@@ -279,7 +233,7 @@ class AutoEnrichService:
             languages = languages_result.data if languages_result.data else []
             
             # Find ecosystems without relevance_score
-            ecosystems_result = db.client.table("ecosystems")\
+            ecosystems_result = await adb.table("ecosystems")\
                 .select("id, name")\
                 .is_("relevance_score", "null")\
                 .limit(10)\
@@ -305,7 +259,7 @@ class AutoEnrichService:
                         continue
                     
                     logger.debug(f"Scoring language: {name}")
-                    score_programming_language(lang_id, name)
+                    await asyncio.to_thread(score_programming_language, lang_id, name)
                     
                     # Small delay to avoid rate limits
                     await asyncio.sleep(0.5)
@@ -325,7 +279,7 @@ class AutoEnrichService:
                         continue
                     
                     logger.debug(f"Scoring ecosystem: {name}")
-                    score_ecosystem(eco_id, name)
+                    await asyncio.to_thread(score_ecosystem, eco_id, name)
                     
                     # Small delay to avoid rate limits
                     await asyncio.sleep(0.5)
@@ -346,7 +300,7 @@ class AutoEnrichService:
             logger.info("🔄 Checking for Data jobs with empty AI column...")
             
             # Find Data jobs with enrichment records but no type_datarol (empty AI column)
-            result = db.client.table("llm_enrichment")\
+            result = await adb.table("llm_enrichment")\
                 .select("job_posting_id, enrichment_error, job_postings!inner(title, title_classification)")\
                 .eq("job_postings.title_classification", "Data")\
                 .is_("type_datarol", "null")\
@@ -361,39 +315,29 @@ class AutoEnrichService:
             
             logger.info(f"🔄 Found {len(jobs)} Data jobs with empty AI column - retrying enrichment")
             
-            # Retry enrichment for each job
-            retry_count = 0
+            titles = {}
             for job in jobs:
-                try:
-                    job_id = job["job_posting_id"]
-                    title = job.get("job_postings", {}).get("title", "Unknown")
-                    error = job.get("enrichment_error")
-                    
-                    if error:
-                        logger.info(f"Retrying (had error): {title}")
-                    else:
-                        logger.info(f"Retrying (incomplete): {title}")
-                    
-                    # Force re-enrichment
-                    success = await asyncio.to_thread(
-                        process_job_enrichment,
-                        job_id,
-                        force=True  # Force re-enrichment
-                    )
-                    
-                    if success:
-                        retry_count += 1
-                        logger.success(f"✅ Retry successful: {title}")
-                    else:
-                        logger.warning(f"⚠️ Retry failed: {title}")
-                    
-                    # Delay between retries
-                    await asyncio.sleep(2)
+                job_id = job["job_posting_id"]
+                title = (job.get("job_postings") or {}).get("title", "Unknown")
+                titles[job_id] = title
                 
-                except Exception as e:
-                    logger.error(f"Failed to retry enrichment for job: {e}")
-                    continue
-            
+                if job.get("enrichment_error"):
+                    logger.info(f"Retrying (had error): {title}")
+                else:
+                    logger.info(f"Retrying (incomplete): {title}")
+            
+            # Force re-enrichment, concurrently
+            pool = self.get_enrichment_pool()
+            stats = await pool.run(list(titles), force=True)
+            
+            for result in stats["results"]:
+                title = titles.get(result.get("job_id"), "Unknown")
+                if result.get("success"):
+                    logger.success(f"✅ Retry successful: {title}")
+                else:
+                    logger.warning(f"⚠️ Retry failed: {title}")
+            
+            retry_count = stats["successful"]
             logger.info(f"✅ Retry complete: {retry_count}/{len(jobs)} successful")
         
         except Exception as e:
@@ -475,18 +419,30 @@ class AutoEnrichService:
         Calculate rankings for ALL enriched Data jobs.
         Runs every hour to update rankings with fresh hourly variance.
         
+        Hourly runs are incremental: only jobs flagged needs_ranking are re-scored,
+        all others reuse their cached scores. Once a day everything is re-scored
+        (picks up company changes that do not flag needs_ranking).
+        
         Non-enriched jobs get very high rank numbers (bottom of list).
         """
         try:
             from ranking.job_ranker import calculate_and_save_rankings
             
-            logger.info("📊 Running hourly ranking calculation for ALL enriched Data jobs...")
+            incremental = (
+                self.last_full_ranking is not None and
+                (datetime.utcnow() - self.last_full_ranking).total_seconds() < self.full_ranking_interval
+            )
+            
+            logger.info(f"📊 Running hourly ranking calculation for ALL enriched Data jobs ({'incremental' if incremental else 'full'})...")
             logger.info("   This includes hourly variance for dynamic rankings")
             
             # Run ranking calculation in thread to avoid blocking
             # This will rank ALL active Data jobs (enriched + non-enriched)
             # Non-enriched jobs will rank low due to missing data
-            num_ranked = await asyncio.to_thread(calculate_and_save_rankings)
+            num_ranked = await asyncio.to_thread(calculate_and_save_rankings, incremental)
+            
+            if not incremental:
+                self.last_full_ranking = datetime.utcnow()
             
             logger.success(f"✅ Ranked {num_ranked} jobs successfully (hourly refresh)")
         
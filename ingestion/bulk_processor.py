@@ -0,0 +1,566 @@
+"""Set-based bulk ingestion of complete Bright Data snapshots.
+
+process_job_posting costs 12-20 sequential PostgREST round trips per job. This
+module processes a snapshot in rounds of BULK_ROUND_SIZE jobs instead:
+
+1. Parse all jobs
+2. Resolve companies, locations (incl. vague-location overrides), dedup keys
+   and existing sources with a handful of in_() queries
+3. Replay the per-row decision logic in memory, in snapshot order, so jobs
+   that repeat within the snapshot behave exactly as they would one by one
+4. Write all new/changed rows with chunked multi-row upserts
+
+New/updated/error semantics match process_job_posting. Every row of a round
+carries its primary key from the plan and is written with ON CONFLICT, so the
+writes are idempotent: if they fail halfway, the same plan is written again
+and only finishes the steps that did not land. A step whose multi-row write
+fails is written row by row, so a bad row only fails its own job. Only a round
+that fails before writing anything is retried through the per-row path.
+
+process_jobs_stream runs the same rounds on a snapshot that is still
+downloading (NDJSON), overlapping download time with database writes.
+"""
+
+import asyncio
+from typing import Dict, Any, List, Optional, AsyncIterator
+from uuid import UUID, uuid4
+from datetime import datetime
+from loguru import logger
+
+from database.client import db, select_best_company
+from ingestion.normalizer import normalize_location
+from ingestion.deduplicator import should_update_job
+from ingestion.deduplicator_v2 import (
+    create_dedup_key,
+    get_jobs_by_dedup_keys,
+    get_jobs_with_source,
+    add_sources_to_jobs,
+    update_sources_last_seen
+)
+from ingestion.processor import (
+    ProcessingResult,
+    BatchResult,
+    process_job_posting,
+    parse_raw_job,
+    extract_company_data,
+    extract_location_string,
+    get_vague_location_matcher,
+    is_usable_company_location,
+    VagueLocationMatcher
+)
+
+
+# Jobs resolved and written per round
+BULK_ROUND_SIZE = 250
+
+# Downloaded rounds buffered ahead of ingestion when streaming a snapshot
+STREAM_MAX_PENDING_ROUNDS = 2
+
+# Attempts to write a planned round (writes are idempotent, see module docstring)
+ROUND_WRITE_ATTEMPTS = 2
+
+
+def process_jobs_bulk(
+    raw_jobs: List[Dict[str, Any]],
+    scrape_run_id: UUID,
+    source: str = "linkedin"
+) -> BatchResult:
+    """
+    Process a snapshot with set-based lookups and multi-row writes.
+    
+    Args:
+        raw_jobs: List of raw job data from API
+        scrape_run_id: UUID of current scrape run
+        source: Job source - "linkedin" or "indeed"
+    
+    Returns:
+        BatchResult with the same counts process_job_posting would produce
+    """
+    result = BatchResult()
+    
+    # Loaded and compiled once per snapshot instead of once per job
+    vague_matcher = get_vague_location_matcher()
+    
+    for start in range(0, len(raw_jobs), BULK_ROUND_SIZE):
+        round_jobs = raw_jobs[start:start + BULK_ROUND_SIZE]
+        
+        for job_result in _process_round_or_fallback(round_jobs, start, scrape_run_id, source, vague_matcher):
+            result.add(job_result)
+        
+        logger.info(f"Processed {start + len(round_jobs)}/{len(raw_jobs)} jobs")
+    
+    return result
+
+
+async def process_jobs_stream(
+    raw_jobs: AsyncIterator[Dict[str, Any]],
+    scrape_run_id: UUID,
+    source: str = "linkedin",
+    max_pending_rounds: int = STREAM_MAX_PENDING_ROUNDS
+) -> BatchResult:
+    """
+    Process a snapshot while it is still being downloaded.
+    
+    The download fills a bounded queue with rounds of BULK_ROUND_SIZE jobs; each
+    round is written in a worker thread while the next one downloads. At most
+    max_pending_rounds rounds are buffered, so memory stays flat regardless of
+    snapshot size. Rounds are processed in snapshot order, so results match
+    process_jobs_bulk.
+    
+    Args:
+        raw_jobs: Async iterator of raw job data (e.g. client.stream_results)
+        scrape_run_id: UUID of current scrape run
+        source: Job source - "linkedin" or "indeed"
+        max_pending_rounds: Downloaded rounds that may wait for ingestion
+    
+    Returns:
+        BatchResult with the same counts process_job_posting would produce
+    """
+    result = BatchResult()
+    vague_matcher = get_vague_location_matcher()
+    rounds: asyncio.Queue = asyncio.Queue(maxsize=max_pending_rounds)
+    
+    async def download():
+        try:
+            round_jobs = []
+            async for raw_job in raw_jobs:
+                round_jobs.append(raw_job)
+                if len(round_jobs) >= BULK_ROUND_SIZE:
+                    await rounds.put(round_jobs)
+                    round_jobs = []
+            if round_jobs:
+                await rounds.put(round_jobs)
+        finally:
+            # End of stream (or download error, re-raised when the task is awaited)
+            await rounds.put(None)
+    
+    downloader = asyncio.create_task(download())
+    processed = 0
+    try:
+        while True:
+            round_jobs = await rounds.get()
+            if round_jobs is None:
+                break
+            
+            round_results = await asyncio.to_thread(
+                _process_round_or_fallback, round_jobs, processed, scrape_run_id, source, vague_matcher
+            )
+            for job_result in round_results:
+                result.add(job_result)
+            
+            processed += len(round_jobs)
+            logger.info(f"Processed {processed} jobs (streaming)")
+        
+        await downloader
+    finally:
+        if not downloader.done():
+            downloader.cancel()
+    
+    return result
+
+
+def _process_round_or_fallback(
+    round_jobs: List[Dict[str, Any]],
+    start: int,
+    scrape_run_id: UUID,
+    source: str,
+    vague_matcher: VagueLocationMatcher
+) -> List[ProcessingResult]:
+    """
+    Process one round in bulk, or job by job if the bulk path fails.
+    
+    _process_round only raises before its first write (write failures are
+    handled per job inside), so the per-job path never sees half a round.
+    """
+    try:
+        return _process_round(round_jobs, scrape_run_id, source, vague_matcher)
+    except Exception as e:
+        logger.exception(
+            f"Bulk ingestion failed for jobs {start + 1}-{start + len(round_jobs)} before writing, "
+            f"falling back to per-job processing: {e}"
+        )
+        return [
+            process_job_posting(raw_job, scrape_run_id, source=source, vague_matcher=vague_matcher)
+            for raw_job in round_jobs
+        ]
+
+
+def _process_round(
+    raw_jobs: List[Dict[str, Any]],
+    scrape_run_id: UUID,
+    source: str,
+    vague_matcher: VagueLocationMatcher
+) -> List[ProcessingResult]:
+    """Resolve and write one round of jobs. Returns results in input order."""
+    results: List[Optional[ProcessingResult]] = [None] * len(raw_jobs)
+    
+    # Step 1: Parse
+    parsed = []
+    for index, raw_job in enumerate(raw_jobs):
+        job, error_result = parse_raw_job(raw_job, source)
+        if error_result:
+            results[index] = error_result
+            continue
+        parsed.append({
+            "index": index,
+            "job": job,
+            "company_data": extract_company_data(job, source),
+            "location_string": extract_location_string(job, source)
+        })
+    
+    if not parsed:
+        return results
+    
+    # Step 2: Companies
+    new_companies = _resolve_companies(parsed)
+    
+    # Step 3: Locations and vague-location overrides
+    new_locations = _resolve_locations(parsed, vague_matcher)
+    
+    # Step 4: Dedup + job rows
+    plan = _plan_jobs(parsed, source)
+    
+    history = [
+        {"id": str(uuid4()), "job_posting_id": job_id, "scrape_run_id": str(scrape_run_id)}
+        for job_id in plan["history"]
+    ]
+    
+    # Step 5: Write everything (idempotent: another attempt only finishes what did not land)
+    for attempt in range(1, ROUND_WRITE_ATTEMPTS + 1):
+        try:
+            failed = _write_round(plan, new_companies, new_locations, history, source)
+            break
+        except Exception as e:
+            if attempt == ROUND_WRITE_ATTEMPTS:
+                logger.exception(f"Bulk write of {len(parsed)} jobs failed after {attempt} attempts: {e}")
+                failed = {item["job_id"]: str(e) for item in parsed}
+            else:
+                logger.warning(f"Bulk write failed, writing the round again: {e}")
+    
+    logger.info(
+        f"Bulk wrote {len(plan['new_jobs'])} new jobs, {len(plan['full_updates'])} updates, "
+        f"{len(new_companies)} companies, {len(new_locations)} locations"
+        + (f", {len(failed)} failed rows" if failed else "")
+    )
+    
+    for item in parsed:
+        if item["job_id"] in failed:
+            results[item["index"]] = ProcessingResult(status='error', error=failed[item["job_id"]])
+        else:
+            results[item["index"]] = ProcessingResult(status=item["status"], job_id=UUID(item["job_id"]))
+    
+    # Title classification is deferred (see job_title_classifier.classify_unclassified_jobs)
+    return results
+
+
+def _write_round(
+    plan: Dict[str, Any],
+    new_companies: List[Dict[str, Any]],
+    new_locations: List[Dict[str, Any]],
+    history: List[Dict[str, Any]],
+    source: str
+) -> Dict[str, str]:
+    """
+    Write a planned round. Returns the rows that could not be written (job or master-data id -> error).
+    
+    Rows that already exist are skipped (inserts) or merged again (full updates),
+    so calling this twice with the same plan is safe.
+    """
+    failed: Dict[str, str] = {}
+    now = datetime.utcnow().isoformat()
+    
+    _write_rows("companies", new_companies, "id", failed, key="id")
+    _write_rows("locations", new_locations, "id", failed, key="id")
+    # A loaded master-data namespace treats absent keys as missing, so per-row
+    # lookups in this process would create these companies and locations again
+    db.remember_companies(row for row in new_companies if row["id"] not in failed)
+    db.remember_locations(row for row in new_locations if row["id"] not in failed)
+    
+    # Jobs whose company or location is missing would fail on the foreign key
+    for row in plan["new_jobs"]:
+        for column in ("company_id", "location_id", "location_id_override"):
+            if row.get(column) in failed:
+                failed[row["id"]] = f"{column} {row[column]} was not written: {failed[row[column]]}"
+    _write_rows("job_postings", plan["new_jobs"], "id", failed, key="id")
+    _write_rows(
+        "job_postings",
+        [
+            {**job_data, "id": job_id, "last_seen_at": now}
+            for job_id, job_data in plan["full_updates"].items()
+        ],
+        "id",
+        failed,
+        key="id",
+        merge=True
+    )
+    seen_only = [jid for jid in plan["seen_only"] if jid not in plan["full_updates"]]
+    if seen_only:
+        db.update_jobs_last_seen(seen_only, now)
+    
+    add_sources_to_jobs([row for row in plan["new_sources"] if row["job_posting_id"] not in failed])
+    if plan["sources_seen"]:
+        update_sources_last_seen(plan["sources_seen"], source)
+    
+    _write_rows("job_descriptions", plan["descriptions"], "job_posting_id", failed)
+    _write_rows("job_posters", plan["posters"], "id", failed)
+    _write_rows("llm_enrichment", plan["llm_stubs"], "job_posting_id", failed)
+    _write_rows("job_scrape_history", history, "id", failed)
+    
+    return failed
+
+
+def _write_rows(
+    table: str,
+    rows: List[Dict[str, Any]],
+    on_conflict: str,
+    failed: Dict[str, str],
+    key: str = "job_posting_id",
+    merge: bool = False
+) -> None:
+    """
+    Upsert one step of a round, skipping rows whose `key` already failed.
+    
+    Inserts skip existing rows (ON CONFLICT DO NOTHING); merge=True updates
+    them. If the multi-row write fails, the rows are written one by one and
+    the failing ones are recorded in `failed`.
+    """
+    rows = [row for row in rows if row.get(key) not in failed]
+    if not rows:
+        return
+    try:
+        db.bulk_upsert(table, rows, on_conflict=on_conflict, ignore_duplicates=not merge)
+        return
+    except Exception as e:
+        logger.warning(f"Bulk write to {table} failed, writing {len(rows)} rows one by one: {e}")
+    
+    for row in rows:
+        try:
+            db.bulk_upsert(table, [row], on_conflict=on_conflict, ignore_duplicates=not merge)
+        except Exception as e:
+            logger.error(f"Failed to write {table} row {row.get(key)}: {e}")
+            failed[row[key]] = str(e)
+
+
+def _resolve_companies(parsed: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Set company_id and company_name on every parsed job.
+    
+    Returns the company rows that still have to be inserted.
+    """
+    linkedin_ids = {
+        item["company_data"]["linkedin_company_id"]
+        for item in parsed if item["company_data"].get("linkedin_company_id")
+    }
+    names = {
+        item["company_data"]["name"]
+        for item in parsed if not item["company_data"].get("linkedin_company_id")
+    }
+    by_linkedin_id = db.get_companies_by_linkedin_ids(linkedin_ids) if linkedin_ids else {}
+    by_name = db.get_companies_by_names(names) if names else {}
+    
+    new_companies = []
+    new_company_ids = set()
+    for item in parsed:
+        company_data = item["company_data"]
+        linkedin_id = company_data.get("linkedin_company_id")
+        
+        if linkedin_id:
+            company = by_linkedin_id.get(linkedin_id)
+        else:
+            company = select_best_company(
+                by_name.get(company_data["name"], []),
+                has_logo=lambda c: c.get("has_logo")
+            )
+        
+        if not company:
+            company = {
+                "id": str(uuid4()),
+                "name": company_data["name"],
+                "linkedin_company_id": linkedin_id,
+                "has_logo": False
+            }
+            new_companies.append({**company_data, "id": company["id"]})
+            new_company_ids.add(company["id"])
+            if linkedin_id:
+                by_linkedin_id[linkedin_id] = company
+            # Later jobs without a LinkedIn ID find it by name, as they would in the DB
+            by_name.setdefault(company["name"], []).append(company)
+            logger.debug(f"Created new company: {company_data['name']}")
+        
+        item["company_id"] = company["id"]
+        item["company_name"] = company["name"] or ""
+        item["company_is_new"] = company["id"] in new_company_ids
+    
+    return new_companies
+
+
+def _resolve_locations(parsed: List[Dict[str, Any]], vague_matcher: VagueLocationMatcher) -> List[Dict[str, Any]]:
+    """
+    Set location_id and location_id_override on every parsed job.
+    
+    Returns the location rows that still have to be inserted.
+    """
+    for item in parsed:
+        item["is_vague"] = item["location_string"] in vague_matcher
+    
+    # Company locations for all vague jobs in one lookup (new companies have no master data yet)
+    vague_company_ids = {
+        item["company_id"] for item in parsed
+        if item["is_vague"] and not item["company_is_new"]
+    }
+    company_locations = db.get_company_locations(vague_company_ids) if vague_company_ids else {}
+    
+    for item in parsed:
+        item["location_data"] = normalize_location(item["location_string"])
+        item["override_location_data"] = None
+        
+        if not item["is_vague"]:
+            continue
+        
+        company_location = company_locations.get(item["company_id"])
+        if is_usable_company_location(company_location):
+            item["override_location_data"] = normalize_location(f"{company_location}, Belgium")
+            logger.info(f"✓ Location override: '{item['location_string']}' → '{company_location}'")
+        else:
+            logger.debug(f"No company location available for override (will be added during enrichment)")
+    
+    location_strings = {item["location_data"]["full_location_string"] for item in parsed}
+    location_strings.update(
+        item["override_location_data"]["full_location_string"]
+        for item in parsed if item["override_location_data"]
+    )
+    locations = db.get_locations_by_strings(location_strings)
+    
+    new_locations = []
+    
+    def location_id_for(location_data: Dict[str, Any]) -> str:
+        key = location_data["full_location_string"]
+        if key not in locations:
+            locations[key] = {"id": str(uuid4()), "full_location_string": key}
+            new_locations.append({**location_data, "id": locations[key]["id"]})
+        return locations[key]["id"]
+    
+    for item in parsed:
+        item["location_id"] = location_id_for(item["location_data"])
+        item["location_id_override"] = (
+            location_id_for(item["override_location_data"])
+            if item["override_location_data"] else None
+        )
+    
+    return new_locations
+
+
+def _plan_jobs(parsed: List[Dict[str, Any]], source: str) -> Dict[str, Any]:
+    """
+    Replay the per-row dedup/update decisions in snapshot order.
+    
+    Sets status and job_id on every parsed job and returns the rows to write.
+    """
+    for item in parsed:
+        item["dedup_key"] = create_dedup_key(item["job"].job_title, item["company_name"])
+    
+    existing_jobs = get_jobs_by_dedup_keys({item["dedup_key"] for item in parsed})
+    with_source = get_jobs_with_source([row["id"] for row in existing_jobs.values()], source)
+    
+    # dedup_key -> what the DB would contain at this point of the per-row run
+    state = {
+        key: {"id": row["id"], "data": row, "has_source": row["id"] in with_source, "is_new": False}
+        for key, row in existing_jobs.items()
+    }
+    
+    plan = {
+        "new_jobs": [],
+        "full_updates": {},
+        "seen_only": set(),
+        "new_sources": [],
+        "sources_seen": set(),
+        "descriptions": [],
+        "posters": [],
+        "llm_stubs": [],
+        "history": []
+    }
+    new_jobs_by_id = {}
+    
+    for item in parsed:
+        job = item["job"]
+        source_job_id = job.job_posting_id if source == "linkedin" else job.jobid
+        
+        job_data = job.to_db_dict(item["company_id"], item["location_id"])
+        job_data["dedup_key"] = item["dedup_key"]
+        job_data["title_normalized"] = job.job_title.lower().strip()
+        job_data["location_id_override"] = item["location_id_override"]
+        
+        existing = state.get(item["dedup_key"])
+        
+        if existing:
+            job_id = existing["id"]
+            
+            if existing["has_source"]:
+                # This source already exists - just update last_seen
+                plan["sources_seen"].add(job_id)
+                
+                if should_update_job(existing["data"], job_data):
+                    _apply_update(plan, new_jobs_by_id, existing, job_data)
+                    logger.info(f"Updated job: {job.job_title} (source: {source})")
+                else:
+                    plan["seen_only"].add(job_id)
+                    logger.debug(f"Re-saw job (no changes): {job.job_title} (source: {source})")
+            else:
+                # NEW source for existing job - add it and merge its data
+                plan["new_sources"].append({
+                    "job_posting_id": job_id,
+                    "source": source,
+                    "source_job_id": source_job_id
+                })
+                existing["has_source"] = True
+                _apply_update(plan, new_jobs_by_id, existing, job_data)
+                logger.info(f"Added {source} source to existing job: {job.job_title}")
+            
+            item["status"] = 'updated'
+        else:
+            job_id = str(uuid4())
+            row = {**job_data, "id": job_id}
+            plan["new_jobs"].append(row)
+            new_jobs_by_id[job_id] = row
+            
+            plan["new_sources"].append({
+                "job_posting_id": job_id,
+                "source": source,
+                "source_job_id": source_job_id
+            })
+            plan["descriptions"].append(job.get_description_dict(job_id))
+            
+            # Job poster if available (LinkedIn only)
+            if source == "linkedin":
+                poster = job.get_poster()
+                if poster:
+                    poster_data = poster.to_db_dict(job_id)
+                    if poster_data:
+                        # Explicit id: job_posters has no natural key to upsert on
+                        plan["posters"].append({**poster_data, "id": str(uuid4())})
+            
+            plan["llm_stubs"].append({"job_posting_id": job_id})
+            
+            state[item["dedup_key"]] = {"id": job_id, "data": dict(job_data), "has_source": True, "is_new": True}
+            item["status"] = 'new'
+            logger.info(f"Inserted new job: {job.job_title} (source: {source})")
+        
+        item["job_id"] = job_id
+        plan["history"].append(job_id)
+    
+    return plan
+
+
+def _apply_update(
+    plan: Dict[str, Any],
+    new_jobs_by_id: Dict[str, Dict[str, Any]],
+    existing: Dict[str, Any],
+    job_data: Dict[str, Any]
+) -> None:
+    """Record a full-data update, folding it into the insert if the job is new in this round."""
+    job_id = existing["id"]
+    if existing["is_new"]:
+        new_jobs_by_id[job_id].update(job_data)
+    else:
+        plan["full_updates"][job_id] = job_data
+    existing["data"] = {**existing["data"], **job_data}
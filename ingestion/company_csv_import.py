@@ -0,0 +1,324 @@
+"""
+Bulk import of company master data from CSV.
+
+The uploaded file is spooled to a temporary file and parsed in one streaming
+pass. Rows are processed in batches of IMPORT_BATCH_SIZE:
+- one chunked in_() lookup resolves the batch's LinkedIn company IDs,
+- one more finds which of those companies already have master data,
+- master data is written with chunked upserts on company_id.
+
+Rows of one upsert must share their columns (PostgREST writes the union of the
+keys, which would blank fields a row did not provide), so rows are grouped by
+the fields they set. A failing chunk is retried company by company so errors
+are still reported per CSV row.
+
+Imports run as a background job (utils.background_jobs) reporting progress.
+"""
+
+import codecs
+import csv
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from database.client import db
+from utils.background_jobs import BackgroundJob
+
+# CSV rows per lookup/write batch
+IMPORT_BATCH_SIZE = 1000
+
+# Bytes read per step when spooling and scanning the file
+READ_CHUNK_SIZE = 64 * 1024
+
+# Errors kept in the job result (the count is always complete)
+MAX_REPORTED_ERRORS = 1000
+
+
+class CsvImportError(ValueError):
+    """The file cannot be imported at all (empty, undecodable, missing header)."""
+
+
+@dataclass
+class CsvImportFile:
+    """Properties of an uploaded CSV found by inspect_company_csv."""
+    path: str
+    encoding: str
+    delimiter: str
+    header_map: Dict[str, int]
+    estimated_rows: int
+
+
+def spool_upload(source: BinaryIO) -> str:
+    """Copy an upload to a temporary file (the upload is closed once the request ends)."""
+    with tempfile.NamedTemporaryFile(prefix="company_import_", suffix=".csv", delete=False) as target:
+        shutil.copyfileobj(source, target, READ_CHUNK_SIZE)
+        return target.name
+
+
+def map_headers(headers: List[str]) -> Dict[str, int]:
+    """Map header names to field keys (case-insensitive, flexible naming)."""
+    header_map = {}
+    for idx, header in enumerate(headers):
+        header_lower = header.lower().strip()
+        if 'linkedin' in header_lower and 'company' in header_lower and 'id' in header_lower:
+            header_map['linkedin_company_id'] = idx
+        elif 'company' in header_lower and 'name' in header_lower:
+            header_map['company_name'] = idx
+        elif 'industry' in header_lower:
+            header_map['industry'] = idx
+        elif 'founded' in header_lower and 'year' in header_lower:
+            header_map['founded_year'] = idx
+        elif 'website' in header_lower:
+            header_map['website'] = idx
+        elif 'jobs' in header_lower and 'page' in header_lower:
+            header_map['jobs_page_url'] = idx
+        elif 'contact' in header_lower and 'email' in header_lower:
+            header_map['contact_email'] = idx
+    return header_map
+
+
+def _scan(path: str) -> Tuple[str, int]:
+    """Encoding (UTF-8, else Latin-1) and line count of a file, in one pass."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    encoding = "utf-8-sig"
+    lines = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+            lines += chunk.count(b"\n")
+            if encoding == "utf-8-sig":
+                try:
+                    decoder.decode(chunk)
+                except UnicodeDecodeError:
+                    encoding = "latin-1"
+        if encoding == "utf-8-sig":
+            try:
+                decoder.decode(b"", final=True)
+            except UnicodeDecodeError:
+                encoding = "latin-1"
+    return encoding, lines
+
+
+def inspect_company_csv(path: str) -> CsvImportFile:
+    """
+    Detect encoding and delimiter and validate the header.
+    
+    Raises:
+        CsvImportError: the file is empty or has no usable header
+    """
+    encoding, lines = _scan(path)
+    
+    with open(path, newline="", encoding=encoding) as f:
+        # Detect delimiter (comma or semicolon)
+        sample = f.read(1024)
+        try:
+            delimiter = csv.Sniffer().sniff(sample, delimiters=',;\t').delimiter
+        except csv.Error:
+            # Default to comma if detection fails
+            delimiter = ','
+        f.seek(0)
+        
+        try:
+            headers = [h.strip() for h in next(csv.reader(f, delimiter=delimiter))]
+        except StopIteration:
+            raise CsvImportError("CSV file is empty")
+    
+    # Validate that first column is LinkedIn Company ID (be flexible with naming)
+    first_header_lower = headers[0].lower().strip() if headers else ''
+    if not first_header_lower or ('linkedin' not in first_header_lower and 'company' not in first_header_lower and 'id' not in first_header_lower):
+        # Check if it looks like a valid header at all
+        if not first_header_lower or len(first_header_lower) < 3:
+            raise CsvImportError(
+                f"First column must be 'LinkedIn Company ID'. Found: '{headers[0] if headers else 'empty'}'. Make sure your CSV has proper headers."
+            )
+    
+    return CsvImportFile(path, encoding, delimiter, map_headers(headers), max(lines - 1, 0))
+
+
+def parse_master_data(row: List[str], header_map: Dict[str, int]) -> Dict[str, Any]:
+    """Master data fields of a CSV row - only fields that have values."""
+    def get_value(key):
+        idx = header_map.get(key)
+        if idx is None or idx >= len(row):
+            return None
+        value = row[idx].strip() if row[idx] else ''
+        return value if value else None
+    
+    master_data = {}
+    
+    # String fields
+    for key in ('industry', 'website', 'jobs_page_url', 'contact_email'):
+        value = get_value(key)
+        if value:
+            master_data[key] = value
+    
+    # Parse founded year (remove any non-digit characters)
+    founded_year_str = get_value('founded_year')
+    if founded_year_str:
+        clean_str = ''.join(c for c in founded_year_str if c.isdigit())
+        if clean_str:
+            master_data['founded_year'] = int(clean_str)
+    
+    return master_data
+
+
+def new_import_stats() -> Dict[str, Any]:
+    return {
+        'total_rows': 0,
+        'skipped_rows': 0,
+        'companies_found': 0,
+        'companies_not_found': 0,
+        'master_data_created': 0,
+        'master_data_updated': 0,
+        'error_count': 0,
+        'errors': []
+    }
+
+
+def _add_error(stats: Dict[str, Any], error: Dict[str, Any]):
+    stats['error_count'] += 1
+    if len(stats['errors']) < MAX_REPORTED_ERRORS:
+        stats['errors'].append(error)
+
+
+def import_company_master_data(csv_file: CsvImportFile, job: Optional[BackgroundJob] = None) -> Dict[str, Any]:
+    """Import a CSV inspected by inspect_company_csv; returns the import stats."""
+    stats = new_import_stats()
+    header_map = csv_file.header_map
+    name_idx = header_map.get('company_name')
+    batch = []
+    
+    with open(csv_file.path, newline="", encoding=csv_file.encoding) as f:
+        reader = csv.reader(f, delimiter=csv_file.delimiter)
+        next(reader, None)  # Header
+        
+        for row_num, row in enumerate(reader, start=2):  # Start at 2 (header is row 1)
+            stats['total_rows'] += 1
+            
+            # Skip empty rows or rows without LinkedIn Company ID (first column)
+            linkedin_company_id = row[0].strip() if row and row[0] else ''
+            if not linkedin_company_id:
+                stats['skipped_rows'] += 1
+                continue
+            
+            # Remove any decimal points (Excel formatting issue)
+            linkedin_company_id = linkedin_company_id.split('.')[0]
+            company_name = row[name_idx] if name_idx is not None and len(row) > name_idx else 'Unknown'
+            
+            try:
+                master_data = parse_master_data(row, header_map)
+            except Exception as e:
+                _add_error(stats, {'row': row_num, 'linkedin_id': linkedin_company_id, 'error': str(e)})
+                continue
+            
+            batch.append((row_num, linkedin_company_id, company_name, master_data))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                _import_batch(batch, stats)
+                batch = []
+                _report_progress(job, stats, csv_file)
+        
+        if batch:
+            _import_batch(batch, stats)
+    
+    _report_progress(job, stats, csv_file)
+    return stats
+
+
+def _report_progress(job: Optional[BackgroundJob], stats: Dict[str, Any], csv_file: CsvImportFile):
+    if job is None:
+        return
+    job.update(
+        processed_rows=stats['total_rows'],
+        estimated_rows=max(csv_file.estimated_rows, stats['total_rows']),
+        master_data_created=stats['master_data_created'],
+        master_data_updated=stats['master_data_updated'],
+        error_count=stats['error_count']
+    )
+
+
+def _import_batch(batch: List[Tuple[int, str, str, Dict[str, Any]]], stats: Dict[str, Any]):
+    """Resolve, then upsert, one batch of parsed rows."""
+    companies = db.get_companies_by_linkedin_ids(linkedin_id for _, linkedin_id, _, _ in batch)
+    
+    # company_id -> rows and merged master data (later rows win, as with sequential updates)
+    pending: Dict[str, Dict[str, Any]] = {}
+    for row_num, linkedin_id, company_name, master_data in batch:
+        company = companies.get(linkedin_id)
+        if not company:
+            stats['companies_not_found'] += 1
+            _add_error(stats, {
+                'row': row_num,
+                'linkedin_id': linkedin_id,
+                'company_name': company_name,
+                'error': 'Company not found in database'
+            })
+            continue
+        
+        stats['companies_found'] += 1
+        
+        # Skip if no data to import
+        if not master_data:
+            stats['skipped_rows'] += 1
+            continue
+        
+        entry = pending.setdefault(company['id'], {'rows': [], 'data': {}})
+        entry['rows'].append((row_num, linkedin_id))
+        entry['data'].update(master_data)
+    
+    if not pending:
+        return
+    
+    existing = db.get_company_ids_with_master_data(pending)
+    
+    # One upsert per set of provided fields
+    groups: Dict[frozenset, List[str]] = {}
+    for company_id, entry in pending.items():
+        groups.setdefault(frozenset(entry['data']), []).append(company_id)
+    
+    for company_ids in groups.values():
+        rows = [{'company_id': company_id, **pending[company_id]['data']} for company_id in company_ids]
+        try:
+            db.bulk_upsert("company_master_data", rows, on_conflict="company_id")
+            written = company_ids
+        except Exception as e:
+            logger.warning(f"Bulk master data upsert failed, retrying {len(rows)} companies one by one: {e}")
+            written = []
+            for company_id, row in zip(company_ids, rows):
+                try:
+                    db.bulk_upsert("company_master_data", [row], on_conflict="company_id")
+                    written.append(company_id)
+                except Exception as row_error:
+                    for row_num, linkedin_id in pending[company_id]['rows']:
+                        _add_error(stats, {'row': row_num, 'linkedin_id': linkedin_id, 'error': str(row_error)})
+        
+        for company_id in written:
+            count = len(pending[company_id]['rows'])
+            if company_id in existing:
+                stats['master_data_updated'] += count
+            else:
+                stats['master_data_created'] += 1
+                stats['master_data_updated'] += count - 1
+
+
+def run_company_import(job: BackgroundJob, csv_file: CsvImportFile):
+    """Background task: import the file, record the result on the job, remove the file."""
+    job.start()
+    logger.info(f"📥 Importing company master data from CSV ({csv_file.estimated_rows} rows)")
+    try:
+        stats = import_company_master_data(csv_file, job)
+        job.finish({
+            'message': f"Import completed: {stats['master_data_created']} created, {stats['master_data_updated']} updated",
+            'stats': stats
+        })
+        logger.info(f"✅ Company import complete: {stats['master_data_created']} created, "
+                    f"{stats['master_data_updated']} updated, {stats['error_count']} errors")
+    except Exception as e:
+        job.fail(str(e))
+    finally:
+        try:
+            os.remove(csv_file.path)
+        except OSError:
+            pass
@@ -245,6 +245,9 @@ def save_enrichment_to_db(company_id: str, enrichment_data: Dict[str, Any]) -> b
             .upsert(db_data, on_conflict="company_id")\
             .execute()
         
+        # Location overrides of newly ingested jobs should see the new locatie_belgie right away
+        db.master_data.put("company_locations", str(company_id), db_data.get("locatie_belgie"))
+        
         return True
         
     except Exception as e:
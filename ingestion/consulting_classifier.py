@@ -7,6 +7,7 @@ from openai import OpenAI
 
 from config.settings import settings
 from database.client import db
+from ingestion.llm_cache import llm_cache
 
 # Initialize OpenAI client
 import os
@@ -43,19 +44,25 @@ def classify_consulting(company_id: str, company_name: str, company_description:
         
         logger.debug(f"Calling OpenAI API with input: {company_info}")
         
-        # Call OpenAI with the prompt
-        response = client.responses.create(
-            prompt={
-                "id": CONSULTING_PROMPT_ID,
-                "version": CONSULTING_PROMPT_VERSION
-            },
-            input=company_info
-        )
-        
-        logger.debug(f"OpenAI response: {response}")
+        # Identical input for the same prompt version returns the stored result
+        cached = llm_cache.get(CONSULTING_PROMPT_ID, CONSULTING_PROMPT_VERSION, company_info)
+        if cached:
+            logger.debug("Using cached LLM response")
+            response = None
+        else:
+            # Call OpenAI with the prompt
+            response = client.responses.create(
+                prompt={
+                    "id": CONSULTING_PROMPT_ID,
+                    "version": CONSULTING_PROMPT_VERSION
+                },
+                input=company_info
+            )
+            
+            logger.debug(f"OpenAI response: {response}")
         
-        # Extract structured output from response
-        classification_data = None
+        # Extract structured output from response (or cache)
+        classification_data = json.loads(cached) if cached else None
         if hasattr(response, 'output') and response.output:
             for item in response.output:
                 if hasattr(item, 'type') and item.type == 'message' and hasattr(item, 'content'):
@@ -80,6 +87,9 @@ def classify_consulting(company_id: str, company_name: str, company_description:
         if 'Consulting' not in classification_data:
             raise ValueError(f"Missing 'Consulting' field in response: {classification_data}")
         
+        if not cached:
+            llm_cache.put(CONSULTING_PROMPT_ID, CONSULTING_PROMPT_VERSION, company_info, json.dumps(classification_data, ensure_ascii=False))
+        
         is_consulting = classification_data.get('Consulting', False)
         reasoning = classification_data.get('reasoning', '')
         
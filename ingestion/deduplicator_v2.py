@@ -1,9 +1,9 @@
 """Deduplication based on title + company (v2)."""
 
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Tuple, Iterable, Set
 from uuid import UUID
 from loguru import logger
-from database.client import db
+from database.client import db, chunked, IN_FILTER_CHUNK_SIZE
 import re
 
 
@@ -125,6 +125,87 @@ def update_source_last_seen(
         .execute()
 
 
+def get_jobs_by_dedup_keys(dedup_keys: Iterable[str]) -> Dict[str, Dict]:
+    """
+    Bulk variant of check_job_exists_by_dedup.
+    
+    Args:
+        dedup_keys: Dedup keys (see create_dedup_key)
+    
+    Returns:
+        Dict mapping dedup_key -> existing job row (first match per key)
+    """
+    jobs = {}
+    for chunk in chunked(set(dedup_keys), IN_FILTER_CHUNK_SIZE):
+        result = db.client.table("job_postings")\
+            .select("*")\
+            .in_("dedup_key", chunk)\
+            .execute()
+        for row in result.data or []:
+            jobs.setdefault(row["dedup_key"], row)
+    return jobs
+
+
+def get_jobs_with_source(job_ids: Iterable[str], source: str) -> Set[str]:
+    """
+    Bulk variant of check_source_exists_for_job.
+    
+    Args:
+        job_ids: Job posting UUIDs
+        source: Source name (linkedin/indeed)
+    
+    Returns:
+        Set of job IDs that already have this source
+    """
+    found = set()
+    for chunk in chunked({str(jid) for jid in job_ids}, IN_FILTER_CHUNK_SIZE):
+        result = db.client.table("job_sources")\
+            .select("job_posting_id")\
+            .in_("job_posting_id", chunk)\
+            .eq("source", source)\
+            .execute()
+        found.update(row["job_posting_id"] for row in result.data or [])
+    return found
+
+
+def add_sources_to_jobs(sources: List[Dict[str, str]]) -> None:
+    """
+    Bulk variant of add_source_to_job.
+    
+    Args:
+        sources: Rows with job_posting_id, source and source_job_id.
+                 Rows that already exist (job_posting_id, source) are skipped.
+    """
+    if not sources:
+        return
+    db.bulk_upsert(
+        "job_sources",
+        sources,
+        on_conflict="job_posting_id,source",
+        ignore_duplicates=True
+    )
+    logger.info(f"Added {len(sources)} job sources")
+
+
+def update_sources_last_seen(job_ids: Iterable[str], source: str) -> None:
+    """
+    Bulk variant of update_source_last_seen.
+    
+    Args:
+        job_ids: Job posting UUIDs
+        source: Source name (linkedin/indeed)
+    """
+    from datetime import datetime
+    
+    last_seen_at = datetime.now().isoformat()
+    for chunk in chunked({str(jid) for jid in job_ids}, IN_FILTER_CHUNK_SIZE):
+        db.client.table("job_sources")\
+            .update({"last_seen_at": last_seen_at})\
+            .in_("job_posting_id", chunk)\
+            .eq("source", source)\
+            .execute()
+
+
 def fields_have_changed(
     old_data: Dict[str, Any],
     new_data: Dict[str, Any],
@@ -0,0 +1,353 @@
+"""
+Concurrent LLM enrichment pool.
+
+Runs job enrichments on the async OpenAI client with:
+- A token-bucket rate limiter (requests + tokens) that follows the
+  x-ratelimit-* response headers of the OpenAI API
+- Adaptive concurrency: halved on RateLimitError, grown back one slot at a time
+- A per-request deadline that starts once the job holds a slot and passed the
+  rate limiter, so jobs queued behind the concurrency limit do not time out
+
+Database reads/writes reuse the synchronous helpers in ingestion.llm_enrichment
+(run in worker threads), so results are identical to process_job_enrichment.
+"""
+
+import asyncio
+import json
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, List, Tuple
+
+from loguru import logger
+from openai import AsyncOpenAI, RateLimitError, APIError
+
+from config.settings import settings
+from ingestion.llm_enrichment import (
+    PROMPT_TEMPLATE_ID,
+    PROMPT_VERSION,
+    extract_enrichment_data,
+    get_cached_enrichment,
+    cache_enrichment,
+    load_job_for_enrichment,
+    complete_job_enrichment
+)
+
+# Rough output size of one enrichment (structured JSON), used for token estimates
+ESTIMATED_OUTPUT_TOKENS = 2000
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse an OpenAI reset duration ("20ms", "1.5s", "6m0s") into seconds."""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def retry_after_seconds(headers) -> Optional[float]:
+    """Server-suggested wait from retry-after-ms / retry-after headers of a 429."""
+    if not headers:
+        return None
+    if headers.get('retry-after-ms'):
+        return parse_reset_duration(f"{headers.get('retry-after-ms')}ms")
+    if headers.get('retry-after'):
+        return parse_reset_duration(f"{headers.get('retry-after')}s")
+    return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate tokens of one enrichment call (~4 characters per input token)."""
+    return len(text) // 4 + ESTIMATED_OUTPUT_TOKENS
+
+
+class TokenBucket:
+    """Token bucket whose capacity and refill rate are learned from response headers."""
+    
+    def __init__(self):
+        self.capacity: Optional[float] = None   # Unknown until the first response
+        self.tokens = 0.0
+        self.refill_per_second = 0.0
+        self.updated_at = time.monotonic()
+    
+    def _refill(self):
+        now = time.monotonic()
+        if self.capacity is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+    
+    def update(self, limit: Optional[str], remaining: Optional[str], reset: Optional[str]):
+        """Sync with x-ratelimit-limit-*, x-ratelimit-remaining-* and x-ratelimit-reset-*."""
+        try:
+            limit_value = float(limit)
+            remaining_value = float(remaining)
+        except (TypeError, ValueError):
+            return
+        
+        self._refill()
+        self.capacity = limit_value
+        # The server count is the truth; local consumption may not have been seen yet
+        self.tokens = remaining_value if self.tokens == 0 else min(self.tokens, remaining_value)
+        
+        reset_seconds = parse_reset_duration(reset)
+        if reset_seconds and remaining_value < limit_value:
+            self.refill_per_second = (limit_value - remaining_value) / reset_seconds
+        else:
+            # OpenAI limits are per minute
+            self.refill_per_second = limit_value / 60
+    
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (0 when unknown or available now)."""
+        self._refill()
+        if self.capacity is None:
+            return 0.0
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        if self.refill_per_second <= 0:
+            return 1.0
+        return (amount - self.tokens) / self.refill_per_second
+    
+    def consume(self, amount: float):
+        if self.capacity is not None:
+            self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Request + token buckets for one OpenAI API key."""
+    
+    def __init__(self):
+        self.requests = TokenBucket()
+        self.tokens = TokenBucket()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self, estimated_tokens: int):
+        """Wait until one request of `estimated_tokens` fits in both buckets."""
+        async with self._lock:
+            while True:
+                wait = max(
+                    self.paused_until - time.monotonic(),
+                    self.requests.wait_time(1),
+                    self.tokens.wait_time(estimated_tokens)
+                )
+                if wait <= 0:
+                    break
+                logger.debug(f"Rate limiter: waiting {wait:.2f}s")
+                await asyncio.sleep(wait)
+            
+            self.requests.consume(1)
+            self.tokens.consume(estimated_tokens)
+    
+    def update_from_headers(self, headers):
+        """Read the x-ratelimit-* headers of an OpenAI response."""
+        if not headers:
+            return
+        self.requests.update(
+            headers.get('x-ratelimit-limit-requests'),
+            headers.get('x-ratelimit-remaining-requests'),
+            headers.get('x-ratelimit-reset-requests')
+        )
+        self.tokens.update(
+            headers.get('x-ratelimit-limit-tokens'),
+            headers.get('x-ratelimit-remaining-tokens'),
+            headers.get('x-ratelimit-reset-tokens')
+        )
+    
+    def pause(self, seconds: float):
+        """Hold back all requests for `seconds` (after a 429)."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class AdaptiveConcurrency:
+    """Concurrency limit that halves on rate limits and grows back by one slot."""
+    
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = self.max_limit
+        self.in_flight = 0
+        self.successes = 0
+        self._condition = asyncio.Condition()
+    
+    @asynccontextmanager
+    async def slot(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+    
+    async def on_success(self):
+        async with self._condition:
+            self.successes += 1
+            # Additive increase: one extra slot after `limit` successes in a row
+            if self.limit < self.max_limit and self.successes >= self.limit:
+                self.limit += 1
+                self.successes = 0
+                logger.info(f"Enrichment concurrency increased to {self.limit}")
+                self._condition.notify_all()
+    
+    async def on_rate_limit(self):
+        async with self._condition:
+            self.successes = 0
+            new_limit = max(self.min_limit, self.limit // 2)
+            if new_limit < self.limit:
+                logger.warning(f"Rate limited: enrichment concurrency reduced from {self.limit} to {new_limit}")
+            self.limit = new_limit
+
+
+class EnrichmentPool:
+    """
+    Asyncio pool for LLM enrichment of many jobs.
+    
+    Create it inside a running event loop (its locks bind to that loop) and reuse it
+    across batches so the learned rate limits and concurrency carry over.
+    """
+    
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        job_timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        client: Optional[AsyncOpenAI] = None
+    ):
+        self.client = client or AsyncOpenAI(api_key=settings.openai_api_key)
+        self.job_timeout = job_timeout or settings.llm_enrichment_job_timeout
+        self.max_retries = max_retries or settings.llm_enrichment_max_retries
+        self.concurrency = AdaptiveConcurrency(concurrency or settings.llm_enrichment_concurrency)
+        self.limiter = RateLimiter()
+    
+    async def call_llm(
+        self,
+        job_id: str,
+        description: str,
+        use_cache: bool = True
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Async counterpart of enrich_job_with_llm.
+        
+        Returns:
+            Tuple of (enrichment_data, error_message)
+        """
+        cached = get_cached_enrichment(description) if use_cache else None
+        if cached:
+            logger.info(f"Using cached enrichment for job {job_id} (same description and prompt version)")
+            return cached, None
+        
+        last_error = None
+        
+        for attempt in range(self.max_retries):
+            if attempt > 0:
+                logger.info(f"Retry attempt {attempt + 1}/{self.max_retries} for job {job_id}")
+            
+            wait_time = 0.0
+            async with self.concurrency.slot():
+                await self.limiter.acquire(estimate_tokens(description))
+                try:
+                    raw = await asyncio.wait_for(
+                        self.client.responses.with_raw_response.create(
+                            prompt={
+                                "id": PROMPT_TEMPLATE_ID,
+                                "version": PROMPT_VERSION
+                            },
+                            input=description
+                        ),
+                        timeout=self.job_timeout
+                    )
+                    self.limiter.update_from_headers(raw.headers)
+                    enrichment_data = extract_enrichment_data(raw.parse())
+                    
+                    if not enrichment_data:
+                        return None, "Could not extract structured output from API response"
+                    
+                    await self.concurrency.on_success()
+                    logger.success(f"Successfully enriched job {job_id}")
+                    cache_enrichment(description, enrichment_data)
+                    return enrichment_data, None
+                
+                except RateLimitError as e:
+                    last_error = e
+                    headers = getattr(getattr(e, 'response', None), 'headers', None)
+                    self.limiter.update_from_headers(headers)
+                    await self.concurrency.on_rate_limit()
+                    
+                    wait_time = retry_after_seconds(headers) or (2 ** attempt) * 5  # 5s, 10s, 20s
+                    self.limiter.pause(wait_time)
+                    logger.warning(f"Rate limit hit for job {job_id}. Waiting {wait_time:.1f}s before retry {attempt + 1}/{self.max_retries}")
+                
+                except asyncio.TimeoutError:
+                    # A hung request is not retried: that would hold the slot for several deadlines
+                    return None, f"Enrichment timeout after {self.job_timeout}s"
+                
+                except json.JSONDecodeError as e:
+                    # JSON parsing errors are not retryable
+                    return None, f"Invalid JSON in LLM response: {str(e)}"
+                
+                except APIError as e:
+                    last_error = e
+                    if attempt >= self.max_retries - 1:
+                        return None, f"API error after {self.max_retries} attempts: {str(e)}"
+                    wait_time = (2 ** attempt) * 3  # 3s, 6s, 12s
+                    logger.warning(f"API error for job {job_id}: {str(e)}. Retrying in {wait_time}s...")
+            
+            # Back off outside the concurrency slot so other jobs can use it
+            await asyncio.sleep(wait_time)
+        
+        return None, f"Rate limit exceeded after {self.max_retries} attempts: {str(last_error)}"
+    
+    async def enrich_job(self, job_id: str, force: bool = False) -> Dict[str, Any]:
+        """Async counterpart of process_job_enrichment (each API request has its own deadline, see call_llm)."""
+        try:
+            description, result = await asyncio.to_thread(load_job_for_enrichment, job_id, force)
+            if description is None:
+                return result
+            
+            enrichment_data, error_message = await self.call_llm(job_id, description, use_cache=not force)
+            
+            if error_message:
+                logger.error(f"Failed to enrich job {job_id}: {error_message}")
+            
+            return await asyncio.to_thread(complete_job_enrichment, job_id, enrichment_data, error_message)
+        
+        except Exception as e:
+            logger.error(f"Failed to process enrichment for job {job_id}: {e}")
+            return {
+                "success": False,
+                "job_id": job_id,
+                "error": str(e)
+            }
+    
+    async def run(self, job_ids: List[str], force: bool = False) -> Dict[str, Any]:
+        """
+        Enrich all jobs concurrently.
+        
+        Returns:
+            Statistics dict with success/failure counts and details (same shape as batch_enrich_jobs)
+        """
+        logger.info(f"Starting concurrent enrichment for {len(job_ids)} jobs (concurrency {self.concurrency.limit})")
+        
+        results = await asyncio.gather(*(self.enrich_job(job_id, force) for job_id in job_ids))
+        
+        stats = {
+            "total": len(job_ids),
+            "successful": sum(1 for r in results if r["success"]),
+            "failed": sum(1 for r in results if not r["success"]),
+            "rate_limited": sum(
+                1 for r in results
+                if not r["success"] and r.get("error") and "rate limit" in r["error"].lower()
+            ),
+            "results": list(results)
+        }
+        
+        logger.success(f"Concurrent enrichment complete: {stats['successful']} successful, {stats['failed']} failed, {stats['rate_limited']} rate limited")
+        return stats
@@ -1,12 +1,14 @@
 """Job title classifier using OpenAI LLM to pre-screen data relevance."""
 
-from typing import Optional
-from datetime import datetime
+from typing import Optional, Dict, List, Iterable, Tuple
+from datetime import datetime, timedelta
 from loguru import logger
 from openai import OpenAI
 
 from config.settings import settings
-from database.client import db
+from database.client import db, chunked, IN_FILTER_CHUNK_SIZE
+from database.job_facets import job_facets
+from ingestion.llm_cache import llm_cache, normalize_input
 
 # OpenAI Responses API configuration
 TITLE_CLASSIFIER_PROMPT_ID = "pmpt_690724c8e4f48190a9d249a76325af9d056897bd40d5b2a3"
@@ -15,6 +17,15 @@ TITLE_CLASSIFIER_PROMPT_VERSION = "4"
 # Initialize OpenAI client
 client = OpenAI(api_key=settings.openai_api_key)
 
+# Persisted memo of normalized title -> classification (migration 068)
+TITLE_MEMO_TABLE = "job_title_classifications"
+
+# In-process copy of the memo, filled from the table and from new classifications
+_title_memo: Dict[str, str] = {}
+
+# Failed classifications are retried after this long, after the new jobs of a batch
+CLASSIFICATION_RETRY_HOURS = 6
+
 
 def classify_job_title(job_title: str) -> tuple[Optional[str], Optional[str]]:
     """
@@ -34,6 +45,12 @@ def classify_job_title(job_title: str) -> tuple[Optional[str], Optional[str]]:
     try:
         logger.debug(f"Classifying job title: {job_title}")
         
+        # Identical titles (ignoring case/whitespace) get the same classification
+        cached = llm_cache.get(TITLE_CLASSIFIER_PROMPT_ID, TITLE_CLASSIFIER_PROMPT_VERSION, job_title, casefold=True)
+        if cached:
+            logger.debug(f"Classification result (cached): {cached}")
+            return cached, None
+        
         # Call OpenAI Responses API
         response = client.responses.create(
             prompt={
@@ -72,6 +89,8 @@ def classify_job_title(job_title: str) -> tuple[Optional[str], Optional[str]]:
             # Return None if classification is invalid - don't auto-fill
             return None, error_msg
         
+        llm_cache.put(TITLE_CLASSIFIER_PROMPT_ID, TITLE_CLASSIFIER_PROMPT_VERSION, job_title, classification, casefold=True)
+        
         logger.debug(f"Classification result: {classification}")
         return classification, None
         
@@ -102,6 +121,8 @@ def save_classification_to_db(job_id: str, classification: str) -> bool:
             })\
             .eq("id", job_id)\
             .execute()
+        # The jobs page filters on title_classification (Data only)
+        job_facets.refresh_jobs([job_id])
         
         logger.debug(f"Saved classification '{classification}' for job {job_id}")
         return True
@@ -139,10 +160,140 @@ def save_classification_error_to_db(job_id: str, error_message: str) -> bool:
         return False
 
 
+def normalize_title(job_title: str) -> str:
+    """Memo key for a job title (whitespace collapsed, casefolded)."""
+    return normalize_input(job_title, casefold=True)
+
+
+def load_title_memo(normalized_titles: Iterable[str]) -> Dict[str, str]:
+    """
+    Known classifications for normalized titles.
+    
+    Checks the in-process memo first and fetches the rest from job_title_classifications.
+    Only classifications of the current prompt version count: bumping
+    TITLE_CLASSIFIER_PROMPT_VERSION sends every title to the LLM again.
+    """
+    known = {}
+    missing = []
+    for title in set(normalized_titles):
+        if title in _title_memo:
+            known[title] = _title_memo[title]
+        else:
+            missing.append(title)
+    
+    try:
+        for chunk in chunked(missing, IN_FILTER_CHUNK_SIZE):
+            result = db.client.table(TITLE_MEMO_TABLE)\
+                .select("normalized_title, classification")\
+                .in_("normalized_title", chunk)\
+                .eq("prompt_version", TITLE_CLASSIFIER_PROMPT_VERSION)\
+                .execute()
+            for row in result.data or []:
+                known[row["normalized_title"]] = row["classification"]
+                _title_memo[row["normalized_title"]] = row["classification"]
+    except Exception as e:
+        logger.warning(f"Title classification memo not available (run migration 068): {e}")
+    
+    return known
+
+
+def remember_classifications(classifications: Dict[str, str]):
+    """Store normalized title -> classification in the in-process and persisted memo."""
+    if not classifications:
+        return
+    
+    _title_memo.update(classifications)
+    
+    now = datetime.utcnow().isoformat()
+    try:
+        db.bulk_upsert(TITLE_MEMO_TABLE, [
+            {
+                "normalized_title": title,
+                "classification": classification,
+                "prompt_version": TITLE_CLASSIFIER_PROMPT_VERSION,
+                "classified_at": now
+            }
+            for title, classification in classifications.items()
+        ], on_conflict="normalized_title")
+    except Exception as e:
+        logger.warning(f"Failed to persist title classification memo: {e}")
+
+
+def classify_titles(titles: Iterable[str]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """
+    Classify many titles with one LLM call per distinct normalized title.
+    
+    Titles already in the memo are not sent to the LLM.
+    
+    Returns:
+        Dict of normalized title -> (classification, error_message)
+    """
+    # First original spelling per normalized title is sent to the LLM
+    distinct = {}
+    for title in titles:
+        distinct.setdefault(normalize_title(title), title)
+    
+    results = {key: (classification, None) for key, classification in load_title_memo(distinct).items()}
+    
+    new_classifications = {}
+    for key, title in distinct.items():
+        if key in results:
+            continue
+        classification, error_message = classify_job_title(title)
+        results[key] = (classification, error_message)
+        if classification:
+            new_classifications[key] = classification
+    
+    remember_classifications(new_classifications)
+    
+    if distinct:
+        logger.debug(f"Classified {len(distinct)} distinct titles ({len(new_classifications)} via LLM)")
+    return results
+
+
+def save_classifications_bulk(job_ids_by_classification: Dict[str, List[str]]) -> int:
+    """Write classifications with one UPDATE per classification per chunk of job ids."""
+    now = datetime.utcnow().isoformat()
+    saved = 0
+    
+    for classification, job_ids in job_ids_by_classification.items():
+        for chunk in chunked(job_ids, IN_FILTER_CHUNK_SIZE):
+            db.client.table("job_postings")\
+                .update({
+                    "title_classification": classification,
+                    "title_classification_at": now,
+                    "title_classification_error": None  # Clear any previous error
+                })\
+                .in_("id", chunk)\
+                .execute()
+            job_facets.refresh_jobs(chunk)
+            saved += len(chunk)
+    
+    return saved
+
+
+def save_classification_errors_bulk(job_ids_by_error: Dict[str, List[str]]):
+    """Write classification errors, grouped by error message."""
+    now = datetime.utcnow().isoformat()
+    
+    for error_message, job_ids in job_ids_by_error.items():
+        for chunk in chunked(job_ids, IN_FILTER_CHUNK_SIZE):
+            db.client.table("job_postings")\
+                .update({
+                    "title_classification_error": error_message,
+                    "title_classification_at": now
+                })\
+                .in_("id", chunk)\
+                .execute()
+
+
 def classify_and_save(job_id: str, job_title: str) -> Optional[str]:
     """
     Classify a job title and save the result to database.
     
+    Always asks the LLM (use classify_unclassified_jobs for memo-backed batches);
+    the result refreshes the title memo.
+    
     Args:
         job_id: UUID of the job posting
         job_title: The job title to classify
@@ -153,6 +304,8 @@ def classify_and_save(job_id: str, job_title: str) -> Optional[str]:
     classification, error_message = classify_job_title(job_title)
     
     if classification:
+        remember_classifications({normalize_title(job_title): classification})
+        
         # Classification succeeded - save it
         if save_classification_to_db(job_id, classification):
             return classification
@@ -164,10 +317,50 @@ def classify_and_save(job_id: str, job_title: str) -> Optional[str]:
     return None
 
 
+def get_pending_jobs(limit: int) -> List[Dict]:
+    """
+    Jobs to classify: never-attempted jobs first (oldest first), then failed ones due for a retry.
+    
+    Jobs without a title and recently failed jobs are left out, so they cannot
+    fill the batch and hold back new jobs.
+    """
+    result = db.client.table("job_postings")\
+        .select("id, title")\
+        .is_("title_classification", "null")\
+        .is_("title_classification_error", "null")\
+        .not_.is_("title", "null")\
+        .neq("title", "")\
+        .order("created_at")\
+        .limit(limit)\
+        .execute()
+    jobs = result.data or []
+    
+    if len(jobs) < limit:
+        retry_before = (datetime.utcnow() - timedelta(hours=CLASSIFICATION_RETRY_HOURS)).isoformat()
+        result = db.client.table("job_postings")\
+            .select("id, title")\
+            .is_("title_classification", "null")\
+            .not_.is_("title_classification_error", "null")\
+            .not_.is_("title", "null")\
+            .neq("title", "")\
+            .lt("title_classification_at", retry_before)\
+            .order("title_classification_at")\
+            .limit(limit - len(jobs))\
+            .execute()
+        jobs.extend(result.data or [])
+    
+    return jobs
+
+
 def classify_unclassified_jobs(limit: int = 100) -> int:
     """
     Classify all jobs that don't have a title classification yet.
     
+    This is the deferred classification step of ingestion: new jobs are stored
+    unclassified and picked up here. Titles are collapsed per normalized title,
+    so a batch full of "Data Engineer" jobs costs at most one LLM call (none if
+    the title is already in the memo).
+    
     Args:
         limit: Maximum number of jobs to classify in one batch
     
@@ -175,26 +368,27 @@ def classify_unclassified_jobs(limit: int = 100) -> int:
         Number of jobs classified
     """
     try:
-        # Get unclassified jobs
-        result = db.client.table("job_postings")\
-            .select("id, title")\
-            .is_("title_classification", "null")\
-            .limit(limit)\
-            .execute()
+        jobs = get_pending_jobs(limit)
         
-        if not result.data:
-            logger.info("No unclassified jobs found")
+        if not jobs:
+            logger.debug("No unclassified jobs found")
             return 0
         
-        logger.info(f"Classifying {len(result.data)} jobs...")
+        classifications = classify_titles(job["title"] for job in jobs)
         
-        classified_count = 0
-        for job in result.data:
-            classification = classify_and_save(job["id"], job["title"])
+        job_ids_by_classification = {}
+        job_ids_by_error = {}
+        for job in jobs:
+            classification, error_message = classifications[normalize_title(job["title"])]
             if classification:
-                classified_count += 1
+                job_ids_by_classification.setdefault(classification, []).append(job["id"])
+            elif error_message:
+                job_ids_by_error.setdefault(error_message, []).append(job["id"])
+        
+        classified_count = save_classifications_bulk(job_ids_by_classification)
+        save_classification_errors_bulk(job_ids_by_error)
         
-        logger.success(f"✅ Classified {classified_count}/{len(result.data)} jobs")
+        logger.success(f"✅ Classified {classified_count}/{len(jobs)} jobs ({len(classifications)} distinct titles)")
         return classified_count
         
     except Exception as e:
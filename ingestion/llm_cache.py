@@ -0,0 +1,213 @@
+"""
+Persistent cache for LLM responses.
+
+Output text is stored in a local SQLite file, keyed by a hash of
+(prompt id, prompt version, normalized input). Repeating a call with the same
+prompt version and input returns the stored output without an API call; bumping
+the prompt version naturally invalidates old entries.
+
+Entries older than llm_cache_max_age_days expire, and once the cache holds more
+than llm_cache_max_entries the least recently used entries are evicted.
+Only validated outputs should be stored, so failed or malformed responses are
+retried as before.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from loguru import logger
+
+from config.settings import settings
+
+# Run eviction every N writes instead of on every write
+EVICTION_INTERVAL = 100
+
+
+def normalize_input(input_text: str, casefold: bool = False) -> str:
+    """Collapse whitespace (and optionally case) so trivial variations share an entry."""
+    normalized = " ".join(str(input_text).split())
+    return normalized.casefold() if casefold else normalized
+
+
+def cache_key(prompt_id: str, prompt_version: str, input_text: str, casefold: bool = False) -> str:
+    """Content address of one LLM call."""
+    payload = "\x00".join([prompt_id, str(prompt_version), normalize_input(input_text, casefold)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed LLM response cache, safe to share between threads."""
+    
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 100_000,
+        max_age_days: float = 90,
+        enabled: bool = True
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_days * 86400
+        self.enabled = enabled
+        self.hits = Counter()    # Per prompt id
+        self.misses = Counter()  # Per prompt id
+        self._writes = 0
+        self._conn = None
+        self._lock = threading.Lock()
+    
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5, check_same_thread=False)
+            # WAL lets the web app, the scheduler and scripts share one file
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    prompt_id TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    output TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses(last_used_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+    
+    def get(self, prompt_id: str, prompt_version: str, input_text: str, casefold: bool = False) -> Optional[str]:
+        """
+        Look up a cached output.
+        
+        Returns:
+            The stored output text, or None on a miss (or when the cache is disabled/unavailable)
+        """
+        if not self.enabled:
+            return None
+        
+        key = cache_key(prompt_id, prompt_version, input_text, casefold)
+        now = time.time()
+        
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT output, created_at FROM llm_responses WHERE key = ?", (key,)
+                ).fetchone()
+                
+                if row and now - row[1] <= self.max_age_seconds:
+                    conn.execute("UPDATE llm_responses SET last_used_at = ? WHERE key = ?", (now, key))
+                    conn.commit()
+                    self.hits[prompt_id] += 1
+                    return row[0]
+                
+                if row:
+                    conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                    conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"LLM cache lookup failed, calling API: {e}")
+        
+        self.misses[prompt_id] += 1
+        return None
+    
+    def put(self, prompt_id: str, prompt_version: str, input_text: str, output: str, casefold: bool = False):
+        """Store a validated output."""
+        if not self.enabled:
+            return
+        
+        key = cache_key(prompt_id, prompt_version, input_text, casefold)
+        now = time.time()
+        
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses "
+                    "(key, prompt_id, prompt_version, output, created_at, last_used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, prompt_id, str(prompt_version), output, now, now)
+                )
+                conn.commit()
+                
+                self._writes += 1
+                if self._writes % EVICTION_INTERVAL == 0:
+                    self._evict(conn, now)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Failed to store LLM response in cache: {e}")
+    
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drop expired entries, then the least recently used ones above max_entries."""
+        expired = conn.execute(
+            "DELETE FROM llm_responses WHERE created_at < ?", (now - self.max_age_seconds,)
+        ).rowcount
+        overflow = conn.execute(
+            "DELETE FROM llm_responses WHERE key IN ("
+            "SELECT key FROM llm_responses ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        ).rowcount
+        conn.commit()
+        
+        if expired or overflow:
+            logger.debug(f"LLM cache eviction: {expired} expired, {overflow} over size limit")
+    
+    def evict(self):
+        """Run eviction now."""
+        if not self.enabled:
+            return
+        try:
+            with self._lock:
+                self._evict(self._connection(), time.time())
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"LLM cache eviction failed: {e}")
+    
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute("DELETE FROM llm_responses")
+                conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Failed to clear LLM cache: {e}")
+        self.hits.clear()
+        self.misses.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of this process, overall and per prompt id."""
+        entries = None
+        if self.enabled:
+            try:
+                with self._lock:
+                    entries = self._connection().execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Failed to count LLM cache entries: {e}")
+        
+        hits = sum(self.hits.values())
+        misses = sum(self.misses.values())
+        return {
+            "enabled": self.enabled,
+            "path": str(self.path),
+            "entries": entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+            "by_prompt": {
+                prompt_id: {"hits": self.hits[prompt_id], "misses": self.misses[prompt_id]}
+                for prompt_id in sorted(set(self.hits) | set(self.misses))
+            }
+        }
+
+
+# Shared cache instance for all ingestion LLM callers
+llm_cache = LLMResponseCache(
+    path=settings.llm_cache_path,
+    max_entries=settings.llm_cache_max_entries,
+    max_age_days=settings.llm_cache_max_age_days,
+    enabled=settings.llm_cache_enabled
+)
@@ -1,5 +1,6 @@
 """LLM enrichment service using OpenAI Responses API for job posting analysis."""
 
+import asyncio
 import json
 import time
 from typing import Dict, Any, Optional, List
@@ -9,6 +10,8 @@ from openai import OpenAI, RateLimitError, APIError
 
 from config.settings import settings
 from database.client import db
+from database.job_facets import job_facets
+from ingestion.llm_cache import llm_cache
 
 # OpenAI Responses API configuration
 PROMPT_TEMPLATE_ID = "pmpt_68ee0e7890788197b06ced94ab8af4d50759bbe1e2c42f88"
@@ -18,7 +21,55 @@ PROMPT_VERSION = "18"  # Latest version with all v17 features
 client = OpenAI(api_key=settings.openai_api_key)
 
 
-def enrich_job_with_llm(job_id: str, job_description: str, max_retries: int = 3) -> tuple[Optional[Dict[str, Any]], Optional[str]]:
+def extract_enrichment_data(response) -> Optional[Dict[str, Any]]:
+    """
+    Extract the structured JSON output from a Responses API response.
+    
+    Raises:
+        json.JSONDecodeError: If the output text is not valid JSON
+    """
+    if hasattr(response, 'output') and response.output:
+        for item in response.output:
+            if hasattr(item, 'type') and item.type == 'message' and hasattr(item, 'content'):
+                for content in item.content:
+                    if hasattr(content, 'type') and content.type == 'output_text':
+                        # Parse JSON from text output
+                        return json.loads(content.text)
+    return None
+
+
+def is_complete_enrichment(enrichment_data: Dict[str, Any]) -> bool:
+    """
+    Whether the enrichment has a data role type.
+    
+    Jobs saved without one (empty type_datarol) are re-enriched by
+    AutoEnrichService.retry_failed_enrichments.
+    """
+    return bool(enrichment_data.get("data_role_type"))
+
+
+def get_cached_enrichment(job_description: str) -> Optional[Dict[str, Any]]:
+    """Complete enrichment stored in the LLM response cache for this description and prompt version."""
+    cached = llm_cache.get(PROMPT_TEMPLATE_ID, PROMPT_VERSION, job_description)
+    if not cached:
+        return None
+    enrichment_data = json.loads(cached)
+    return enrichment_data if is_complete_enrichment(enrichment_data) else None
+
+
+def cache_enrichment(job_description: str, enrichment_data: Dict[str, Any]):
+    """Store a complete enrichment in the LLM response cache (incomplete ones are asked again)."""
+    if not is_complete_enrichment(enrichment_data):
+        return
+    llm_cache.put(PROMPT_TEMPLATE_ID, PROMPT_VERSION, job_description, json.dumps(enrichment_data, ensure_ascii=False))
+
+
+def enrich_job_with_llm(
+    job_id: str,
+    job_description: str,
+    max_retries: int = 3,
+    use_cache: bool = True
+) -> tuple[Optional[Dict[str, Any]], Optional[str]]:
     """
     Enrich a single job posting using OpenAI Responses API with retry logic.
     
@@ -26,12 +77,18 @@ def enrich_job_with_llm(job_id: str, job_description: str, max_retries: int = 3)
         job_id: UUID of the job posting
         job_description: Full text description of the job
         max_retries: Maximum number of retry attempts for rate limits
+        use_cache: If False, ask the model even when the LLM cache has an answer
     
     Returns:
         Tuple of (enrichment_data, error_message):
         - enrichment_data: Parsed enrichment data or None if failed
         - error_message: Error message if failed, None if successful
     """
+    cached = get_cached_enrichment(job_description) if use_cache else None
+    if cached:
+        logger.info(f"Using cached enrichment for job {job_id} (same description and prompt version)")
+        return cached, None
+    
     last_error = None
     
     for attempt in range(max_retries):
@@ -51,17 +108,7 @@ def enrich_job_with_llm(job_id: str, job_description: str, max_retries: int = 3)
             )
             
             # Extract structured output from response
-            enrichment_data = None
-            if hasattr(response, 'output') and response.output:
-                for item in response.output:
-                    if hasattr(item, 'type') and item.type == 'message' and hasattr(item, 'content'):
-                        for content in item.content:
-                            if hasattr(content, 'type') and content.type == 'output_text':
-                                # Parse JSON from text output
-                                enrichment_data = json.loads(content.text)
-                                break
-                    if enrichment_data:
-                        break
+            enrichment_data = extract_enrichment_data(response)
             
             if not enrichment_data:
                 error_msg = "Could not extract structured output from API response"
@@ -71,6 +118,7 @@ def enrich_job_with_llm(job_id: str, job_description: str, max_retries: int = 3)
             logger.success(f"Successfully enriched job {job_id}")
             logger.debug(f"Enrichment data: {enrichment_data}")
             
+            cache_enrichment(job_description, enrichment_data)
             return enrichment_data, None
             
         except RateLimitError as e:
@@ -283,89 +331,124 @@ def save_enrichment_to_db(job_id: str, enrichment_data: Dict[str, Any]) -> bool:
         return False
 
 
-def process_job_enrichment(job_id: str, force: bool = False) -> Dict[str, Any]:
+def load_job_for_enrichment(job_id: str, force: bool = False) -> tuple[Optional[str], Optional[Dict[str, Any]]]:
     """
-    Complete enrichment workflow for a single job.
+    Load the description of a job that is about to be enriched.
     
     Args:
         job_id: UUID of the job posting
         force: If True, re-enrich even if already enriched
     
     Returns:
-        Result dict with success status and message
+        Tuple of (description, result):
+        - description: Job description to send to the LLM, None if there is nothing to do
+        - result: Final result dict (skipped / no description) when description is None
     """
-    try:
-        # Check if already enriched (unless force=True)
-        if not force:
-            existing = db.client.table("llm_enrichment")\
-                .select("enrichment_completed_at")\
-                .eq("job_posting_id", job_id)\
-                .maybe_single()\
-                .execute()
-            
-            if existing.data and existing.data.get("enrichment_completed_at"):
-                logger.debug(f"Job {job_id} already enriched, skipping (use force=True to re-enrich)")
-                return {
-                    "success": True,  # Changed to True so caller knows to skip
-                    "job_id": job_id,
-                    "skipped": True,
-                    "message": "Already enriched"
-                }
-        else:
-            logger.info(f"Force re-enrichment enabled for job {job_id}")
-        
-        # Get job description
-        result = db.client.table("job_descriptions")\
-            .select("full_description_text")\
+    # Check if already enriched (unless force=True)
+    if not force:
+        existing = db.client.table("llm_enrichment")\
+            .select("enrichment_completed_at")\
             .eq("job_posting_id", job_id)\
-            .single()\
+            .maybe_single()\
             .execute()
         
-        if not result.data or not result.data.get("full_description_text"):
-            return {
-                "success": False,
+        if existing.data and existing.data.get("enrichment_completed_at"):
+            logger.debug(f"Job {job_id} already enriched, skipping (use force=True to re-enrich)")
+            return None, {
+                "success": True,  # Changed to True so caller knows to skip
                 "job_id": job_id,
-                "error": "No description found"
+                "skipped": True,
+                "message": "Already enriched"
             }
+    else:
+        logger.info(f"Force re-enrichment enabled for job {job_id}")
+    
+    # Get job description
+    result = db.client.table("job_descriptions")\
+        .select("full_description_text")\
+        .eq("job_posting_id", job_id)\
+        .single()\
+        .execute()
+    
+    if not result.data or not result.data.get("full_description_text"):
+        return None, {
+            "success": False,
+            "job_id": job_id,
+            "error": "No description found"
+        }
+    
+    return result.data["full_description_text"], None
+
+
+def complete_job_enrichment(
+    job_id: str,
+    enrichment_data: Optional[Dict[str, Any]],
+    error_message: Optional[str]
+) -> Dict[str, Any]:
+    """
+    Save the outcome of an LLM call (enrichment or error) and process the tech stack.
+    
+    Returns:
+        Result dict with success status and message
+    """
+    if not enrichment_data:
+        # Save error to database
+        save_enrichment_error_to_db(job_id, error_message or "LLM enrichment failed")
+        return {
+            "success": False,
+            "job_id": job_id,
+            "error": error_message or "LLM enrichment failed"
+        }
+    
+    # Save to database
+    success = save_enrichment_to_db(job_id, enrichment_data)
+    
+    if success:
+        job_facets.refresh_jobs([job_id])
         
-        description = result.data["full_description_text"]
-        
-        # Enrich with LLM
-        enrichment_data, error_message = enrich_job_with_llm(job_id, description)
+        # Process tech stack (programming languages and ecosystems)
+        try:
+            from ingestion.tech_stack_processor import process_tech_stack_for_job
+            from uuid import UUID
+            process_tech_stack_for_job(UUID(job_id), enrichment_data)
+        except Exception as e:
+            logger.warning(f"Failed to process tech stack for job {job_id}: {e}")
+            # Don't fail the entire enrichment if tech stack processing fails
         
-        if not enrichment_data:
-            # Save error to database
-            save_enrichment_error_to_db(job_id, error_message or "LLM enrichment failed")
-            return {
-                "success": False,
-                "job_id": job_id,
-                "error": error_message or "LLM enrichment failed"
-            }
+        return {
+            "success": True,
+            "job_id": job_id,
+            "data": enrichment_data
+        }
+    else:
+        return {
+            "success": False,
+            "job_id": job_id,
+            "error": "Failed to save to database"
+        }
+
+
+def process_job_enrichment(job_id: str, force: bool = False) -> Dict[str, Any]:
+    """
+    Complete enrichment workflow for a single job.
+    
+    Args:
+        job_id: UUID of the job posting
+        force: If True, re-enrich even if already enriched
+    
+    Returns:
+        Result dict with success status and message
+    """
+    try:
+        description, result = load_job_for_enrichment(job_id, force)
+        if description is None:
+            return result
         
-        # Save to database
-        success = save_enrichment_to_db(job_id, enrichment_data)
+        # Enrich with LLM
+        # A forced re-enrichment asks the model again instead of reusing its cached answer
+        enrichment_data, error_message = enrich_job_with_llm(job_id, description, use_cache=not force)
         
-        if success:
-            # Process tech stack (programming languages and ecosystems)
-            try:
-                from ingestion.tech_stack_processor import process_tech_stack_for_job
-                from uuid import UUID
-                process_tech_stack_for_job(UUID(job_id), enrichment_data)
-            except Exception as e:
-                logger.warning(f"Failed to process tech stack for job {job_id}: {e}")
-                # Don't fail the entire enrichment if tech stack processing fails
-            
-            return {
-                "success": True,
-                "job_id": job_id,
-                "data": enrichment_data
-            }
-        else:
-            return {
-                "success": False,
-                "job_id": job_id,
-                "error": "Failed to save to database"
-            }
+        return complete_job_enrichment(job_id, enrichment_data, error_message)
         
     except Exception as e:
         logger.error(f"Failed to process enrichment for job {job_id}: {e}")
@@ -436,51 +519,30 @@ def get_unenriched_jobs(limit: int = 100, include_retries: bool = True) -> List[
         return []
 
 
-def batch_enrich_jobs(job_ids: List[str], batch_size: int = 50, delay_between_jobs: float = 1.0) -> Dict[str, Any]:
+def batch_enrich_jobs(job_ids: List[str], batch_size: int = 50, concurrency: Optional[int] = None) -> Dict[str, Any]:
     """
-    Enrich multiple jobs in batch with rate limiting.
+    Enrich multiple jobs concurrently with rate limiting.
+    
+    Runs the jobs on an EnrichmentPool (async OpenAI client, adaptive concurrency,
+    rate limits read from the API response headers). Call from synchronous code only.
     
     Args:
         job_ids: List of job UUIDs to enrich
         batch_size: Maximum number of jobs to process (default: 50)
-        delay_between_jobs: Delay in seconds between each job to avoid rate limits (default: 1.0s)
+        concurrency: Maximum concurrent LLM calls (default: settings.llm_enrichment_concurrency)
     
     Returns:
         Statistics dict with success/failure counts and details
     """
+    from ingestion.enrichment_pool import EnrichmentPool
+    
     # Limit batch size
     if len(job_ids) > batch_size:
         logger.warning(f"Batch size limited from {len(job_ids)} to {batch_size} jobs")
         job_ids = job_ids[:batch_size]
     
-    stats = {
-        "total": len(job_ids),
-        "successful": 0,
-        "failed": 0,
-        "rate_limited": 0,
-        "results": []
-    }
-    
-    logger.info(f"Starting batch enrichment for {len(job_ids)} jobs (max batch size: {batch_size})")
-    
-    for i, job_id in enumerate(job_ids, 1):
-        logger.info(f"Processing job {i}/{len(job_ids)}: {job_id}")
-        
-        result = process_job_enrichment(job_id)
-        stats["results"].append(result)
-        
-        if result["success"]:
-            stats["successful"] += 1
-        else:
-            stats["failed"] += 1
-            # Check if it's a rate limit error
-            if result.get("error") and "rate limit" in result["error"].lower():
-                stats["rate_limited"] += 1
-        
-        # Add delay between jobs to avoid rate limits (except for last job)
-        if i < len(job_ids):
-            logger.debug(f"Waiting {delay_between_jobs}s before next job...")
-            time.sleep(delay_between_jobs)
+    async def run_pool():
+        # The pool's locks bind to the running loop, so create it inside asyncio.run
+        return await EnrichmentPool(concurrency=concurrency).run(job_ids)
     
-    logger.success(f"Batch enrichment complete: {stats['successful']} successful, {stats['failed']} failed, {stats['rate_limited']} rate limited")
-    return stats
\ No newline at end of file
+    return asyncio.run(run_pool())
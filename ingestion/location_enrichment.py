@@ -8,6 +8,7 @@ from openai import OpenAI
 
 from config.settings import settings
 from database.client import db
+from ingestion.llm_cache import llm_cache
 
 
 # Initialize OpenAI client with extended timeout
@@ -45,18 +46,24 @@ def enrich_location(location_id: str, city: str, country_code: str, region: Opti
         # Call OpenAI with the prompt
         logger.debug(f"Calling OpenAI API with input: {location_info}")
         
-        response = client.responses.create(
-            prompt={
-                "id": LOCATION_ENRICHMENT_PROMPT_ID,
-                "version": LOCATION_ENRICHMENT_PROMPT_VERSION
-            },
-            input=location_info
-        )
-        
-        logger.debug(f"OpenAI response: {response}")
+        # Identical input for the same prompt version returns the stored result
+        cached = llm_cache.get(LOCATION_ENRICHMENT_PROMPT_ID, LOCATION_ENRICHMENT_PROMPT_VERSION, location_info)
+        if cached:
+            logger.debug("Using cached LLM response")
+            response = None
+        else:
+            response = client.responses.create(
+                prompt={
+                    "id": LOCATION_ENRICHMENT_PROMPT_ID,
+                    "version": LOCATION_ENRICHMENT_PROMPT_VERSION
+                },
+                input=location_info
+            )
+            
+            logger.debug(f"OpenAI response: {response}")
         
-        # Extract structured output from response
-        enrichment_data = None
+        # Extract structured output from response (or cache)
+        enrichment_data = json.loads(cached) if cached else None
         if hasattr(response, 'output') and response.output:
             for item in response.output:
                 if hasattr(item, 'type') and item.type == 'message' and hasattr(item, 'content'):
@@ -78,6 +85,9 @@ def enrich_location(location_id: str, city: str, country_code: str, region: Opti
         if not isinstance(enrichment_data, dict):
             raise ValueError(f"LLM response is not a valid dictionary, got: {type(enrichment_data)}")
         
+        if not cached:
+            llm_cache.put(LOCATION_ENRICHMENT_PROMPT_ID, LOCATION_ENRICHMENT_PROMPT_VERSION, location_info, json.dumps(enrichment_data, ensure_ascii=False))
+        
         # Save enrichment data to database
         success = save_enrichment_to_db(location_id, enrichment_data)
         
@@ -1,6 +1,7 @@
 """Main ingestion pipeline for processing LinkedIn and Indeed job data."""
 
-from typing import Dict, Any, List, Optional
+import re
+from typing import Dict, Any, List, Optional, Iterable, Union
 from uuid import UUID
 from datetime import datetime
 from loguru import logger
@@ -18,7 +19,6 @@ from ingestion.deduplicator_v2 import (
     update_source_last_seen,
     create_dedup_key
 )
-from ingestion.job_title_classifier import classify_and_save
 
 
 class ProcessingResult:
@@ -72,7 +72,124 @@ class BatchResult:
         return [{"error": r.error} for r in self.results if r.status == 'error']
 
 
-def process_job_posting(raw_job: Dict[str, Any], scrape_run_id: UUID, source: str = "linkedin") -> ProcessingResult:
+def parse_raw_job(raw_job: Dict[str, Any], source: str):
+    """
+    Parse and validate a raw job with the Pydantic model for its source.
+    
+    Returns:
+        (job, None) on success, (None, ProcessingResult) with status 'error' on validation failure
+    """
+    # Extract job_id_field first for error logging
+    if source == "linkedin":
+        job_id_field = raw_job.get('job_posting_id', 'unknown')
+    elif source == "indeed":
+        # Bright Data uses 'jobid' (not 'job_id')
+        job_id_field = raw_job.get('jobid', 'unknown')
+    else:
+        job_id_field = 'unknown'
+    
+    try:
+        if source == "linkedin":
+            job = LinkedInJobPosting(**raw_job)
+        elif source == "indeed":
+            # Log raw data for debugging
+            logger.debug(f"Raw Indeed job keys: {list(raw_job.keys())}")
+            job = IndeedJobPosting(**raw_job)
+        else:
+            raise ValueError(f"Unknown source: {source}")
+    except ValidationError as e:
+        error_msg = f"ValidationError for {source} job {job_id_field}: {str(e)}"
+        logger.error(error_msg)
+        # Log raw data on validation failure for debugging
+        import json
+        logger.error(f"Raw job data that failed validation: {json.dumps(raw_job, indent=2)}")
+        # Return simplified error for metadata (first error only)
+        first_error = e.errors()[0] if e.errors() else {}
+        field = first_error.get('loc', ['unknown'])[0]
+        msg = first_error.get('msg', str(e))
+        return None, ProcessingResult(status='error', error=f"Field '{field}': {msg}")
+    
+    return job, None
+
+
+def extract_company_data(job, source: str) -> Dict[str, Any]:
+    """Get normalized company data from a parsed job."""
+    if source == "linkedin":
+        company_model = job.get_company()
+        return normalize_company(company_model.model_dump())
+    else:  # indeed
+        return normalize_company(job.get_company_dict())
+
+
+def extract_location_string(job, source: str) -> str:
+    """Get the raw location string from a parsed job."""
+    if source == "linkedin":
+        location_model = job.get_location()
+        return location_model.full_location_string
+    else:  # indeed
+        return job.get_location_string()
+
+
+class VagueLocationMatcher:
+    """Vague location patterns compiled into one anchored prefix regex."""
+    
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = tuple(patterns)
+        # Longest first so the alternation reports the most specific pattern
+        alternatives = sorted({re.escape(p) for p in self.patterns if p}, key=len, reverse=True)
+        self._regex = re.compile("(?:" + "|".join(alternatives) + ")") if alternatives else None
+    
+    def match(self, location_string: str) -> Optional[str]:
+        """Return the pattern the location starts with, or None."""
+        if self._regex is None or not location_string:
+            return None
+        found = self._regex.match(location_string.strip())
+        return found.group(0) if found else None
+    
+    def __contains__(self, location_string: str) -> bool:
+        return self.match(location_string) is not None
+
+
+_vague_location_matcher: Optional[VagueLocationMatcher] = None
+
+
+def get_vague_location_matcher() -> VagueLocationMatcher:
+    """
+    Matcher for the active vague location patterns.
+    
+    The patterns come from the master-data cache (one config query per TTL); the
+    regex is only recompiled when they actually change.
+    """
+    global _vague_location_matcher
+    patterns = tuple(db.get_vague_location_patterns())
+    if _vague_location_matcher is None or _vague_location_matcher.patterns != patterns:
+        _vague_location_matcher = VagueLocationMatcher(patterns)
+        logger.debug(f"Compiled {len(patterns)} vague location patterns")
+    return _vague_location_matcher
+
+
+def is_vague_location(location_string: str, vague_patterns: Union[VagueLocationMatcher, List[str]]) -> bool:
+    """Check if a location is vague (e.g., "Flemish Region", "Belgium")."""
+    if not isinstance(vague_patterns, VagueLocationMatcher):
+        vague_patterns = VagueLocationMatcher(vague_patterns)
+    return location_string in vague_patterns
+
+
+def is_usable_company_location(company_location: Optional[str]) -> bool:
+    """Check if a company_master_data.locatie_belgie value can be used as override."""
+    return bool(
+        company_location
+        and company_location.strip()
+        and company_location.lower() not in ["niet gevonden", "unknown", "n/a"]
+    )
+
+
+def process_job_posting(
+    raw_job: Dict[str, Any],
+    scrape_run_id: UUID,
+    source: str = "linkedin",
+    vague_matcher: Optional[VagueLocationMatcher] = None
+) -> ProcessingResult:
     """
     Process a single job posting through the ingestion pipeline.
     
@@ -89,59 +206,30 @@ def process_job_posting(raw_job: Dict[str, Any], scrape_run_id: UUID, source: st
         raw_job: Raw job data from Bright Data API
         scrape_run_id: UUID of current scrape run
         source: Job source - "linkedin" or "indeed"
+        vague_matcher: Compiled vague location patterns (loaded once per batch by callers)
     
     Returns:
         ProcessingResult with status and job_id
     """
     try:
         # Step 1: Parse and validate with Pydantic based on source
-        # Extract job_id_field first for error logging
-        if source == "linkedin":
-            job_id_field = raw_job.get('job_posting_id', 'unknown')
-        elif source == "indeed":
-            # Bright Data uses 'jobid' (not 'job_id')
-            job_id_field = raw_job.get('jobid', 'unknown')
-        else:
-            job_id_field = 'unknown'
-        
-        try:
-            if source == "linkedin":
-                job = LinkedInJobPosting(**raw_job)
-            elif source == "indeed":
-                # Log raw data for debugging
-                logger.debug(f"Raw Indeed job keys: {list(raw_job.keys())}")
-                job = IndeedJobPosting(**raw_job)
-            else:
-                raise ValueError(f"Unknown source: {source}")
-        except ValidationError as e:
-            error_msg = f"ValidationError for {source} job {job_id_field}: {str(e)}"
-            logger.error(error_msg)
-            # Log raw data on validation failure for debugging
-            import json
-            logger.error(f"Raw job data that failed validation: {json.dumps(raw_job, indent=2)}")
-            # Return simplified error for metadata (first error only)
-            first_error = e.errors()[0] if e.errors() else {}
-            field = first_error.get('loc', ['unknown'])[0]
-            msg = first_error.get('msg', str(e))
-            return ProcessingResult(status='error', error=f"Field '{field}': {msg}")
+        job, error_result = parse_raw_job(raw_job, source)
+        if error_result:
+            return error_result
         
         # Step 2: Process company
-        if source == "linkedin":
-            company_model = job.get_company()
-            company_data = normalize_company(company_model.model_dump())
-        else:  # indeed
-            company_data = normalize_company(job.get_company_dict())
+        company_data = extract_company_data(job, source)
         
         if company_data.get("linkedin_company_id"):
             # LinkedIn job: Check by LinkedIn ID
-            existing_company = db.get_company_by_linkedin_id(company_data["linkedin_company_id"])
+            existing_company = db.get_cached_company_by_linkedin_id(company_data["linkedin_company_id"])
             if existing_company:
                 company_id = UUID(existing_company["id"])
             else:
                 company_id = db.insert_company(company_data)
         else:
             # Indeed job (no LinkedIn ID): Check by name to avoid duplicates
-            existing_company = db.get_company_by_name(company_data["name"])
+            existing_company = db.get_cached_company_by_name(company_data["name"])
             if existing_company:
                 company_id = UUID(existing_company["id"])
                 logger.debug(f"Reusing existing company: {company_data['name']}")
@@ -150,15 +238,10 @@ def process_job_posting(raw_job: Dict[str, Any], scrape_run_id: UUID, source: st
                 logger.debug(f"Created new company: {company_data['name']}")
         
         # Step 3: Process location
-        if source == "linkedin":
-            location_model = job.get_location()
-            location_string = location_model.full_location_string
-        else:  # indeed
-            location_string = job.get_location_string()
-        
+        location_string = extract_location_string(job, source)
         location_data = normalize_location(location_string)
         
-        existing_location = db.get_location_by_string(location_data["full_location_string"])
+        existing_location = db.get_cached_location_by_string(location_data["full_location_string"])
         if existing_location:
             location_id = UUID(existing_location["id"])
         else:
@@ -169,31 +252,24 @@ def process_job_posting(raw_job: Dict[str, Any], scrape_run_id: UUID, source: st
         # create/get location from company master data
         location_id_override = None
         
-        # Get vague location patterns from database config
-        vague_patterns = db.get_vague_location_patterns()
-        
-        # Check if location is vague
-        is_vague = any(location_string.strip().startswith(pattern) for pattern in vague_patterns)
+        # Vague location patterns from database config, compiled once
+        if vague_matcher is None:
+            vague_matcher = get_vague_location_matcher()
         
-        if is_vague:
+        if location_string in vague_matcher:
             # Location is vague - try to use company's locatie_belgie
             try:
-                company_master = db.client.table("company_master_data")\
-                    .select("locatie_belgie")\
-                    .eq("company_id", str(company_id))\
-                    .maybe_single()\
-                    .execute()
+                company_location = db.get_cached_company_location(str(company_id))
                 
-                if company_master.data and company_master.data.get("locatie_belgie"):
-                    company_location = company_master.data["locatie_belgie"]
+                if company_location:
                     # Check if location is valid (not empty, not "niet gevonden")
-                    if company_location and company_location.strip() and company_location.lower() not in ["niet gevonden", "unknown", "n/a"]:
+                    if is_usable_company_location(company_location):
                         # Create location string from company location
                         override_location_string = f"{company_location}, Belgium"
                         override_location_data = normalize_location(override_location_string)
                         
                         # Check if this location already exists
-                        existing_override = db.get_location_by_string(override_location_data["full_location_string"])
+                        existing_override = db.get_cached_location_by_string(override_location_data["full_location_string"])
                         if existing_override:
                             location_id_override = UUID(existing_override["id"])
                         else:
@@ -285,14 +361,8 @@ def process_job_posting(raw_job: Dict[str, Any], scrape_run_id: UUID, source: st
         # Step 7: Record in scrape history
         db.insert_scrape_history(job_id, scrape_run_id)
         
-        # Step 8: Classify job title (async, non-blocking)
-        try:
-            classification = classify_and_save(str(job_id), job.job_title)
-            if classification:
-                logger.debug(f"Job title classified as: {classification}")
-        except Exception as e:
-            # Don't fail the entire job processing if classification fails
-            logger.warning(f"Failed to classify job title for {job_id}: {e}")
+        # Title classification is deferred: unclassified jobs are picked up by
+        # job_title_classifier.classify_unclassified_jobs (auto-enrich service)
         
         return ProcessingResult(status=status, job_id=job_id)
         
@@ -301,7 +371,12 @@ def process_job_posting(raw_job: Dict[str, Any], scrape_run_id: UUID, source: st
         return ProcessingResult(status='error', error=str(e))
 
 
-async def process_jobs_batch(raw_jobs: List[Dict[str, Any]], scrape_run_id: UUID, source: str = "linkedin") -> BatchResult:
+async def process_jobs_batch(
+    raw_jobs: List[Dict[str, Any]],
+    scrape_run_id: UUID,
+    source: str = "linkedin",
+    bulk: bool = True
+) -> BatchResult:
     """
     Process multiple jobs in batch with error handling.
     
@@ -309,19 +384,30 @@ async def process_jobs_batch(raw_jobs: List[Dict[str, Any]], scrape_run_id: UUID
         raw_jobs: List of raw job data from API
         scrape_run_id: UUID of current scrape run
         source: Job source - "linkedin" or "indeed"
+        bulk: Use set-based lookups and multi-row writes (see ingestion.bulk_processor).
+              Set to False to process jobs one by one with process_job_posting.
     
     Returns:
         BatchResult with counts and details
     """
     logger.info(f"Processing batch of {len(raw_jobs)} {source} jobs")
     
+    if bulk:
+        # Import here to avoid circular dependency
+        from ingestion.bulk_processor import process_jobs_bulk
+        
+        result = process_jobs_bulk(raw_jobs, scrape_run_id, source=source)
+        logger.success(f"Batch processing complete: {result.summary()}")
+        return result
+    
     result = BatchResult()
+    vague_matcher = get_vague_location_matcher()
     
     for i, raw_job in enumerate(raw_jobs, 1):
         if i % 10 == 0:
             logger.info(f"Processed {i}/{len(raw_jobs)} jobs")
         
-        job_result = process_job_posting(raw_job, scrape_run_id, source=source)
+        job_result = process_job_posting(raw_job, scrape_run_id, source=source, vague_matcher=vague_matcher)
         result.add(job_result)
     
     logger.success(f"Batch processing complete: {result.summary()}")
@@ -8,6 +8,7 @@ from loguru import logger
 from openai import OpenAI
 
 from config.settings import settings
+from ingestion.llm_cache import llm_cache
 
 # Initialize OpenAI client
 client = OpenAI(api_key=settings.openai_api_key)
@@ -32,6 +33,12 @@ def score_relevance(name: str) -> tuple[Optional[int], Optional[str]]:
     try:
         logger.debug(f"Scoring relevance for: {name}")
         
+        # Same tech name (ignoring case/whitespace) gets the same score
+        cached = llm_cache.get(RELEVANCE_PROMPT_ID, RELEVANCE_PROMPT_VERSION, name, casefold=True)
+        if cached:
+            logger.debug(f"Relevance score for '{name}' (cached): {cached}")
+            return int(cached), None
+        
         # Call OpenAI Responses API
         response = client.responses.create(
             prompt={
@@ -73,6 +80,8 @@ def score_relevance(name: str) -> tuple[Optional[int], Optional[str]]:
                 logger.warning(f"{error_msg} for: {name}")
                 return None, error_msg
             
+            llm_cache.put(RELEVANCE_PROMPT_ID, RELEVANCE_PROMPT_VERSION, name, str(score), casefold=True)
+            
             logger.debug(f"Relevance score for '{name}': {score}")
             return score, None
             
@@ -1,10 +1,11 @@
 """Process and normalize tech stack data from LLM enrichment."""
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Iterable, Callable, Optional
 from uuid import UUID
 from loguru import logger
 
 from database.client import db
+from utils.response_cache import response_cache, TAG_TECH_STACK
 
 
 def process_tech_stack_for_job(job_id: UUID, enrichment_data: Dict[str, Any]) -> None:
@@ -21,31 +22,11 @@ def process_tech_stack_for_job(job_id: UUID, enrichment_data: Dict[str, Any]) ->
         enrichment_data: Enrichment data containing must_have/nice_to_have lists
     """
     try:
-        # Extract tech stack from enrichment data
-        must_have_languages = enrichment_data.get("must_have_languages", [])
-        nice_to_have_languages = enrichment_data.get("nice_to_have_languages", [])
-        must_have_ecosystems = enrichment_data.get("must_have_ecosystems", [])
-        nice_to_have_ecosystems = enrichment_data.get("nice_to_have_ecosystems", [])
-        
         logger.debug(f"Processing tech stack for job {job_id}")
-        logger.debug(f"Languages: {must_have_languages + nice_to_have_languages}")
-        logger.debug(f"Ecosystems: {must_have_ecosystems + nice_to_have_ecosystems}")
-        
-        # Process programming languages
-        for lang in must_have_languages:
-            _process_programming_language(job_id, lang, "must_have")
-        
-        for lang in nice_to_have_languages:
-            _process_programming_language(job_id, lang, "nice_to_have")
         
-        # Process ecosystems
-        for eco in must_have_ecosystems:
-            _process_ecosystem(job_id, eco, "must_have")
+        counts = process_tech_stack_for_jobs({job_id: enrichment_data})
         
-        for eco in nice_to_have_ecosystems:
-            _process_ecosystem(job_id, eco, "nice_to_have")
-        
-        logger.success(f"Processed tech stack for job {job_id}")
+        logger.success(f"Processed tech stack for job {job_id} ({counts['languages']} languages, {counts['ecosystems']} ecosystems)")
         
     except Exception as e:
         logger.error(f"Failed to process tech stack for job {job_id}: {e}")
@@ -53,96 +34,125 @@ def process_tech_stack_for_job(job_id: UUID, enrichment_data: Dict[str, Any]) ->
         traceback.print_exc()
 
 
-def _process_programming_language(job_id: UUID, language_name: str, requirement_level: str) -> None:
+def process_tech_stack_for_jobs(enrichments: Dict[UUID, Dict[str, Any]]) -> Dict[str, int]:
     """
-    Process a single programming language: upsert to masterdata and assign to job.
+    Write the tech stack of one or many jobs with set-based statements.
+    
+    Per tech kind (languages, ecosystems) this costs at most three round trips,
+    however many jobs and items: one INSERT ... ON CONFLICT DO NOTHING for
+    masterdata names not in the master-data cache, one query for their IDs, and
+    one ON CONFLICT DO NOTHING upsert for all job assignments.
     
     Args:
-        job_id: UUID of the job posting
-        language_name: Name of the programming language
-        requirement_level: 'must_have' or 'nice_to_have'
+        enrichments: Enrichment data (must_have/nice_to_have lists) per job ID
+    
+    Returns:
+        Number of language and ecosystem assignments written (existing ones are skipped by the database)
     """
-    try:
-        # Normalize name (trim whitespace)
-        language_name = language_name.strip()
-        if not language_name:
-            return
-        
-        # Check if language exists in masterdata
-        existing = db.get_programming_language_by_name(language_name)
-        
-        if existing:
-            language_id = UUID(existing["id"])
-            logger.debug(f"Found existing language: {language_name}")
-        else:
-            # Create new masterdata entry
-            language_data = {
-                "name": language_name,
-                "display_name": language_name,  # Initially same as name
-                "is_active": True
-            }
-            language_id = db.insert_programming_language(language_data)
-            logger.info(f"Created new programming language: {language_name}")
-        
-        # Assign to job (with duplicate handling via UNIQUE constraint)
-        try:
-            db.assign_programming_language_to_job(job_id, language_id, requirement_level)
-            logger.debug(f"Assigned {language_name} to job {job_id} as {requirement_level}")
-        except Exception as e:
-            # Duplicate assignment, skip
-            if "duplicate" in str(e).lower() or "unique" in str(e).lower():
-                logger.debug(f"Language {language_name} already assigned to job {job_id}")
-            else:
-                raise
-        
-    except Exception as e:
-        logger.error(f"Failed to process language {language_name}: {e}")
+    counts = {
+        "languages": _write_tech_assignments(
+            _collect_tech_items(enrichments, "languages"),
+            table="programming_languages",
+            assignment_table="job_programming_languages",
+            id_column="programming_language_id",
+            lookup=db.get_cached_programming_language,
+            lookup_many=db.get_programming_languages_by_names
+        ),
+        "ecosystems": _write_tech_assignments(
+            _collect_tech_items(enrichments, "ecosystems"),
+            table="ecosystems",
+            assignment_table="job_ecosystems",
+            id_column="ecosystem_id",
+            lookup=db.get_cached_ecosystem,
+            lookup_many=db.get_ecosystems_by_names
+        )
+    }
+    if counts["languages"] or counts["ecosystems"]:
+        response_cache.invalidate(TAG_TECH_STACK)
+    return counts
 
 
-def _process_ecosystem(job_id: UUID, ecosystem_name: str, requirement_level: str) -> None:
+def _collect_tech_items(enrichments: Dict[UUID, Dict[str, Any]], kind: str) -> List[Tuple[str, str, str]]:
     """
-    Process a single ecosystem: upsert to masterdata and assign to job.
+    Get (job_id, name, requirement_level) per distinct job + name.
     
-    Args:
-        job_id: UUID of the job posting
-        ecosystem_name: Name of the ecosystem
-        requirement_level: 'must_have' or 'nice_to_have'
+    A name listed as both must-have and nice-to-have keeps must_have, like the
+    per-item insert order did.
     """
-    try:
-        # Normalize name (trim whitespace)
-        ecosystem_name = ecosystem_name.strip()
-        if not ecosystem_name:
-            return
-        
-        # Check if ecosystem exists in masterdata
-        existing = db.get_ecosystem_by_name(ecosystem_name)
-        
+    items: Dict[Tuple[str, str], str] = {}
+    for job_id, enrichment_data in enrichments.items():
+        for level in ("must_have", "nice_to_have"):
+            for name in enrichment_data.get(f"{level}_{kind}") or []:
+                # Normalize name (trim whitespace)
+                if not isinstance(name, str) or not name.strip():
+                    continue
+                items.setdefault((str(job_id), name.strip()), level)
+    return [(job_id, name, level) for (job_id, name), level in items.items()]
+
+
+def _resolve_tech_ids(
+    names: Iterable[str],
+    table: str,
+    lookup: Callable[[str], Optional[Dict]],
+    lookup_many: Callable[[Iterable[str]], Dict[str, Dict]]
+) -> Dict[str, str]:
+    """Masterdata IDs per name, creating missing names in one statement."""
+    ids = {}
+    missing = []
+    for name in names:
+        existing = lookup(name)
         if existing:
-            ecosystem_id = UUID(existing["id"])
-            logger.debug(f"Found existing ecosystem: {ecosystem_name}")
+            ids[name] = existing["id"]
         else:
-            # Create new masterdata entry
-            ecosystem_data = {
-                "name": ecosystem_name,
-                "display_name": ecosystem_name,  # Initially same as name
-                "is_active": True
-            }
-            ecosystem_id = db.insert_ecosystem(ecosystem_data)
-            logger.info(f"Created new ecosystem: {ecosystem_name}")
-        
-        # Assign to job (with duplicate handling via UNIQUE constraint)
-        try:
-            db.assign_ecosystem_to_job(job_id, ecosystem_id, requirement_level)
-            logger.debug(f"Assigned {ecosystem_name} to job {job_id} as {requirement_level}")
-        except Exception as e:
-            # Duplicate assignment, skip
-            if "duplicate" in str(e).lower() or "unique" in str(e).lower():
-                logger.debug(f"Ecosystem {ecosystem_name} already assigned to job {job_id}")
-            else:
-                raise
-        
-    except Exception as e:
-        logger.error(f"Failed to process ecosystem {ecosystem_name}: {e}")
+            missing.append(name)
+    
+    if not missing:
+        return ids
+    
+    # Create new masterdata entries (display name initially same as name)
+    db.bulk_upsert(
+        table,
+        [{"name": name, "display_name": name, "is_active": True} for name in missing],
+        on_conflict="name",
+        ignore_duplicates=True
+    )
+    
+    for name, row in lookup_many(missing).items():
+        if row.get("is_active", True):
+            ids[name] = row["id"]
+            db.master_data.put(table, name, row)
+        else:
+            logger.debug(f"Skipping inactive {table} entry: {name}")
+    
+    logger.info(f"Resolved {len(missing)} new {table} names")
+    return ids
+
+
+def _write_tech_assignments(
+    items: List[Tuple[str, str, str]],
+    table: str,
+    assignment_table: str,
+    id_column: str,
+    lookup: Callable[[str], Optional[Dict]],
+    lookup_many: Callable[[Iterable[str]], Dict[str, Dict]]
+) -> int:
+    if not items:
+        return 0
+    
+    ids = _resolve_tech_ids({name for _, name, _ in items}, table, lookup, lookup_many)
+    rows = [
+        {
+            "job_posting_id": job_id,
+            id_column: ids[name],
+            "requirement_level": level
+        }
+        for job_id, name, level in items
+        if name in ids
+    ]
+    
+    # Already assigned (UNIQUE job_posting_id + masterdata id) is skipped
+    db.bulk_upsert(assignment_table, rows, on_conflict=f"job_posting_id,{id_column}", ignore_duplicates=True)
+    return len(rows)
 
 
 def get_job_tech_stack(job_id: UUID) -> Dict[str, Any]:
@@ -15,12 +15,15 @@ Plus diversiteitsmodifiers om spreiding te garanderen.
 
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator
 from collections import defaultdict
+from uuid import uuid4
 from loguru import logger
 from dateutil import parser as date_parser
 
-from database.client import db
+from database.client import db, chunked, IN_FILTER_CHUNK_SIZE
+from database.job_facets import job_facets
+from utils.response_cache import response_cache, TAG_RANKINGS
 
 
 def parse_datetime(date_string: str) -> Optional[datetime]:
@@ -112,6 +115,20 @@ class JobData:
     # Final score
     final_score: float = 0.0
     final_rank: int = 0
+    
+    # True when the component scores come from ranking_metadata (incremental run)
+    scores_cached: bool = False
+    
+    # What the scoring needs from the description/logo blobs (job_ranking_input_view
+    # returns these instead of the blobs; derived in __post_init__ otherwise)
+    description_len: int = 0
+    has_logo: bool = False
+    
+    def __post_init__(self):
+        if self.description_text:
+            self.description_len = len(self.description_text)
+        if self.company_logo_data:
+            self.has_logo = True
 
 
 class JobRankingSystem:
@@ -200,7 +217,7 @@ class JobRankingSystem:
             score += 15
         
         # Gedetailleerde beschrijving: 10 punten
-        if job.description_text and len(job.description_text) > 500:
+        if job.description_len > 500:
             score += 10
         
         # Tech stack bonus: max 15 punten (NEW!)
@@ -239,7 +256,7 @@ class JobRankingSystem:
             score += 10
         
         # Company logo: 10 punten
-        if job.company_logo_data:
+        if job.has_logo:
             score += 10
         
         return score
@@ -498,6 +515,192 @@ class JobRankingSystem:
         return ranked_jobs
 
 
+FAANG_COMPANIES = ['google', 'microsoft', 'meta', 'amazon', 'apple', 'netflix', 'facebook', 'alphabet']
+
+# Bump when the cached fields in ranking_metadata change (forces a full recompute)
+RANKING_CACHE_VERSION = 1
+
+# Slim ranking projection (migration 066) and the full view it replaces
+RANKING_INPUT_VIEW = "job_ranking_input_view"
+LEGACY_RANKING_VIEW = "job_ranking_view"
+
+
+def job_from_ranking_row(row: Dict[str, Any]) -> JobData:
+    """Build JobData from a job_ranking_input_view (or job_ranking_view) row"""
+    # All data is already denormalized in the view
+    # Check if FAANG
+    is_faang = (row.get('company_name') or '').lower() in FAANG_COMPANIES
+    
+    # Parse labels JSON for seniority
+    labels = row.get('labels')
+    if isinstance(labels, str):
+        import json
+        try:
+            labels = json.loads(labels)
+        except:
+            labels = {}
+    
+    seniority = None
+    if labels:
+        # Try different language keys for seniority
+        for lang in ['nl', 'en', 'fr']:
+            if lang in labels:
+                seniority_value = labels[lang].get('seniority')
+                if seniority_value:
+                    # Handle both string and list
+                    if isinstance(seniority_value, list):
+                        seniority = seniority_value[0] if seniority_value else None
+                    else:
+                        seniority = seniority_value
+                    break
+    
+    return JobData(
+        id=row['id'],
+        title=row['title'],
+        company_id=row['company_id'],
+        company_name=row.get('company_name', ''),
+        location_id=row['location_id'],
+        posted_date=parse_datetime(row.get('posted_date')),
+        seniority_level=row.get('seniority_level'),
+        employment_type=row.get('employment_type'),
+        function_areas=row.get('function_areas'),
+        base_salary_min=row.get('base_salary_min'),
+        base_salary_max=row.get('base_salary_max'),
+        apply_url=row.get('apply_url'),
+        num_applicants=row.get('num_applicants'),
+        is_active=row.get('is_active', True),
+        title_classification=row.get('title_classification', 'Data'),  # Default to 'Data' if missing
+        
+        # Company data (from view)
+        company_industry=row.get('company_industry'),
+        company_url=row.get('company_url'),
+        company_logo_data=row.get('company_logo_data'),
+        company_employee_count_range=row.get('company_employee_count_range'),
+        company_rating=row.get('company_rating'),
+        company_reviews_count=row.get('company_reviews_count'),
+        hiring_model=row.get('hiring_model'),
+        is_faang=is_faang,
+        
+        # Location data (from view)
+        location_city=row.get('location_city'),
+        
+        # Enrichment data (from view)
+        skills_must_have=row.get('skills_must_have'),
+        samenvatting_kort=row.get('samenvatting_kort'),
+        samenvatting_lang=row.get('samenvatting_lang'),
+        data_role_type=row.get('data_role_type'),
+        seniority=seniority,
+        enrichment_completed_at=parse_datetime(row.get('enrichment_completed_at')),
+        
+        # Scraping data (maintained column since migration 067)
+        scraped_at=parse_datetime(row.get('last_scraped_at')),
+        
+        # Tech stack data (from view)
+        must_have_programmeertalen=row.get('must_have_programmeertalen', []),
+        nice_to_have_programmeertalen=row.get('nice_to_have_programmeertalen', []),
+        must_have_ecosystemen=row.get('must_have_ecosystemen', []),
+        nice_to_have_ecosystemen=row.get('nice_to_have_ecosystemen', []),
+        
+        # Description data (from view)
+        description_text=row.get('description_text'),
+        description_len=row.get('description_len') or 0,
+        has_logo=bool(row.get('has_logo'))
+    )
+
+
+def _iter_view_pages(view: str, job_ids: Optional[List[str]] = None) -> Iterator[List[Dict[str, Any]]]:
+    """Yield pages of rows from a ranking view: keyset on id, or by id chunks"""
+    if job_ids is not None:
+        for batch_ids in chunked(job_ids, IN_FILTER_CHUNK_SIZE):
+            yield db.client.table(view)\
+                .select("*")\
+                .in_("id", batch_ids)\
+                .execute().data
+        return
+    
+    page_size = 1000  # Supabase limit
+    last_id = None
+    
+    while True:
+        # Keyset pagination: cost per page stays constant (no growing OFFSET)
+        query = db.client.table(view)\
+            .select("*")\
+            .order("id")\
+            .limit(page_size)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        
+        rows = query.execute().data
+        if rows:
+            yield rows
+        
+        if len(rows) < page_size:
+            break
+        last_id = rows[-1]['id']
+
+
+def iter_ranking_rows(job_ids: Optional[List[str]] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield pages of ranking input rows for all active jobs (or only job_ids)
+    
+    Reads job_ranking_input_view; falls back to the full job_ranking_view when the
+    slim view does not exist yet (migration 066 not run).
+    """
+    started = False
+    try:
+        for rows in _iter_view_pages(RANKING_INPUT_VIEW, job_ids):
+            started = True
+            yield rows
+    except Exception as e:
+        if started:
+            raise
+        logger.warning(f"Could not read {RANKING_INPUT_VIEW} ({e}), falling back to {LEGACY_RANKING_VIEW}")
+        yield from _iter_view_pages(LEGACY_RANKING_VIEW, job_ids)
+
+
+def load_jobs_by_ids(job_ids: List[str]) -> List[JobData]:
+    """Load full ranking rows for specific jobs"""
+    jobs = []
+    for rows in iter_ranking_rows(job_ids):
+        jobs.extend(job_from_ranking_row(row) for row in rows)
+    return jobs
+
+
+def _load_scrape_times_from_history(jobs: List[JobData]):
+    """Set scraped_at from job_scrape_history (pre-migration 067 fallback)"""
+    logger.info(f"Fetching most recent scrape times for {len(jobs)} jobs...")
+    job_ids = [job.id for job in jobs]
+    
+    # Get most recent detected_at for each job from job_scrape_history
+    # We'll do this in batches to avoid query size limits
+    batch_size = 100
+    job_scrape_times = {}
+    
+    for i in range(0, len(job_ids), batch_size):
+        batch_ids = job_ids[i:i + batch_size]
+        
+        # Query for this batch
+        scrape_result = db.client.table("job_scrape_history")\
+            .select("job_posting_id, detected_at")\
+            .in_("job_posting_id", batch_ids)\
+            .order("detected_at", desc=True)\
+            .execute()
+        
+        # Get most recent scrape for each job
+        for row in scrape_result.data:
+            job_id = row['job_posting_id']
+            if job_id not in job_scrape_times:
+                # First (most recent) entry for this job
+                job_scrape_times[job_id] = parse_datetime(row['detected_at'])
+    
+    # Update jobs with scrape times
+    for job in jobs:
+        if job.id in job_scrape_times:
+            job.scraped_at = job_scrape_times[job.id]
+    
+    logger.info(f"Found scrape times for {len(job_scrape_times)} jobs")
+
+
 def load_jobs_from_database(only_needs_ranking: bool = False) -> List[JobData]:
     """
     Load jobs from database with necessary joins using pagination
@@ -508,189 +711,235 @@ def load_jobs_from_database(only_needs_ranking: bool = False) -> List[JobData]:
     logger.info("Loading jobs from database with pagination...")
     
     jobs = []
+    has_last_scraped_at = False
+    
+    if only_needs_ranking:
+        # needs_ranking is on job_postings, not in the view: collect the ids first
+        job_ids = [row['id'] for row in load_ranking_snapshot() if row.get('needs_ranking')]
+        for rows in iter_ranking_rows(job_ids):
+            has_last_scraped_at = has_last_scraped_at or bool(rows and 'last_scraped_at' in rows[0])
+            jobs.extend(job_from_ranking_row(row) for row in rows)
+        logger.info(f"Loaded {len(jobs)} jobs flagged needs_ranking")
+    else:
+        # Slim denormalized view (no blobs), paged by keyset on id
+        for rows in iter_ranking_rows():
+            has_last_scraped_at = has_last_scraped_at or bool(rows and 'last_scraped_at' in rows[0])
+            jobs.extend(job_from_ranking_row(row) for row in rows)
+            logger.info(f"Loaded batch: {len(rows)} jobs ({len(jobs)} total)")
+    
+    if jobs and not has_last_scraped_at:
+        # View without last_scraped_at (migration 067 not run): probe the history table
+        _load_scrape_times_from_history(jobs)
+    
+    logger.info(f"Loaded {len(jobs)} jobs from database")
+    return jobs
+
+
+def load_ranking_snapshot() -> List[Dict[str, Any]]:
+    """
+    Load the slim per-job ranking state of all active jobs from job_postings
+    
+    Only the columns needed to decide what to recompute and to run the diversity
+    pass: no description or logo blobs, no joins.
+    """
+    rows = []
     page_size = 1000  # Supabase limit
-    offset = 0
+    last_id = None
     
     while True:
-        # Use denormalized view for efficient data loading
-        # This avoids Supabase/PostgREST join limitations
-        query = db.client.table("job_ranking_view")\
-            .select("*")\
-            .range(offset, offset + page_size - 1)
-        
-        # Optionally filter to only jobs that need ranking
-        # Note: needs_ranking is on job_postings table, not in view
-        # So we need to join or filter differently if this is needed
-        # For now, we load all active Data jobs
+        query = db.client.table("job_postings")\
+            .select("id, title, company_id, location_id, posted_date, title_classification, is_active, needs_ranking, ranking_metadata")\
+            .eq("is_active", True)\
+            .order("id")\
+            .limit(page_size)
+        if last_id is not None:
+            query = query.gt("id", last_id)
         
         result = query.execute()
+        rows.extend(result.data)
         
-        if not result.data:
-            break  # No more jobs
-        
-        logger.info(f"Loaded batch: {len(result.data)} jobs (offset {offset})")
-        
-        # Process this batch
-        for row in result.data:
-            # All data is already denormalized in the view
-            # Check if FAANG
-            faang_companies = ['google', 'microsoft', 'meta', 'amazon', 'apple', 'netflix', 'facebook', 'alphabet']
-            is_faang = row.get('company_name', '').lower() in faang_companies
-            
-            # Parse labels JSON for seniority
-            labels = row.get('labels')
-            if isinstance(labels, str):
-                import json
-                try:
-                    labels = json.loads(labels)
-                except:
-                    labels = {}
-            
-            seniority = None
-            if labels:
-                # Try different language keys for seniority
-                for lang in ['nl', 'en', 'fr']:
-                    if lang in labels:
-                        seniority_value = labels[lang].get('seniority')
-                        if seniority_value:
-                            # Handle both string and list
-                            if isinstance(seniority_value, list):
-                                seniority = seniority_value[0] if seniority_value else None
-                            else:
-                                seniority = seniority_value
-                            break
-            
-            job = JobData(
-                id=row['id'],
-                title=row['title'],
-                company_id=row['company_id'],
-                company_name=row.get('company_name', ''),
-                location_id=row['location_id'],
-                posted_date=parse_datetime(row.get('posted_date')),
-                seniority_level=row.get('seniority_level'),
-                employment_type=row.get('employment_type'),
-                function_areas=row.get('function_areas'),
-                base_salary_min=row.get('base_salary_min'),
-                base_salary_max=row.get('base_salary_max'),
-                apply_url=row.get('apply_url'),
-                num_applicants=row.get('num_applicants'),
-                is_active=row.get('is_active', True),
-                title_classification=row.get('title_classification', 'Data'),  # Default to 'Data' if missing
-                
-                # Company data (from view)
-                company_industry=row.get('company_industry'),
-                company_url=row.get('company_url'),
-                company_logo_data=row.get('company_logo_data'),
-                company_employee_count_range=row.get('company_employee_count_range'),
-                company_rating=row.get('company_rating'),
-                company_reviews_count=row.get('company_reviews_count'),
-                hiring_model=row.get('hiring_model'),
-                is_faang=is_faang,
-                
-                # Location data (from view)
-                location_city=row.get('location_city'),
-                
-                # Enrichment data (from view)
-                skills_must_have=row.get('skills_must_have'),
-                samenvatting_kort=row.get('samenvatting_kort'),
-                samenvatting_lang=row.get('samenvatting_lang'),
-                data_role_type=row.get('data_role_type'),
-                seniority=seniority,
-                enrichment_completed_at=parse_datetime(row.get('enrichment_completed_at')),
-                
-                # Scraping data - will be populated in next step
-                scraped_at=None,
-                
-                # Tech stack data (from view)
-                must_have_programmeertalen=row.get('must_have_programmeertalen', []),
-                nice_to_have_programmeertalen=row.get('nice_to_have_programmeertalen', []),
-                must_have_ecosystemen=row.get('must_have_ecosystemen', []),
-                nice_to_have_ecosystemen=row.get('nice_to_have_ecosystemen', []),
-                
-                # Description data (from view)
-                description_text=row.get('description_text')
-            )
-            
-            jobs.append(job)
-        
-        # Check if we got less than page_size (last page)
         if len(result.data) < page_size:
             break
-        
-        # Move to next page
-        offset += page_size
+        last_id = result.data[-1]['id']
     
-    # Now fetch most recent scrape times for all jobs in one query
-    logger.info(f"Fetching most recent scrape times for {len(jobs)} jobs...")
-    if jobs:
-        job_ids = [job.id for job in jobs]
-        
-        # Get most recent detected_at for each job from job_scrape_history
-        # We'll do this in batches to avoid query size limits
-        batch_size = 100
-        job_scrape_times = {}
-        
-        for i in range(0, len(job_ids), batch_size):
-            batch_ids = job_ids[i:i + batch_size]
-            
-            # Query for this batch
-            scrape_result = db.client.table("job_scrape_history")\
-                .select("job_posting_id, detected_at")\
-                .in_("job_posting_id", batch_ids)\
-                .order("detected_at", desc=True)\
-                .execute()
-            
-            # Get most recent scrape for each job
-            for row in scrape_result.data:
-                job_id = row['job_posting_id']
-                if job_id not in job_scrape_times:
-                    # First (most recent) entry for this job
-                    job_scrape_times[job_id] = parse_datetime(row['detected_at'])
-        
-        # Update jobs with scrape times
-        for job in jobs:
-            if job.id in job_scrape_times:
-                job.scraped_at = job_scrape_times[job.id]
-        
-        logger.info(f"Found scrape times for {len(job_scrape_times)} jobs")
-        
-        # Note: Enrichment data is already loaded from the view, no need to fetch separately
+    return rows
+
+
+def job_from_ranking_cache(row: Dict[str, Any]) -> Optional[JobData]:
+    """
+    Build JobData from a snapshot row using the scores cached in ranking_metadata
     
-    logger.info(f"Loaded {len(jobs)} jobs from database")
+    Returns None when the job has to be fully recomputed (flagged needs_ranking,
+    never ranked, or ranked by an older cache version).
+    """
+    metadata = row.get('ranking_metadata')
+    if row.get('needs_ranking') or not metadata or metadata.get('cache_version') != RANKING_CACHE_VERSION:
+        return None
+    
+    enrichment_completed_at = metadata.get('enrichment_completed_at')
+    
+    job = JobData(
+        id=row['id'],
+        title=row.get('title'),
+        company_id=row.get('company_id'),
+        company_name='',
+        location_id=row.get('location_id'),
+        posted_date=parse_datetime(row.get('posted_date')),
+        seniority_level=None,
+        employment_type=None,
+        function_areas=None,
+        base_salary_min=None,
+        base_salary_max=None,
+        apply_url=None,
+        num_applicants=None,
+        is_active=row.get('is_active', True),
+        title_classification=row.get('title_classification', 'Data'),
+        company_industry=None,
+        company_url=None,
+        company_logo_data=None,
+        company_employee_count_range=None,
+        company_rating=None,
+        company_reviews_count=None,
+        hiring_model=None,
+        is_faang=False,
+        location_city=None,
+        skills_must_have=None,
+        samenvatting_kort=None,
+        samenvatting_lang=None,
+        data_role_type=metadata.get('data_role_type'),
+        seniority=metadata.get('seniority'),
+        enrichment_completed_at=datetime.fromisoformat(enrichment_completed_at) if enrichment_completed_at else None,
+        scraped_at=None,
+        description_text=None
+    )
+    
+    # Stable component scores; freshness is time dependent and always recomputed
+    job.quality_score = metadata['quality_score']
+    job.transparency_score = metadata['transparency_score']
+    job.role_match_score = metadata['role_match_score']
+    job.completeness_score = metadata['completeness_score']
+    job.reputation_score = metadata['reputation_score']
+    job.scores_cached = True
+    
+    return job
+
+
+def load_jobs_incremental() -> List[JobData]:
+    """
+    Load jobs for an incremental ranking run
+    
+    All active jobs come from the slim job_postings snapshot. Only jobs flagged
+    needs_ranking (or without a valid cache) are loaded in full from
+    job_ranking_view; all others reuse the component scores in ranking_metadata.
+    """
+    logger.info("Loading ranking snapshot (incremental)...")
+    
+    snapshot = load_ranking_snapshot()
+    cached_jobs = {}
+    stale_ids = []
+    
+    for row in snapshot:
+        job = job_from_ranking_cache(row)
+        if job:
+            cached_jobs[job.id] = job
+        else:
+            stale_ids.append(row['id'])
+    
+    fresh_jobs = {job.id: job for job in load_jobs_by_ids(stale_ids)}
+    
+    # Keep snapshot order so ties are broken the same way on every run
+    jobs = []
+    for row in snapshot:
+        job = cached_jobs.get(row['id']) or fresh_jobs.get(row['id'])
+        if job:
+            jobs.append(job)
+    
+    logger.info(f"Loaded {len(jobs)} jobs ({len(cached_jobs)} from ranking cache, {len(fresh_jobs)} recomputed)")
     return jobs
 
 
+# Rows per multi-row insert into job_rankings_staging
+RANKING_STAGING_CHUNK_SIZE = 1000
+
+
+def build_ranking_metadata(job: JobData) -> Dict[str, Any]:
+    """
+    Score breakdown stored in job_postings.ranking_metadata
+    
+    Also serves as the cache for incremental ranking runs (see job_from_ranking_cache).
+    """
+    return {
+        'freshness_score': round(job.freshness_score, 2),
+        'quality_score': round(job.quality_score, 2),
+        'transparency_score': round(job.transparency_score, 2),
+        'role_match_score': round(job.role_match_score, 2),
+        'completeness_score': round(job.completeness_score, 2),
+        'reputation_score': round(job.reputation_score, 2),
+        'base_score': round(job.base_score, 2),
+        'company_rank': job.company_rank,
+        'role_type_rank': job.role_type_rank,
+        'location_rank': job.location_rank,
+        'seniority_rank': job.seniority_rank,
+        
+        # Ranking cache: inputs of the diversity pass for incremental runs
+        'cache_version': RANKING_CACHE_VERSION,
+        'data_role_type': job.data_role_type,
+        'seniority': job.seniority,
+        'enrichment_completed_at': job.enrichment_completed_at.isoformat() if job.enrichment_completed_at else None
+    }
+
+
 def save_rankings_to_database(ranked_jobs: List[JobData]):
-    """Save ranking scores back to database"""
+    """
+    Save ranking scores back to database
+    
+    Rankings are written to job_rankings_staging in chunked multi-row inserts and then
+    swapped into job_postings by apply_job_rankings() in a single UPDATE (migration 065),
+    so readers never see a mix of old and new ranking positions.
+    """
     logger.info(f"Saving rankings for {len(ranked_jobs)} jobs...")
     
     # Use SINGLE timestamp for ALL jobs in this ranking run
     # This is critical for queries that filter by latest ranking_updated_at
     ranking_timestamp = datetime.now().isoformat()
+    ranking_run_id = str(uuid4())
     
-    for job in ranked_jobs:
-        # Create metadata JSON
-        metadata = {
-            'freshness_score': round(job.freshness_score, 2),
-            'quality_score': round(job.quality_score, 2),
-            'transparency_score': round(job.transparency_score, 2),
-            'role_match_score': round(job.role_match_score, 2),
-            'completeness_score': round(job.completeness_score, 2),
-            'reputation_score': round(job.reputation_score, 2),
-            'base_score': round(job.base_score, 2),
-            'company_rank': job.company_rank,
-            'role_type_rank': job.role_type_rank,
-            'location_rank': job.location_rank,
-            'seniority_rank': job.seniority_rank
+    rows = [
+        {
+            'ranking_run_id': ranking_run_id,
+            'job_posting_id': job.id,
+            'base_score': round(job.base_score, 2),  # Stable score (recalculated nightly)
+            'ranking_score': round(job.final_score, 2),  # Final score (base × multiplier, hourly)
+            'ranking_position': job.final_rank,
+            'ranking_metadata': build_ranking_metadata(job),
+            'hourly_multiplier': round(job.hourly_multiplier, 3)  # Store hourly multiplier
         }
-        
+        for job in ranked_jobs
+    ]
+    
+    try:
+        db.bulk_insert("job_rankings_staging", rows, chunk_size=RANKING_STAGING_CHUNK_SIZE)
+        result = db.client.rpc("apply_job_rankings", {
+            "p_ranking_run_id": ranking_run_id,
+            "p_ranking_updated_at": ranking_timestamp
+        }).execute()
+        logger.info(f"✅ Rankings saved to database ({result.data} jobs swapped in)")
+    except Exception as e:
+        # Staging table / function missing (migration 065 not run) - use the slow path
+        logger.warning(f"Bulk ranking save failed ({e}), falling back to per-job updates")
+        _save_rankings_row_by_row(ranked_jobs, ranking_timestamp)
+
+
+def _save_rankings_row_by_row(ranked_jobs: List[JobData], ranking_timestamp: str):
+    """Save rankings with one UPDATE per job (pre-migration 065 fallback)"""
+    for job in ranked_jobs:
         # Update database - use SAME timestamp for all jobs
         db.client.table("job_postings").update({
             'base_score': round(job.base_score, 2),  # Stable score (recalculated nightly)
             'ranking_score': round(job.final_score, 2),  # Final score (base × multiplier, hourly)
             'ranking_position': job.final_rank,
             'ranking_updated_at': ranking_timestamp,  # Same for all jobs!
-            'ranking_metadata': metadata,
+            'ranking_metadata': build_ranking_metadata(job),
             'hourly_multiplier': round(job.hourly_multiplier, 3),  # Store hourly multiplier
             'needs_ranking': False  # Mark as ranked
         }).eq('id', job.id).execute()
@@ -698,24 +947,79 @@ def save_rankings_to_database(ranked_jobs: List[JobData]):
     logger.info("✅ Rankings saved to database")
 
 
-def calculate_and_save_rankings():
-    """Main function to calculate and save rankings"""
-    logger.info("🚀 Starting job ranking calculation...")
+def get_ranking_epoch() -> Optional[Dict[str, Any]]:
+    """
+    Current ranking epoch and the epoch covered by the last ranking run (migration 069).
+    
+    The epoch moves once per INSERT/DELETE on job_postings and per UPDATE that changes
+    ranking fields, so it catches set-level changes that needs_ranking flags do not.
+    
+    Returns:
+        Dict with 'epoch', 'ranked_epoch' and 'ranked_at', or None if not available
+    """
+    try:
+        return db.client.rpc("get_ranking_epoch", {}).execute().data
+    except Exception as e:
+        logger.warning(f"Ranking epoch not available (run migration 069): {e}")
+        return None
+
+
+def record_ranked_epoch(epoch: int):
+    """Mark rankings as up to date with `epoch`"""
+    try:
+        db.client.rpc("record_ranked_epoch", {"p_epoch": epoch}).execute()
+    except Exception as e:
+        logger.warning(f"Failed to record ranked epoch {epoch}: {e}")
+
+
+def ranking_epoch_changed() -> bool:
+    """True if job_postings changed since the last ranking run (or the epoch is unknown)"""
+    state = get_ranking_epoch()
+    return state is None or state['epoch'] != state['ranked_epoch']
+
+
+def calculate_and_save_rankings(incremental: bool = False):
+    """
+    Main function to calculate and save rankings
+    
+    Args:
+        incremental: If True, only recompute the component scores of jobs flagged
+                     needs_ranking and re-apply freshness, diversity and the hourly
+                     multiplier over the cached scores of all other jobs.
+                     A full run (default) recomputes everything and also picks up
+                     company-level changes that do not flag needs_ranking.
+    """
+    logger.info(f"🚀 Starting job ranking calculation ({'incremental' if incremental else 'full'})...")
     
     try:
-        # Load jobs
-        jobs = load_jobs_from_database()
+        # Rank jobs (columnar NumPy engine, identical results to JobRankingSystem)
+        from ranking.vectorized import VectorizedJobRankingSystem
+        ranker = VectorizedJobRankingSystem()
+        
+        # Read before loading: changes made while this run loads stay newer than the recorded epoch
+        epoch_state = get_ranking_epoch()
         
-        # Rank jobs
-        ranker = JobRankingSystem()
-        ranked_jobs = ranker.rank_jobs(jobs)
+        if incremental:
+            jobs = load_jobs_incremental()
+            ranked_jobs = ranker.rank_jobs_incremental(jobs)
+        else:
+            jobs = load_jobs_from_database()
+            ranked_jobs = ranker.rank_jobs(jobs)
         
         # Save to database
         save_rankings_to_database(ranked_jobs)
+        response_cache.invalidate(TAG_RANKINGS)
+        job_facets.invalidate()
+        
+        if epoch_state:
+            record_ranked_epoch(epoch_state['epoch'])
         
         logger.info("✅ Job ranking calculation complete!")
         return len(ranked_jobs)
-        
+    
     except Exception as e:
         logger.error(f"❌ Error calculating rankings: {e}")
+        # The per-job fallback may have written part of the positions
+        response_cache.invalidate(TAG_RANKINGS)
+        job_facets.invalidate()
         raise
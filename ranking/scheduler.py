@@ -3,7 +3,8 @@ Job Ranking & Maintenance Scheduler
 ====================================
 
 Scheduled tasks:
-- Ranking calculation: Every hour (for dynamic rankings with hourly multiplier)
+- Ranking calculation: Every hour, incremental (for dynamic rankings with hourly multiplier)
+- Full ranking recalculation: Every night at 03:00
 - Stuck run cleanup: Every hour
 """
 
@@ -17,17 +18,22 @@ from ranking.job_ranker import calculate_and_save_rankings
 from ingestion.stuck_run_cleaner import clean_stuck_runs
 
 
-def run_ranking_job():
+def run_ranking_job(incremental: bool = True):
     """Run the ranking calculation"""
-    logger.info("⏰ Scheduled ranking job triggered")
+    logger.info(f"⏰ Scheduled ranking job triggered ({'incremental' if incremental else 'full'})")
     
     try:
-        num_ranked = calculate_and_save_rankings()
+        num_ranked = calculate_and_save_rankings(incremental=incremental)
         logger.info(f"✅ Scheduled ranking complete: {num_ranked} jobs ranked")
     except Exception as e:
         logger.error(f"❌ Scheduled ranking failed: {e}")
 
 
+def run_full_ranking_job():
+    """Re-score all jobs (picks up company changes that do not flag needs_ranking)"""
+    run_ranking_job(incremental=False)
+
+
 def run_stuck_run_cleanup():
     """Clean up stuck scrape runs"""
     logger.info("⏰ Scheduled stuck run cleanup triggered")
@@ -49,17 +55,21 @@ def start_scheduler():
     
     logger.info("🕐 Starting job ranking scheduler...")
     logger.info("📅 Ranking schedule: Every hour (dynamic rankings with random multiplier)")
+    logger.info("📅 Full ranking recalculation: Every night at 03:00")
     logger.info("📅 Stuck run cleanup: Every hour")
     
     # Schedule ranking calculation every hour
     schedule.every().hour.do(run_ranking_job)
     
+    # Schedule full recalculation every night
+    schedule.every().day.at("03:00").do(run_full_ranking_job)
+    
     # Schedule stuck run cleanup every hour
     schedule.every().hour.do(run_stuck_run_cleanup)
     
     # Also run immediately on startup
     logger.info("🚀 Running initial ranking calculation...")
-    run_ranking_job()
+    run_full_ranking_job()
     
     logger.info("🚀 Running initial stuck run cleanup...")
     run_stuck_run_cleanup()
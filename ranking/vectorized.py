@@ -0,0 +1,500 @@
+"""
+Vectorized Ranking Engine
+=========================
+
+Columnar (struct-of-arrays) implementation of JobRankingSystem on NumPy.
+
+Jobs are loaded once into RankingColumns, after which the six component scores,
+base scores, diversity ranks (argsort + cumulative counts per group), hourly
+multipliers and final ranks are computed with array operations. Every float
+operation is done in the same order as the scalar implementation, so results
+are bit-for-bit identical to JobRankingSystem.rank_jobs.
+
+rank_jobs_incremental reuses cached component scores (ranking_metadata) for jobs
+that did not change and only redoes the time-dependent pass for all of them.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Dict, Any
+
+import numpy as np
+from loguru import logger
+
+from ranking.job_ranker import JobData, JobRankingSystem
+
+
+def _bool_column(values) -> np.ndarray:
+    """Python truthiness of every value as a bool array"""
+    return np.fromiter((bool(v) for v in values), dtype=bool)
+
+
+def _len_column(values) -> np.ndarray:
+    """len() of every value (None counts as 0) as an int array"""
+    return np.fromiter((len(v) if v else 0 for v in values), dtype=np.int64)
+
+
+def _category_codes(values) -> np.ndarray:
+    """Map arbitrary hashable values (incl. None) to dense integer codes"""
+    index: Dict[Any, int] = {}
+    return np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int64)
+
+
+def group_ranks(codes: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """
+    1-based rank of each element within its group, counted in `order`.
+    
+    Equivalent to walking `order` and incrementing a counter per group
+    (the defaultdict loop in JobRankingSystem.calculate_diversity_ranks).
+    """
+    n = len(codes)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    
+    ordered_codes = codes[order]
+    # Stable sort keeps the `order` sequence within each group
+    by_group = np.argsort(ordered_codes, kind='stable')
+    grouped = ordered_codes[by_group]
+    
+    starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]])
+    sizes = np.diff(np.r_[starts, n])
+    ranks_grouped = np.arange(n) - np.repeat(starts, sizes) + 1
+    
+    ranks = np.empty(n, dtype=np.int64)
+    ranks[order[by_group]] = ranks_grouped
+    return ranks
+
+
+@dataclass
+class DiversityColumns:
+    """Struct-of-arrays view of what the freshness/diversity/hourly pass needs"""
+    ids: np.ndarray                   # str
+    posted_us: np.ndarray             # int64 microseconds since epoch
+    has_posted_date: np.ndarray       # bool
+    is_enriched: np.ndarray           # bool
+    
+    # Diversity groups
+    company_codes: np.ndarray
+    role_codes: np.ndarray
+    location_codes: np.ndarray
+    seniority_codes: np.ndarray
+    
+    is_nis: np.ndarray                # bool (title_classification == 'NIS')
+    
+    @classmethod
+    def from_jobs(cls, jobs: List[JobData]) -> 'DiversityColumns':
+        """Load the time/diversity inputs of JobData objects into columns"""
+        n = len(jobs)
+        
+        posted = np.array(
+            [j.posted_date if j.posted_date else None for j in jobs],
+            dtype='datetime64[us]'
+        ) if n else np.zeros(0, dtype='datetime64[us]')
+        has_posted_date = ~np.isnat(posted)
+        posted_us = np.where(has_posted_date, posted.astype(np.int64), 0)
+        
+        return cls(
+            ids=np.array([j.id for j in jobs], dtype=str),
+            posted_us=posted_us,
+            has_posted_date=has_posted_date,
+            is_enriched=_bool_column(j.enrichment_completed_at for j in jobs),
+            company_codes=_category_codes(j.company_id for j in jobs),
+            role_codes=_category_codes(j.data_role_type for j in jobs),
+            location_codes=_category_codes(j.location_id for j in jobs),
+            seniority_codes=_category_codes(j.seniority for j in jobs),
+            is_nis=np.fromiter((j.title_classification == 'NIS' for j in jobs), dtype=bool, count=n)
+        )
+
+
+@dataclass
+class RankingColumns(DiversityColumns):
+    """Struct-of-arrays view of the ranking inputs of N jobs"""
+    # Quality
+    skills_count: np.ndarray          # int64
+    has_salary: np.ndarray            # bool
+    has_seniority_level: np.ndarray   # bool
+    has_employment_type: np.ndarray   # bool
+    has_samenvatting_lang: np.ndarray # bool
+    description_len: np.ndarray       # int64
+    tech_count: np.ndarray            # int64
+    
+    # Transparency
+    is_direct: np.ndarray             # bool
+    is_recruitment: np.ndarray        # bool
+    has_apply_url: np.ndarray         # bool
+    has_num_applicants: np.ndarray    # bool
+    has_logo: np.ndarray              # bool
+    
+    # Role match
+    role_match: np.ndarray            # float64, looked up per distinct data_role_type
+    
+    # Completeness
+    has_employee_count_range: np.ndarray
+    has_industry: np.ndarray
+    has_company_url: np.ndarray
+    has_location_city: np.ndarray
+    has_function_areas: np.ndarray
+    
+    # Reputation
+    rating: np.ndarray                # float64, NaN when missing
+    size_points: np.ndarray           # int64 (10/20/30)
+    is_faang: np.ndarray              # bool
+    
+    @classmethod
+    def from_jobs(cls, jobs: List[JobData], ranker: JobRankingSystem) -> 'RankingColumns':
+        """Load JobData objects into columns (the only per-job Python loop)"""
+        n = len(jobs)
+        base = DiversityColumns.from_jobs(jobs)
+        
+        # Role match: evaluate the scalar rule once per distinct role type
+        role_scores: Dict[Any, float] = {}
+        role_match = np.fromiter(
+            (
+                role_scores[j.data_role_type] if j.data_role_type in role_scores
+                else role_scores.setdefault(j.data_role_type, ranker.calculate_role_match_score(j))
+                for j in jobs
+            ),
+            dtype=np.float64,
+            count=n
+        )
+        
+        large_companies = ['1001-5000', '5001-10000', '10000+']
+        medium_companies = ['201-500', '501-1000']
+        size_points = np.fromiter(
+            (
+                30 if j.company_employee_count_range in large_companies
+                else 20 if j.company_employee_count_range in medium_companies
+                else 10
+                for j in jobs
+            ),
+            dtype=np.int64,
+            count=n
+        )
+        
+        return cls(
+            **vars(base),
+            skills_count=_len_column(j.skills_must_have for j in jobs),
+            has_salary=np.fromiter(
+                (j.base_salary_min is not None and j.base_salary_max is not None for j in jobs),
+                dtype=bool, count=n
+            ),
+            has_seniority_level=_bool_column(j.seniority_level for j in jobs),
+            has_employment_type=_bool_column(j.employment_type for j in jobs),
+            has_samenvatting_lang=_bool_column(j.samenvatting_lang for j in jobs),
+            description_len=np.fromiter((j.description_len for j in jobs), dtype=np.int64, count=n),
+            tech_count=(
+                _len_column(j.must_have_programmeertalen for j in jobs)
+                + _len_column(j.nice_to_have_programmeertalen for j in jobs)
+                + _len_column(j.must_have_ecosystemen for j in jobs)
+                + _len_column(j.nice_to_have_ecosystemen for j in jobs)
+            ),
+            is_direct=np.fromiter((j.hiring_model == 'direct' for j in jobs), dtype=bool, count=n),
+            is_recruitment=np.fromiter((j.hiring_model == 'recruitment' for j in jobs), dtype=bool, count=n),
+            has_apply_url=_bool_column(j.apply_url for j in jobs),
+            has_num_applicants=np.fromiter((j.num_applicants is not None for j in jobs), dtype=bool, count=n),
+            has_logo=_bool_column(j.has_logo for j in jobs),
+            role_match=role_match,
+            has_employee_count_range=_bool_column(j.company_employee_count_range for j in jobs),
+            has_industry=_bool_column(j.company_industry for j in jobs),
+            has_company_url=_bool_column(j.company_url for j in jobs),
+            has_location_city=_bool_column(j.location_city for j in jobs),
+            has_function_areas=_bool_column(j.function_areas for j in jobs),
+            rating=np.fromiter(
+                (j.company_rating if j.company_rating is not None else np.nan for j in jobs),
+                dtype=np.float64, count=n
+            ),
+            size_points=size_points,
+            is_faang=_bool_column(j.is_faang for j in jobs)
+        )
+
+
+@dataclass
+class RankingResult:
+    """Columnar ranking output, indexed like the input columns"""
+    freshness_score: np.ndarray
+    quality_score: np.ndarray
+    transparency_score: np.ndarray
+    role_match_score: np.ndarray
+    completeness_score: np.ndarray
+    reputation_score: np.ndarray
+    base_score: np.ndarray
+    company_rank: np.ndarray
+    role_type_rank: np.ndarray
+    location_rank: np.ndarray
+    seniority_rank: np.ndarray
+    hourly_multiplier: np.ndarray
+    final_score: np.ndarray
+    final_rank: np.ndarray
+    order: np.ndarray                 # input indices sorted by final ranking
+
+
+class VectorizedJobRankingSystem(JobRankingSystem):
+    """
+    Drop-in replacement for JobRankingSystem.rank_jobs working on NumPy columns.
+    
+    Uses the same weights, penalties and rules (class attributes are inherited).
+    """
+    
+    def freshness_scores(self, cols: RankingColumns, now: datetime) -> np.ndarray:
+        """Vectorized calculate_freshness_score"""
+        now_us = np.datetime64(now, 'us').astype(np.int64)
+        age_us = now_us - cols.posted_us
+        # Same arithmetic as timedelta.total_seconds() / 3600
+        hours_old = (age_us / 10**6) / 3600
+        
+        day_us = 86400 * 10**6
+        scores = np.select(
+            [
+                hours_old <= 30,
+                age_us <= 1 * day_us,
+                age_us <= 3 * day_us,
+                age_us <= 7 * day_us,
+                age_us <= 14 * day_us,
+                age_us <= 30 * day_us,
+            ],
+            [150, 100, 90, 75, 60, 40],
+            default=20
+        )
+        return np.where(cols.has_posted_date, scores, 20).astype(np.float64)
+    
+    def quality_scores(self, cols: RankingColumns) -> np.ndarray:
+        """Vectorized calculate_quality_score"""
+        score = np.zeros(len(cols.ids), dtype=np.int64)
+        score += np.where(cols.skills_count >= 3, 20, np.where(cols.skills_count == 0, -30, 0))
+        score += np.where(cols.has_salary, 25, 0)
+        score += np.where(cols.has_seniority_level, 15, 0)
+        score += np.where(cols.has_employment_type, 10, 0)
+        score += np.where(cols.has_samenvatting_lang, 15, 0)
+        score += np.where(cols.description_len > 500, 10, 0)
+        score += np.minimum(15, cols.tech_count)
+        return np.minimum(100, score).astype(np.float64)
+    
+    def transparency_scores(self, cols: RankingColumns) -> np.ndarray:
+        """Vectorized calculate_transparency_score"""
+        score = (
+            np.where(cols.is_direct, 60, 0)
+            + np.where(cols.has_apply_url, 20, 0)
+            + np.where(cols.has_num_applicants, 10, 0)
+            + np.where(cols.has_logo, 10, 0)
+        )
+        return score.astype(np.float64)
+    
+    def completeness_scores(self, cols: RankingColumns) -> np.ndarray:
+        """Vectorized calculate_completeness_score"""
+        score = (
+            np.where(cols.has_employee_count_range, 15, 0)
+            + np.where(cols.has_industry, 15, 0)
+            + np.where(cols.has_company_url, 15, 0)
+            + np.where(cols.has_location_city, 15, 0)
+            + np.where(cols.has_function_areas, 20, 0)
+            + np.where(cols.is_enriched, 20, 0)
+        )
+        return score.astype(np.float64)
+    
+    def reputation_scores(self, cols: RankingColumns) -> np.ndarray:
+        """Vectorized calculate_reputation_score"""
+        has_rating = ~np.isnan(cols.rating)
+        rating = np.where(has_rating, cols.rating, 0.0)
+        
+        # Recruitment agencies: 20 with a good rating, otherwise 10
+        recruitment = np.where(has_rating & (rating >= 4.0), 20, 10)
+        
+        # Direct employers: rating + size + FAANG bonus
+        rating_points = np.where(
+            has_rating,
+            np.select([rating >= 4.5, rating >= 4.0, rating >= 3.5], [40, 30, 20], default=10),
+            10
+        )
+        direct = rating_points + cols.size_points + np.where(cols.is_faang, 30, 0)
+        
+        return np.where(cols.is_recruitment, recruitment, direct).astype(np.float64)
+    
+    def hourly_multipliers(self, cols: RankingColumns, now: datetime) -> np.ndarray:
+        """Vectorized calculate_hourly_multiplier (one MD5 per job, arithmetic on arrays)"""
+        hour_str = now.strftime('%Y-%m-%d-%H')
+        # First 4 digest bytes == int(hexdigest()[:8], 16)
+        hash_vals = np.fromiter(
+            (
+                int.from_bytes(hashlib.md5(f"{hour_str}-{job_id}".encode()).digest()[:4], 'big')
+                for job_id in cols.ids
+            ),
+            dtype=np.int64,
+            count=len(cols.ids)
+        )
+        random_factor = (hash_vals % 10000) / 10000
+        return 0.8 + (random_factor * 0.4)
+    
+    def rank_columns(self, cols: RankingColumns, now: Optional[datetime] = None) -> RankingResult:
+        """Full ranking pipeline on columns"""
+        return self.rank_scored_columns(
+            cols,
+            quality=self.quality_scores(cols),
+            transparency=self.transparency_scores(cols),
+            role_match=cols.role_match,
+            completeness=self.completeness_scores(cols),
+            reputation=self.reputation_scores(cols),
+            now=now
+        )
+    
+    def rank_scored_columns(
+        self,
+        cols: DiversityColumns,
+        quality: np.ndarray,
+        transparency: np.ndarray,
+        role_match: np.ndarray,
+        completeness: np.ndarray,
+        reputation: np.ndarray,
+        now: Optional[datetime] = None
+    ) -> RankingResult:
+        """
+        Ranking pipeline given the time-independent component scores
+        
+        Freshness, base score, diversity ranks, hourly multiplier and final ranks are
+        computed here; this is the only part an incremental run has to redo for every job.
+        """
+        if now is None:
+            now = datetime.now()
+        n = len(cols.ids)
+        
+        # Base scores (same summation order as calculate_base_scores)
+        freshness = self.freshness_scores(cols, now)
+        
+        base = (
+            freshness * self.WEIGHT_FRESHNESS +
+            quality * self.WEIGHT_QUALITY +
+            transparency * self.WEIGHT_TRANSPARENCY +
+            role_match * self.WEIGHT_ROLE_MATCH +
+            completeness * self.WEIGHT_COMPLETENESS +
+            reputation * self.WEIGHT_REPUTATION
+        )
+        base = np.where(cols.is_enriched, base, -9999.0)
+        
+        # Diversity ranks: stable descending sort on base score (== sorted(reverse=True))
+        diversity_order = np.argsort(-base, kind='stable')
+        company_rank = group_ranks(cols.company_codes, diversity_order)
+        role_rank = group_ranks(cols.role_codes, diversity_order)
+        location_rank = group_ranks(cols.location_codes, diversity_order)
+        seniority_rank = group_ranks(cols.seniority_codes, diversity_order)
+        
+        # Diversity modifiers + hourly multiplier (same multiplication order as apply_diversity_modifiers)
+        company_modifier = np.maximum(0.1, 1 - (company_rank - 1) * self.COMPANY_PENALTY_PER_EXTRA)
+        role_modifier = np.maximum(0.3, 1 - (role_rank - 1) * self.ROLE_PENALTY_PER_EXTRA)
+        seniority_modifier = np.maximum(0.5, 1 - (seniority_rank - 1) * self.SENIORITY_PENALTY_PER_EXTRA)
+        hourly = self.hourly_multipliers(cols, now)
+        
+        score = base * company_modifier
+        score = score * role_modifier
+        score = np.where(location_rank == 1, score * self.LOCATION_BOOST_FIRST, score)
+        score = score * seniority_modifier
+        score = score * hourly
+        
+        # Final order: final_score DESC, id ASC
+        order = np.lexsort((cols.ids, -score)) if n else np.zeros(0, dtype=np.int64)
+        
+        # NIS jobs get 999999, Data jobs are numbered consecutively
+        nis_sorted = cols.is_nis[order]
+        ranks_sorted = np.where(nis_sorted, 999999, np.cumsum(~nis_sorted))
+        final_rank = np.empty(n, dtype=np.int64)
+        final_rank[order] = ranks_sorted
+        
+        return RankingResult(
+            freshness_score=freshness,
+            quality_score=quality,
+            transparency_score=transparency,
+            role_match_score=role_match,
+            completeness_score=completeness,
+            reputation_score=reputation,
+            base_score=base,
+            company_rank=company_rank,
+            role_type_rank=role_rank,
+            location_rank=location_rank,
+            seniority_rank=seniority_rank,
+            hourly_multiplier=hourly,
+            final_score=score,
+            final_rank=final_rank,
+            order=order
+        )
+    
+    def rank_jobs(self, jobs: List[JobData]) -> List[JobData]:
+        """Volledige ranking pipeline (vectorized), writes scores back onto the JobData objects"""
+        active_jobs = [job for job in jobs if job.is_active]
+        
+        logger.info(f"📊 Ranking {len(active_jobs)} active jobs (vectorized)...")
+        
+        cols = RankingColumns.from_jobs(active_jobs, self)
+        result = self.rank_columns(cols)
+        
+        return self._apply_result(active_jobs, cols, result)
+    
+    def rank_jobs_incremental(self, jobs: List[JobData]) -> List[JobData]:
+        """
+        Ranking pipeline over cached component scores
+        
+        Jobs with scores_cached keep their quality/transparency/role match/completeness/
+        reputation scores; only the others are scored from their full data. Freshness is
+        recomputed for every job (it moves between buckets as jobs age), followed by the
+        diversity and hourly multiplier pass. Given the same cached scores, the result is
+        identical to rank_jobs on the full data.
+        """
+        active_jobs = [job for job in jobs if job.is_active]
+        stale_jobs = [job for job in active_jobs if not job.scores_cached]
+        
+        logger.info(
+            f"📊 Ranking {len(active_jobs)} active jobs (incremental, "
+            f"{len(stale_jobs)} rescored, {len(active_jobs) - len(stale_jobs)} cached)..."
+        )
+        
+        if stale_jobs:
+            stale_cols = RankingColumns.from_jobs(stale_jobs, self)
+            components = zip(
+                self.quality_scores(stale_cols),
+                self.transparency_scores(stale_cols),
+                stale_cols.role_match,
+                self.completeness_scores(stale_cols),
+                self.reputation_scores(stale_cols)
+            )
+            for job, (quality, transparency, role_match, completeness, reputation) in zip(stale_jobs, components):
+                job.quality_score = float(quality)
+                job.transparency_score = float(transparency)
+                job.role_match_score = float(role_match)
+                job.completeness_score = float(completeness)
+                job.reputation_score = float(reputation)
+        
+        n = len(active_jobs)
+        cols = DiversityColumns.from_jobs(active_jobs)
+        result = self.rank_scored_columns(
+            cols,
+            quality=np.fromiter((j.quality_score for j in active_jobs), dtype=np.float64, count=n),
+            transparency=np.fromiter((j.transparency_score for j in active_jobs), dtype=np.float64, count=n),
+            role_match=np.fromiter((j.role_match_score for j in active_jobs), dtype=np.float64, count=n),
+            completeness=np.fromiter((j.completeness_score for j in active_jobs), dtype=np.float64, count=n),
+            reputation=np.fromiter((j.reputation_score for j in active_jobs), dtype=np.float64, count=n)
+        )
+        
+        return self._apply_result(active_jobs, cols, result)
+    
+    def _apply_result(self, active_jobs: List[JobData], cols: DiversityColumns, result: RankingResult) -> List[JobData]:
+        """Write columnar results back onto the JobData objects, return them in ranked order"""
+        for i, job in enumerate(active_jobs):
+            job.freshness_score = float(result.freshness_score[i])
+            job.quality_score = float(result.quality_score[i])
+            job.transparency_score = float(result.transparency_score[i])
+            job.role_match_score = float(result.role_match_score[i])
+            job.completeness_score = float(result.completeness_score[i])
+            job.reputation_score = float(result.reputation_score[i])
+            job.base_score = float(result.base_score[i])
+            job.company_rank = int(result.company_rank[i])
+            job.role_type_rank = int(result.role_type_rank[i])
+            job.location_rank = int(result.location_rank[i])
+            job.seniority_rank = int(result.seniority_rank[i])
+            job.hourly_multiplier = float(result.hourly_multiplier[i])
+            job.final_score = float(result.final_score[i])
+            job.final_rank = int(result.final_rank[i])
+        
+        ranked_jobs = [active_jobs[i] for i in result.order]
+        
+        nis_count = int(cols.is_nis.sum())
+        logger.info(f"✅ Ranking complete! {len(ranked_jobs) - nis_count} Data jobs ranked, {nis_count} NIS jobs set to rank 999999.")
+        
+        return ranked_jobs
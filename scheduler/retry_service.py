@@ -8,7 +8,7 @@ from datetime import datetime, timezone
 from typing import List, Dict
 from loguru import logger
 
-from database.client import db
+from database.async_client import adb
 
 
 class RetryService:
@@ -44,7 +44,7 @@ class RetryService:
         now = datetime.now(timezone.utc)
         
         # Find runs that are ready for retry
-        result = db.client.table("scrape_runs")\
+        result = await adb.table("scrape_runs")\
             .select("id, query_id, search_query, location_query, retry_count, max_retries, original_run_id")\
             .eq("status", "pending_retry")\
             .lte("next_retry_at", now.isoformat())\
@@ -82,7 +82,7 @@ class RetryService:
             from scraper import execute_scrape_run
             
             # Update status to 'running'
-            db.client.table("scrape_runs")\
+            await adb.table("scrape_runs")\
                 .update({
                     "status": "running",
                     "started_at": datetime.now(timezone.utc).isoformat(),
@@ -96,7 +96,7 @@ class RetryService:
             
             # Get query details if we have query_id
             if query_id:
-                query_result = db.client.table("scrape_queries")\
+                query_result = await adb.table("scrape_queries")\
                     .select("*")\
                     .eq("id", query_id)\
                     .single()\
@@ -132,7 +132,7 @@ class RetryService:
             logger.error(f"❌ Retry {retry_count}/{max_retries} failed: {e}")
             
             # Mark as failed
-            db.client.table("scrape_runs")\
+            await adb.table("scrape_runs")\
                 .update({
                     "status": "failed",
                     "error_message": f"Retry {retry_count}/{max_retries} failed: {str(e)}",
@@ -9,7 +9,7 @@ from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.date import DateTrigger
 from loguru import logger
 
-from database import db
+from database import db, adb
 from scraper import execute_scrape_run
 from scheduler.retry_service import get_retry_service
 
@@ -188,7 +188,7 @@ class SchedulerService:
             # Update last_run_at and next_run_at
             next_run = self.scheduler.get_job(query_id).next_run_time
             
-            db.client.table("search_queries")\
+            await adb.table("search_queries")\
                 .update({
                     "last_run_at": datetime.utcnow().isoformat(),
                     "next_run_at": next_run.isoformat() if next_run else None
@@ -227,7 +227,8 @@ class SchedulerService:
             from scripts.fix_stuck_runs_with_retry import fix_stuck_runs_with_retry
             
             # Run the stuck run fixer
-            fix_stuck_runs_with_retry(
+            await adb.run(
+                fix_stuck_runs_with_retry,
                 max_duration_hours=1,
                 retry_delay_hours=4,
                 max_retries=4
@@ -5,10 +5,14 @@ from uuid import UUID
 from datetime import datetime
 from loguru import logger
 
+from config.settings import settings
 from database.client import db
+from database.job_facets import job_facets
 from clients import get_client
 from scraper.date_strategy import determine_date_range
 from ingestion.processor import process_jobs_batch, BatchResult
+from ingestion.bulk_processor import process_jobs_stream
+from utils.response_cache import response_cache, TAG_JOBS, TAG_COMPANIES, TAG_SCRAPE_RUNS
 
 
 class ScrapeRunResult:
@@ -69,7 +73,8 @@ async def execute_scrape_run(
     2. Create scrape_run record (status='running')
     3. Trigger Bright Data collection
     4. Wait for completion (poll with progress logging)
-    5. Process all jobs through ingestion pipeline
+    5. Process all jobs through ingestion pipeline (streamed while downloading
+       when settings.brightdata_stream_snapshots is on)
     6. Update scrape_run with results
     7. Assign job types to found jobs
     8. Return summary
@@ -112,6 +117,7 @@ async def execute_scrape_run(
         }
     }
     run_id = db.create_scrape_run(run_data)
+    response_cache.invalidate(TAG_SCRAPE_RUNS)
     logger.info(f"Created scrape run: {run_id}")
     
     try:
@@ -139,12 +145,26 @@ async def execute_scrape_run(
         
         # Step 5: Wait for completion (with progress logging)
         logger.info(f"⏳ Waiting for Bright Data snapshot {snapshot_id} to complete...")
-        jobs_data = await brightdata.wait_for_completion(snapshot_id)
         
-        logger.success(f"✅ Received {len(jobs_data)} jobs from Bright Data")
+        if settings.brightdata_stream_snapshots:
+            await brightdata.wait_until_ready(snapshot_id)
+            
+            # Step 6: Stream jobs into the ingestion pipeline while the snapshot downloads
+            logger.info(f"🔄 Streaming snapshot {snapshot_id} through ingestion pipeline...")
+            batch_result = await process_jobs_stream(brightdata.stream_results(snapshot_id), run_id, source=source)
+            jobs_found = len(batch_result.results)
+            logger.success(f"✅ Received {jobs_found} jobs from Bright Data")
+        else:
+            jobs_data = await brightdata.wait_for_completion(snapshot_id)
+            jobs_found = len(jobs_data)
+            logger.success(f"✅ Received {jobs_found} jobs from Bright Data")
+            
+            # Step 6: Process jobs through ingestion pipeline
+            logger.info(f"🔄 Processing {jobs_found} jobs through ingestion pipeline...")
+            batch_result = await process_jobs_batch(jobs_data, run_id, source=source)
         
         # Log warning if no jobs found
-        if len(jobs_data) == 0:
+        if jobs_found == 0:
             logger.warning(
                 f"⚠️ No jobs returned from Bright Data!\n"
                 f"  Query: '{query}'\n"
@@ -158,9 +178,6 @@ async def execute_scrape_run(
                 f"    - Date range too restrictive"
             )
         
-        # Step 6: Process jobs through ingestion pipeline
-        logger.info(f"🔄 Processing {len(jobs_data)} jobs through ingestion pipeline...")
-        batch_result = await process_jobs_batch(jobs_data, run_id, source=source)
         logger.success(
             f"✅ Batch processing complete:\n"
             f"  New jobs: {batch_result.new_count}\n"
@@ -171,22 +188,12 @@ async def execute_scrape_run(
         # Step 7: Assign job types to all jobs found in this run (BEFORE updating scrape_run)
         if job_type_id and batch_result.job_ids:
             logger.info(f"🏷️  Assigning job type {job_type_id} to {len(batch_result.job_ids)} jobs...")
-            assignment_count = 0
-            for job_id in batch_result.job_ids:
-                try:
-                    # Insert job_type_assignment (ON CONFLICT DO NOTHING handles duplicates)
-                    db.client.table("job_type_assignments").insert({
-                        "job_posting_id": job_id,
-                        "job_type_id": job_type_id,
-                        "assigned_via": "scrape"
-                    }).execute()
-                    assignment_count += 1
-                except Exception as e:
-                    # Ignore duplicate key errors
-                    if "duplicate key" not in str(e).lower():
-                        logger.warning(f"Failed to assign type to job {job_id}: {e}")
-            
-            logger.info(f"✅ Created {assignment_count} job type assignments")
+            try:
+                # Chunked multi-row INSERT ... ON CONFLICT DO NOTHING (already assigned jobs are skipped)
+                assignment_count = db.assign_job_type(batch_result.job_ids, job_type_id, assigned_via="scrape")
+                logger.info(f"✅ Assigned job type to {assignment_count} jobs")
+            except Exception as e:
+                logger.warning(f"Failed to assign job type {job_type_id}: {e}")
         
         # Step 8: Update scrape_run with results
         end_time = datetime.utcnow()
@@ -196,7 +203,7 @@ async def execute_scrape_run(
         db.update_scrape_run(run_id, {
             "status": "completed",
             "completed_at": end_time.isoformat(),
-            "jobs_found": len(jobs_data),
+            "jobs_found": jobs_found,
             "jobs_new": batch_result.new_count,
             "jobs_updated": batch_result.updated_count,
             "metadata": {
@@ -207,7 +214,7 @@ async def execute_scrape_run(
                 "batch_summary": batch_result.summary(),
                 "jobs_error": batch_result.error_count,
                 "error_details": batch_result.error_details if batch_result.error_count > 0 else [],
-                "brightdata_jobs_returned": len(jobs_data),
+                "brightdata_jobs_returned": jobs_found,
                 "query_params": {
                     "keyword": query,
                     "location": location,
@@ -216,6 +223,8 @@ async def execute_scrape_run(
                 }
             }
         })
+        response_cache.invalidate(TAG_JOBS, TAG_COMPANIES, TAG_SCRAPE_RUNS)
+        job_facets.refresh_jobs(batch_result.job_ids)
         
         # Clean up
         logger.info("🧹 Cleaning up Bright Data client...")
@@ -227,7 +236,7 @@ async def execute_scrape_run(
             query=query,
             location=location,
             status='completed',
-            jobs_found=len(jobs_data),
+            jobs_found=jobs_found,
             jobs_new=batch_result.new_count,
             jobs_updated=batch_result.updated_count,
             duration_seconds=duration,
@@ -277,6 +286,9 @@ async def execute_scrape_run(
                 "duration_seconds": duration
             }
         })
+        # Rounds ingested before the failure are already saved
+        response_cache.invalidate(TAG_JOBS, TAG_COMPANIES, TAG_SCRAPE_RUNS)
+        job_facets.invalidate()
         
         logger.error(f"Run {run_id} failed after {duration:.1f}s: {detailed_error}")
         
@@ -1,8 +1,9 @@
 """
 Auto-calculate rankings for jobs that need it.
 
-This script checks for jobs with needs_ranking = TRUE and calculates their rankings.
-Can be run as a cron job or manually.
+This script checks whether job_postings changed since the last ranking run
+(ranking epoch, migration 069) or jobs are flagged needs_ranking = TRUE, and
+calculates their rankings incrementally. Can be run as a cron job or manually.
 """
 
 import sys
@@ -13,7 +14,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from loguru import logger
 from database.client import db
-from ranking.job_ranker import calculate_and_save_rankings, load_jobs_from_database
+from ranking.job_ranker import calculate_and_save_rankings, ranking_epoch_changed
 
 
 def check_jobs_needing_ranking():
@@ -33,19 +34,20 @@ def main():
     logger.info("AUTO RANKING CALCULATION")
     logger.info("="*60)
     
-    # Check if any jobs need ranking
+    # Check if anything changed since the last ranking run
+    epoch_changed = ranking_epoch_changed()
     jobs_needing_ranking = check_jobs_needing_ranking()
     
-    if jobs_needing_ranking == 0:
+    if not epoch_changed and jobs_needing_ranking == 0:
         logger.info("✅ No jobs need ranking. All rankings are up to date.")
         return
     
-    logger.info(f"Found {jobs_needing_ranking} jobs that need ranking")
+    logger.info(f"Found {jobs_needing_ranking} jobs that need ranking (job set changed: {epoch_changed})")
     logger.info("Starting ranking calculation...")
     
     try:
-        # Calculate rankings (this will use the updated load function)
-        num_ranked = calculate_and_save_rankings()
+        # Re-score flagged jobs, re-apply diversity and positions over all jobs
+        num_ranked = calculate_and_save_rankings(incremental=True)
         
         logger.info("="*60)
         logger.info(f"✅ SUCCESS: Ranked {num_ranked} jobs")
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark: last-seen lookup for ranking vs. job_scrape_history size.
+
+Compares the two ways the ranker can get the most recent scrape per job:
+1. Legacy: job_scrape_history probed in batches of 100 job ids, every history
+   row fetched and the newest kept in Python
+2. Aggregated: job_postings.last_scraped_at (migration 067), one value per job
+   read with keyset pagination
+
+To show how the legacy probe scales with history size, it is repeated over
+growing history windows (detected_at within the last N days); the row count of
+each window is reported next to its load time.
+
+Usage:
+    python scripts/benchmark_ranking_load.py [--windows 7 30 90 0] [--max-jobs 5000]
+    
+    A window of 0 means the full history.
+"""
+
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+from loguru import logger
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from database.client import db
+
+
+def load_active_job_ids(max_jobs: Optional[int] = None) -> List[str]:
+    """Active job ids in id order (keyset paged)"""
+    job_ids = []
+    last_id = None
+    
+    while True:
+        query = db.client.table("job_postings")\
+            .select("id")\
+            .eq("is_active", True)\
+            .order("id")\
+            .limit(1000)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        
+        rows = query.execute().data
+        job_ids.extend(row['id'] for row in rows)
+        
+        if len(rows) < 1000 or (max_jobs and len(job_ids) >= max_jobs):
+            break
+        last_id = rows[-1]['id']
+    
+    return job_ids[:max_jobs] if max_jobs else job_ids
+
+
+def count_history_rows(since: Optional[str]) -> int:
+    """Number of job_scrape_history rows in the window"""
+    query = db.client.table("job_scrape_history").select("id", count="exact").limit(1)
+    if since:
+        query = query.gte("detected_at", since)
+    return query.execute().count or 0
+
+
+def legacy_probe(job_ids: List[str], since: Optional[str]) -> int:
+    """Per-100 history probe as done by the ranker before migration 067"""
+    latest = {}
+    for i in range(0, len(job_ids), 100):
+        query = db.client.table("job_scrape_history")\
+            .select("job_posting_id, detected_at")\
+            .in_("job_posting_id", job_ids[i:i + 100])\
+            .order("detected_at", desc=True)
+        if since:
+            query = query.gte("detected_at", since)
+        
+        for row in query.execute().data:
+            latest.setdefault(row['job_posting_id'], row['detected_at'])
+    return len(latest)
+
+
+def aggregated_lookup(max_jobs: Optional[int] = None) -> int:
+    """One last_scraped_at value per active job"""
+    found = 0
+    total = 0
+    last_id = None
+    
+    while True:
+        query = db.client.table("job_postings")\
+            .select("id, last_scraped_at")\
+            .eq("is_active", True)\
+            .order("id")\
+            .limit(1000)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        
+        rows = query.execute().data
+        total += len(rows)
+        found += sum(1 for row in rows if row['last_scraped_at'])
+        
+        if len(rows) < 1000 or (max_jobs and total >= max_jobs):
+            break
+        last_id = rows[-1]['id']
+    
+    return found
+
+
+def run_benchmark(windows: List[int], max_jobs: Optional[int] = None):
+    """Run the benchmark and print a results table"""
+    job_ids = load_active_job_ids(max_jobs)
+    logger.info(f"Benchmarking last-seen lookup for {len(job_ids)} active jobs")
+    
+    start = time.perf_counter()
+    try:
+        aggregated_found = aggregated_lookup(max_jobs)
+        aggregated_seconds = time.perf_counter() - start
+    except Exception as e:
+        logger.warning(f"last_scraped_at not available (run migration 067): {e}")
+        aggregated_found, aggregated_seconds = None, None
+    
+    results = []
+    for days in windows:
+        since = (datetime.utcnow() - timedelta(days=days)).isoformat() if days else None
+        history_rows = count_history_rows(since)
+        
+        start = time.perf_counter()
+        found = legacy_probe(job_ids, since)
+        seconds = time.perf_counter() - start
+        
+        results.append((days, history_rows, found, seconds))
+        logger.info(f"Window {days or 'all'} days: {history_rows} history rows, {seconds:.2f}s")
+    
+    print()
+    print(f"{'window':>8} | {'history rows':>12} | {'jobs found':>10} | {'legacy probe':>12} | {'last_scraped_at':>15}")
+    print("-" * 71)
+    for days, history_rows, found, seconds in results:
+        window = f"{days}d" if days else "all"
+        aggregated = f"{aggregated_seconds:.2f}s" if aggregated_seconds is not None else "n/a"
+        print(f"{window:>8} | {history_rows:>12} | {found:>10} | {seconds:>11.2f}s | {aggregated:>15}")
+    
+    if aggregated_found is not None:
+        print(f"\nlast_scraped_at set for {aggregated_found} jobs (independent of history size)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark ranking last-seen lookup against job_scrape_history size"
+    )
+    parser.add_argument(
+        '--windows',
+        type=int,
+        nargs='+',
+        default=[7, 30, 90, 0],
+        help='History windows in days to probe (0 = full history, default: 7 30 90 0)'
+    )
+    parser.add_argument(
+        '--max-jobs',
+        type=int,
+        default=None,
+        help='Only benchmark the first N active jobs (default: all)'
+    )
+    
+    args = parser.parse_args()
+    run_benchmark(args.windows, args.max_jobs)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,12 @@
 
 from loguru import logger
 from database.client import db
-from ingestion.tech_stack_processor import process_tech_stack_for_job
+from ingestion.tech_stack_processor import process_tech_stack_for_jobs
 from uuid import UUID
 
+# Jobs per bulk write
+MIGRATION_BATCH_SIZE = 200
+
 
 def migrate_tech_stack():
     """
@@ -34,35 +37,42 @@ def migrate_tech_stack():
         success_count = 0
         error_count = 0
         
-        for i, enrichment in enumerate(result.data, 1):
-            job_id = enrichment["job_posting_id"]
+        for batch_start in range(0, total, MIGRATION_BATCH_SIZE):
+            batch = result.data[batch_start:batch_start + MIGRATION_BATCH_SIZE]
+            enrichments = {}
             
-            try:
-                # Parse PostgreSQL arrays
-                must_have_languages = _parse_postgres_array(enrichment.get("must_have_programmeertalen"))
-                nice_to_have_languages = _parse_postgres_array(enrichment.get("nice_to_have_programmeertalen"))
-                must_have_ecosystems = _parse_postgres_array(enrichment.get("must_have_ecosystemen"))
-                nice_to_have_ecosystems = _parse_postgres_array(enrichment.get("nice_to_have_ecosystemen"))
-                
-                # Create enrichment data structure
-                enrichment_data = {
-                    "must_have_languages": must_have_languages,
-                    "nice_to_have_languages": nice_to_have_languages,
-                    "must_have_ecosystems": must_have_ecosystems,
-                    "nice_to_have_ecosystems": nice_to_have_ecosystems
-                }
-                
-                # Process tech stack
-                process_tech_stack_for_job(UUID(job_id), enrichment_data)
+            for enrichment in batch:
+                job_id = enrichment.get("job_posting_id")
                 
-                success_count += 1
-                
-                if i % 10 == 0:
-                    logger.info(f"Progress: {i}/{total} jobs processed")
+                try:
+                    # Parse PostgreSQL arrays into the enrichment data structure
+                    enrichments[UUID(job_id)] = {
+                        "must_have_languages": _parse_postgres_array(enrichment.get("must_have_programmeertalen")),
+                        "nice_to_have_languages": _parse_postgres_array(enrichment.get("nice_to_have_programmeertalen")),
+                        "must_have_ecosystems": _parse_postgres_array(enrichment.get("must_have_ecosystemen")),
+                        "nice_to_have_ecosystems": _parse_postgres_array(enrichment.get("nice_to_have_ecosystemen"))
+                    }
+                except Exception as e:
+                    logger.error(f"Failed to migrate job {job_id}: {e}")
+                    error_count += 1
+            
+            if enrichments:
+                try:
+                    # One set of bulk statements per batch
+                    process_tech_stack_for_jobs(enrichments)
+                    success_count += len(enrichments)
                 
-            except Exception as e:
-                logger.error(f"Failed to migrate job {job_id}: {e}")
-                error_count += 1
+                except Exception as e:
+                    logger.warning(f"Bulk write failed for batch at {batch_start}, retrying per job: {e}")
+                    for job_id, enrichment_data in enrichments.items():
+                        try:
+                            process_tech_stack_for_jobs({job_id: enrichment_data})
+                            success_count += 1
+                        except Exception as e:
+                            logger.error(f"Failed to migrate job {job_id}: {e}")
+                            error_count += 1
+            
+            logger.info(f"Progress: {min(batch_start + MIGRATION_BATCH_SIZE, total)}/{total} jobs processed")
         
         logger.success(f"✅ Migration complete!")
         logger.success(f"   Total jobs: {total}")
@@ -0,0 +1,189 @@
+"""Pytest tests for the non-blocking database facade."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from database.async_client import AsyncDatabase
+
+
+class FakeBuilder:
+    """Minimal PostgREST builder: records the chain, `execute` returns it."""
+    
+    def __init__(self, chain=(), delay=0):
+        self.chain = chain
+        self.delay = delay
+    
+    def _step(self, *parts):
+        return FakeBuilder(self.chain + parts, self.delay)
+    
+    def table(self, name):
+        return self._step("table", name)
+    
+    def rpc(self, fn, params):
+        return self._step("rpc", fn, params)
+    
+    def select(self, columns, count=None):
+        return self._step("select", columns, count)
+    
+    def eq(self, column, value):
+        return self._step("eq", column, value)
+    
+    def is_(self, column, value):
+        return self._step("is", column, value)
+    
+    @property
+    def not_(self):
+        return self._step("not")
+    
+    def execute(self):
+        time.sleep(self.delay)
+        return SimpleNamespace(data=list(self.chain), thread=threading.current_thread().name)
+
+
+class FakeAsyncBuilder(FakeBuilder):
+    def _step(self, *parts):
+        return FakeAsyncBuilder(self.chain + parts, self.delay)
+    
+    async def execute(self):
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(data=list(self.chain), thread="event-loop")
+
+
+def make_db(delay=0, use_async_client=False):
+    return AsyncDatabase(SimpleNamespace(client=FakeBuilder(delay=delay)), max_workers=4, use_async_client=use_async_client)
+
+
+class TestAsyncDatabase:
+    """Test query replay and offloading."""
+    
+    @pytest.mark.asyncio
+    async def test_thread_pool_replays_chain(self):
+        """Test that the recorded chain, including the not_ property, runs on the sync client off the loop."""
+        adb = make_db()
+        
+        result = await adb.table("job_postings")\
+            .select("id", count="exact")\
+            .not_.is_("ranking_updated_at", "null")\
+            .execute()
+        
+        assert result.data == [
+            "table", "job_postings", "select", "id", "exact", "not", "is", "ranking_updated_at", "null"
+        ]
+        assert result.thread.startswith("db")
+    
+    @pytest.mark.asyncio
+    async def test_queries_can_branch(self):
+        """Test that extending a base query does not change it (incremental filter building)."""
+        adb = make_db()
+        base = adb.table("scrape_runs").select("*")
+        
+        filtered = await base.eq("status", "running").execute()
+        unfiltered = await base.execute()
+        
+        assert filtered.data[-3:] == ["eq", "status", "running"]
+        assert unfiltered.data == ["table", "scrape_runs", "select", "*", None]
+    
+    @pytest.mark.asyncio
+    async def test_slow_queries_do_not_block_the_loop(self):
+        """Test that concurrent slow queries overlap instead of running one after another."""
+        adb = make_db(delay=0.2)
+        
+        start = time.monotonic()
+        await asyncio.gather(*[adb.table("companies").select("id").execute() for _ in range(4)])
+        
+        assert time.monotonic() - start < 0.6
+    
+    @pytest.mark.asyncio
+    async def test_async_client_is_preferred(self, monkeypatch):
+        """Test that queries use the async client when available."""
+        adb = make_db(use_async_client=True)
+        monkeypatch.setattr(adb, "_async_client", lambda: FakeAsyncBuilder())
+        
+        result = await adb.rpc("get_ranking_epoch").execute()
+        
+        assert result.data == ["rpc", "get_ranking_epoch", {}]
+        assert result.thread == "event-loop"
+    
+    @pytest.mark.asyncio
+    async def test_run_offloads_helpers(self):
+        """Test that blocking helpers run in the database thread pool."""
+        adb = make_db()
+        
+        name = await adb.run(lambda suffix: threading.current_thread().name + suffix, suffix="!")
+        
+        assert name.startswith("db") and name.endswith("!")
+
+
+class TestQueryRunStats:
+    """Test the grouped per-query run stats."""
+    
+    RUNS = [
+        {"id": "r1", "search_query_id": "q1", "search_query": "data", "location_query": "Gent", "started_at": "2026-10-01", "jobs_found": 10},
+        {"id": "r2", "search_query_id": "q1", "search_query": "data", "location_query": "Gent", "started_at": "2026-10-02", "jobs_found": None},
+        {"id": "r3", "search_query_id": None, "search_query": "data", "location_query": "Gent", "started_at": "2026-10-03", "jobs_found": 5}
+    ]
+    QUERIES = [
+        {"id": "q1", "search_query": "data", "location_query": "Gent"},
+        {"id": "q2", "search_query": "bi", "location_query": "Leuven"}
+    ]
+    
+    @pytest.fixture
+    def adb(self, monkeypatch):
+        """Facade whose queries run against RUNS in memory; the RPC is missing."""
+        adb = make_db()
+        calls = []
+        
+        async def execute_steps(steps):
+            calls.append(steps[0][0])
+            if steps[0][0] == "rpc":
+                raise Exception("Could not find the function public.get_query_run_stats")
+            rows = list(self.RUNS)
+            limit = None
+            for name, call in steps[2:]:
+                args = call[0]
+                if name == "eq":
+                    rows = [row for row in rows if row[args[0]] == args[1]]
+                elif name == "order":
+                    rows.sort(key=lambda row: row[args[0]], reverse=True)
+                elif name == "limit":
+                    limit = args[0]
+            return SimpleNamespace(data=rows[:limit] if limit else rows)
+        
+        monkeypatch.setattr(adb, "execute_steps", execute_steps)
+        adb.calls = calls
+        return adb
+    
+    @pytest.mark.asyncio
+    async def test_rpc_rows_are_keyed_by_query(self, adb, monkeypatch):
+        """Test that one RPC call answers for every query."""
+        async def rpc_result(steps):
+            adb.calls.append(steps)
+            return SimpleNamespace(data=[{"search_query_id": "q1", "last_run": {"id": "r2"}, "total_jobs": 10, "run_count": 2}])
+        
+        monkeypatch.setattr(adb, "execute_steps", rpc_result)
+        
+        stats = await adb.get_query_run_stats(self.QUERIES)
+        
+        assert stats == {"q1": {"last_run": {"id": "r2"}, "total_jobs": 10, "run_count": 2}}
+        assert adb.calls == [(("rpc", (("get_query_run_stats", {"p_query_ids": ["q1", "q2"], "p_match_by_text": False}), {})),)]
+    
+    @pytest.mark.asyncio
+    async def test_fallback_matches_by_id(self, adb):
+        """Test the per-query fallback without migration 070 (Indeed: runs by search_query_id)."""
+        stats = await adb.get_query_run_stats(self.QUERIES)
+        
+        assert stats["q1"] == {"last_run": self.RUNS[1], "total_jobs": 10, "run_count": 2}
+        assert stats["q2"] == {"last_run": None, "total_jobs": 0, "run_count": 0}
+    
+    @pytest.mark.asyncio
+    async def test_fallback_matches_by_text(self, adb):
+        """Test that LinkedIn queries also count runs without a search_query_id."""
+        stats = await adb.get_query_run_stats(self.QUERIES, match_by_text=True)
+        
+        assert stats["q1"]["last_run"]["id"] == "r3"
+        assert stats["q1"]["total_jobs"] == 15
+        assert stats["q1"]["run_count"] == 3
@@ -2,6 +2,8 @@
 
 import pytest
 import asyncio
+import json
+import httpx
 from clients.mock_brightdata import MockBrightDataLinkedInClient
 from clients.brightdata_linkedin import (
     BrightDataLinkedInClient,
@@ -142,6 +144,70 @@ class TestRealBrightDataClient:
         assert issubclass(SnapshotTimeoutError, BrightDataError)
 
 
+class TestSnapshotStreaming:
+    """Test NDJSON snapshot streaming (HTTP mocked with httpx.MockTransport)."""
+    
+    def make_client(self, body, status_code=200):
+        """Real client whose HTTP calls return `body` for every request."""
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(status_code, content=body)
+        
+        client = BrightDataLinkedInClient(api_token="test_token", dataset_id="test_dataset")
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return client, requests
+    
+    @pytest.mark.asyncio
+    async def test_stream_results_filters_error_items(self):
+        """Test that jobs are yielded line by line and error items are dropped."""
+        lines = [
+            {"job_posting_id": "1", "job_title": "Data Engineer"},
+            {"error": "Page not found", "error_code": "dead_page"},
+            {"job_posting_id": "2", "job_title": "Data Analyst"}
+        ]
+        body = "\n".join(json.dumps(line) for line in lines) + "\n\n"
+        client, requests = self.make_client(body.encode())
+        
+        jobs = [job async for job in client.stream_results("snap_1")]
+        
+        assert [job["job_posting_id"] for job in jobs] == ["1", "2"]
+        assert requests[0].url.params["format"] == "ndjson"
+        await client.close()
+    
+    @pytest.mark.asyncio
+    async def test_stream_results_snapshot_building(self):
+        """Test that a snapshot that is still building raises BrightDataError."""
+        client, _ = self.make_client(json.dumps({"status": "building"}).encode())
+        
+        with pytest.raises(BrightDataError):
+            async for _ in client.stream_results("snap_1"):
+                pass
+        await client.close()
+    
+    @pytest.mark.asyncio
+    async def test_stream_results_http_error(self):
+        """Test that HTTP errors are wrapped in BrightDataError."""
+        client, _ = self.make_client(b"", status_code=500)
+        
+        with pytest.raises(BrightDataError):
+            async for _ in client.stream_results("snap_1"):
+                pass
+        await client.close()
+    
+    @pytest.mark.asyncio
+    async def test_mock_client_streams_snapshot(self):
+        """Test that the mock client streams the same jobs it downloads."""
+        client = MockBrightDataLinkedInClient()
+        snapshot_id = await client.trigger_collection("test", "test", limit=3)
+        await client.wait_until_ready(snapshot_id, poll_interval=1, timeout=10)
+        
+        streamed = [job async for job in client.stream_results(snapshot_id)]
+        
+        assert streamed == await client.download_results(snapshot_id)
+
+
 class TestClientFactory:
     """Test client factory functions."""
     
@@ -0,0 +1,357 @@
+"""Pytest tests for set-based bulk ingestion."""
+
+import asyncio
+
+import pytest
+from uuid import uuid4
+
+from ingestion import bulk_processor
+from ingestion.processor import VagueLocationMatcher, is_vague_location
+from database import client
+
+
+def make_raw_job(job_id, title="Data Engineer", company="Tech Corp", company_id="111", location="Brussels, Brussels, BE"):
+    """Minimal raw LinkedIn job as returned by Bright Data."""
+    return {
+        "job_posting_id": job_id,
+        "job_title": title,
+        "company_name": company,
+        "company_id": company_id,
+        "job_location": location,
+        "url": f"https://www.linkedin.com/jobs/view/{job_id}",
+        "job_num_applicants": 10
+    }
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """In-memory replacement for every lookup/write the bulk path makes."""
+    state = {
+        "companies": [],
+        "locations": [],
+        "jobs": {},           # dedup_key -> row
+        "sources": set(),     # job ids with the current source
+        "writes": {},         # table -> rows written
+        "upserts": {},
+        "last_seen": [],
+        "sources_seen": [],
+        "new_sources": [],
+        "fail": {}            # table -> predicate(rows) that makes the write raise
+    }
+    
+    def bulk_insert(table, rows, chunk_size=500):
+        state["writes"].setdefault(table, []).extend(rows)
+        return len(rows)
+    
+    def bulk_upsert(table, rows, on_conflict, ignore_duplicates=False, chunk_size=500):
+        if state["fail"].get(table, lambda rows: False)(rows):
+            raise RuntimeError(f"write to {table} failed")
+        # ON CONFLICT DO NOTHING is an insert that skips rows already written
+        target = state["writes"] if ignore_duplicates else state["upserts"]
+        existing = {row.get("id") or row.get("job_posting_id") for row in target.get(table, [])}
+        new_rows = [row for row in rows if not ignore_duplicates or (row.get("id") or row.get("job_posting_id")) not in existing]
+        target.setdefault(table, []).extend(new_rows)
+        return len(rows)
+    
+    monkeypatch.setattr(client.db, "get_vague_location_patterns", lambda: ["Belgium"])
+    monkeypatch.setattr(client.db, "get_companies_by_linkedin_ids", lambda ids: {
+        c["linkedin_company_id"]: c for c in state["companies"] if c["linkedin_company_id"] in ids
+    })
+    monkeypatch.setattr(client.db, "get_companies_by_names", lambda names: {
+        c["name"]: [c] for c in state["companies"] if c["name"] in names
+    })
+    monkeypatch.setattr(client.db, "get_company_locations", lambda ids: {})
+    monkeypatch.setattr(client.db, "get_locations_by_strings", lambda strings: {
+        l["full_location_string"]: l for l in state["locations"] if l["full_location_string"] in strings
+    })
+    monkeypatch.setattr(client.db, "bulk_insert", bulk_insert)
+    monkeypatch.setattr(client.db, "bulk_upsert", bulk_upsert)
+    monkeypatch.setattr(client.db, "update_jobs_last_seen", lambda ids, ts: state["last_seen"].extend(ids))
+    
+    monkeypatch.setattr(bulk_processor, "get_jobs_by_dedup_keys", lambda keys: {
+        k: v for k, v in state["jobs"].items() if k in keys
+    })
+    monkeypatch.setattr(bulk_processor, "get_jobs_with_source", lambda ids, source: {
+        i for i in ids if i in state["sources"]
+    })
+    monkeypatch.setattr(bulk_processor, "add_sources_to_jobs", lambda rows: state["new_sources"].extend(rows))
+    monkeypatch.setattr(bulk_processor, "update_sources_last_seen", lambda ids, source: state["sources_seen"].extend(ids))
+    
+    return state
+
+
+class TestProcessJobsBulk:
+    """Test bulk ingestion semantics against the per-row path."""
+    
+    def test_new_jobs_are_inserted_with_related_rows(self, fake_db):
+        """Test that unseen jobs produce inserts for every related table."""
+        raw_jobs = [
+            make_raw_job("1", title="Data Engineer"),
+            make_raw_job("2", title="Data Analyst")
+        ]
+        
+        result = bulk_processor.process_jobs_bulk(raw_jobs, uuid4())
+        
+        assert result.new_count == 2
+        assert result.updated_count == 0
+        assert len(fake_db["writes"]["companies"]) == 1
+        assert len(fake_db["writes"]["locations"]) == 1
+        assert len(fake_db["writes"]["job_postings"]) == 2
+        assert len(fake_db["writes"]["job_descriptions"]) == 2
+        assert len(fake_db["writes"]["llm_enrichment"]) == 2
+        assert len(fake_db["writes"]["job_scrape_history"]) == 2
+        assert len(fake_db["new_sources"]) == 2
+    
+    def test_duplicate_within_snapshot_counts_as_update(self, fake_db):
+        """Test that a repeated title+company in one snapshot behaves like the per-row path."""
+        raw_jobs = [
+            make_raw_job("1"),
+            make_raw_job("2")
+        ]
+        
+        result = bulk_processor.process_jobs_bulk(raw_jobs, uuid4())
+        
+        assert result.new_count == 1
+        assert result.updated_count == 1
+        assert len(fake_db["writes"]["job_postings"]) == 1
+        assert result.job_ids[0] == result.job_ids[1]
+        assert len(fake_db["writes"]["job_scrape_history"]) == 2
+    
+    def test_existing_job_with_source_only_updates_last_seen(self, fake_db):
+        """Test that an unchanged, already-known job only bumps last_seen_at."""
+        company = {"id": str(uuid4()), "name": "Tech Corp", "linkedin_company_id": "111"}
+        fake_db["companies"].append(company)
+        
+        job_id = str(uuid4())
+        fake_db["jobs"]["data engineer|tech corp"] = {
+            "id": job_id,
+            "title": "Data Engineer",
+            "num_applicants": 10,
+            "application_available": None
+        }
+        fake_db["sources"].add(job_id)
+        
+        result = bulk_processor.process_jobs_bulk([make_raw_job("1")], uuid4())
+        
+        assert result.updated_count == 1
+        assert "companies" not in fake_db["writes"]
+        assert "job_postings" not in fake_db["writes"]
+        assert "job_postings" not in fake_db["upserts"]
+        assert fake_db["last_seen"] == [job_id]
+        assert fake_db["sources_seen"] == [job_id]
+    
+    def test_changed_job_is_upserted(self, fake_db):
+        """Test that a known job with changed fields gets a full-data upsert."""
+        fake_db["companies"].append({"id": str(uuid4()), "name": "Tech Corp", "linkedin_company_id": "111"})
+        job_id = str(uuid4())
+        fake_db["jobs"]["data engineer|tech corp"] = {"id": job_id, "title": "Data Engineer", "num_applicants": 3}
+        fake_db["sources"].add(job_id)
+        
+        result = bulk_processor.process_jobs_bulk([make_raw_job("1")], uuid4())
+        
+        assert result.updated_count == 1
+        upserted = fake_db["upserts"]["job_postings"]
+        assert len(upserted) == 1
+        assert upserted[0]["id"] == job_id
+        assert upserted[0]["num_applicants"] == 10
+        assert fake_db["last_seen"] == []
+    
+    def test_validation_error_is_reported(self, fake_db):
+        """Test that invalid raw jobs are counted as errors without blocking the batch."""
+        raw_jobs = [
+            {"job_posting_id": "broken"},
+            make_raw_job("1")
+        ]
+        
+        result = bulk_processor.process_jobs_bulk(raw_jobs, uuid4())
+        
+        assert result.error_count == 1
+        assert result.new_count == 1
+    
+    def test_vague_locations_resolved_with_one_lookup(self, fake_db, monkeypatch):
+        """Test that overrides for all vague-location jobs come from a single company-location lookup."""
+        companies = [
+            {"id": str(uuid4()), "name": "Tech Corp", "linkedin_company_id": "111"},
+            {"id": str(uuid4()), "name": "Data Corp", "linkedin_company_id": "222"}
+        ]
+        fake_db["companies"].extend(companies)
+        lookups = []
+        
+        def get_company_locations(ids):
+            lookups.append(set(ids))
+            return {companies[0]["id"]: "Gent", companies[1]["id"]: "niet gevonden"}
+        
+        monkeypatch.setattr(client.db, "get_company_locations", get_company_locations)
+        raw_jobs = [
+            make_raw_job("1", location="Belgium"),
+            make_raw_job("2", company="Data Corp", company_id="222", location="Belgium"),
+            make_raw_job("3", title="Data Analyst", location="Brussels, Brussels, BE")
+        ]
+        
+        result = bulk_processor.process_jobs_bulk(raw_jobs, uuid4())
+        
+        assert result.new_count == 3
+        assert lookups == [{companies[0]["id"], companies[1]["id"]}]
+        overrides = [row["location_id_override"] for row in fake_db["writes"]["job_postings"]]
+        assert overrides[0] is not None
+        assert overrides[1:] == [None, None]
+
+
+    def test_failed_round_is_written_again_not_replayed_per_row(self, fake_db, monkeypatch):
+        """Test that a round failing after some writes finishes them instead of using the per-row path."""
+        attempts = []
+        
+        def add_sources(rows):
+            attempts.append(rows)
+            if len(attempts) == 1:
+                raise RuntimeError("connection reset")
+            fake_db["new_sources"].extend(rows)
+        
+        monkeypatch.setattr(bulk_processor, "add_sources_to_jobs", add_sources)
+        monkeypatch.setattr(bulk_processor, "process_job_posting", lambda *args, **kwargs: pytest.fail("per-row path used"))
+        raw_jobs = [
+            make_raw_job("1", title="Data Engineer"),
+            make_raw_job("2", title="Data Analyst")
+        ]
+        
+        result = bulk_processor.process_jobs_bulk(raw_jobs, uuid4())
+        
+        assert result.new_count == 2
+        assert len(attempts) == 2
+        assert len(fake_db["new_sources"]) == 2
+        assert len(fake_db["writes"]["job_postings"]) == 2
+        assert len(fake_db["writes"]["job_descriptions"]) == 2
+        assert len(fake_db["writes"]["llm_enrichment"]) == 2
+        assert len(fake_db["writes"]["job_scrape_history"]) == 2
+    
+    def test_bad_row_only_fails_its_job(self, fake_db):
+        """Test that a row rejected by the database fails its own job and the rest of the round is written."""
+        fake_db["fail"]["job_postings"] = lambda rows: any(row.get("title") == "Broken Engineer" for row in rows)
+        raw_jobs = [
+            make_raw_job("1", title="Data Engineer"),
+            make_raw_job("2", title="Broken Engineer"),
+            make_raw_job("3", title="Data Analyst")
+        ]
+        
+        result = bulk_processor.process_jobs_bulk(raw_jobs, uuid4())
+        
+        assert result.new_count == 2
+        assert result.error_count == 1
+        assert [job["title"] for job in fake_db["writes"]["job_postings"]] == ["Data Engineer", "Data Analyst"]
+        assert len(fake_db["writes"]["job_descriptions"]) == 2
+        assert len(fake_db["new_sources"]) == 2
+    
+    def test_written_master_data_is_cached(self, fake_db, monkeypatch):
+        """Test that per-row lookups after a bulk round find its companies and locations in a loaded cache."""
+        cache = client.MasterDataCache()
+        for namespace in ("companies_by_linkedin_id", "companies_by_name", "locations"):
+            cache.load(namespace, {})
+        monkeypatch.setattr(client.db, "master_data", cache)
+        fake_db["fail"]["locations"] = lambda rows: any("Gent" in row["full_location_string"] for row in rows)
+        raw_jobs = [
+            make_raw_job("1", company="Tech Corp", company_id="111"),
+            make_raw_job("2", company="Other Corp", company_id="222", location="Gent, Flanders, BE")
+        ]
+        
+        bulk_processor.process_jobs_bulk(raw_jobs, uuid4())
+        
+        company = fake_db["writes"]["companies"][0]
+        location = fake_db["writes"]["locations"][0]
+        assert client.db.get_cached_company_by_name("Tech Corp")["id"] == company["id"]
+        assert client.db.get_cached_company_by_linkedin_id("111")["id"] == company["id"]
+        assert client.db.get_cached_location_by_string(location["full_location_string"])["id"] == location["id"]
+        # The location that could not be written is not cached
+        assert len(fake_db["writes"]["locations"]) == 1
+        assert cache.stats()["by_namespace"]["locations"]["entries"] == 1
+
+
+class TestProcessJobsStream:
+    """Test ingestion of a snapshot that is still downloading."""
+    
+    @pytest.mark.asyncio
+    async def test_stream_matches_bulk(self, fake_db, monkeypatch):
+        """Test that streamed rounds give the same counts as a complete snapshot."""
+        monkeypatch.setattr(bulk_processor, "BULK_ROUND_SIZE", 2)
+        raw_jobs = [
+            make_raw_job("1", title="Data Engineer"),
+            make_raw_job("2", title="Data Engineer"),
+            make_raw_job("3", title="Data Analyst"),
+            {"job_posting_id": "broken"},
+            make_raw_job("5", title="Data Scientist")
+        ]
+        
+        async def download():
+            for raw_job in raw_jobs:
+                await asyncio.sleep(0)
+                yield raw_job
+        
+        result = await bulk_processor.process_jobs_stream(download(), uuid4())
+        
+        assert result.new_count == 3
+        assert result.updated_count == 1
+        assert result.error_count == 1
+        assert len(result.results) == 5
+    
+    @pytest.mark.asyncio
+    async def test_download_is_bounded_and_overlaps_ingestion(self, fake_db, monkeypatch):
+        """Test that the download waits for ingestion once the queue is full."""
+        monkeypatch.setattr(bulk_processor, "BULK_ROUND_SIZE", 1)
+        downloaded = []
+        ingested_before = []
+        
+        def process_round(round_jobs, scrape_run_id, source, vague_matcher):
+            ingested_before.append(len(downloaded))
+            return [bulk_processor.ProcessingResult(status="skipped") for _ in round_jobs]
+        
+        monkeypatch.setattr(bulk_processor, "_process_round", process_round)
+        
+        async def download():
+            for i in range(10):
+                downloaded.append(i)
+                yield make_raw_job(str(i))
+        
+        result = await bulk_processor.process_jobs_stream(download(), uuid4(), max_pending_rounds=2)
+        
+        assert len(result.results) == 10
+        # Ingestion of the first round starts long before the download finishes
+        assert ingested_before[0] < 10
+        assert all(count - index <= 4 for index, count in enumerate(ingested_before))
+    
+    @pytest.mark.asyncio
+    async def test_download_error_is_raised(self, fake_db, monkeypatch):
+        """Test that a failing download fails the run after ingesting what arrived."""
+        monkeypatch.setattr(bulk_processor, "BULK_ROUND_SIZE", 1)
+        
+        async def download():
+            yield make_raw_job("1")
+            raise RuntimeError("connection reset")
+        
+        with pytest.raises(RuntimeError):
+            await bulk_processor.process_jobs_stream(download(), uuid4())
+        
+        assert len(fake_db["writes"]["job_postings"]) == 1
+
+
+class TestVagueLocationMatcher:
+    """Test the compiled vague-location prefix matcher."""
+    
+    def test_prefix_match(self):
+        """Test that locations starting with a configured pattern are vague."""
+        matcher = VagueLocationMatcher(["Flemish Region", "Belgium", "Brussels-Capital Region"])
+        
+        assert matcher.match("  Flemish Region, Belgium") == "Flemish Region"
+        assert "Belgium" in matcher
+        assert "Gent, Flemish Region, Belgium" not in matcher
+        assert "" not in matcher
+    
+    def test_patterns_are_literal(self):
+        """Test that regex characters in patterns are matched literally."""
+        matcher = VagueLocationMatcher(["Belgium (Remote)", "B.E"])
+        
+        assert "Belgium (Remote)" in matcher
+        assert "BxE" not in matcher
+    
+    def test_empty_and_list_patterns(self):
+        """Test that no patterns never match and plain lists still work."""
+        assert "Belgium" not in VagueLocationMatcher([])
+        assert is_vague_location("Belgium", ["Belgium"])
@@ -0,0 +1,105 @@
+"""Pytest tests for the batched company master data CSV import."""
+
+import pytest
+
+from ingestion import company_csv_import
+from ingestion.company_csv_import import CsvImportError, import_company_master_data, inspect_company_csv, run_company_import
+from utils.background_jobs import BackgroundJobRegistry
+
+
+class FakeImportDb:
+    """db stand-in: companies by LinkedIn ID, existing master data and recorded upserts."""
+    
+    def __init__(self, companies, existing=(), failing=()):
+        self.companies = companies
+        self.existing = set(existing)
+        self.failing = set(failing)
+        self.lookups = []
+        self.upserts = []
+    
+    def get_companies_by_linkedin_ids(self, linkedin_ids):
+        linkedin_ids = list(linkedin_ids)
+        self.lookups.append(linkedin_ids)
+        return {i: {"id": self.companies[i]} for i in linkedin_ids if i in self.companies}
+    
+    def get_company_ids_with_master_data(self, company_ids):
+        return self.existing & set(company_ids)
+    
+    def bulk_upsert(self, table, rows, on_conflict, ignore_duplicates=False):
+        if any(row["company_id"] in self.failing for row in rows):
+            raise RuntimeError("constraint violation")
+        self.upserts.append(rows)
+        return rows
+
+
+def write_csv(tmp_path, text, encoding="utf-8"):
+    path = tmp_path / "import.csv"
+    path.write_bytes(text.encode(encoding))
+    return str(path)
+
+
+class TestCompanyCsvImport:
+    """Test file inspection, batching and error reporting."""
+    
+    def test_inspect_detects_format(self, tmp_path):
+        """Test delimiter, encoding and header detection."""
+        path = write_csv(tmp_path, "LinkedIn Company ID;Company Name;Industry;Gründungsjahr\n1;Müller;IT;\n", "latin-1")
+        
+        csv_file = inspect_company_csv(path)
+        
+        assert csv_file.delimiter == ";"
+        assert csv_file.encoding == "latin-1"
+        assert csv_file.header_map == {"linkedin_company_id": 0, "company_name": 1, "industry": 2}
+        assert csv_file.estimated_rows == 1
+    
+    def test_inspect_rejects_empty_file(self, tmp_path):
+        """Test that an empty file is a file-level error."""
+        with pytest.raises(CsvImportError):
+            inspect_company_csv(write_csv(tmp_path, ""))
+    
+    def test_batches_and_row_errors(self, tmp_path, monkeypatch):
+        """Test one lookup per batch, grouped upserts and per-row errors."""
+        fake_db = FakeImportDb({"1": "c-1", "2": "c-2", "3": "c-3"}, existing={"c-2"})
+        monkeypatch.setattr(company_csv_import, "db", fake_db)
+        monkeypatch.setattr(company_csv_import, "IMPORT_BATCH_SIZE", 2)
+        path = write_csv(tmp_path, "\n".join([
+            "LinkedIn Company ID,Company Name,Industry,Founded Year",
+            "1.0,Acme,IT,",
+            "2,Beta,Retail,ca. 1999",
+            ",,,",
+            "9,Ghost,IT,",
+            "3,Gamma,,",
+            "1,Acme,Software,"
+        ]))
+        
+        stats = import_company_master_data(inspect_company_csv(path))
+        
+        assert fake_db.lookups == [["1", "2"], ["9", "3"], ["1"]]
+        assert fake_db.upserts == [
+            [{"company_id": "c-1", "industry": "IT"}],
+            [{"company_id": "c-2", "industry": "Retail", "founded_year": 1999}],
+            [{"company_id": "c-1", "industry": "Software"}]
+        ]
+        assert stats["total_rows"] == 6
+        assert stats["skipped_rows"] == 2
+        assert stats["companies_not_found"] == 1
+        assert stats["master_data_created"] == 2
+        assert stats["master_data_updated"] == 1
+        assert stats["errors"] == [{"row": 5, "linkedin_id": "9", "company_name": "Ghost", "error": "Company not found in database"}]
+    
+    def test_failed_chunk_is_retried_per_row(self, tmp_path, monkeypatch):
+        """Test that one bad row does not fail the rest of its upsert chunk."""
+        fake_db = FakeImportDb({"1": "c-1", "2": "c-2"}, failing={"c-2"})
+        monkeypatch.setattr(company_csv_import, "db", fake_db)
+        job = BackgroundJobRegistry().create("company_import")
+        path = write_csv(tmp_path, "LinkedIn Company ID,Industry\n1,IT\n2,IT\n")
+        
+        run_company_import(job, inspect_company_csv(path))
+        
+        status = job.to_dict()
+        assert status["status"] == "completed"
+        assert status["progress"]["processed_rows"] == 2
+        assert fake_db.upserts == [[{"company_id": "c-1", "industry": "IT"}]]
+        assert status["result"]["stats"]["master_data_created"] == 1
+        assert status["result"]["stats"]["errors"] == [{"row": 3, "linkedin_id": "2", "error": "constraint violation"}]
+        assert not (tmp_path / "import.csv").exists()
@@ -0,0 +1,229 @@
+"""Pytest tests for the concurrent LLM enrichment pool."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+from ingestion import enrichment_pool, llm_enrichment
+from ingestion.llm_cache import LLMResponseCache
+from ingestion.enrichment_pool import (
+    AdaptiveConcurrency,
+    EnrichmentPool,
+    TokenBucket,
+    parse_reset_duration
+)
+
+
+def make_response(data, headers=None):
+    """Raw Responses API response with structured output"""
+    content = SimpleNamespace(type="output_text", text=json.dumps(data))
+    parsed = SimpleNamespace(output=[SimpleNamespace(type="message", content=[content])])
+    return SimpleNamespace(headers=headers or {}, parse=lambda: parsed)
+
+
+def make_rate_limit_error(headers=None):
+    request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return RateLimitError("Rate limit reached", response=response, body=None)
+
+
+class FakeAsyncClient:
+    """Async OpenAI client stub; `behaviour(job_input, call_number)` returns or raises."""
+    
+    def __init__(self, behaviour, delay=0.01):
+        self.behaviour = behaviour
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.responses = SimpleNamespace(with_raw_response=SimpleNamespace(create=self.create))
+    
+    async def create(self, prompt, input):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return self.behaviour(input, self.calls)
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def fake_db(monkeypatch, tmp_path):
+    """Replace the database helpers (and LLM cache) used by the pool; returns saved outcomes"""
+    saved = {}
+    monkeypatch.setattr(llm_enrichment, "llm_cache", LLMResponseCache(str(tmp_path / "llm_cache.sqlite3")))
+    
+    def load(job_id, force=False):
+        return f"description of {job_id}", None
+    
+    def complete(job_id, enrichment_data, error_message):
+        saved[job_id] = enrichment_data or error_message
+        if enrichment_data:
+            return {"success": True, "job_id": job_id, "data": enrichment_data}
+        return {"success": False, "job_id": job_id, "error": error_message}
+    
+    monkeypatch.setattr(enrichment_pool, "load_job_for_enrichment", load)
+    monkeypatch.setattr(enrichment_pool, "complete_job_enrichment", complete)
+    return saved
+
+
+class TestRateLimitHeaders:
+    """Test parsing of x-ratelimit-* headers."""
+    
+    @pytest.mark.parametrize("value,expected", [
+        ("20ms", 0.02),
+        ("1.5s", 1.5),
+        ("6m0s", 360.0),
+        ("1h2m3s", 3723.0)
+    ])
+    def test_parse_reset_duration(self, value, expected):
+        """Test OpenAI reset durations."""
+        assert parse_reset_duration(value) == pytest.approx(expected)
+    
+    def test_parse_reset_duration_invalid(self):
+        """Test that missing or unknown durations are ignored."""
+        assert parse_reset_duration(None) is None
+        assert parse_reset_duration("soon") is None
+    
+    def test_bucket_learns_from_headers(self):
+        """Test that an empty bucket waits for the refill rate implied by the headers."""
+        bucket = TokenBucket()
+        assert bucket.wait_time(1) == 0  # Unknown limits never block
+        
+        bucket.update("60", "0", "1s")
+        
+        assert bucket.capacity == 60
+        assert bucket.wait_time(1) == pytest.approx(1 / 60, rel=0.1)
+
+
+class TestAdaptiveConcurrency:
+    """Test AIMD concurrency limits."""
+    
+    @pytest.mark.asyncio
+    async def test_halves_and_recovers(self):
+        """Test that rate limits halve the limit and successes grow it back."""
+        concurrency = AdaptiveConcurrency(8)
+        
+        await concurrency.on_rate_limit()
+        await concurrency.on_rate_limit()
+        assert concurrency.limit == 2
+        
+        for _ in range(2):
+            await concurrency.on_success()
+        assert concurrency.limit == 3
+        
+        for _ in range(10):
+            await concurrency.on_rate_limit()
+        assert concurrency.limit == 1
+
+
+class TestEnrichmentPool:
+    """Test concurrent enrichment runs."""
+    
+    @pytest.mark.asyncio
+    async def test_runs_jobs_concurrently(self, fake_db):
+        """Test that jobs overlap and stats keep the batch_enrich_jobs shape."""
+        client = FakeAsyncClient(lambda job_input, call: make_response({"data_role_type": "Data Engineer"}))
+        pool = EnrichmentPool(concurrency=4, client=client)
+        
+        stats = await pool.run([f"job-{i}" for i in range(12)])
+        
+        assert stats["total"] == 12
+        assert stats["successful"] == 12
+        assert stats["failed"] == 0
+        assert [r["job_id"] for r in stats["results"]] == [f"job-{i}" for i in range(12)]
+        assert 1 < client.max_in_flight <= 4
+    
+    @pytest.mark.asyncio
+    async def test_rate_limit_reduces_concurrency_and_retries(self, fake_db):
+        """Test that a 429 halves concurrency and the job succeeds on retry."""
+        def behaviour(job_input, call):
+            if call == 1:
+                raise make_rate_limit_error({"retry-after-ms": "10"})
+            return make_response({"data_role_type": "Data Analyst"})
+        
+        client = FakeAsyncClient(behaviour)
+        pool = EnrichmentPool(concurrency=4, client=client)
+        
+        stats = await pool.run(["job-1"])
+        
+        assert stats["successful"] == 1
+        assert client.calls == 2
+        assert pool.concurrency.limit == 2
+    
+    @pytest.mark.asyncio
+    async def test_rate_limit_exhausted(self, fake_db):
+        """Test that jobs failing on every attempt are counted as rate limited."""
+        def behaviour(job_input, call):
+            raise make_rate_limit_error({"retry-after-ms": "1"})
+        
+        pool = EnrichmentPool(concurrency=2, max_retries=2, client=FakeAsyncClient(behaviour))
+        
+        stats = await pool.run(["job-1"])
+        
+        assert stats["failed"] == 1
+        assert stats["rate_limited"] == 1
+        assert "Rate limit exceeded" in fake_db["job-1"]
+    
+    @pytest.mark.asyncio
+    async def test_job_deadline(self, fake_db):
+        """Test that a job exceeding its deadline is saved as an error without blocking others."""
+        def behaviour(job_input, call):
+            return make_response({"ok": True})
+        
+        client = FakeAsyncClient(behaviour, delay=0.5)
+        pool = EnrichmentPool(concurrency=2, job_timeout=0.05, client=client)
+        
+        stats = await pool.run(["job-1", "job-2"])
+        
+        assert stats["failed"] == 2
+        assert all("timeout" in fake_db[job_id] for job_id in ["job-1", "job-2"])
+    
+    @pytest.mark.asyncio
+    async def test_deadline_excludes_slot_wait(self, fake_db):
+        """Test that jobs queued behind the concurrency limit do not time out while waiting."""
+        client = FakeAsyncClient(lambda job_input, call: make_response({"data_role_type": "Data Engineer"}), delay=0.2)
+        pool = EnrichmentPool(concurrency=1, job_timeout=0.3, client=client)
+        
+        stats = await pool.run(["job-1", "job-2", "job-3"])
+        
+        assert stats["successful"] == 3
+        assert client.max_in_flight == 1
+    
+    @pytest.mark.asyncio
+    async def test_cached_descriptions_skip_api(self, fake_db):
+        """Test that re-enriching the same description is served from the LLM cache."""
+        client = FakeAsyncClient(lambda job_input, call: make_response({"data_role_type": "Data Engineer"}))
+        pool = EnrichmentPool(concurrency=2, client=client)
+        
+        await pool.run(["job-1"])
+        stats = await pool.run(["job-1"])
+        
+        assert stats["successful"] == 1
+        assert client.calls == 1
+        assert fake_db["job-1"] == {"data_role_type": "Data Engineer"}
+    
+    @pytest.mark.asyncio
+    async def test_forced_retry_of_incomplete_result_asks_again(self, fake_db):
+        """Test that an answer without data role type is not cached and a forced retry calls the API."""
+        def behaviour(job_input, call):
+            return make_response({"data_role_type": None} if call == 1 else {"data_role_type": "Data Analyst"})
+        
+        client = FakeAsyncClient(behaviour)
+        pool = EnrichmentPool(concurrency=2, client=client)
+        
+        await pool.run(["job-1"])
+        assert fake_db["job-1"] == {"data_role_type": None}
+        
+        # Even a complete cached answer is skipped when forced
+        llm_enrichment.cache_enrichment("description of job-1", {"data_role_type": "Data Engineer"})
+        await pool.run(["job-1"], force=True)
+        
+        assert client.calls == 2
+        assert fake_db["job-1"] == {"data_role_type": "Data Analyst"}
@@ -0,0 +1,100 @@
+"""Pytest tests for the streaming CSV exports."""
+
+import csv
+import io
+from types import SimpleNamespace
+
+import pytest
+
+from web.exports import csv_chunks, keyset_pages, selection_pages
+from web.api.companies import company_export_row
+from web.api.jobs import job_export_row
+
+
+class FakeKeysetQuery:
+    """Immutable adb query stand-in over sorted rows; records each page request."""
+    
+    def __init__(self, rows, calls, after=None, limit=None):
+        self.rows = rows
+        self.calls = calls
+        self.after = after
+        self.page_limit = limit
+    
+    def gt(self, column, value):
+        return FakeKeysetQuery(self.rows, self.calls, value, self.page_limit)
+    
+    def in_(self, column, values):
+        return FakeKeysetQuery([row for row in self.rows if row["id"] in values], self.calls, self.after, self.page_limit)
+    
+    def order(self, column):
+        return self
+    
+    def limit(self, count):
+        return FakeKeysetQuery(self.rows, self.calls, self.after, count)
+    
+    async def execute(self):
+        self.calls.append(self.after)
+        rows = [row for row in self.rows if self.after is None or row["id"] > self.after]
+        return SimpleNamespace(data=rows[:self.page_limit])
+
+
+class TestKeysetExport:
+    """Test paging and incremental CSV encoding."""
+    
+    @pytest.mark.asyncio
+    async def test_pages_follow_last_id(self):
+        """Test that each page starts after the last id of the previous one."""
+        calls = []
+        rows = [{"id": f"id-{i:02d}"} for i in range(5)]
+        
+        pages = [page async for page in keyset_pages(FakeKeysetQuery(rows, calls), page_size=2)]
+        
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert calls == [None, "id-01", "id-03"]
+    
+    @pytest.mark.asyncio
+    async def test_selection_is_paged_in_id_chunks(self, monkeypatch):
+        """Test that an id selection is sent in in_() chunks and rows still come in id order."""
+        monkeypatch.setattr("web.exports.IN_FILTER_CHUNK_SIZE", 2)
+        calls = []
+        rows = [{"id": f"id-{i:02d}"} for i in range(6)]
+        
+        pages = [page async for page in selection_pages(FakeKeysetQuery(rows, calls), ["id-04", "id-00", "id-03", "id-05", "id-09"])]
+        
+        assert [[row["id"] for row in page] for page in pages] == [["id-00", "id-03"], ["id-04", "id-05"]]
+        assert len(calls) == 3
+    
+    @pytest.mark.asyncio
+    async def test_header_is_sent_before_the_first_query(self):
+        """Test that the first chunk is the header and each page becomes its own chunk."""
+        calls = []
+        rows = [{"id": f"id-{i}", "name": f"Company, {i}"} for i in range(3)]
+        chunks = csv_chunks(["ID", "Name"], keyset_pages(FakeKeysetQuery(rows, calls), page_size=2), lambda r: [r["id"], r["name"]])
+        
+        header = await chunks.__anext__()
+        assert header.strip() == "ID,Name"
+        assert calls == []
+        
+        rest = [chunk async for chunk in chunks]
+        assert len(rest) == 2
+        assert list(csv.reader(io.StringIO(header + "".join(rest))))[1:] == [[row["id"], row["name"]] for row in rows]
+    
+    def test_rows(self):
+        """Test that embedded one-to-one rows (list or dict) and list columns are flattened."""
+        company = company_export_row({
+            "linkedin_company_id": "111",
+            "name": "Acme",
+            "company_master_data": [{"industry": "IT", "ai_enriched": True}]
+        })
+        job = job_export_row({
+            "id": "j-1",
+            "title": "Data Engineer",
+            "is_active": True,
+            "companies": {"name": "Acme"},
+            "llm_enrichment": {"skills_must_have_en": ["SQL", "Python"], "enrichment_completed_at": "2026-01-01"}
+        })
+        
+        assert company[:3] == ["111", "Acme", "IT"] and company[-1] == "Yes"
+        assert job[:3] == ["j-1", "Data Engineer", "Acme"]
+        assert "SQL; Python" in job
+        assert job[-1] == "Yes"
@@ -0,0 +1,155 @@
+"""Pytest tests for the in-memory job facet index."""
+
+from datetime import datetime, timedelta, timezone
+
+from database.job_facets import JobFacetCache, JobFacetIndex, bitmap_of, popcount
+
+
+def job(job_id, title, seniority, ranking_position=None, ranking_score=None, days_ago=3, **extra):
+    posted = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    row = {
+        "id": job_id,
+        "title": title,
+        "seniority_level": seniority,
+        "employment_type": "Full-time",
+        "posted_date": posted.isoformat(),
+        "source": "linkedin",
+        "title_classification": "Data",
+        "company_id": "c-1",
+        "location_id": "l-1",
+        "ranking_position": ranking_position,
+        "ranking_score": ranking_score,
+        "locations": {"subdivision_name_en": "Flanders"},
+        "llm_enrichment": [],
+        "job_type_assignments": []
+    }
+    row.update(extra)
+    return row
+
+
+JOBS = [
+    job("j-1", "Data Engineer", "Mid-Senior level", 2, 0.8,
+        llm_enrichment=[{"type_datarol": "Data Engineer", "contract": "Vast", "enrichment_completed_at": "2026-10-01T08:00:00Z"}],
+        job_type_assignments=[{"job_type_id": "t-1"}, {"job_type_id": "t-2"}]),
+    job("j-2", "Senior Data Engineer", "Mid-Senior level", 1, 0.9, days_ago=20,
+        job_type_assignments=[{"job_type_id": "t-1"}]),
+    job("j-3", "Data Analyst", "Entry level", None, None, days_ago=0,
+        locations={"subdivision_name_en": "Wallonia"}),
+    job("j-4", "BI Analyst", "Entry level", 3, 0.5, source="indeed")
+]
+
+
+class TestJobFacetIndex:
+    """Test filtering, facet counts, ordering and incremental updates."""
+    
+    def test_bitmaps(self):
+        """Test that bitmaps hold one bit per document."""
+        assert bitmap_of([0, 3, 9]) == 0b1000001001
+        assert popcount(bitmap_of(range(100))) == 100
+        assert bitmap_of([]) == 0
+    
+    def test_filters_and_disjunctive_counts(self):
+        """Test that facets are ORed within, ANDed across, and counted without their own filter."""
+        index = JobFacetIndex.from_rows(JOBS)
+        
+        result = index.query({"seniority": ["Mid-Senior level"], "type_ids": ["t-1"]}, limit=10)
+        facets = result["facets"]
+        
+        assert sorted(result["job_ids"]) == ["j-1", "j-2"]
+        assert result["total"] == 2
+        # Seniority counted with the type filter only, type ids with the seniority filter only
+        assert facets["seniority"] == {"Mid-Senior level": 2}
+        assert facets["type_ids"] == {"t-1": 2, "t-2": 1}
+        assert facets["ai_enriched"] == {"true": 1, "false": 1}
+        assert facets["posted_date"] == {"today": 0, "week": 1, "month": 2}
+        assert "company_ids" not in facets
+        
+        both = index.query({"seniority": ["Mid-Senior level", "Entry level"], "source": ["indeed"]}, search="analyst")
+        assert both["job_ids"] == ["j-4"]
+        assert index.query({}, posted_date="week", facets=False)["total"] == 3
+    
+    def test_sort_and_paging_match_search_jobs(self):
+        """Test ranking order with unranked jobs last, descending order and offset pages."""
+        index = JobFacetIndex.from_rows(JOBS)
+        
+        assert index.query({}, limit=10)["job_ids"] == ["j-2", "j-1", "j-4", "j-3"]
+        assert index.query({}, sort_field="ranking_position", sort_direction="desc", limit=10)["job_ids"] == ["j-3", "j-4", "j-1", "j-2"]
+        assert index.query({}, sort_field="title", limit=2, offset=1)["job_ids"] == ["j-3", "j-1"]
+        assert index.query({}, limit=0)["job_ids"] == []
+    
+    def test_title_sort_ignores_case(self):
+        """Test that titles sort case-insensitively like the database collation."""
+        index = JobFacetIndex.from_rows([
+            job("j-1", "data engineer", "Entry level"),
+            job("j-2", "BI Analyst", "Entry level"),
+            job("j-3", "analytics engineer", "Entry level")
+        ])
+        
+        assert index.query({}, sort_field="title", limit=10)["job_ids"] == ["j-3", "j-2", "j-1"]
+    
+    def test_upsert_and_remove(self):
+        """Test that changed jobs move between facet values and removed jobs disappear."""
+        index = JobFacetIndex.from_rows(JOBS)
+        
+        index.upsert(job("j-3", "Data Analyst", "Mid-Senior level", 0, 1.0, days_ago=0))
+        index.upsert(job("j-5", "Data Scientist", "Entry level", 4, 0.4))
+        index.remove("j-2")
+        
+        result = index.query({}, limit=10)
+        assert result["job_ids"] == ["j-3", "j-1", "j-4", "j-5"]
+        assert result["facets"]["seniority"] == {"Mid-Senior level": 2, "Entry level": 2}
+        assert result["facets"]["subdivision_name_en"] == {"Flanders": 4}
+        assert index.size == 4
+
+
+class TestJobFacetCache:
+    """Test the shared index lifecycle."""
+    
+    def test_pending_refreshes_are_applied_before_queries(self):
+        """Test that refreshed jobs are re-read, and inactive or deleted ones dropped."""
+        current = {row["id"]: dict(row, is_active=True) for row in JOBS}
+        cache = JobFacetCache(
+            load_all=lambda: [row for row in current.values() if row["is_active"]],
+            load_some=lambda ids: [current[job_id] for job_id in ids if job_id in current]
+        )
+        cache.build()
+        
+        current["j-1"]["is_active"] = False
+        del current["j-4"]
+        current["j-6"] = dict(job("j-6", "Analytics Engineer", "Entry level", 5, 0.3), is_active=True)
+        cache.refresh_jobs(["j-1", "j-4", "j-6"])
+        
+        result = cache.query(filters={}, limit=10)
+        assert result["job_ids"] == ["j-2", "j-6", "j-3"]
+        assert cache.stats()["pending_refreshes"] == 0
+    
+    def test_refresh_during_build_reaches_new_index(self):
+        """Test that a job refreshed while the index loads is re-read after the swap."""
+        current = {row["id"]: dict(row) for row in JOBS}
+        
+        def load_all():
+            rows = [dict(row) for row in current.values()]
+            # The change lands after this snapshot was read, and a query on the old
+            # index consumes the refresh while the build is still running
+            current["j-3"]["seniority_level"] = "Mid-Senior level"
+            cache.refresh_jobs(["j-3"])
+            cache.query(filters={}, limit=10)
+            return rows
+        
+        cache = JobFacetCache(
+            load_all=lambda: [dict(row) for row in current.values()],
+            load_some=lambda ids: [current[job_id] for job_id in ids if job_id in current]
+        )
+        cache.build()
+        cache._load_all = load_all
+        cache.build()
+        
+        result = cache.query(filters={"seniority": ["Mid-Senior level"]}, limit=10)
+        assert "j-3" in result["job_ids"]
+        assert cache.stats()["pending_refreshes"] == 0
+    
+    def test_disabled_cache_answers_nothing(self):
+        """Test that a disabled index leaves the list to the database."""
+        cache = JobFacetCache(enabled=False, load_all=lambda: JOBS)
+        
+        assert cache.query(filters={}) is None
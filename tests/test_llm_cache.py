@@ -0,0 +1,74 @@
+"""Pytest tests for the persistent LLM response cache."""
+
+import time
+
+import pytest
+
+from ingestion.llm_cache import LLMResponseCache, cache_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Empty cache in a temporary SQLite file."""
+    return LLMResponseCache(str(tmp_path / "llm_cache.sqlite3"), max_entries=3, max_age_days=1)
+
+
+class TestLLMResponseCache:
+    """Test lookups, keys, eviction and counters."""
+    
+    def test_hit_and_miss_counters(self, cache):
+        """Test that stored outputs are returned and lookups are counted per prompt."""
+        assert cache.get("pmpt_a", "1", "Data Engineer") is None
+        cache.put("pmpt_a", "1", "Data Engineer", "Data")
+        
+        assert cache.get("pmpt_a", "1", "Data Engineer") == "Data"
+        
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+        assert stats["by_prompt"]["pmpt_a"] == {"hits": 1, "misses": 1}
+    
+    def test_key_includes_prompt_version(self, cache):
+        """Test that a new prompt version does not reuse old outputs."""
+        cache.put("pmpt_a", "1", "Data Engineer", "Data")
+        
+        assert cache.get("pmpt_a", "2", "Data Engineer") is None
+        assert cache.get("pmpt_b", "1", "Data Engineer") is None
+    
+    def test_input_normalization(self):
+        """Test that whitespace is ignored always and case only when requested."""
+        assert cache_key("p", "1", "Data  Engineer\n") == cache_key("p", "1", "Data Engineer")
+        assert cache_key("p", "1", "data engineer") != cache_key("p", "1", "Data Engineer")
+        assert cache_key("p", "1", "data engineer", casefold=True) == cache_key("p", "1", "Data Engineer", casefold=True)
+    
+    def test_expired_entries_are_misses(self, cache, monkeypatch):
+        """Test that entries older than max_age_days are not returned."""
+        cache.put("pmpt_a", "1", "Python", "95")
+        
+        later = time.time() + 2 * 86400
+        monkeypatch.setattr("ingestion.llm_cache.time.time", lambda: later)
+        
+        assert cache.get("pmpt_a", "1", "Python") is None
+        assert cache.stats()["entries"] == 0
+    
+    def test_evicts_least_recently_used(self, cache):
+        """Test that the least recently used entries are dropped above max_entries."""
+        for i, name in enumerate(["a", "b", "c", "d"]):
+            cache.put("pmpt_a", "1", name, str(i))
+            time.sleep(0.01)
+        cache.get("pmpt_a", "1", "a")  # Refresh "a", so "b" is the oldest
+        
+        cache.evict()
+        
+        assert cache.stats()["entries"] == 3
+        assert cache.get("pmpt_a", "1", "a") == "0"
+        assert cache.get("pmpt_a", "1", "b") is None
+    
+    def test_disabled_cache(self, tmp_path):
+        """Test that a disabled cache never stores or returns outputs."""
+        cache = LLMResponseCache(str(tmp_path / "off.sqlite3"), enabled=False)
+        cache.put("pmpt_a", "1", "x", "y")
+        
+        assert cache.get("pmpt_a", "1", "x") is None
+        assert not (tmp_path / "off.sqlite3").exists()
@@ -0,0 +1,162 @@
+"""Pytest tests for logo normalization, thumbnails and the logo cache."""
+
+import base64
+import io
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+
+from utils.logo_cache import (
+    InvalidLogoError,
+    LogoCache,
+    decode_logo_data,
+    encode_logo_data,
+    logo_hash,
+    normalize_logo,
+    render_thumbnail,
+    stored_logo_bytes,
+    thumbnail_size
+)
+from web import logos
+
+
+def make_png(width=800, height=400):
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(output, format="PNG")
+    return output.getvalue()
+
+
+class FakeLogoTable:
+    """adb.table() stand-in for one row; records the selected columns."""
+    
+    def __init__(self, row, calls):
+        self.row = row
+        self.calls = calls
+        self.columns = None
+    
+    def select(self, columns):
+        self.columns = columns
+        return self
+    
+    def eq(self, column, value):
+        return self
+    
+    def limit(self, count):
+        return self
+    
+    async def execute(self):
+        self.calls.append(self.columns)
+        return SimpleNamespace(data=[{
+            column.strip(): self.row.get(column.strip()) for column in self.columns.split(",")
+        }])
+
+
+class TestLogoImages:
+    """Test upload normalization and thumbnail rendering."""
+    
+    def test_normalize_downscales_to_png(self):
+        """Test that uploads are stored as PNG of at most 512 pixels."""
+        data, content_type = normalize_logo(make_png(2000, 1000), "image/jpeg")
+        
+        image = Image.open(io.BytesIO(data))
+        assert content_type == "image/png"
+        assert image.format == "PNG"
+        assert image.size == (512, 256)
+    
+    def test_normalize_keeps_svg_and_rejects_garbage(self):
+        """Test that SVGs pass through and non-images are refused."""
+        svg = b'<?xml version="1.0"?><svg xmlns="http://www.w3.org/2000/svg"></svg>'
+        
+        assert normalize_logo(svg, "image/svg+xml") == (svg, "image/svg+xml")
+        with pytest.raises(InvalidLogoError):
+            normalize_logo(b"not an image", "image/png")
+    
+    def test_thumbnail_is_fixed_size(self):
+        """Test that thumbnails are square and in the requested format."""
+        image = Image.open(io.BytesIO(render_thumbnail(make_png(), 64, "webp")))
+        
+        assert image.format == "WEBP"
+        assert image.size == (64, 64)
+        assert thumbnail_size(50) == 64
+        assert thumbnail_size(None) == thumbnail_size(4000) == 512
+    
+    def test_decode_legacy_formats(self):
+        """Test hex bytea, raw bytes and base64-in-bytea (old tech-stack uploads) decode to the image."""
+        png = make_png(10, 10)
+        legacy = base64.b64encode(png)
+        
+        assert stored_logo_bytes(encode_logo_data(png)) == png
+        assert decode_logo_data(png) == png
+        assert decode_logo_data(stored_logo_bytes(encode_logo_data(legacy))) == png
+
+
+class TestLogoCache:
+    """Test the disk + memory tiers."""
+    
+    def test_memory_lru_and_disk(self, tmp_path):
+        """Test that evicted entries are still served from disk."""
+        cache = LogoCache(str(tmp_path), memory_items=1)
+        cache.put("a.png", b"A")
+        cache.put("b.png", b"B")
+        
+        assert cache.get("b.png") == b"B"
+        assert cache.get("a.png") == b"A"
+        assert cache.get("missing.png") is None
+        assert cache.hits == {"memory": 1, "disk": 1}
+        assert cache.misses == 1
+    
+    def test_versions_expire(self, tmp_path):
+        """Test that a row's logo version is forgotten on invalidate."""
+        cache = LogoCache(str(tmp_path))
+        cache.set_version("companies", "c-1", None)
+        
+        assert cache.get_version("companies", "c-1") == (True, None)
+        cache.invalidate("companies", "c-1")
+        assert cache.get_version("companies", "c-1") == (False, None)
+
+
+class TestLogoResponse:
+    """Test ETags, 304s and the database reads of the logo endpoints."""
+    
+    @pytest.fixture
+    def logo_db(self, monkeypatch, tmp_path):
+        png = make_png()
+        row = {
+            "logo_data": encode_logo_data(png),
+            "logo_hash": logo_hash(png),
+            "logo_filename": "acme.png",
+            "logo_content_type": "image/png"
+        }
+        calls = []
+        monkeypatch.setattr(logos, "adb", SimpleNamespace(table=lambda name: FakeLogoTable(row, calls)))
+        monkeypatch.setattr(logos, "logo_cache", LogoCache(str(tmp_path)))
+        return SimpleNamespace(row=row, calls=calls)
+    
+    @pytest.mark.asyncio
+    async def test_blob_is_read_once(self, logo_db):
+        """Test that only the first request reads logo_data; later ones hit the cache or answer 304."""
+        request = SimpleNamespace(headers={"accept": "image/webp,*/*"})
+        
+        first = await logos.logo_response("companies", "c-1", request, size=64)
+        second = await logos.logo_response("companies", "c-1", request, size=64)
+        not_modified = await logos.logo_response(
+            "companies", "c-1", SimpleNamespace(headers={"if-none-match": first.headers["etag"]}), size=64, fmt="webp"
+        )
+        
+        assert first.media_type == "image/webp"
+        assert first.body == second.body
+        assert first.headers["etag"].startswith(f'"{logo_db.row["logo_hash"][:32]}-64-webp')
+        assert "max-age" in first.headers["cache-control"]
+        assert not_modified.status_code == 304
+        assert sum("logo_data" in columns for columns in logo_db.calls) == 1
+    
+    @pytest.mark.asyncio
+    async def test_missing_logo(self, logo_db):
+        """Test that a row without logo is a 404."""
+        logo_db.row.update(logo_data=None, logo_hash=None)
+        
+        with pytest.raises(HTTPException) as error:
+            await logos.logo_response("companies", "c-1", SimpleNamespace(headers={}))
+        assert error.value.status_code == 404
@@ -0,0 +1,166 @@
+"""Pytest tests for the process-wide master-data cache."""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from database import client
+from database.client import MasterDataCache
+
+
+class TestMasterDataCache:
+    """Test cache semantics independent of the database."""
+    
+    def test_positive_and_negative_entries(self):
+        """Test that rows and known misses are both served from the cache."""
+        cache = MasterDataCache()
+        
+        assert cache.get("locations", "Gent, Belgium") == (False, None)
+        
+        cache.put("locations", "Gent, Belgium", {"id": "loc-1"})
+        cache.put("locations", "Nowhere", None)
+        
+        assert cache.get("locations", "Gent, Belgium") == (True, {"id": "loc-1"})
+        assert cache.get("locations", "Nowhere") == (True, None)
+        assert cache.stats()["by_namespace"]["locations"] == {
+            "entries": 2, "loaded": False, "hits": 2, "misses": 1
+        }
+    
+    def test_negative_entries_expire_first(self):
+        """Test that misses use the shorter negative TTL."""
+        cache = MasterDataCache(ttl_seconds=60, negative_ttl_seconds=0.01)
+        cache.put("ecosystems", "Azure", {"id": "eco-1"})
+        cache.put("ecosystems", "Unknown", None)
+        
+        time.sleep(0.02)
+        
+        assert cache.get("ecosystems", "Azure") == (True, {"id": "eco-1"})
+        assert cache.get("ecosystems", "Unknown") == (False, None)
+    
+    def test_loaded_namespace_is_complete(self):
+        """Test that a key absent from a bulk-loaded namespace is a known miss until the TTL expires."""
+        cache = MasterDataCache(ttl_seconds=0.05)
+        cache.load("programming_languages", {"Python": {"id": "lang-1"}})
+        
+        assert not cache.should_load("programming_languages")
+        assert cache.get("programming_languages", "Cobol") == (True, None)
+        
+        time.sleep(0.06)
+        
+        assert cache.should_load("programming_languages")
+        assert cache.get("programming_languages", "Cobol") == (False, None)
+    
+    def test_put_without_replace_keeps_existing_row(self):
+        """Test that a duplicate company name keeps the cached best match."""
+        cache = MasterDataCache()
+        cache.put("companies_by_name", "Acme", {"id": "best"})
+        cache.put("companies_by_name", "Acme", {"id": "newer"}, replace=False)
+        cache.put("companies_by_name", "Other", None)
+        cache.put("companies_by_name", "Other", {"id": "new"}, replace=False)
+        
+        assert cache.get("companies_by_name", "Acme") == (True, {"id": "best"})
+        assert cache.get("companies_by_name", "Other") == (True, {"id": "new"})
+    
+    def test_disabled(self):
+        """Test that a disabled cache never answers."""
+        cache = MasterDataCache(enabled=False)
+        cache.put("locations", "Gent, Belgium", {"id": "loc-1"})
+        
+        assert cache.get("locations", "Gent, Belgium") == (False, None)
+        assert not cache.should_load("locations")
+
+
+class TestCachedLookups:
+    """Test the cached SupabaseClient lookups."""
+    
+    @pytest.fixture
+    def db(self, monkeypatch):
+        """Global client with a fresh cache; bulk loads and per-key queries are counted."""
+        db = client.db
+        calls = {"select_all": [], "per_key": []}
+        tables = {
+            "locations": [{"id": "loc-1", "full_location_string": "Gent, Belgium"}],
+            "companies": [
+                {"id": "c-1", "name": "Acme", "linkedin_company_id": "111"},
+                {"id": "c-2", "name": "Acme", "linkedin_company_id": None}
+            ],
+            "job_types": [
+                {"id": "t-1", "name": "Data", "color": "#3B82F6"},
+                {"id": "t-2", "name": "BI", "color": "#10B981"}
+            ]
+        }
+        
+        def select_all(table, columns, where=None, page_size=1000):
+            calls["select_all"].append(table)
+            if where:
+                # Only the logo filter is used: pretend c-2 has a logo
+                return [{"id": "c-2"}]
+            return [dict(row) for row in tables[table]]
+        
+        def get_locations_by_strings(strings):
+            calls["per_key"].extend(strings)
+            return {}
+        
+        monkeypatch.setattr(db, "master_data", MasterDataCache())
+        monkeypatch.setattr(db, "_select_all", select_all)
+        monkeypatch.setattr(db, "get_locations_by_strings", get_locations_by_strings)
+        return SimpleNamespace(db=db, calls=calls)
+    
+    def test_warm_load_answers_without_queries(self, db):
+        """Test that one bulk load serves every later lookup, including misses."""
+        assert db.db.get_cached_location_by_string("Gent, Belgium")["id"] == "loc-1"
+        assert db.db.get_cached_location_by_string("Antwerpen, Belgium") is None
+        assert db.db.get_cached_location_by_string("Gent, Belgium")["id"] == "loc-1"
+        
+        assert db.calls["select_all"] == ["locations"]
+        assert db.calls["per_key"] == []
+    
+    def test_companies_by_name_prefer_logo(self, db):
+        """Test that warm-loaded companies keep the get_company_by_name preference."""
+        assert db.db.get_cached_company_by_name("Acme")["id"] == "c-2"
+        assert db.db.get_cached_company_by_linkedin_id("111")["id"] == "c-1"
+    
+    def test_failed_warm_load_falls_back_to_per_key_lookups(self, db, monkeypatch):
+        """Test that lookups still work (and cache misses) when the bulk load fails."""
+        def failing_select_all(*args, **kwargs):
+            raise Exception("relation does not exist")
+        
+        monkeypatch.setattr(db.db, "_select_all", failing_select_all)
+        
+        assert db.db.get_cached_location_by_string("Gent, Belgium") is None
+        assert db.db.get_cached_location_by_string("Gent, Belgium") is None
+        
+        assert db.calls["per_key"] == ["Gent, Belgium"]
+    
+    def test_inserted_location_is_cached(self, db, monkeypatch):
+        """Test that inserts update the cache so the next job reuses the new row."""
+        insert_result = SimpleNamespace(data=[{"id": "00000000-0000-0000-0000-000000000001"}])
+        table = SimpleNamespace(insert=lambda data: SimpleNamespace(execute=lambda: insert_result))
+        monkeypatch.setattr(db.db, "client", SimpleNamespace(table=lambda name: table))
+        
+        assert db.db.get_cached_location_by_string("Leuven, Belgium") is None
+        db.db.insert_location({"full_location_string": "Leuven, Belgium"})
+        
+        assert db.db.get_cached_location_by_string("Leuven, Belgium")["id"] == "00000000-0000-0000-0000-000000000001"
+    
+    def test_job_types_for_runs_listing(self, db):
+        """Test that job types for a page of runs come from one bulk load."""
+        job_types = db.db.get_cached_job_types(["t-1", "t-2", "t-1", "t-gone"])
+        job_types_again = db.db.get_cached_job_types(["t-2"])
+        
+        assert set(job_types) == {"t-1", "t-2"}
+        assert job_types_again["t-2"]["name"] == "BI"
+        assert db.calls["select_all"] == ["job_types"]
+    
+    def test_assign_job_type_is_one_bulk_write(self, db, monkeypatch):
+        """Test that a run's job-type assignment is one ON CONFLICT DO NOTHING upsert."""
+        calls = []
+        monkeypatch.setattr(db.db, "bulk_upsert", lambda *args, **kwargs: calls.append((args, kwargs)) or len(args[1]))
+        
+        assert db.db.assign_job_type(["j-1", "j-2", "j-1"], "t-1") == 2
+        
+        (table, rows), kwargs = calls[0]
+        assert table == "job_type_assignments"
+        assert [row["job_posting_id"] for row in rows] == ["j-1", "j-2"]
+        assert kwargs == {"on_conflict": "job_posting_id,job_type_id", "ignore_duplicates": True}
@@ -0,0 +1,89 @@
+"""Pytest tests for keyset pagination and count modes."""
+
+import pytest
+
+from database.client import job_sort_keys
+from database.pagination import (
+    InvalidCursorError,
+    SortKey,
+    apply_keyset,
+    count_method,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+    next_cursor
+)
+
+
+class RecordingQuery:
+    """Builder stand-in that records filter and order calls."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def or_(self, filters):
+        self.calls.append(("or", filters))
+        return self
+    
+    def order(self, column, desc=False, nullsfirst=False):
+        self.calls.append(("order", column, desc, nullsfirst))
+        return self
+
+
+class TestKeysetPagination:
+    """Test cursors and the generated PostgREST filters."""
+    
+    def test_cursor_round_trip(self):
+        """Test that a cursor holds the last row's sort values and only fits its own sort order."""
+        keys = [SortKey("name"), SortKey("id")]
+        rows = [{"id": "a", "name": "Acme"}, {"id": "b", "name": "Beta, Inc."}]
+        
+        cursor = next_cursor(rows, keys, limit=2)
+        
+        assert decode_cursor(keys, cursor) == ["Beta, Inc.", "b"]
+        assert next_cursor(rows, keys, limit=3) is None
+        with pytest.raises(InvalidCursorError):
+            decode_cursor([SortKey("city"), SortKey("id")], cursor)
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(keys, "not-a-cursor")
+    
+    def test_filter_expands_tuple_comparison(self):
+        """Test the or/and expansion with quoted values and NULLS LAST on ascending keys."""
+        keys = [SortKey("name"), SortKey("id", desc=True)]
+        
+        assert keyset_filter(keys, ["Beta, Inc.", "b"]) == (
+            'or(name.gt."Beta, Inc.",name.is.null),and(name.eq."Beta, Inc.",id.lt."b")'
+        )
+    
+    def test_filter_with_null_sort_values(self):
+        """Test that rows after a NULL only continue within the NULLs (or past them when NULLs sort first)."""
+        ranking = job_sort_keys("ranking_position", "asc")
+        
+        assert [key.column for key in ranking] == ["ranking_position", "ranking_score", "id"]
+        assert keyset_filter(ranking, [None, None, "j-1"]) == (
+            "and(ranking_position.is.null,ranking_score.not.is.null),"
+            'and(ranking_position.is.null,ranking_score.is.null,id.gt."j-1")'
+        )
+        assert keyset_filter(ranking, [3, 0.5, "j-1"]).startswith(
+            "or(ranking_position.gt.3,ranking_position.is.null),and(ranking_position.eq.3,ranking_score.lt.0.5)"
+        )
+    
+    def test_apply_orders_like_the_filter(self):
+        """Test that the ORDER BY matches the keys and the filter is only added with a cursor."""
+        keys = job_sort_keys("posted_date", "desc")
+        plain = RecordingQuery()
+        paged = RecordingQuery()
+        
+        apply_keyset(plain, keys)
+        apply_keyset(paged, keys, encode_cursor(keys, {"posted_date": "2026-10-01T08:00:00+00:00", "id": "j-9"}))
+        
+        assert plain.calls == [("order", "posted_date", True, False), ("order", "id", False, False)]
+        assert paged.calls[0] == ("or", 'posted_date.lt."2026-10-01T08:00:00+00:00",and(posted_date.eq."2026-10-01T08:00:00+00:00",id.gt."j-9")')
+        assert paged.calls[1:] == plain.calls
+    
+    def test_count_modes(self):
+        """Test that count=none skips the count and unknown modes are refused."""
+        assert count_method("estimated") == "estimated"
+        assert count_method("none") is None
+        with pytest.raises(ValueError):
+            count_method("fuzzy")
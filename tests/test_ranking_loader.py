@@ -0,0 +1,230 @@
+"""Pytest tests for loading ranking input from the database."""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from ranking import job_ranker
+from ranking.job_ranker import JobRankingSystem, job_from_ranking_row
+
+
+class FakeQuery:
+    """Minimal PostgREST query builder over an in-memory list of rows."""
+    
+    def __init__(self, table, log):
+        self.table = table
+        self.log = log
+        self.filters = []
+        self.page_size = None
+        self.desc = False
+    
+    def select(self, columns):
+        return self
+    
+    def order(self, column, desc=False):
+        self.desc = desc
+        return self
+    
+    def limit(self, size):
+        self.page_size = size
+        return self
+    
+    def gt(self, column, value):
+        self.filters.append(lambda row: row[column] > value)
+        return self
+    
+    def in_(self, column, values):
+        self.filters.append(lambda row: row[column] in values)
+        return self
+    
+    def execute(self):
+        self.log.append(self.table["name"])
+        if self.table["rows"] is None:
+            raise Exception(f"relation \"{self.table['name']}\" does not exist")
+        rows = sorted(
+            (r for r in self.table["rows"] if all(f(r) for f in self.filters)),
+            key=lambda r: r["id"],
+            reverse=self.desc
+        )
+        if self.page_size is not None:
+            rows = rows[:self.page_size]
+        return SimpleNamespace(data=rows)
+
+
+def make_row(job_id, **overrides):
+    """Slim ranking view row"""
+    row = {
+        "id": job_id,
+        "title": "Data Engineer",
+        "company_id": "c1",
+        "company_name": "Acme",
+        "location_id": "l1",
+        "posted_date": "2025-11-20T10:00:00",
+        "is_active": True,
+        "title_classification": "Data",
+        "enrichment_completed_at": "2025-11-20T11:00:00+00:00",
+        "data_role_type": "Data Engineer",
+        "labels": {"nl": {"seniority": ["Senior"]}},
+        "has_logo": True,
+        "description_len": 1200
+    }
+    row.update(overrides)
+    return row
+
+
+@pytest.fixture
+def fake_views(monkeypatch):
+    """job_ranking_input_view / job_ranking_view backed by lists (None = missing view)"""
+    tables = {
+        "job_ranking_input_view": {"name": "job_ranking_input_view", "rows": []},
+        "job_ranking_view": {"name": "job_ranking_view", "rows": []},
+        "job_scrape_history": {"name": "job_scrape_history", "rows": []}
+    }
+    log = []
+    fake_client = SimpleNamespace(table=lambda name: FakeQuery(tables[name], log))
+    monkeypatch.setattr(job_ranker, "db", SimpleNamespace(client=fake_client))
+    return tables, log
+
+
+class TestIterRankingRows:
+    """Test keyset paging and the legacy view fallback."""
+    
+    def test_pages_by_keyset(self, fake_views):
+        """Test that all rows are returned exactly once across pages."""
+        tables, log = fake_views
+        tables["job_ranking_input_view"]["rows"] = [make_row(f"{i:04d}") for i in range(2500)]
+        
+        pages = list(job_ranker.iter_ranking_rows())
+        
+        assert [len(p) for p in pages] == [1000, 1000, 500]
+        assert [r["id"] for p in pages for r in p] == [f"{i:04d}" for i in range(2500)]
+        assert set(log) == {"job_ranking_input_view"}
+    
+    def test_falls_back_to_legacy_view(self, fake_views):
+        """Test that the full view is used when migration 066 has not been run."""
+        tables, log = fake_views
+        tables["job_ranking_input_view"]["rows"] = None
+        tables["job_ranking_view"]["rows"] = [
+            make_row("1", has_logo=None, description_len=None, company_logo_data="\\x89", description_text="x" * 600)
+        ]
+        
+        jobs = job_ranker.load_jobs_by_ids(["1"])
+        
+        assert log == ["job_ranking_input_view", "job_ranking_view"]
+        assert jobs[0].has_logo
+        assert jobs[0].description_len == 600
+
+
+class TestLastScrapedAt:
+    """Test the last-seen lookup during the ranking load."""
+    
+    def test_uses_maintained_column(self, fake_views):
+        """Test that last_scraped_at from the view is used without history queries."""
+        tables, log = fake_views
+        tables["job_ranking_input_view"]["rows"] = [
+            make_row("1", last_scraped_at="2025-11-21T08:00:00+00:00"),
+            make_row("2", last_scraped_at=None)
+        ]
+        
+        jobs = job_ranker.load_jobs_from_database()
+        
+        assert "job_scrape_history" not in log
+        assert jobs[0].scraped_at == datetime(2025, 11, 21, 8, 0)
+        assert jobs[1].scraped_at is None
+    
+    def test_probes_history_without_column(self, fake_views):
+        """Test that the newest history row is used when migration 067 has not been run."""
+        tables, log = fake_views
+        tables["job_ranking_input_view"]["rows"] = [make_row("1")]
+        tables["job_scrape_history"]["rows"] = [
+            {"id": "h1", "job_posting_id": "1", "detected_at": "2025-11-20T08:00:00"},
+            {"id": "h2", "job_posting_id": "1", "detected_at": "2025-11-21T08:00:00"}
+        ]
+        
+        jobs = job_ranker.load_jobs_from_database()
+        
+        assert "job_scrape_history" in log
+        assert jobs[0].scraped_at is not None
+    
+    def test_empty_id_chunk(self, fake_views, monkeypatch):
+        """Test that an id chunk whose jobs were deleted meanwhile returns no rows without failing."""
+        monkeypatch.setattr(job_ranker, "load_ranking_snapshot", lambda: [
+            {"id": "1", "needs_ranking": True},
+            {"id": "2", "needs_ranking": True}
+        ])
+        monkeypatch.setattr(job_ranker, "iter_ranking_rows", lambda job_ids: iter([
+            [],
+            [make_row("2", last_scraped_at="2025-11-21T08:00:00+00:00")]
+        ]))
+        
+        jobs = job_ranker.load_jobs_from_database(only_needs_ranking=True)
+        
+        assert [job.id for job in jobs] == ["2"]
+
+
+class TestRankingEpoch:
+    """Test detection of job set changes since the last ranking run."""
+    
+    @pytest.fixture
+    def fake_rpc(self, monkeypatch):
+        """db.client.rpc backed by a dict of function name -> result (Exception = missing)"""
+        functions = {}
+        calls = []
+        
+        def rpc(name, params):
+            calls.append((name, params))
+            result = functions[name]
+            if isinstance(result, Exception):
+                raise result
+            return SimpleNamespace(execute=lambda: SimpleNamespace(data=result))
+        
+        monkeypatch.setattr(job_ranker, "db", SimpleNamespace(client=SimpleNamespace(rpc=rpc)))
+        return functions, calls
+    
+    def test_epoch_comparison(self, fake_rpc):
+        """Test that rankings are stale only when the epoch moved past the ranked epoch."""
+        functions, _ = fake_rpc
+        
+        functions["get_ranking_epoch"] = {"epoch": 42, "ranked_epoch": 42, "ranked_at": None}
+        assert not job_ranker.ranking_epoch_changed()
+        
+        functions["get_ranking_epoch"] = {"epoch": 43, "ranked_epoch": 42, "ranked_at": None}
+        assert job_ranker.ranking_epoch_changed()
+    
+    def test_missing_migration_counts_as_changed(self, fake_rpc):
+        """Test that an unavailable epoch never suppresses a ranking run."""
+        functions, _ = fake_rpc
+        functions["get_ranking_epoch"] = Exception("function get_ranking_epoch() does not exist")
+        
+        assert job_ranker.ranking_epoch_changed()
+    
+    def test_run_records_epoch_read_before_loading(self, fake_rpc, monkeypatch):
+        """Test that a ranking run records the epoch it started from."""
+        functions, calls = fake_rpc
+        functions["get_ranking_epoch"] = {"epoch": 7, "ranked_epoch": 5, "ranked_at": None}
+        functions["record_ranked_epoch"] = None
+        monkeypatch.setattr(job_ranker, "load_jobs_from_database", lambda: [])
+        monkeypatch.setattr(job_ranker, "save_rankings_to_database", lambda jobs: None)
+        
+        job_ranker.calculate_and_save_rankings()
+        
+        assert ("record_ranked_epoch", {"p_epoch": 7}) in calls
+
+
+class TestJobFromRankingRow:
+    """Test conversion of slim view rows."""
+    
+    def test_slim_row_scores_like_full_row(self):
+        """Test that has_logo/description_len score the same as the blobs they replace."""
+        ranker = JobRankingSystem()
+        slim = job_from_ranking_row(make_row("1"))
+        full = job_from_ranking_row(make_row(
+            "1", has_logo=None, description_len=None,
+            company_logo_data="\\x89504e47", description_text="x" * 1200
+        ))
+        
+        assert slim.description_text is None
+        assert slim.seniority == "Senior"
+        assert ranker.calculate_quality_score(slim) == ranker.calculate_quality_score(full)
+        assert ranker.calculate_transparency_score(slim) == ranker.calculate_transparency_score(full)
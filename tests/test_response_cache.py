@@ -0,0 +1,119 @@
+"""Pytest tests for the dashboard stats response cache."""
+
+import asyncio
+import time
+
+import pytest
+
+from utils.response_cache import ResponseCache
+
+
+class Counts:
+    """Async compute function counting its calls."""
+    
+    def __init__(self, delay=0.01, error=None):
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+    
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"total_jobs": self.calls}
+
+
+class TestResponseCache:
+    """Test TTLs, single flight and invalidation."""
+    
+    @pytest.mark.asyncio
+    async def test_hits_are_served_from_memory(self):
+        """Test that a second call within the TTL does not recompute."""
+        cache = ResponseCache(ttl_seconds=60)
+        compute = Counts()
+        
+        first = await cache.get_or_compute("db_stats", compute)
+        second = await cache.get_or_compute("db_stats", compute)
+        
+        assert first == second == {"total_jobs": 1}
+        assert compute.calls == 1
+        assert cache.stats()["by_key"]["db_stats"] == {"hits": 1, "misses": 1}
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_compute(self):
+        """Test single-flight coalescing of simultaneous dashboard loads."""
+        cache = ResponseCache()
+        compute = Counts(delay=0.05)
+        
+        results = await asyncio.gather(*[cache.get_or_compute("db_stats", compute) for _ in range(10)])
+        
+        assert compute.calls == 1
+        assert all(result == {"total_jobs": 1} for result in results)
+    
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self):
+        """Test that entries are recomputed after their TTL."""
+        cache = ResponseCache()
+        compute = Counts(delay=0)
+        
+        await cache.get_or_compute("ranking_status", compute, ttl=0.01)
+        time.sleep(0.02)
+        
+        assert await cache.get_or_compute("ranking_status", compute, ttl=0.01) == {"total_jobs": 2}
+    
+    @pytest.mark.asyncio
+    async def test_invalidate_by_tag(self):
+        """Test that invalidating a tag only drops entries carrying it."""
+        cache = ResponseCache()
+        stats, tech = Counts(delay=0), Counts(delay=0)
+        await cache.get_or_compute("db_stats", stats, tags=("jobs", "scrape_runs"))
+        await cache.get_or_compute("tech_stack_stats", tech, tags=("tech_stack",))
+        
+        cache.invalidate("jobs")
+        await cache.get_or_compute("db_stats", stats, tags=("jobs", "scrape_runs"))
+        await cache.get_or_compute("tech_stack_stats", tech, tags=("tech_stack",))
+        
+        assert stats.calls == 2
+        assert tech.calls == 1
+    
+    @pytest.mark.asyncio
+    async def test_invalidation_during_compute_is_not_overwritten(self):
+        """Test that a result computed before an invalidation is not stored."""
+        cache = ResponseCache()
+        compute = Counts(delay=0.05)
+        
+        pending = asyncio.ensure_future(cache.get_or_compute("db_stats", compute, tags=("jobs",)))
+        await asyncio.sleep(0.01)
+        cache.invalidate("jobs")
+        await pending
+        
+        assert await cache.get_or_compute("db_stats", compute, tags=("jobs",)) == {"total_jobs": 2}
+    
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self):
+        """Test that all waiters see a failure and the next call retries."""
+        cache = ResponseCache()
+        compute = Counts(error=RuntimeError("statement timeout"))
+        
+        results = await asyncio.gather(
+            *[cache.get_or_compute("db_stats", compute) for _ in range(3)],
+            return_exceptions=True
+        )
+        
+        assert compute.calls == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+        
+        compute.error = None
+        assert await cache.get_or_compute("db_stats", compute) == {"total_jobs": 2}
+    
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        """Test that a disabled cache always computes."""
+        cache = ResponseCache(enabled=False)
+        compute = Counts(delay=0)
+        
+        await cache.get_or_compute("db_stats", compute)
+        await cache.get_or_compute("db_stats", compute)
+        
+        assert compute.calls == 2
@@ -0,0 +1,127 @@
+"""Pytest tests for the full-text and relevance-ordered job search."""
+
+from types import SimpleNamespace
+
+from database import client
+from database.client import apply_job_filters
+
+
+class FakeJobQuery:
+    """Sync builder stand-in over job rows; supports the calls search_jobs makes."""
+    
+    def __init__(self, rows, log, filters=()):
+        self.rows = rows
+        self.log = log
+        self.filters = filters
+    
+    def _with(self, *step):
+        self.log.append(step)
+        return FakeJobQuery(self.rows, self.log, self.filters + (step,))
+    
+    def select(self, columns, count=None):
+        return self._with("select")
+    
+    def eq(self, column, value):
+        return self._with("eq", column, value)
+    
+    def in_(self, column, values):
+        return self._with("in", column, list(values))
+    
+    def ilike(self, column, pattern):
+        return self._with("ilike", column, pattern)
+    
+    def filter(self, column, operator, value):
+        return self._with("filter", column, operator, value)
+    
+    def order(self, column, desc=False, nullsfirst=False):
+        return self._with("order", column)
+    
+    def range(self, start, end):
+        return self._with("range", start, end)
+    
+    def execute(self):
+        rows = [dict(row) for row in self.rows]
+        for step in self.filters:
+            if step[0] == "eq":
+                rows = [row for row in rows if row.get(step[1]) == step[2]]
+            elif step[0] == "in":
+                rows = [row for row in rows if row.get(step[1]) in step[2]]
+        return SimpleNamespace(data=rows, count=len(rows))
+
+
+class FakeSupabase:
+    def __init__(self, rows, ranks=None):
+        self.rows = rows
+        self.ranks = ranks
+        self.log = []
+    
+    def table(self, name):
+        return FakeJobQuery(self.rows, self.log)
+    
+    def rpc(self, name, params):
+        if self.ranks is None:
+            raise RuntimeError("function search_job_ids does not exist")
+        self.log.append(("rpc", name, params["p_search_text"]))
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=[
+            {"job_id": job_id, "rank": rank} for job_id, rank in self.ranks
+        ]))
+
+
+JOBS = [
+    {"id": "j-1", "title": "Data Engineer", "is_active": True},
+    {"id": "j-2", "title": "Senior Data Engineer", "is_active": True},
+    {"id": "j-3", "title": "Data Engineer (closed)", "is_active": False},
+    {"id": "j-4", "title": "Accountant", "is_active": True}
+]
+
+
+class TestJobSearch:
+    """Test search modes and relevance ordering."""
+    
+    def test_search_modes(self):
+        """Test that fulltext uses websearch FTS on the search document and basic a title ILIKE."""
+        log = []
+        apply_job_filters(FakeJobQuery([], log), search_query='"data engineer" -junior', search_mode="fulltext")
+        apply_job_filters(FakeJobQuery([], log), search_query="data")
+        
+        assert ("filter", "search_vector", "wfts(simple)", '"data engineer" -junior') in log
+        assert ("ilike", "title", "%data%") in log
+    
+    def test_relevance_order_with_filters(self, monkeypatch):
+        """Test that ranked matches are filtered, paged by offset and returned best first."""
+        fake = FakeSupabase(JOBS, ranks=[("j-2", 0.9), ("j-3", 0.8), ("j-1", 0.5)])
+        monkeypatch.setattr(client.db, "client", fake)
+        
+        jobs, total = client.db.search_jobs(search_query="data engineer", search_mode="fulltext", sort_field="relevance")
+        second_page, _ = client.db.search_jobs(
+            search_query="data engineer", search_mode="fulltext", sort_field="relevance", limit=1, offset=1
+        )
+        
+        assert [job["id"] for job in jobs] == ["j-2", "j-1"]
+        assert jobs[0]["search_rank"] == 0.9
+        assert total == 2
+        assert [job["id"] for job in second_page] == ["j-1"]
+    
+    def test_relevance_falls_back_without_rpc(self, monkeypatch):
+        """Test that a missing search RPC degrades to the default ranking sort."""
+        fake = FakeSupabase(JOBS)
+        monkeypatch.setattr(client.db, "client", fake)
+        
+        jobs, total = client.db.search_jobs(search_query="data", search_mode="fulltext", sort_field="relevance")
+        
+        assert total == 3
+        assert ("order", "ranking_position") in fake.log
+        assert ("filter", "search_vector", "wfts(simple)", "data") in fake.log
+    
+    def test_precomputed_ranks_are_reused(self, monkeypatch):
+        """Test that ranks fetched by the caller (to flag capped totals) are not fetched again."""
+        fake = FakeSupabase(JOBS, ranks=[("j-1", 0.9)])
+        monkeypatch.setattr(client.db, "client", fake)
+        
+        jobs, total = client.db.search_jobs(
+            search_query="data", search_mode="fulltext", sort_field="relevance", ranks={"j-2": 0.7, "j-1": 0.4}
+        )
+        
+        assert [job["id"] for job in jobs] == ["j-2", "j-1"]
+        assert total == 2
+        assert not [step for step in fake.log if step[0] == "rpc"]
@@ -0,0 +1,114 @@
+"""Pytest tests for the bulk tech-stack writer."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from database import client
+from database.client import MasterDataCache
+from ingestion import tech_stack_processor
+from ingestion.tech_stack_processor import process_tech_stack_for_jobs
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """Global client with in-memory masterdata tables; every statement is recorded."""
+    db = client.db
+    tables = {
+        "programming_languages": {"Python": {"id": "lang-1", "name": "Python", "is_active": True}},
+        "ecosystems": {"Legacy": {"id": "eco-0", "name": "Legacy", "is_active": False}}
+    }
+    calls = []
+    
+    def bulk_upsert(table, rows, on_conflict, ignore_duplicates=False):
+        calls.append(("upsert", table, rows, on_conflict, ignore_duplicates))
+        if table in tables:
+            for row in rows:
+                tables[table].setdefault(row["name"], {"id": f"{table}-{row['name']}", **row})
+        return len(rows)
+    
+    def by_names(table):
+        def lookup(names):
+            calls.append(("select", table, sorted(names)))
+            return {name: tables[table][name] for name in names if name in tables[table]}
+        return lookup
+    
+    cache = MasterDataCache()
+    cache.load("programming_languages", {"Python": tables["programming_languages"]["Python"]})
+    cache.load("ecosystems", {})
+    
+    monkeypatch.setattr(db, "master_data", cache)
+    monkeypatch.setattr(db, "bulk_upsert", bulk_upsert)
+    monkeypatch.setattr(db, "get_programming_languages_by_names", by_names("programming_languages"))
+    monkeypatch.setattr(db, "get_ecosystems_by_names", by_names("ecosystems"))
+    return SimpleNamespace(db=db, calls=calls, tables=tables)
+
+
+class TestProcessTechStackForJobs:
+    """Test set-based masterdata and assignment writes."""
+    
+    def test_statement_count_is_independent_of_job_count(self, fake_db):
+        """Test that many jobs share one masterdata upsert, one ID lookup and one assignment upsert per kind."""
+        enrichments = {
+            f"job-{i}": {
+                "must_have_languages": ["Python", "SQL"],
+                "nice_to_have_languages": ["Scala"],
+                "must_have_ecosystems": ["Azure"]
+            }
+            for i in range(50)
+        }
+        
+        counts = process_tech_stack_for_jobs(enrichments)
+        
+        assert counts == {"languages": 150, "ecosystems": 50}
+        assert [call[:2] for call in fake_db.calls] == [
+            ("upsert", "programming_languages"),
+            ("select", "programming_languages"),
+            ("upsert", "job_programming_languages"),
+            ("upsert", "ecosystems"),
+            ("select", "ecosystems"),
+            ("upsert", "job_ecosystems")
+        ]
+        # Python came from the cache; only new names are written
+        assert fake_db.calls[1][2] == ["SQL", "Scala"]
+        assert fake_db.calls[2][3:] == ("job_posting_id,programming_language_id", True)
+    
+    def test_new_names_are_cached(self, fake_db):
+        """Test that the next batch resolves newly created names without queries."""
+        process_tech_stack_for_jobs({"job-1": {"must_have_languages": ["Rust"]}})
+        fake_db.calls.clear()
+        
+        process_tech_stack_for_jobs({"job-2": {"must_have_languages": ["Rust"]}})
+        
+        assert [call[:2] for call in fake_db.calls] == [("upsert", "job_programming_languages")]
+    
+    def test_must_have_wins_and_names_are_normalized(self, fake_db):
+        """Test per-job dedupe: trimmed names, must_have before nice_to_have, invalid items skipped."""
+        process_tech_stack_for_jobs({
+            "job-1": {
+                "must_have_languages": [" Python ", "", None],
+                "nice_to_have_languages": ["Python"]
+            }
+        })
+        
+        assignments = fake_db.calls[-1][2]
+        assert assignments == [
+            {"job_posting_id": "job-1", "programming_language_id": "lang-1", "requirement_level": "must_have"}
+        ]
+    
+    def test_inactive_entries_are_skipped(self, fake_db):
+        """Test that deactivated masterdata is not assigned or reactivated."""
+        counts = process_tech_stack_for_jobs({"job-1": {"must_have_ecosystems": ["Legacy", "AWS"]}})
+        
+        assert counts["ecosystems"] == 1
+        assert fake_db.tables["ecosystems"]["Legacy"]["is_active"] is False
+        assert fake_db.calls[-1][2][0]["ecosystem_id"] == "ecosystems-AWS"
+    
+    def test_single_job_errors_are_logged(self, fake_db, monkeypatch):
+        """Test that the per-job entry point keeps swallowing write errors."""
+        def failing_upsert(*args, **kwargs):
+            raise Exception("connection reset")
+        
+        monkeypatch.setattr(fake_db.db, "bulk_upsert", failing_upsert)
+        
+        tech_stack_processor.process_tech_stack_for_job("job-1", {"must_have_languages": ["Go"]})
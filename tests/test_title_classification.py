@@ -0,0 +1,189 @@
+"""Pytest tests for memo-backed, deferred job title classification."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from ingestion import job_title_classifier
+from ingestion.job_title_classifier import TITLE_MEMO_TABLE, classify_unclassified_jobs
+
+
+class FakeTable:
+    """PostgREST table stub supporting the select/update chains used by the classifier."""
+    
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+        self.values = None
+        self.filters = []
+        self.negate = False
+        self.sort = None
+        self.size = None
+    
+    def _filter(self, test):
+        negate, self.negate = self.negate, False
+        self.filters.append((lambda row: not test(row)) if negate else test)
+        return self
+    
+    @property
+    def not_(self):
+        self.negate = True
+        return self
+    
+    def select(self, columns):
+        return self
+    
+    def update(self, values):
+        self.values = values
+        return self
+    
+    def is_(self, column, value):
+        return self._filter(lambda row: row.get(column) is None)
+    
+    def in_(self, column, values):
+        return self._filter(lambda row: row.get(column) in values)
+    
+    def eq(self, column, value):
+        return self._filter(lambda row: row.get(column) == value)
+    
+    def neq(self, column, value):
+        return self._filter(lambda row: row.get(column) != value)
+    
+    def lt(self, column, value):
+        return self._filter(lambda row: row.get(column) is not None and row.get(column) < value)
+    
+    def order(self, column):
+        self.sort = column
+        return self
+    
+    def limit(self, size):
+        self.size = size
+        return self
+    
+    def execute(self):
+        rows = [r for r in self.db.tables[self.name] if all(f(r) for f in self.filters)]
+        if self.sort:
+            rows.sort(key=lambda row: row.get(self.sort) or "")
+        if self.size is not None:
+            rows = rows[:self.size]
+        if self.values is not None:
+            self.db.updates.append((self.name, self.values, [r["id"] for r in rows]))
+            for row in rows:
+                row.update(self.values)
+        return SimpleNamespace(data=rows)
+
+
+class FakeDb:
+    """Database stub with in-memory tables and an update log."""
+    
+    def __init__(self):
+        self.tables = {"job_postings": [], TITLE_MEMO_TABLE: []}
+        self.updates = []
+        self.client = SimpleNamespace(table=lambda name: FakeTable(self, name))
+    
+    def bulk_upsert(self, table, rows, on_conflict, **kwargs):
+        existing = {r[on_conflict]: r for r in self.tables[table]}
+        for row in rows:
+            existing[row[on_conflict]] = dict(row)
+        self.tables[table] = list(existing.values())
+        return len(rows)
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """In-memory job_postings + memo table, LLM classifier that records its calls"""
+    db = FakeDb()
+    llm_calls = []
+    
+    def classify_job_title(title):
+        llm_calls.append(title)
+        return ("Data" if "data" in title.lower() else "NIS"), None
+    
+    monkeypatch.setattr(job_title_classifier, "db", db)
+    monkeypatch.setattr(job_title_classifier, "classify_job_title", classify_job_title)
+    monkeypatch.setattr(job_title_classifier, "_title_memo", {})
+    db.refreshed = []
+    monkeypatch.setattr(job_title_classifier, "job_facets", SimpleNamespace(refresh_jobs=db.refreshed.extend))
+    return db, llm_calls
+
+
+def add_jobs(db, titles, **columns):
+    start = len(db.tables["job_postings"])
+    db.tables["job_postings"].extend(
+        {"id": f"job-{i}", "title": title, "title_classification": None, "created_at": f"2026-10-{i + 1:02d}", **columns}
+        for i, title in enumerate(titles, start)
+    )
+
+
+class TestClassifyUnclassifiedJobs:
+    """Test batch classification of pending jobs."""
+    
+    def test_one_llm_call_per_distinct_title(self, fake_db):
+        """Test that titles differing only in case/whitespace share one classification."""
+        db, llm_calls = fake_db
+        add_jobs(db, ["Data Engineer", "data  engineer", "DATA ENGINEER ", "Sales Manager"])
+        
+        classified = classify_unclassified_jobs()
+        
+        assert classified == 4
+        assert sorted(llm_calls) == ["Data Engineer", "Sales Manager"]
+        assert {r["title_classification"] for r in db.tables["job_postings"][:3]} == {"Data"}
+        assert db.tables["job_postings"][3]["title_classification"] == "NIS"
+        # One UPDATE per classification, not per job
+        assert len([u for u in db.updates if u[0] == "job_postings"]) == 2
+        # The jobs facet index re-reads the classified jobs
+        assert sorted(db.refreshed) == ["job-0", "job-1", "job-2", "job-3"]
+    
+    def test_persisted_memo_skips_llm(self, fake_db, monkeypatch):
+        """Test that titles in job_title_classifications are not sent to the LLM again."""
+        db, llm_calls = fake_db
+        add_jobs(db, ["Data Engineer"])
+        classify_unclassified_jobs()
+        
+        # New process: empty in-memory memo, same database
+        monkeypatch.setattr(job_title_classifier, "_title_memo", {})
+        db.tables["job_postings"] = []
+        add_jobs(db, ["Data  Engineer"])
+        
+        classify_unclassified_jobs()
+        
+        assert llm_calls == ["Data Engineer"]
+        assert db.tables["job_postings"][0]["title_classification"] == "Data"
+        assert db.tables[TITLE_MEMO_TABLE][0]["normalized_title"] == "data engineer"
+    
+    def test_errors_are_saved_per_job(self, fake_db, monkeypatch):
+        """Test that failed classifications store the error and leave the job pending."""
+        db, _ = fake_db
+        monkeypatch.setattr(job_title_classifier, "classify_job_title", lambda title: (None, "Unexpected classification: Maybe"))
+        add_jobs(db, ["Data Engineer", "Data Engineer"])
+        
+        assert classify_unclassified_jobs() == 0
+        
+        for row in db.tables["job_postings"]:
+            assert row["title_classification"] is None
+            assert row["title_classification_error"] == "Unexpected classification: Maybe"
+        assert db.tables[TITLE_MEMO_TABLE] == []
+    
+    def test_failed_jobs_do_not_block_new_ones(self, fake_db):
+        """Test that recently failed jobs are skipped and old failures are retried after new jobs."""
+        db, llm_calls = fake_db
+        add_jobs(db, ["Failed Recently"] * 3, title_classification_error="timeout", title_classification_at="2999-01-01")
+        add_jobs(db, ["Failed Long Ago"], title_classification_error="timeout", title_classification_at="2026-01-01")
+        add_jobs(db, ["Data Engineer", ""])
+        
+        classified = classify_unclassified_jobs(limit=2)
+        
+        assert classified == 2
+        assert llm_calls == ["Data Engineer", "Failed Long Ago"]
+    
+    def test_memo_of_other_prompt_version_is_ignored(self, fake_db):
+        """Test that a prompt version bump sends memoized titles to the LLM again."""
+        db, llm_calls = fake_db
+        db.tables[TITLE_MEMO_TABLE].append({"normalized_title": "data engineer", "classification": "NIS", "prompt_version": "backfill"})
+        add_jobs(db, ["Data Engineer"])
+        
+        classify_unclassified_jobs()
+        
+        assert llm_calls == ["Data Engineer"]
+        assert db.tables["job_postings"][0]["title_classification"] == "Data"
+        assert db.tables[TITLE_MEMO_TABLE][0]["prompt_version"] == job_title_classifier.TITLE_CLASSIFIER_PROMPT_VERSION
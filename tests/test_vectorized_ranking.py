@@ -0,0 +1,199 @@
+"""Pytest tests for the vectorized ranking engine."""
+
+import copy
+import json
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from ranking import job_ranker, vectorized
+from ranking.job_ranker import (
+    JobData, JobRankingSystem, RANKING_CACHE_VERSION, build_ranking_metadata, job_from_ranking_cache
+)
+from ranking.vectorized import VectorizedJobRankingSystem, group_ranks
+
+
+FROZEN_NOW = datetime(2025, 11, 21, 14, 37, 12, 123456)
+
+
+class FrozenDatetime(datetime):
+    """datetime with a fixed now() so scalar and vectorized runs see the same clock."""
+    
+    frozen = FROZEN_NOW
+    
+    @classmethod
+    def now(cls, tz=None):
+        return cls.frozen
+
+
+@pytest.fixture
+def frozen_time(monkeypatch):
+    monkeypatch.setattr(FrozenDatetime, "frozen", FROZEN_NOW)
+    monkeypatch.setattr(job_ranker, "datetime", FrozenDatetime)
+    monkeypatch.setattr(vectorized, "datetime", FrozenDatetime)
+
+
+def make_job(rng: random.Random, index: int) -> JobData:
+    """Random job covering every branch of the scoring rules."""
+    def maybe(value, p=0.7):
+        return value if rng.random() < p else None
+    
+    def some_list(max_len=5):
+        return maybe([f"item{i}" for i in range(rng.randint(0, max_len))])
+    
+    posted_date = maybe(FROZEN_NOW - timedelta(hours=rng.uniform(-2, 24 * 45)), 0.9)
+    
+    return JobData(
+        id=f"{rng.getrandbits(128):032x}",
+        title=f"Job {index}",
+        company_id=f"company-{rng.randint(0, 15)}",
+        company_name=rng.choice(["Google", "Acme", "Initech"]),
+        location_id=rng.choice([f"location-{i}" for i in range(6)] + [None]),
+        posted_date=posted_date,
+        seniority_level=maybe("Mid-Senior level"),
+        employment_type=maybe(rng.choice(["Full-time", ""])),
+        function_areas=maybe(rng.choice([["Engineering"], []])),
+        base_salary_min=maybe(50000.0),
+        base_salary_max=maybe(70000.0),
+        apply_url=maybe("https://apply"),
+        num_applicants=maybe(rng.randint(0, 200)),
+        is_active=rng.random() < 0.95,
+        title_classification=rng.choice(["Data", "Data", "NIS", None]),
+        company_industry=maybe("IT"),
+        company_url=maybe("https://acme.example"),
+        company_logo_data=maybe("\\x89504e47"),
+        company_employee_count_range=rng.choice(
+            [None, "", "1-10", "201-500", "501-1000", "1001-5000", "10000+"]
+        ),
+        company_rating=rng.choice([None, 3.0, 3.5, 3.9, 4.0, 4.2, 4.5, 4.9]),
+        company_reviews_count=maybe(10),
+        hiring_model=rng.choice(["direct", "recruitment", "unknown", None]),
+        is_faang=rng.random() < 0.1,
+        location_city=maybe("Brussels"),
+        skills_must_have=some_list(),
+        samenvatting_kort=maybe("kort"),
+        samenvatting_lang=maybe(rng.choice(["lang", ""])),
+        data_role_type=rng.choice(
+            [None, "Data Engineer", "Data Scientist", "Data Analyst", "Analytics Engineer",
+             "BI Developer", "ML Engineer", "Data Architect", "Other", "NIS"]
+        ),
+        seniority=rng.choice([None, "Junior", "Medior", "Senior"]),
+        enrichment_completed_at=maybe(FROZEN_NOW, 0.8),
+        scraped_at=None,
+        description_text=maybe("x" * rng.choice([10, 500, 501, 2000])),
+        must_have_programmeertalen=some_list(6),
+        nice_to_have_programmeertalen=some_list(6),
+        must_have_ecosystemen=some_list(6),
+        nice_to_have_ecosystemen=some_list(6)
+    )
+
+
+RESULT_FIELDS = [
+    "freshness_score", "quality_score", "transparency_score", "role_match_score",
+    "completeness_score", "reputation_score", "base_score",
+    "company_rank", "role_type_rank", "location_rank", "seniority_rank",
+    "hourly_multiplier", "final_score", "final_rank"
+]
+
+
+class TestVectorizedRanking:
+    """Vectorized engine must reproduce the scalar ranking exactly."""
+    
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_matches_scalar_implementation(self, frozen_time, seed):
+        """Test bit-for-bit equality of every score, rank and the final order."""
+        rng = random.Random(seed)
+        jobs = [make_job(rng, i) for i in range(500)]
+        
+        scalar = JobRankingSystem().rank_jobs(copy.deepcopy(jobs))
+        fast = VectorizedJobRankingSystem().rank_jobs(copy.deepcopy(jobs))
+        
+        assert [j.id for j in fast] == [j.id for j in scalar]
+        for expected, actual in zip(scalar, fast):
+            for field in RESULT_FIELDS:
+                assert getattr(actual, field) == getattr(expected, field), field
+    
+    def test_empty_job_list(self, frozen_time):
+        """Test that ranking nothing returns nothing."""
+        assert VectorizedJobRankingSystem().rank_jobs([]) == []
+
+
+def snapshot_row(job: JobData, needs_ranking: bool = False) -> dict:
+    """job_postings snapshot row as returned by load_ranking_snapshot"""
+    return {
+        "id": job.id,
+        "title": job.title,
+        "company_id": job.company_id,
+        "location_id": job.location_id,
+        "posted_date": job.posted_date.isoformat() if job.posted_date else None,
+        "title_classification": job.title_classification,
+        "is_active": True,
+        "needs_ranking": needs_ranking,
+        # JSONB round trip
+        "ranking_metadata": json.loads(json.dumps(build_ranking_metadata(job)))
+    }
+
+
+class TestIncrementalRanking:
+    """Incremental runs over cached scores must match a full re-rank."""
+    
+    def test_matches_full_rerank(self, frozen_time):
+        """Test that cached + rescored jobs rank exactly like a full run hours later."""
+        rng = random.Random(7)
+        jobs = [make_job(rng, i) for i in range(400)]
+        ranker = VectorizedJobRankingSystem()
+        
+        # Previous full run populates ranking_metadata
+        previous = {job.id: job for job in ranker.rank_jobs(copy.deepcopy(jobs))}
+        
+        # Some jobs change (and get flagged), time moves on (freshness buckets change)
+        FrozenDatetime.frozen = FROZEN_NOW + timedelta(hours=30)
+        changed = set(rng.sample(range(len(jobs)), 40))
+        for i in changed:
+            jobs[i].skills_must_have = ["SQL", "Python", "dbt"]
+            jobs[i].hiring_model = "direct"
+        
+        incremental_input = []
+        for i, job in enumerate(jobs):
+            if not job.is_active:
+                continue
+            if i in changed:
+                incremental_input.append(copy.deepcopy(job))
+            else:
+                incremental_input.append(job_from_ranking_cache(snapshot_row(previous[job.id])))
+        
+        expected = JobRankingSystem().rank_jobs(copy.deepcopy(jobs))
+        actual = ranker.rank_jobs_incremental(incremental_input)
+        
+        assert [j.id for j in actual] == [j.id for j in expected]
+        for e, a in zip(expected, actual):
+            for field in RESULT_FIELDS:
+                assert getattr(a, field) == getattr(e, field), field
+    
+    def test_flagged_or_outdated_rows_are_not_cached(self, frozen_time):
+        """Test that needs_ranking, missing metadata and old cache versions force a recompute."""
+        job = make_job(random.Random(1), 0)
+        row = snapshot_row(job)
+        
+        assert job_from_ranking_cache(row).scores_cached
+        assert job_from_ranking_cache({**row, "needs_ranking": True}) is None
+        assert job_from_ranking_cache({**row, "ranking_metadata": None}) is None
+        assert job_from_ranking_cache({
+            **row, "ranking_metadata": {**row["ranking_metadata"], "cache_version": RANKING_CACHE_VERSION - 1}
+        }) is None
+
+
+class TestGroupRanks:
+    """Test cumulative per-group counting."""
+    
+    def test_ranks_follow_given_order(self):
+        """Test that ranks count within each group in the given visiting order."""
+        codes = np.array([0, 1, 0, 0, 1])
+        order = np.array([4, 3, 2, 1, 0])
+        
+        ranks = group_ranks(codes, order)
+        
+        # Visiting order: 4(g1) 3(g0) 2(g0) 1(g1) 0(g0)
+        assert ranks.tolist() == [3, 2, 2, 1, 1]
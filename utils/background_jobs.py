@@ -0,0 +1,125 @@
+"""
+In-process registry of long-running background jobs (e.g. CSV imports).
+
+An endpoint registers a job, hands it to a background task and returns its id;
+the task reports progress on the job and clients poll its status:
+
+    job = background_jobs.create("company_import", total_rows=None)
+    background_tasks.add_task(run_import, job, path)
+    ...
+    job.update(processed_rows=500)
+    job.finish(result)
+
+Jobs live in the memory of the web process; only the most recent ones are kept.
+"""
+
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+# Finished jobs kept for status polling
+MAX_FINISHED_JOBS = 50
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class BackgroundJob:
+    """Status and progress of one background job, safe to update from a worker thread."""
+    
+    def __init__(self, kind: str, **progress: Any):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.status = STATUS_QUEUED
+        self.progress: Dict[str, Any] = dict(progress)
+        self.result: Optional[Any] = None
+        self.error: Optional[str] = None
+        self.created_at = _now()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def done(self) -> bool:
+        return self.status in (STATUS_COMPLETED, STATUS_FAILED)
+    
+    def start(self):
+        with self._lock:
+            self.status = STATUS_RUNNING
+            self.started_at = _now()
+    
+    def update(self, **progress: Any):
+        with self._lock:
+            self.progress.update(progress)
+    
+    def finish(self, result: Any = None):
+        with self._lock:
+            self.status = STATUS_COMPLETED
+            self.result = result
+            self.finished_at = _now()
+    
+    def fail(self, error: str, result: Any = None):
+        with self._lock:
+            self.status = STATUS_FAILED
+            self.error = error
+            self.result = result
+            self.finished_at = _now()
+        logger.error(f"❌ Background job {self.kind} {self.id} failed: {error}")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at
+            }
+
+
+class BackgroundJobRegistry:
+    """Jobs by id; finished jobs beyond max_finished are forgotten, oldest first."""
+    
+    def __init__(self, max_finished: int = MAX_FINISHED_JOBS):
+        self.max_finished = max_finished
+        self._jobs: Dict[str, BackgroundJob] = {}
+        self._lock = threading.Lock()
+    
+    def create(self, kind: str, **progress: Any) -> BackgroundJob:
+        job = BackgroundJob(kind, **progress)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        return job
+    
+    def get(self, job_id: str) -> Optional[BackgroundJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def list(self, kind: Optional[str] = None) -> List[BackgroundJob]:
+        """Jobs (optionally of one kind), newest first."""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if kind is None or job.kind == kind]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+    
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.done]
+        for job in sorted(finished, key=lambda job: job.finished_at)[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job.id]
+
+
+# Shared registry of the web process
+background_jobs = BackgroundJobRegistry()
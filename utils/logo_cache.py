@@ -0,0 +1,280 @@
+"""
+Logo normalization, thumbnails and a local two-tier cache for uploaded logos.
+
+Uploads are normalized once (decoded with Pillow, EXIF-rotated, downscaled to
+MAX_LOGO_DIMENSION and re-encoded as PNG; SVGs are stored as-is). Pages request
+fixed-size thumbnails which are rendered from the stored logo on first use and
+kept in a content-hashed directory on disk, with an LRU memory tier in front:
+
+    .cache/logos/<sha256>.src          decoded logo as stored in the database
+    .cache/logos/<sha256>-64.webp      rendered thumbnails
+
+The hash is the SHA-256 of the stored logo_data (logo_hash, migration 072), so
+files never need invalidation; only the per-row version (which hash a row
+currently has) expires, after version_ttl_seconds or when this process writes.
+"""
+
+import base64
+import binascii
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from config.settings import settings
+
+# Largest stored logo and the thumbnail sizes served (requested sizes snap up to these)
+MAX_LOGO_DIMENSION = 512
+THUMBNAIL_SIZES = (32, 64, 128, 256, MAX_LOGO_DIMENSION)
+THUMBNAIL_FORMATS = {"webp": "image/webp", "png": "image/png"}
+
+SVG_CONTENT_TYPE = "image/svg+xml"
+
+# Magic numbers of the image types accepted for upload
+_IMAGE_SIGNATURES = (b"\x89PNG\r\n\x1a\n", b"\xff\xd8\xff", b"GIF87a", b"GIF89a", b"RIFF")
+
+
+class InvalidLogoError(ValueError):
+    """Uploaded file is not a usable image."""
+
+
+@dataclass(frozen=True)
+class LogoVersion:
+    """The logo a row currently has, without its data."""
+    hash: str
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+    
+    @property
+    def is_svg(self) -> bool:
+        return self.content_type == SVG_CONTENT_TYPE
+
+
+def is_svg(data: bytes) -> bool:
+    """Whether data looks like an SVG document."""
+    return b"<svg" in data[:4096].lower()
+
+
+def _is_image(data: bytes) -> bool:
+    return data.startswith(_IMAGE_SIGNATURES) or is_svg(data)
+
+
+def stored_logo_bytes(value: Any) -> bytes:
+    """Bytes of a logo_data value as returned by PostgREST (hex-encoded bytea)."""
+    if isinstance(value, str):
+        if value.startswith("\\x"):
+            return bytes.fromhex(value[2:])
+        return value.encode("utf-8")
+    return bytes(value)
+
+
+def decode_logo_data(stored: bytes) -> bytes:
+    """
+    Image bytes of a stored logo.
+    
+    Older tech-stack uploads stored the base64 text of the image in the bytea
+    column; those are unwrapped here, once per cache fill.
+    """
+    if _is_image(stored):
+        return stored
+    try:
+        decoded = base64.b64decode(stored, validate=True)
+    except (binascii.Error, ValueError):
+        return stored
+    return decoded if _is_image(decoded) else stored
+
+
+def encode_logo_data(data: bytes) -> str:
+    """bytea literal for writing logo_data through PostgREST."""
+    return "\\x" + data.hex()
+
+
+def logo_hash(stored: bytes) -> str:
+    """Content hash of stored logo_data (same value as logo_hash in the database)."""
+    return hashlib.sha256(stored).hexdigest()
+
+
+def thumbnail_size(size: Optional[int]) -> int:
+    """Snap a requested size to the next available thumbnail size."""
+    if size is None:
+        return MAX_LOGO_DIMENSION
+    return next((s for s in THUMBNAIL_SIZES if s >= size), MAX_LOGO_DIMENSION)
+
+
+def _open_image(data: bytes) -> Image.Image:
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except (UnidentifiedImageError, OSError, SyntaxError, Image.DecompressionBombError) as e:
+        raise InvalidLogoError(f"Not a valid image: {e}")
+    return ImageOps.exif_transpose(image).convert("RGBA")
+
+
+def normalize_logo(data: bytes, content_type: Optional[str] = None) -> Tuple[bytes, str]:
+    """
+    Normalize an uploaded logo for storage.
+    
+    Returns:
+        (data, content_type): PNG of at most MAX_LOGO_DIMENSION pixels, or the SVG unchanged
+    
+    Raises:
+        InvalidLogoError: data is not a decodable image
+    """
+    if content_type == SVG_CONTENT_TYPE or is_svg(data):
+        if not is_svg(data):
+            raise InvalidLogoError("Not a valid SVG document")
+        return data, SVG_CONTENT_TYPE
+    
+    image = _open_image(data)
+    image.thumbnail((MAX_LOGO_DIMENSION, MAX_LOGO_DIMENSION), Image.LANCZOS)
+    
+    output = io.BytesIO()
+    image.save(output, format="PNG", optimize=True)
+    return output.getvalue(), "image/png"
+
+
+def render_thumbnail(source: bytes, size: int, fmt: str) -> bytes:
+    """Render a logo centered on a transparent size x size canvas."""
+    image = _open_image(source)
+    image.thumbnail((size, size), Image.LANCZOS)
+    
+    canvas = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    canvas.paste(image, ((size - image.width) // 2, (size - image.height) // 2))
+    
+    output = io.BytesIO()
+    if fmt == "webp":
+        canvas.save(output, format="WEBP", quality=90, method=4)
+    else:
+        canvas.save(output, format="PNG", optimize=True)
+    return output.getvalue()
+
+
+class LogoCache:
+    """Disk + LRU memory cache of logo sources and thumbnails, plus per-row logo versions."""
+    
+    def __init__(
+        self,
+        directory: str,
+        memory_items: int = 512,
+        version_ttl_seconds: float = 300,
+        enabled: bool = True
+    ):
+        self.directory = Path(directory)
+        self.memory_items = memory_items
+        self.version_ttl_seconds = version_ttl_seconds
+        self.enabled = enabled
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._versions: Dict[Tuple[str, str], Tuple[float, Optional[LogoVersion]]] = {}
+        self._lock = threading.Lock()
+        self.hits = Counter()  # Per tier (memory, disk)
+        self.misses = 0
+    
+    # ---- Versions ----
+    
+    def get_version(self, table: str, entity_id: str) -> Tuple[bool, Optional[LogoVersion]]:
+        """(found, version) for a row; version None means the row has no logo."""
+        if not self.enabled:
+            return False, None
+        with self._lock:
+            entry = self._versions.get((table, entity_id))
+            if entry and entry[0] > time.monotonic():
+                return True, entry[1]
+        return False, None
+    
+    def set_version(self, table: str, entity_id: str, version: Optional[LogoVersion]):
+        if self.enabled:
+            with self._lock:
+                self._versions[(table, entity_id)] = (time.monotonic() + self.version_ttl_seconds, version)
+    
+    def invalidate(self, table: str, entity_id: str):
+        """Forget which logo a row has (after an upload or delete)."""
+        with self._lock:
+            self._versions.pop((table, entity_id), None)
+    
+    # ---- Content ----
+    
+    def get(self, name: str) -> Optional[bytes]:
+        """Cached file by name, from memory or disk."""
+        if not self.enabled:
+            return None
+        
+        with self._lock:
+            data = self._memory.get(name)
+            if data is not None:
+                self._memory.move_to_end(name)
+                self.hits["memory"] += 1
+                return data
+        
+        try:
+            data = (self.directory / name).read_bytes()
+        except FileNotFoundError:
+            data = None
+        except OSError as e:
+            logger.warning(f"Failed to read cached logo {name}: {e}")
+            data = None
+        
+        if data is None:
+            self.misses += 1
+            return None
+        
+        self.hits["disk"] += 1
+        self._remember(name, data)
+        return data
+    
+    def put(self, name: str, data: bytes):
+        """Store a file on disk (atomically) and in memory."""
+        if not self.enabled:
+            return
+        
+        self._remember(name, data)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.directory / f".{name}.{os.getpid()}.{threading.get_ident()}.tmp"
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, self.directory / name)
+        except OSError as e:
+            logger.warning(f"Failed to write cached logo {name}: {e}")
+    
+    def _remember(self, name: str, data: bytes):
+        with self._lock:
+            self._memory[name] = data
+            self._memory.move_to_end(name)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Entry counts and hit/miss counters of this process."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "directory": str(self.directory),
+                "memory_entries": len(self._memory),
+                "versions": len(self._versions),
+                "hits": dict(self.hits),
+                "misses": self.misses
+            }
+
+
+def source_name(hash: str) -> str:
+    return f"{hash}.src"
+
+
+def thumbnail_name(hash: str, size: int, fmt: str) -> str:
+    return f"{hash}-{size}.{fmt}"
+
+
+# Shared cache instance for the logo endpoints
+logo_cache = LogoCache(
+    directory=settings.logo_cache_dir,
+    memory_items=settings.logo_cache_memory_items,
+    version_ttl_seconds=settings.logo_cache_version_ttl_seconds,
+    enabled=settings.logo_cache_enabled
+)
@@ -0,0 +1,129 @@
+"""
+In-process TTL cache for aggregate API responses (dashboard stats).
+
+Endpoints wrap their expensive count queries in `response_cache.get_or_compute`:
+concurrent misses for the same key share one computation (single flight), and
+the result is served from memory until its TTL expires or a writer invalidates
+one of its tags:
+
+    stats = await response_cache.get_or_compute("db_stats", load_stats, tags=("jobs", "companies"))
+    ...
+    response_cache.invalidate("jobs")
+
+Writers in other processes (scripts) cannot reach this cache; the TTL bounds how
+stale their changes can appear.
+"""
+
+import asyncio
+import threading
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from loguru import logger
+
+from config.settings import settings
+
+# Tags used by the stats endpoints and the writers that invalidate them
+TAG_JOBS = "jobs"
+TAG_COMPANIES = "companies"
+TAG_SCRAPE_RUNS = "scrape_runs"
+TAG_RANKINGS = "rankings"
+TAG_TECH_STACK = "tech_stack"
+
+
+class ResponseCache:
+    """TTL + tag-invalidated response cache with single-flight fills, safe to invalidate from any thread."""
+    
+    def __init__(self, ttl_seconds: float = 300, enabled: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: Dict[str, Tuple[float, Any, Tuple[str, ...]]] = {}  # key -> (expires_at, value, tags)
+        self._generations = Counter()  # Per tag, bumped on invalidation
+        self._clears = 0  # Bumped on invalidate() without tags
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.hits = Counter()
+        self.misses = Counter()
+    
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        tags: Iterable[str] = ()
+    ) -> Any:
+        """
+        Cached value for key, or the result of compute().
+        
+        Concurrent callers missing the same key await one shared compute(); if
+        it raises, they all see the error and nothing is cached.
+        """
+        if not self.enabled:
+            return await compute()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.hits[key] += 1
+                return entry[1]
+            self.misses[key] += 1
+        
+        task = self._inflight.get(key)
+        if task is None or task.done():
+            task = asyncio.ensure_future(self._fill(key, compute, ttl, tuple(tags)))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._inflight.pop(key, None) if self._inflight.get(key) is done else None)
+        
+        # A cancelled request must not cancel the fill other callers are waiting for
+        return await asyncio.shield(task)
+    
+    async def _fill(self, key: str, compute: Callable[[], Awaitable[Any]], ttl: Optional[float], tags: Tuple[str, ...]) -> Any:
+        with self._lock:
+            generations = self._generation_snapshot(tags)
+        
+        value = await compute()
+        
+        with self._lock:
+            # Invalidated while computing: serve the value to current callers but do not store it
+            if self._generation_snapshot(tags) == generations:
+                self._entries[key] = (time.monotonic() + (self.ttl_seconds if ttl is None else ttl), value, tags)
+        return value
+    
+    def _generation_snapshot(self, tags: Tuple[str, ...]) -> Tuple:
+        return (self._clears,) + tuple(self._generations[tag] for tag in tags)
+    
+    def invalidate(self, *tags: str):
+        """Drop entries carrying any of the tags (all entries when no tags are given)."""
+        with self._lock:
+            if not tags:
+                self._entries.clear()
+                self._clears += 1
+                return
+            
+            self._generations.update(tags)
+            stale = [key for key, (_, _, entry_tags) in self._entries.items() if set(entry_tags) & set(tags)]
+            for key in stale:
+                del self._entries[key]
+        
+        if stale:
+            logger.debug(f"Response cache invalidated ({', '.join(tags)}): {len(stale)} entries")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Entry count and hit/miss counters of this process, per key."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "by_key": {
+                    key: {"hits": self.hits[key], "misses": self.misses[key]}
+                    for key in sorted(set(self.hits) | set(self.misses))
+                }
+            }
+
+
+# Shared cache instance for the web app and the in-process writers
+response_cache = ResponseCache(
+    ttl_seconds=settings.response_cache_ttl_seconds,
+    enabled=settings.response_cache_enabled
+)
@@ -1,14 +1,19 @@
 """API endpoints for company master data management."""
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, BackgroundTasks
-from fastapi.responses import StreamingResponse, Response
+from fastapi import APIRouter, HTTPException, UploadFile, File, BackgroundTasks, Query, Request
 from typing import Optional, List
 from pydantic import BaseModel
-import csv
-import io
+import asyncio
+import os
 from loguru import logger
 
-from database import db
+from database import adb
+from database.client import COMPANY_COLUMNS, SearchMode, with_has_logo
+from database.pagination import CountMode, InvalidCursorError, SortKey, apply_keyset, count_method, next_cursor
+from ingestion.company_csv_import import CsvImportError, inspect_company_csv, run_company_import, spool_upload
+from utils.background_jobs import background_jobs
+from web.exports import csv_chunks, csv_response, first_embedded, keyset_pages
+from web.logos import logo_response, save_logo, delete_logo
 
 router = APIRouter()
 
@@ -18,6 +23,9 @@ ALLOWED_MIME_TYPES = {
 }
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 
+# Company list order (id makes the keyset unique for companies with the same name)
+COMPANY_SORT_KEYS = [SortKey("name"), SortKey("id")]
+
 
 # Pydantic models for request/response
 class CompanyMasterDataCreate(BaseModel):
@@ -61,7 +69,10 @@ async def list_companies(
     has_master_data: Optional[bool] = None,
     verified: Optional[bool] = None,
     limit: int = 100,  # Back to 100 - view is much lighter
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,  # next_cursor of the previous page (replaces offset)
+    count: CountMode = "exact",  # exact, planned, estimated or none
+    search_mode: SearchMode = "basic"  # basic (name contains) or fulltext (fuzzy, best match first)
 ):
     """List companies with optional filters using lightweight view."""
     
@@ -69,36 +80,59 @@ async def list_companies(
         # Try to use lightweight view for much faster loading
         # Fallback to regular query if view doesn't exist yet
         try:
-            query = db.client.table("companies_list_view").select(
+            query = adb.table("companies_list_view").select(
                 "*",
-                count="exact"
+                count=count_method(count)
             )
         except Exception as view_error:
             logger.warning(f"companies_list_view not found, falling back to regular query: {view_error}")
             # Fallback to old query method
-            query = db.client.table("companies").select(
+            query = adb.table("companies").select(
                 "id, name, logo_url, industry, linkedin_company_id, company_master_data(id, hiring_model, is_consulting, sector_nl, sector_en, sector_fr, size_category, category_nl, category_en, category_fr, locatie_belgie, aantal_werknemers, bedrijfswebsite, jobspagina, email_hr, ai_enriched, ai_enriched_at)",
-                count="exact"
+                count=count_method(count)
             )
         
-        # Apply search filter
-        if search:
-            query = query.ilike("name", f"%{search}%")
-        
-        # Order by name (already in view but can be overridden)
-        query = query.order("name")
-        
-        # Apply pagination
-        query = query.range(offset, offset + limit - 1)
-        
-        result = query.execute()
+        # Ranked (fuzzy) name search: the page is a slice of the ranked company ids
+        ranked_ids = await adb.search_company_ids(search) if search and search_mode == "fulltext" else None
+        
+        if ranked_ids is not None:
+            if cursor:
+                raise InvalidCursorError("Ranked search results are paged with offset")
+            page_ids = ranked_ids[offset:offset + limit]
+            total = len(ranked_ids)
+            rows = []
+            if page_ids:
+                result = await query.in_("id", page_ids).execute()
+                position = {company_id: i for i, company_id in enumerate(page_ids)}
+                rows = sorted(result.data or [], key=lambda row: position[row["id"]])
+            next_page = None
+        else:
+            # Apply search filter
+            if search:
+                query = query.ilike("name", f"%{search}%")
+            
+            # Order by name (already in view but can be overridden), then id
+            query = apply_keyset(query, COMPANY_SORT_KEYS, cursor)
+            
+            # Apply pagination
+            if cursor:
+                query = query.limit(limit)
+            else:
+                query = query.range(offset, offset + limit - 1)
+            
+            result = await query.execute()
+            rows = result.data or []
+            
+            # No total for count=none
+            total = None if count == "none" else result.count or 0
+            next_page = next_cursor(rows, COMPANY_SORT_KEYS, limit)
         
-        if not result.data:
-            return {"companies": [], "total": 0}
+        if not rows:
+            return {"companies": [], "total": total, "next_cursor": None}
         
         # Transform view data to match expected format
         companies = []
-        for row in result.data:
+        for row in rows:
             # Restructure to match old format for compatibility
             company = {
                 "id": row["id"],
@@ -132,9 +166,12 @@ async def list_companies(
         
         return {
             "companies": companies,
-            "total": result.count or 0
+            "total": total,
+            "next_cursor": next_page
         }
     
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error in list_companies: {e}")
         import traceback
@@ -147,8 +184,8 @@ async def get_company(company_id: str):
     """Get company details with master data."""
     
     # Get company with master data
-    company = db.client.table("companies")\
-        .select("*, company_master_data(*)")\
+    company = await adb.table("companies")\
+        .select(f"{COMPANY_COLUMNS}, company_master_data(*)")\
         .eq("id", company_id)\
         .single()\
         .execute()
@@ -156,10 +193,10 @@ async def get_company(company_id: str):
     if not company.data:
         raise HTTPException(status_code=404, detail="Company not found")
     
-    company_data = company.data
+    company_data = with_has_logo(company.data)
     
     # Get job count and recent jobs
-    jobs = db.client.table("job_postings")\
+    jobs = await adb.table("job_postings")\
         .select("id, title, posted_date, is_active")\
         .eq("company_id", company_id)\
         .order("posted_date", desc=True)\
@@ -182,7 +219,7 @@ async def create_master_data(company_id: str, data: CompanyMasterDataCreate):
     """Create master data for a company."""
     
     # Check if company exists
-    company = db.client.table("companies")\
+    company = await adb.table("companies")\
         .select("id")\
         .eq("id", company_id)\
         .execute()
@@ -191,7 +228,7 @@ async def create_master_data(company_id: str, data: CompanyMasterDataCreate):
         raise HTTPException(status_code=404, detail="Company not found")
     
     # Check if master data already exists
-    existing = db.client.table("company_master_data")\
+    existing = await adb.table("company_master_data")\
         .select("id")\
         .eq("company_id", company_id)\
         .execute()
@@ -203,7 +240,7 @@ async def create_master_data(company_id: str, data: CompanyMasterDataCreate):
     master_data = data.dict(exclude_none=True)
     master_data["company_id"] = company_id
     
-    result = db.client.table("company_master_data")\
+    result = await adb.table("company_master_data")\
         .insert(master_data)\
         .execute()
     
@@ -220,7 +257,7 @@ async def update_master_data(company_id: str, data: CompanyMasterDataUpdate):
     print(f"[DEBUG] Data dict (exclude_none): {data.dict(exclude_none=True)}")
     
     # Check if master data exists
-    existing = db.client.table("company_master_data")\
+    existing = await adb.table("company_master_data")\
         .select("id")\
         .eq("company_id", company_id)\
         .execute()
@@ -238,7 +275,7 @@ async def update_master_data(company_id: str, data: CompanyMasterDataUpdate):
     
     print(f"[DEBUG] Sending to database: {update_data}")
     
-    result = db.client.table("company_master_data")\
+    result = await adb.table("company_master_data")\
         .update(update_data)\
         .eq("company_id", company_id)\
         .execute()
@@ -252,7 +289,7 @@ async def patch_master_data(company_id: str, data: dict):
     """Partially update master data fields (for inline editing)."""
     
     # Check if master data exists
-    existing = db.client.table("company_master_data")\
+    existing = await adb.table("company_master_data")\
         .select("id")\
         .eq("company_id", company_id)\
         .execute()
@@ -260,13 +297,13 @@ async def patch_master_data(company_id: str, data: dict):
     if not existing.data:
         # Create master data if it doesn't exist
         data["company_id"] = company_id
-        result = db.client.table("company_master_data")\
+        result = await adb.table("company_master_data")\
             .insert(data)\
             .execute()
         return result.data[0]
     
     # Update only the provided fields
-    result = db.client.table("company_master_data")\
+    result = await adb.table("company_master_data")\
         .update(data)\
         .eq("company_id", company_id)\
         .execute()
@@ -278,7 +315,7 @@ async def patch_master_data(company_id: str, data: dict):
 async def delete_master_data(company_id: str):
     """Delete master data for a company."""
     
-    result = db.client.table("company_master_data")\
+    result = await adb.table("company_master_data")\
         .delete()\
         .eq("company_id", company_id)\
         .execute()
@@ -290,7 +327,7 @@ async def delete_master_data(company_id: str):
 async def list_industries():
     """Get list of unique industries."""
     
-    result = db.client.table("company_master_data")\
+    result = await adb.table("company_master_data")\
         .select("industry")\
         .execute()
     
@@ -305,322 +342,112 @@ async def list_industries():
     return {"industries": industries}
 
 
+COMPANY_EXPORT_HEADER = [
+    'LinkedIn Company ID',
+    'Company Name',
+    'Industry',
+    'Founded Year',
+    'Website',
+    'Jobs Page URL',
+    'Contact Email',
+    'Bedrijfswebsite (AI)',
+    'Jobspagina (AI)',
+    'Email HR (AI)',
+    'Email HR Bron (AI)',
+    'Email Algemeen (AI)',
+    'Bedrijfsomschrijving (AI)',
+    'AI Enriched'
+]
+
+COMPANY_EXPORT_MASTER_DATA_FIELDS = [
+    "industry", "founded_year", "website", "jobs_page_url", "contact_email",
+    "bedrijfswebsite", "jobspagina", "email_hr", "email_hr_bron", "email_algemeen",
+    "bedrijfsomschrijving"
+]
+
+
+def company_export_row(company: dict) -> list:
+    """CSV row of a company with its master data."""
+    master_data = first_embedded(company.get("company_master_data")) or {}
+    
+    return [
+        company.get("linkedin_company_id") or "",
+        company.get("name") or "",
+        *[master_data.get(field) or "" for field in COMPANY_EXPORT_MASTER_DATA_FIELDS],
+        "Yes" if master_data.get("ai_enriched") else "No"
+    ]
+
+
 @router.get("/export/csv")
 async def export_companies_csv(
     search: Optional[str] = None,
     industry: Optional[str] = None,
     verified: Optional[bool] = None
 ):
-    """Export companies with master data to CSV."""
+    """Export companies with master data to CSV (streamed in keyset pages, see web.exports)."""
     
-    try:
-        # Build query to get all companies (no pagination for export)
-        query = db.client.table("companies").select(
-            "id, linkedin_company_id, name, logo_url, company_master_data(*)"
-        )
-        
-        # Apply search filter
-        if search:
-            query = query.ilike("name", f"%{search}%")
-        
-        # Order by name
-        query = query.order("name")
-        
-        result = query.execute()
-        
-        if not result.data:
-            # Return empty CSV with headers
-            companies = []
-        else:
-            companies = result.data
-        
-        # Create CSV in memory
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow([
-            'LinkedIn Company ID',
-            'Company Name',
-            'Industry',
-            'Founded Year',
-            'Website',
-            'Jobs Page URL',
-            'Contact Email',
-            'Bedrijfswebsite (AI)',
-            'Jobspagina (AI)',
-            'Email HR (AI)',
-            'Email HR Bron (AI)',
-            'Email Algemeen (AI)',
-            'Bedrijfsomschrijving (AI)',
-            'AI Enriched'
-        ])
-        
-        # Write data rows
-        for company in companies:
-            master_data = company.get("company_master_data")
-            
-            # Handle master_data format (could be list or dict)
-            if isinstance(master_data, list):
-                master_data = master_data[0] if master_data else None
-            
-            # Extract fields
-            linkedin_company_id = company.get("linkedin_company_id", "")
-            company_name = company.get("name", "")
-            industry = master_data.get("industry", "") if master_data else ""
-            founded_year = master_data.get("founded_year", "") if master_data else ""
-            website = master_data.get("website", "") if master_data else ""
-            jobs_page_url = master_data.get("jobs_page_url", "") if master_data else ""
-            contact_email = master_data.get("contact_email", "") if master_data else ""
-            bedrijfswebsite = master_data.get("bedrijfswebsite", "") if master_data else ""
-            jobspagina = master_data.get("jobspagina", "") if master_data else ""
-            email_hr = master_data.get("email_hr", "") if master_data else ""
-            email_hr_bron = master_data.get("email_hr_bron", "") if master_data else ""
-            email_algemeen = master_data.get("email_algemeen", "") if master_data else ""
-            bedrijfsomschrijving = master_data.get("bedrijfsomschrijving", "") if master_data else ""
-            ai_enriched = "Yes" if (master_data and master_data.get("ai_enriched")) else "No"
-            
-            writer.writerow([
-                linkedin_company_id,
-                company_name,
-                industry,
-                founded_year,
-                website,
-                jobs_page_url,
-                contact_email,
-                bedrijfswebsite,
-                jobspagina,
-                email_hr,
-                email_hr_bron,
-                email_algemeen,
-                bedrijfsomschrijving,
-                ai_enriched
-            ])
-        
-        # Prepare response
-        output.seek(0)
-        
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": "attachment; filename=companies_export.csv"
-            }
-        )
+    query = adb.table("companies").select(
+        f"id, linkedin_company_id, name, company_master_data({', '.join(COMPANY_EXPORT_MASTER_DATA_FIELDS)}, ai_enriched)"
+    )
     
-    except Exception as e:
-        print(f"Error in export_companies_csv: {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Failed to export companies: {str(e)}")
+    # Apply search filter
+    if search:
+        query = query.ilike("name", f"%{search}%")
+    
+    return csv_response(
+        csv_chunks(COMPANY_EXPORT_HEADER, keyset_pages(query), company_export_row),
+        "companies_export.csv"
+    )
 
 
-@router.post("/import/csv")
-async def import_companies_csv(file: UploadFile = File(...)):
-    """Import companies master data from CSV file. Matches companies by LinkedIn Company ID (first column)."""
+@router.post("/import/csv", status_code=202)
+async def import_companies_csv(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+    """
+    Import companies master data from CSV file. Matches companies by LinkedIn Company ID (first column).
     
-    try:
-        # Validate file type
-        if not file.filename.endswith('.csv'):
-            raise HTTPException(status_code=400, detail="File must be a CSV")
-        
-        # Read file content
-        content = await file.read()
-        
-        # Try different encodings
-        content_str = None
-        for encoding in ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252']:
-            try:
-                content_str = content.decode(encoding)
-                break
-            except UnicodeDecodeError:
-                continue
-        
-        if content_str is None:
-            raise HTTPException(status_code=400, detail="Unable to decode CSV file. Please ensure it's a valid CSV.")
-        
-        # Detect delimiter (comma or semicolon)
-        sniffer = csv.Sniffer()
-        try:
-            # Sample first 1024 bytes to detect delimiter
-            sample = content_str[:1024]
-            dialect = sniffer.sniff(sample, delimiters=',;\t')
-            delimiter = dialect.delimiter
-        except csv.Error:
-            # Default to comma if detection fails
-            delimiter = ','
-        
-        # Parse CSV with detected delimiter
-        csv_reader = csv.reader(io.StringIO(content_str), delimiter=delimiter)
-        
-        # Read header
-        try:
-            headers = next(csv_reader)
-            headers = [h.strip() for h in headers]
-        except StopIteration:
-            raise HTTPException(status_code=400, detail="CSV file is empty")
-        
-        # Validate that first column is LinkedIn Company ID (be flexible with naming)
-        first_header_lower = headers[0].lower().strip() if headers else ''
-        if not first_header_lower or ('linkedin' not in first_header_lower and 'company' not in first_header_lower and 'id' not in first_header_lower):
-            # Check if it looks like a valid header at all
-            if not first_header_lower or len(first_header_lower) < 3:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"First column must be 'LinkedIn Company ID'. Found: '{headers[0] if headers else 'empty'}'. Make sure your CSV has proper headers."
-                )
-        
-        # Map headers to indices (case-insensitive)
-        header_map = {}
-        for idx, header in enumerate(headers):
-            header_lower = header.lower().strip()
-            if 'linkedin' in header_lower and 'company' in header_lower and 'id' in header_lower:
-                header_map['linkedin_company_id'] = idx
-            elif 'company' in header_lower and 'name' in header_lower:
-                header_map['company_name'] = idx
-            elif 'industry' in header_lower:
-                header_map['industry'] = idx
-            elif 'founded' in header_lower and 'year' in header_lower:
-                header_map['founded_year'] = idx
-            elif 'website' in header_lower:
-                header_map['website'] = idx
-            elif 'jobs' in header_lower and 'page' in header_lower:
-                header_map['jobs_page_url'] = idx
-            elif 'contact' in header_lower and 'email' in header_lower:
-                header_map['contact_email'] = idx
-        
-        stats = {
-            'total_rows': 0,
-            'skipped_rows': 0,
-            'companies_found': 0,
-            'companies_not_found': 0,
-            'master_data_created': 0,
-            'master_data_updated': 0,
-            'errors': []
-        }
-        
-        # Process each row
-        for row_num, row in enumerate(csv_reader, start=2):  # Start at 2 (header is row 1)
-            stats['total_rows'] += 1
-            
-            try:
-                # Get LinkedIn Company ID from first column
-                if not row or len(row) == 0:
-                    stats['skipped_rows'] += 1
-                    continue
-                
-                linkedin_company_id = row[0].strip() if row[0] else ''
-                
-                # Skip empty rows or rows without LinkedIn Company ID
-                if not linkedin_company_id:
-                    stats['skipped_rows'] += 1
-                    continue
-                
-                # Convert to string and remove any decimal points (Excel formatting issue)
-                linkedin_company_id = str(linkedin_company_id).split('.')[0]
-                
-                # Find company by linkedin_company_id
-                result = db.client.table("companies")\
-                    .select("id, name")\
-                    .eq("linkedin_company_id", linkedin_company_id)\
-                    .execute()
-                
-                if not result.data:
-                    stats['companies_not_found'] += 1
-                    # Get company name from row for better error message
-                    company_name = row[header_map.get('company_name', 1)] if 'company_name' in header_map and len(row) > header_map.get('company_name', 1) else 'Unknown'
-                    stats['errors'].append({
-                        'row': row_num,
-                        'linkedin_id': linkedin_company_id,
-                        'company_name': company_name,
-                        'error': 'Company not found in database'
-                    })
-                    continue
-                
-                company = result.data[0]
-                stats['companies_found'] += 1
-                company_id = company['id']
-                
-                # Helper function to safely get value from row
-                def get_value(key):
-                    if key not in header_map:
-                        return None
-                    idx = header_map[key]
-                    if idx >= len(row):
-                        return None
-                    value = row[idx].strip() if row[idx] else ''
-                    return value if value else None
-                
-                # Prepare master data - only include fields that have values
-                master_data = {}
-                
-                # String fields
-                if get_value('industry'):
-                    master_data['industry'] = get_value('industry')
-                if get_value('website'):
-                    master_data['website'] = get_value('website')
-                if get_value('jobs_page_url'):
-                    master_data['jobs_page_url'] = get_value('jobs_page_url')
-                if get_value('contact_email'):
-                    master_data['contact_email'] = get_value('contact_email')
-                
-                # Parse founded year
-                founded_year_str = get_value('founded_year')
-                if founded_year_str:
-                    try:
-                        # Remove any non-digit characters
-                        clean_str = ''.join(c for c in founded_year_str if c.isdigit())
-                        if clean_str:
-                            master_data['founded_year'] = int(clean_str)
-                    except ValueError:
-                        pass
-                
-                # Skip if no data to import
-                if not master_data:
-                    stats['skipped_rows'] += 1
-                    continue
-                
-                # Check if master data exists
-                existing = db.client.table("company_master_data")\
-                    .select("id")\
-                    .eq("company_id", company_id)\
-                    .execute()
-                
-                if existing.data:
-                    # Update existing master data
-                    db.client.table("company_master_data")\
-                        .update(master_data)\
-                        .eq("company_id", company_id)\
-                        .execute()
-                    stats['master_data_updated'] += 1
-                else:
-                    # Create new master data
-                    master_data['company_id'] = company_id
-                    db.client.table("company_master_data")\
-                        .insert(master_data)\
-                        .execute()
-                    stats['master_data_created'] += 1
-                    
-            except Exception as e:
-                stats['errors'].append({
-                    'row': row_num,
-                    'linkedin_id': row[0] if row else 'Unknown',
-                    'error': str(e)
-                })
-        
-        return {
-            'success': True,
-            'message': f"Import completed: {stats['master_data_created']} created, {stats['master_data_updated']} updated",
-            'stats': stats
-        }
+    The import runs in the background (see ingestion.company_csv_import); poll
+    GET /import/{job_id} for progress and the result with row-level errors.
+    """
     
-    except HTTPException:
-        raise
+    # Validate file type
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="File must be a CSV")
+    
+    path = await asyncio.to_thread(spool_upload, file.file)
+    try:
+        csv_file = await asyncio.to_thread(inspect_company_csv, path)
+    except CsvImportError as e:
+        os.remove(path)
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"Error in import_companies_csv: {e}")
-        import traceback
-        traceback.print_exc()
+        os.remove(path)
+        logger.error(f"Error in import_companies_csv: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to import companies: {str(e)}")
+    
+    job = background_jobs.create(
+        "company_import",
+        filename=file.filename,
+        processed_rows=0,
+        estimated_rows=csv_file.estimated_rows
+    )
+    background_tasks.add_task(run_company_import, job, csv_file)
+    
+    return {
+        'success': True,
+        'message': f"Import started ({csv_file.estimated_rows} rows)",
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f"/api/companies/import/{job.id}"
+    }
+
+
+@router.get("/import/{job_id}")
+async def get_company_import_status(job_id: str):
+    """Status, progress and (when finished) the stats of a CSV import."""
+    job = background_jobs.get(job_id)
+    if job is None or job.kind != "company_import":
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job.to_dict()
 
 
 # ==================== LOGO UPLOAD ====================
@@ -646,17 +473,9 @@ async def upload_company_logo(company_id: str, file: UploadFile = File(...)):
                 detail=f"File too large. Maximum size: {MAX_FILE_SIZE / 1024 / 1024}MB"
             )
         
-        # Update database with binary data
-        db.client.table("companies")\
-            .update({
-                "logo_data": logo_data,
-                "logo_filename": file.filename,
-                "logo_content_type": file.content_type
-            })\
-            .eq("id", company_id)\
-            .execute()
+        filename = await save_logo("companies", company_id, logo_data, file.content_type, file.filename)
         
-        return {"message": "Logo uploaded successfully", "filename": file.filename}
+        return {"message": "Logo uploaded successfully", "filename": filename}
     except HTTPException:
         raise
     except Exception as e:
@@ -664,22 +483,15 @@ async def upload_company_logo(company_id: str, file: UploadFile = File(...)):
 
 
 @router.get("/{company_id}/logo")
-async def get_company_logo(company_id: str):
-    """Get the logo for a company."""
+async def get_company_logo(
+    company_id: str,
+    request: Request,
+    size: Optional[int] = Query(None, ge=1),
+    fmt: Optional[str] = Query(None, alias="format")
+):
+    """Get the logo for a company as a fixed-size thumbnail (ETag / 304 aware)."""
     try:
-        result = db.client.table("companies")\
-            .select("logo_data, logo_content_type, logo_filename")\
-            .eq("id", company_id)\
-            .single()\
-            .execute()
-        
-        if not result.data or not result.data.get("logo_data"):
-            raise HTTPException(status_code=404, detail="Logo not found")
-        
-        return Response(
-            content=bytes(result.data["logo_data"]),
-            media_type=result.data.get("logo_content_type", "image/png")
-        )
+        return await logo_response("companies", company_id, request, size, fmt)
     except HTTPException:
         raise
     except Exception as e:
@@ -690,14 +502,7 @@ async def get_company_logo(company_id: str):
 async def delete_company_logo(company_id: str):
     """Delete the logo for a company."""
     try:
-        db.client.table("companies")\
-            .update({
-                "logo_data": None,
-                "logo_filename": None,
-                "logo_content_type": None
-            })\
-            .eq("id", company_id)\
-            .execute()
+        await delete_logo("companies", company_id)
         
         return {"message": "Logo deleted successfully"}
     except Exception as e:
@@ -725,7 +530,7 @@ async def enrich_single_company(company_id: str, background_tasks: BackgroundTas
     """Enrich a single company with AI (runs in background)."""
     try:
         # Get company details
-        company = db.client.table("companies")\
+        company = await adb.table("companies")\
             .select("id, name, logo_url")\
             .eq("id", company_id)\
             .single()\
@@ -796,7 +601,7 @@ async def get_unenriched_companies(limit: int = 1000):
         
         # Use include_retries=False to find companies without master_data records
         # This includes all companies that have never been enriched (no master_data row)
-        company_ids = get_unenriched_companies(limit, include_retries=False)
+        company_ids = await adb.run(get_unenriched_companies, limit, include_retries=False)
         
         return {
             "company_ids": company_ids,
@@ -813,7 +618,7 @@ async def get_enrichment_stats():
     try:
         from ingestion.company_enrichment import get_enrichment_stats
         
-        stats = get_enrichment_stats()
+        stats = await adb.run(get_enrichment_stats)
         
         return stats
         
@@ -836,7 +641,7 @@ async def classify_company_size(company_id: str):
         from ingestion.company_enrichment import enrich_company
         
         # Get company data
-        company = db.client.table("companies")\
+        company = await adb.table("companies")\
             .select("id, name, logo_url")\
             .eq("id", company_id)\
             .single()\
@@ -852,7 +657,7 @@ async def classify_company_size(company_id: str):
             raise HTTPException(status_code=400, detail="Company has no name")
         
         # Run unified enrichment (includes size classification)
-        result = enrich_company(company_id, company_name, company_url)
+        result = await adb.run(enrich_company, company_id, company_name, company_url)
         
         if not result.get("success"):
             raise HTTPException(status_code=500, detail=result.get("error", "Enrichment failed"))
@@ -885,7 +690,7 @@ async def get_size_classification_stats():
     try:
         from ingestion.company_size_enrichment import get_classification_stats
         
-        stats = get_classification_stats()
+        stats = await adb.run(get_classification_stats)
         
         return stats
         
@@ -914,7 +719,7 @@ async def classify_company_consulting(company_id: str, background_tasks: Backgro
     """Classify if a company is primarily a consulting firm (runs in background)."""
     try:
         # Get company details
-        company = db.client.table("companies")\
+        company = await adb.table("companies")\
             .select("id, name")\
             .eq("id", company_id)\
             .single()\
@@ -928,7 +733,7 @@ async def classify_company_consulting(company_id: str, background_tasks: Backgro
         # Get master data description if available
         description = None
         try:
-            master_data = db.client.table("company_master_data")\
+            master_data = await adb.table("company_master_data")\
                 .select("bedrijfsomschrijving_en")\
                 .eq("company_id", company_id)\
                 .execute()
@@ -995,7 +800,7 @@ async def get_enriched_companies_for_consulting(limit: int = 1000):
     """Get list of enriched companies that can be classified for consulting status."""
     try:
         # Get companies that have been AI enriched (query master data table directly)
-        result = db.client.table("company_master_data")\
+        result = await adb.table("company_master_data")\
             .select("company_id")\
             .eq("ai_enriched", True)\
             .limit(limit)\
@@ -1017,7 +822,7 @@ async def classify_all_enriched_companies(background_tasks: BackgroundTasks, lim
     """Classify all enriched companies for consulting status (runs in background)."""
     try:
         # Get enriched companies (query master data table directly)
-        result = db.client.table("company_master_data")\
+        result = await adb.table("company_master_data")\
             .select("company_id")\
             .eq("ai_enriched", True)\
             .limit(limit)\
@@ -7,12 +7,15 @@ from uuid import UUID
 from datetime import datetime
 from loguru import logger
 
-from database import db
+from database import adb
 from scraper import execute_scrape_run
 from scheduler.service import get_scheduler
 
 router = APIRouter()
 
+# Queries without runs
+EMPTY_RUN_STATS = {"last_run": None, "total_jobs": 0, "run_count": 0}
+
 
 class IndeedQueryCreate(BaseModel):
     """Schema for creating a new Indeed query."""
@@ -50,42 +53,23 @@ async def list_indeed_queries(
     """List all Indeed search queries with stats."""
     try:
         # Get all Indeed queries from search_queries table
-        query_builder = db.client.table("search_queries").select("*").eq("source", "indeed")
+        query_builder = adb.table("search_queries").select("*").eq("source", "indeed")
         
         if status == "active":
             query_builder = query_builder.eq("is_active", True)
         elif status == "inactive":
             query_builder = query_builder.eq("is_active", False)
         
-        queries = query_builder.order("created_at", desc=True)\
+        queries = await query_builder.order("created_at", desc=True)\
             .range(offset, offset + limit - 1)\
             .execute()
         
-        # Get stats for each query
-        result = []
-        for query in queries.data:
-            # Get latest run
-            latest_run = db.client.table("scrape_runs")\
-                .select("*")\
-                .eq("search_query_id", query["id"])\
-                .order("started_at", desc=True)\
-                .limit(1)\
-                .execute()
-            
-            # Count total jobs found
-            all_runs = db.client.table("scrape_runs")\
-                .select("jobs_found")\
-                .eq("search_query_id", query["id"])\
-                .execute()
-            
-            total_jobs = sum(r.get("jobs_found", 0) for r in all_runs.data)
-            
-            result.append({
-                **query,
-                "last_run": latest_run.data[0] if latest_run.data else None,
-                "total_jobs": total_jobs,
-                "run_count": len(all_runs.data)
-            })
+        # Last run, run count and total jobs for the whole page in one call
+        run_stats = await adb.get_query_run_stats(queries.data)
+        result = [
+            {**query, **run_stats.get(query["id"], EMPTY_RUN_STATS)}
+            for query in queries.data
+        ]
         
         # Get overall stats
         stats = {
@@ -110,7 +94,7 @@ async def create_indeed_query(query: IndeedQueryCreate):
             **query.dict(),
             "source": "indeed"
         }
-        result = db.client.table("search_queries").insert(data).execute()
+        result = await adb.table("search_queries").insert(data).execute()
         return result.data[0]
     except Exception as e:
         logger.error(f"Error creating Indeed query: {e}")
@@ -121,7 +105,7 @@ async def create_indeed_query(query: IndeedQueryCreate):
 async def get_indeed_query(query_id: str):
     """Get a specific Indeed query."""
     try:
-        result = db.client.table("search_queries")\
+        result = await adb.table("search_queries")\
             .select("*")\
             .eq("id", query_id)\
             .eq("source", "indeed")\
@@ -138,7 +122,7 @@ async def update_indeed_query(query_id: str, query: IndeedQueryUpdate):
     """Update an Indeed query."""
     try:
         data = query.dict(exclude_none=True)
-        result = db.client.table("search_queries")\
+        result = await adb.table("search_queries")\
             .update(data)\
             .eq("id", query_id)\
             .eq("source", "indeed")\
@@ -153,7 +137,7 @@ async def update_indeed_query(query_id: str, query: IndeedQueryUpdate):
 async def delete_indeed_query(query_id: str):
     """Delete an Indeed query."""
     try:
-        db.client.table("search_queries")\
+        await adb.table("search_queries")\
             .delete()\
             .eq("id", query_id)\
             .eq("source", "indeed")\
@@ -169,7 +153,7 @@ async def run_indeed_query(query_id: str, background_tasks: BackgroundTasks):
     """Trigger a scrape run for an Indeed query."""
     try:
         # Get query details
-        query = db.client.table("search_queries")\
+        query = await adb.table("search_queries")\
             .select("*")\
             .eq("id", query_id)\
             .eq("source", "indeed")\
@@ -219,7 +203,7 @@ async def update_schedule(query_id: str, schedule: ScheduleConfig):
         
         # Update database
         update_data = schedule.model_dump()
-        result = db.client.table("search_queries")\
+        result = await adb.table("search_queries")\
             .update(update_data)\
             .eq("id", query_id)\
             .eq("source", "indeed")\
@@ -231,7 +215,7 @@ async def update_schedule(query_id: str, schedule: ScheduleConfig):
         # Update scheduler
         scheduler = get_scheduler()
         if schedule.schedule_enabled:
-            scheduler.schedule_query(result.data[0])
+            await adb.run(scheduler.schedule_query, result.data[0])
             logger.info(f"Scheduled Indeed query {query_id}")
         else:
             scheduler.unschedule_query(query_id)
@@ -249,7 +233,7 @@ async def update_schedule(query_id: str, schedule: ScheduleConfig):
 async def get_schedule(query_id: str):
     """Get schedule information for an Indeed query."""
     try:
-        result = db.client.table("search_queries")\
+        result = await adb.table("search_queries")\
             .select("schedule_enabled, schedule_type, schedule_time, schedule_interval_hours, schedule_days_of_week")\
             .eq("id", query_id)\
             .eq("source", "indeed")\
@@ -6,7 +6,7 @@ from datetime import datetime, timedelta
 from loguru import logger
 from pydantic import BaseModel
 
-from database import db
+from database import db, adb
 
 router = APIRouter()
 
@@ -24,19 +24,19 @@ async def list_indeed_runs(
     """List all Indeed scrape runs."""
     try:
         # Get runs with Indeed platform
-        query_builder = db.client.table("scrape_runs")\
+        query_builder = adb.table("scrape_runs")\
             .select("*, search_queries(search_query, location_query, job_type_id)")\
             .eq("platform", "indeed_brightdata")
         
         if status:
             query_builder = query_builder.eq("status", status)
         
-        runs = query_builder.order("started_at", desc=True)\
+        runs = await query_builder.order("started_at", desc=True)\
             .range(offset, offset + limit - 1)\
             .execute()
         
         # Get stats
-        stats_query = db.client.table("scrape_runs")\
+        stats_query = await adb.table("scrape_runs")\
             .select("status, jobs_found, jobs_new, jobs_updated")\
             .eq("platform", "indeed_brightdata")\
             .execute()
@@ -64,7 +64,7 @@ async def list_indeed_runs(
 async def get_active_indeed_runs():
     """Get currently running Indeed scrapes."""
     try:
-        runs = db.client.table("scrape_runs")\
+        runs = await adb.table("scrape_runs")\
             .select("*, search_queries(search_query, location_query, job_type_id)")\
             .eq("platform", "indeed_brightdata")\
             .eq("status", "running")\
@@ -85,7 +85,7 @@ async def get_active_indeed_runs():
 async def get_indeed_run(run_id: str):
     """Get details of a specific Indeed run."""
     try:
-        result = db.client.table("scrape_runs")\
+        result = await adb.table("scrape_runs")\
             .select("*, search_queries(search_query, location_query, job_type_id)")\
             .eq("id", run_id)\
             .eq("platform", "indeed_brightdata")\
@@ -102,7 +102,7 @@ async def get_indeed_run_jobs(run_id: str, limit: int = 100, offset: int = 0):
     """Get jobs from a specific Indeed run."""
     try:
         # Get jobs via scrape_history
-        result = db.client.table("scrape_history")\
+        result = await adb.table("scrape_history")\
             .select("job_posting_id, job_postings(id, title, company_id, location_id, source, companies(name), locations!job_postings_location_id_fkey(city, country_code))")\
             .eq("scrape_run_id", run_id)\
             .range(offset, offset + limit - 1)\
@@ -132,7 +132,7 @@ async def archive_indeed_run(run_id: str, body: ArchiveRequest):
     """Archive or unarchive an Indeed scrape run."""
     try:
         # Update the archived status
-        result = db.client.table("scrape_runs")\
+        result = await adb.table("scrape_runs")\
             .update({"archived": body.archived})\
             .eq("id", run_id)\
             .eq("platform", "indeed_brightdata")\
@@ -165,7 +165,7 @@ async def stop_indeed_run(run_id: str):
     """
     try:
         # Get current run (don't check status - allow stopping any run)
-        current = db.client.table("scrape_runs")\
+        current = await adb.table("scrape_runs")\
             .select("*")\
             .eq("id", run_id)\
             .eq("platform", "indeed_brightdata")\
@@ -184,7 +184,7 @@ async def stop_indeed_run(run_id: str):
             }
         
         # Hard stop: update status immediately
-        result = db.client.table("scrape_runs")\
+        result = await adb.table("scrape_runs")\
             .update({
                 "status": "failed",
                 "completed_at": datetime.utcnow().isoformat(),
@@ -211,7 +211,7 @@ async def cancel_indeed_run(run_id: str):
     """Cancel/kill a running Indeed scrape run."""
     try:
         # Check if run exists and is cancellable
-        run = db.client.table("scrape_runs")\
+        run = await adb.table("scrape_runs")\
             .select("id, status")\
             .eq("id", run_id)\
             .eq("platform", "indeed_brightdata")\
@@ -229,7 +229,7 @@ async def cancel_indeed_run(run_id: str):
             )
         
         # Update run to failed status with cancellation metadata
-        result = db.client.table("scrape_runs")\
+        result = await adb.table("scrape_runs")\
             .update({
                 "status": "failed",
                 "completed_at": datetime.utcnow().isoformat(),
@@ -276,7 +276,7 @@ async def cleanup_stuck_indeed_runs(hours: int = 2):
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
         
         # Find stuck runs
-        stuck_runs = db.client.table("scrape_runs")\
+        stuck_runs = await adb.table("scrape_runs")\
             .select("id, search_query, location_query, started_at")\
             .eq("platform", "indeed_brightdata")\
             .eq("status", "running")\
@@ -293,7 +293,7 @@ async def cleanup_stuck_indeed_runs(hours: int = 2):
         cleaned_count = 0
         for run in stuck_runs.data:
             try:
-                db.client.table("scrape_runs")\
+                await adb.table("scrape_runs")\
                     .update({
                         "status": "failed",
                         "completed_at": datetime.utcnow().isoformat(),
@@ -1,11 +1,13 @@
 """API endpoints for job types management."""
 
+import asyncio
 from fastapi import APIRouter, HTTPException
-from typing import Optional
+from typing import Optional, List, Dict
 from pydantic import BaseModel
 from datetime import datetime
+from loguru import logger
 
-from database import db
+from database import db, adb
 
 router = APIRouter()
 
@@ -26,23 +28,18 @@ class JobTypeUpdate(BaseModel):
 @router.get("/")
 async def list_job_types(active_only: bool = False):
     """List all job types."""
-    query = db.client.table("job_types").select("*")
+    query = adb.table("job_types").select("*")
     
     if active_only:
         query = query.eq("is_active", True)
     
-    result = query.order("name").execute()
+    result = await query.order("name").execute()
     
-    # Get job counts for each type
+    # Get job counts for all types in one grouped query
+    job_counts = await _get_job_type_counts([job_type["id"] for job_type in result.data])
     types_with_counts = []
     for job_type in result.data:
-        # Count jobs with this type
-        count_result = db.client.table("job_type_assignments")\
-            .select("id", count="exact")\
-            .eq("job_type_id", job_type["id"])\
-            .execute()
-        
-        job_type["job_count"] = count_result.count or 0
+        job_type["job_count"] = job_counts.get(job_type["id"], 0)
         types_with_counts.append(job_type)
     
     return {
@@ -51,10 +48,28 @@ async def list_job_types(active_only: bool = False):
     }
 
 
+async def _get_job_type_counts(type_ids: List[str]) -> Dict[str, int]:
+    """Job count per type (get_job_type_counts RPC, migration 071; falls back to one count per type)."""
+    try:
+        result = await adb.rpc("get_job_type_counts").execute()
+        return {row["job_type_id"]: row["job_count"] for row in result.data or []}
+    except Exception as e:
+        logger.warning(f"get_job_type_counts unavailable, counting per job type: {e}")
+    
+    counts = await asyncio.gather(*[
+        adb.table("job_type_assignments")
+            .select("id", count="exact")
+            .eq("job_type_id", type_id)
+            .execute()
+        for type_id in type_ids
+    ])
+    return {type_id: count_result.count or 0 for type_id, count_result in zip(type_ids, counts)}
+
+
 @router.get("/{type_id}")
 async def get_job_type(type_id: str):
     """Get a specific job type."""
-    result = db.client.table("job_types")\
+    result = await adb.table("job_types")\
         .select("*")\
         .eq("id", type_id)\
         .single()\
@@ -70,7 +85,7 @@ async def get_job_type(type_id: str):
 async def create_job_type(job_type: JobTypeCreate):
     """Create a new job type."""
     try:
-        result = db.client.table("job_types")\
+        result = await adb.table("job_types")\
             .insert({
                 "name": job_type.name,
                 "description": job_type.description,
@@ -78,6 +93,7 @@ async def create_job_type(job_type: JobTypeCreate):
                 "is_active": True
             })\
             .execute()
+        db.master_data.invalidate("job_types")
         
         return result.data[0]
     except Exception as e:
@@ -103,7 +119,7 @@ async def update_job_type(type_id: str, job_type: JobTypeUpdate):
         raise HTTPException(status_code=400, detail="No fields to update")
     
     try:
-        result = db.client.table("job_types")\
+        result = await adb.table("job_types")\
             .update(update_data)\
             .eq("id", type_id)\
             .execute()
@@ -111,6 +127,7 @@ async def update_job_type(type_id: str, job_type: JobTypeUpdate):
         if not result.data:
             raise HTTPException(status_code=404, detail="Job type not found")
         
+        db.master_data.invalidate("job_types")
         return result.data[0]
     except Exception as e:
         if "duplicate key" in str(e).lower():
@@ -122,17 +139,18 @@ async def update_job_type(type_id: str, job_type: JobTypeUpdate):
 async def delete_job_type(type_id: str):
     """Delete a job type (soft delete by setting is_active=false)."""
     # Check if type is used in queries
-    queries = db.client.table("search_queries")\
+    queries = await adb.table("search_queries")\
         .select("id", count="exact")\
         .eq("job_type_id", type_id)\
         .execute()
     
     if queries.count and queries.count > 0:
         # Soft delete - set to inactive
-        result = db.client.table("job_types")\
+        result = await adb.table("job_types")\
             .update({"is_active": False})\
             .eq("id", type_id)\
             .execute()
+        db.master_data.invalidate("job_types")
         
         return {
             "message": "Job type deactivated (used in queries)",
@@ -140,10 +158,11 @@ async def delete_job_type(type_id: str):
         }
     else:
         # Hard delete - not used anywhere
-        result = db.client.table("job_types")\
+        result = await adb.table("job_types")\
             .delete()\
             .eq("id", type_id)\
             .execute()
+        db.master_data.invalidate("job_types")
         
         return {
             "message": "Job type deleted",
@@ -155,7 +174,7 @@ async def delete_job_type(type_id: str):
 async def get_jobs_by_type(type_id: str, limit: int = 50, offset: int = 0):
     """Get all jobs with a specific type."""
     # Get job IDs with this type
-    assignments = db.client.table("job_type_assignments")\
+    assignments = await adb.table("job_type_assignments")\
         .select("job_posting_id")\
         .eq("job_type_id", type_id)\
         .execute()
@@ -166,7 +185,7 @@ async def get_jobs_by_type(type_id: str, limit: int = 50, offset: int = 0):
     job_ids = [a["job_posting_id"] for a in assignments.data]
     
     # Get jobs
-    jobs, total = db.search_jobs(
+    jobs, total = await adb.run(db.search_jobs,
         job_ids=job_ids,
         limit=limit,
         offset=offset
@@ -1,13 +1,18 @@
 """API endpoints for job database."""
 
 from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
-from typing import Optional, List
+from typing import Dict, Optional, List
 from uuid import UUID
 from pydantic import BaseModel
 from loguru import logger
 
-from database import db
+from database import db, adb
+from database.client import COMPANY_COLUMNS, JOB_SEARCH_MAX_RESULTS, RELEVANCE_SORT, SearchMode, apply_job_filters, job_filter_embeds, job_sort_keys
+from database.job_facets import INDEX_SORT_FIELDS, job_facets
+from database.pagination import CountMode, InvalidCursorError, next_cursor
 from ingestion.job_title_classifier import classify_and_save
+from utils.response_cache import response_cache, TAG_JOBS
+from web.exports import csv_chunks, csv_response, first_embedded, join_values, keyset_pages, selection_pages
 
 router = APIRouter()
 
@@ -16,6 +21,15 @@ class ClassifyJobsRequest(BaseModel):
     job_ids: List[str]
 
 
+def job_facet_filters(**values) -> Dict[str, List[str]]:
+    """Facet index filters (database.job_facets.JOB_FACETS) from list parameters; single values become one-item lists."""
+    return {
+        facet: value if isinstance(value, list) else [value]
+        for facet, value in values.items()
+        if value
+    }
+
+
 @router.get("/")
 async def list_jobs(
     search: Optional[str] = None,
@@ -38,12 +52,31 @@ async def list_jobs(
     run_id: Optional[str] = None,  # Filter by scrape run
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
-    sort_field: str = "ranking_position",  # Field to sort by (default: ranking)
+    sort_field: str = "ranking_position",  # Field to sort by (default: ranking), or relevance
     sort_direction: str = "asc",  # asc or desc (asc = best rank first)
     limit: int = 50,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,  # next_cursor of the previous page (replaces offset)
+    count: CountMode = "exact",  # exact, planned, estimated or none
+    search_mode: SearchMode = "basic",  # basic (title contains) or fulltext (websearch syntax)
+    facets: bool = False  # Include the /facets counts for these filters
 ):
-    """List jobs with filtering and search. Default sort by ranking_position (best first)."""
+    """
+    List jobs with filtering and search. Default sort by ranking_position (best first).
+    
+    Pass the returned next_cursor as cursor to get the next page at constant
+    cost (offset pages get slower with depth); count=estimated avoids a full
+    count of the matching jobs. search_mode=fulltext searches titles,
+    descriptions and AI summaries; add sort_field=relevance for best matches
+    first. Relevance also matches stemmed and misspelled words (so its total
+    can differ from other sorts for the same search) and only the best
+    JOB_SEARCH_MAX_RESULTS matches are reachable: total_capped is true when the
+    total is limited by that.
+    
+    Lists of active jobs with offset paging are answered from the in-memory
+    facet index (database.job_facets) when it is loaded: the page ids, total
+    and facet counts come from its bitmaps and only the page rows are read.
+    """
     
     try:
         # If run_id is provided, filter jobs from that specific scrape run
@@ -51,7 +84,7 @@ async def list_jobs(
         run_info = None
         if run_id:
             # Get jobs from this run via job_scrape_history
-            history = db.client.table("job_scrape_history")\
+            history = await adb.table("job_scrape_history")\
                 .select("job_posting_id")\
                 .eq("scrape_run_id", run_id)\
                 .execute()
@@ -63,7 +96,7 @@ async def list_jobs(
                 job_ids_filter = []
             
             # Get run info for display
-            run = db.client.table("scrape_runs")\
+            run = await adb.table("scrape_runs")\
                 .select("search_query, location_query")\
                 .eq("id", run_id)\
                 .execute()
@@ -90,36 +123,87 @@ async def list_jobs(
         else:
             active_only = is_active if is_active is not None else True
         
-        # Build search query
-        jobs, total = db.search_jobs(
-            search_query=search,
-            location=location,
-            company_ids=company_id_list,
-            location_ids=location_id_list,
-            type_ids=type_id_list,
-            seniority=seniority,
-            employment=employment,
-            posted_date=posted_date,
-            ai_enriched=ai_enriched_bool,
-            title_classification=title_classification,
-            type_datarol=type_datarol,
-            contract=contract,
-            subdivision_name_en=subdivision_name_en,
-            source=source,
-            active_only=active_only,
-            job_ids=job_ids_filter,
-            sort_field=sort_field,
-            sort_direction=sort_direction,
-            limit=limit,
-            offset=offset
-        )
+        # Ranked matches are fetched here so the response can tell when the total is capped
+        ranks = None
+        if sort_field == RELEVANCE_SORT and search and search_mode == "fulltext":
+            ranks = await adb.run(db.search_job_ids, search)
+        total_capped = ranks is not None and len(ranks) >= JOB_SEARCH_MAX_RESULTS
+        
+        indexed = None
+        if active_only and not run_id and not cursor and search_mode == "basic" and sort_field in INDEX_SORT_FIELDS:
+            # Pending refreshes are read from the database: run in the thread pool
+            indexed = await adb.run(job_facets.query,
+                filters=job_facet_filters(
+                    company_ids=company_id_list,
+                    location_ids=location_id_list,
+                    type_ids=type_id_list,
+                    seniority=seniority,
+                    employment=employment,
+                    ai_enriched=ai_enriched if ai_enriched_bool is not None else None,
+                    title_classification=title_classification,
+                    type_datarol=type_datarol,
+                    contract=contract,
+                    subdivision_name_en=subdivision_name_en,
+                    source=source
+                ),
+                posted_date=posted_date,
+                search=search,
+                sort_field=sort_field,
+                sort_direction=sort_direction,
+                offset=offset,
+                limit=limit,
+                facets=facets
+            )
+        
+        if indexed is not None:
+            # Read the page rows by id, in the index order
+            rows, _ = await adb.run(db.search_jobs,
+                job_ids=indexed["job_ids"],
+                active_only=False,
+                sort_field=sort_field,
+                sort_direction=sort_direction,
+                limit=len(indexed["job_ids"]),
+                count="none"
+            )
+            rows_by_id = {row["id"]: row for row in rows}
+            jobs = [rows_by_id[job_id] for job_id in indexed["job_ids"] if job_id in rows_by_id]
+            total = indexed["total"]
+        else:
+            jobs, total = await adb.run(db.search_jobs,
+                search_query=search,
+                location=location,
+                company_ids=company_id_list,
+                location_ids=location_id_list,
+                type_ids=type_id_list,
+                seniority=seniority,
+                employment=employment,
+                posted_date=posted_date,
+                ai_enriched=ai_enriched_bool,
+                title_classification=title_classification,
+                type_datarol=type_datarol,
+                contract=contract,
+                subdivision_name_en=subdivision_name_en,
+                source=source,
+                active_only=active_only,
+                job_ids=job_ids_filter,
+                sort_field=sort_field,
+                sort_direction=sort_direction,
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+                count=count,
+                search_mode=search_mode,
+                ranks=ranks
+            )
         
         # Get stats
-        stats = db.get_stats()
+        stats = await adb.get_stats()
         
         response = {
             "jobs": jobs,
             "total": total,  # Use actual count from search_jobs
+            "total_capped": total_capped,  # Relevance sort: total counts only the best JOB_SEARCH_MAX_RESULTS matches
+            "next_cursor": None if sort_field == RELEVANCE_SORT else next_cursor(jobs, job_sort_keys(sort_field, sort_direction), limit),
             "stats": {
                 "total_jobs": stats.get("total_jobs", 0),
                 "active_jobs": stats.get("active_jobs", 0),
@@ -127,6 +211,9 @@ async def list_jobs(
             }
         }
         
+        if facets:
+            response["facets"] = indexed.get("facets") if indexed is not None else None
+        
         # Include run info if filtering by run_id
         if run_info:
             response["filter_info"] = {
@@ -137,6 +224,8 @@ async def list_jobs(
         
         return response
     
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error in list_jobs endpoint: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -174,7 +263,7 @@ async def count_jobs(
     # Handle run_id filter
     job_ids_filter = None
     if run_id:
-        history = db.client.table("job_scrape_history")\
+        history = await adb.table("job_scrape_history")\
             .select("job_posting_id")\
             .eq("scrape_run_id", run_id)\
             .execute()
@@ -193,7 +282,7 @@ async def count_jobs(
     active_only = is_active if is_active is not None else None
     
     # Get count only (limit=0 to skip fetching actual records)
-    _, total = db.search_jobs(
+    _, total = await adb.run(db.search_jobs,
         search_query=search,
         company=company,
         location=location,
@@ -221,12 +310,195 @@ async def count_jobs(
     return {"count": total}
 
 
+JOB_EXPORT_SELECT = (
+    "id, title, source, posted_date, seniority_level, employment_type, is_active, ranking_position, job_url, apply_url, "
+    "companies(name), "
+    "locations!job_postings_location_id_fkey(city, subdivision_name_en), "
+    "llm_enrichment(type_datarol, rolniveau, seniority, contract, skills_must_have_en, skills_nice_to_have_en, "
+    "samenvatting_kort_nl, enrichment_completed_at)"
+)
+
+JOB_EXPORT_HEADER = [
+    'Job ID',
+    'Title',
+    'Company',
+    'City',
+    'Region',
+    'Source',
+    'Posted Date',
+    'Seniority Level',
+    'Employment Type',
+    'Active',
+    'Ranking Position',
+    'Job URL',
+    'Apply URL',
+    'Type Datarol (AI)',
+    'Rolniveau (AI)',
+    'Seniority (AI)',
+    'Contract (AI)',
+    'Skills Must Have (AI)',
+    'Skills Nice To Have (AI)',
+    'Samenvatting (AI)',
+    'AI Enriched'
+]
+
+
+def job_export_row(job: dict) -> list:
+    """CSV row of a job posting with its AI enrichment."""
+    company = first_embedded(job.get("companies")) or {}
+    location = first_embedded(job.get("locations")) or {}
+    enrichment = first_embedded(job.get("llm_enrichment")) or {}
+    
+    return [
+        job["id"],
+        job.get("title") or "",
+        company.get("name") or "",
+        location.get("city") or "",
+        location.get("subdivision_name_en") or "",
+        job.get("source") or "",
+        job.get("posted_date") or "",
+        job.get("seniority_level") or "",
+        job.get("employment_type") or "",
+        "Yes" if job.get("is_active") else "No",
+        job.get("ranking_position") or "",
+        job.get("job_url") or "",
+        job.get("apply_url") or "",
+        enrichment.get("type_datarol") or "",
+        enrichment.get("rolniveau") or "",
+        enrichment.get("seniority") or "",
+        enrichment.get("contract") or "",
+        join_values(enrichment.get("skills_must_have_en")),
+        join_values(enrichment.get("skills_nice_to_have_en")),
+        enrichment.get("samenvatting_kort_nl") or "",
+        "Yes" if enrichment.get("enrichment_completed_at") else "No"
+    ]
+
+
+@router.get("/export/csv")
+async def export_jobs_csv(
+    search: Optional[str] = None,
+    company_ids: Optional[str] = None,  # Comma-separated company IDs
+    location_ids: Optional[str] = None,  # Comma-separated location IDs
+    type_ids: Optional[str] = None,  # Comma-separated type IDs
+    job_ids: Optional[str] = None,  # Comma-separated job IDs (export a selection)
+    seniority: Optional[List[str]] = Query(None),
+    employment: Optional[List[str]] = Query(None),
+    posted_date: Optional[str] = None,
+    ai_enriched: Optional[str] = None,  # true, false, or None for all
+    title_classification: Optional[str] = None,
+    type_datarol: Optional[str] = None,
+    contract: Optional[str] = None,
+    subdivision_name_en: Optional[str] = None,
+    source: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    run_id: Optional[str] = None,
+    search_mode: SearchMode = "basic"
+):
+    """
+    Export jobs with their AI enrichment to CSV, streamed in keyset pages (see web.exports).
+    Accepts the filter parameters of the main /jobs endpoint.
+    """
+    job_ids_filter = job_ids.split(',') if job_ids else None
+    if run_id:
+        history = await adb.table("job_scrape_history")\
+            .select("job_posting_id")\
+            .eq("scrape_run_id", run_id)\
+            .execute()
+        run_job_ids = {h["job_posting_id"] for h in history.data or []}
+        job_ids_filter = [job_id for job_id in (job_ids_filter or run_job_ids) if job_id in run_job_ids]
+    
+    ai_enriched_bool = None
+    if ai_enriched == 'true':
+        ai_enriched_bool = True
+    elif ai_enriched == 'false':
+        ai_enriched_bool = False
+    
+    # A run or an explicit selection exports inactive jobs too, like the job list
+    if is_active is not None:
+        active_only = is_active
+    else:
+        active_only = job_ids_filter is None
+    
+    type_id_list = type_ids.split(',') if type_ids else None
+    query = adb.table("job_postings").select(JOB_EXPORT_SELECT + job_filter_embeds(type_id_list, ai_enriched_bool))
+    query = apply_job_filters(
+        query,
+        search_query=search,
+        company_ids=company_ids.split(',') if company_ids else None,
+        location_ids=location_ids.split(',') if location_ids else None,
+        type_ids=type_id_list,
+        seniority=seniority,
+        employment=employment,
+        posted_date=posted_date,
+        ai_enriched=ai_enriched_bool,
+        title_classification=title_classification,
+        type_datarol=type_datarol,
+        contract=contract,
+        subdivision_name_en=subdivision_name_en,
+        source=source,
+        active_only=active_only,
+        search_mode=search_mode
+    )
+    
+    # A run can hold thousands of jobs: page through them in id chunks, not one huge in_() per page
+    pages = keyset_pages(query) if job_ids_filter is None else selection_pages(query, job_ids_filter)
+    return csv_response(csv_chunks(JOB_EXPORT_HEADER, pages, job_export_row), "jobs_export.csv")
+
+
+@router.get("/facets")
+async def get_job_facets(
+    search: Optional[str] = None,
+    company_ids: Optional[str] = None,  # Comma-separated company IDs
+    location_ids: Optional[str] = None,  # Comma-separated location IDs
+    type_ids: Optional[str] = None,  # Comma-separated type IDs
+    seniority: Optional[List[str]] = Query(None),
+    employment: Optional[List[str]] = Query(None),
+    posted_date: Optional[str] = None,
+    ai_enriched: Optional[str] = None,  # true, false, or None for all
+    title_classification: Optional[str] = None,
+    type_datarol: Optional[str] = None,
+    contract: Optional[str] = None,
+    subdivision_name_en: Optional[str] = None,
+    source: Optional[str] = None
+):
+    """
+    Count active jobs per filter value (seniority, job type, contract, region, ...).
+    
+    Each facet is counted under all selected filters except its own, so the
+    counts show what selecting another value of that facet would return.
+    Accepts the filter parameters of the main /jobs endpoint (basic search).
+    """
+    result = await adb.run(job_facets.query,
+        filters=job_facet_filters(
+            company_ids=company_ids.split(',') if company_ids else None,
+            location_ids=location_ids.split(',') if location_ids else None,
+            type_ids=type_ids.split(',') if type_ids else None,
+            seniority=seniority,
+            employment=employment,
+            ai_enriched=ai_enriched if ai_enriched in ('true', 'false') else None,
+            title_classification=title_classification,
+            type_datarol=type_datarol,
+            contract=contract,
+            subdivision_name_en=subdivision_name_en,
+            source=source
+        ),
+        posted_date=posted_date,
+        search=search,
+        limit=0
+    )
+    if result is None:
+        # First request (or index disabled): the index is built in the background
+        raise HTTPException(status_code=503, detail="Job facet index is loading", headers={"Retry-After": "5"})
+    
+    return {"total": result["total"], "facets": result["facets"]}
+
+
 @router.get("/{job_id}")
 async def get_job_detail(job_id: str):
     """Get detailed information about a specific job."""
     # Get job with all related data including LLM enrichment
-    job = db.client.table("job_postings")\
-        .select("*, companies(*), locations!job_postings_location_id_fkey(*), job_descriptions(*), job_posters(*), llm_enrichment(*)")\
+    job = await adb.table("job_postings")\
+        .select(f"*, companies({COMPANY_COLUMNS}), locations!job_postings_location_id_fkey(*), job_descriptions(*), job_posters(*), llm_enrichment(*)")\
         .eq("id", job_id)\
         .single()\
         .execute()
@@ -241,7 +513,7 @@ async def get_job_detail(job_id: str):
 async def get_job_history(job_id: str):
     """Get scrape history for a job."""
     # Query job_scrape_history with correct column name
-    history = db.client.table("job_scrape_history")\
+    history = await adb.table("job_scrape_history")\
         .select("*, scrape_runs(id, search_query, location_query, started_at, status)")\
         .eq("job_posting_id", job_id)\
         .order("detected_at", desc=True)\
@@ -256,7 +528,9 @@ async def get_job_history(job_id: str):
 async def update_job(job_id: str, job_data: dict):
     """Update job information."""
     # Update job posting
-    db.update_job_posting(UUID(job_id), job_data)
+    await adb.run(db.update_job_posting, UUID(job_id), job_data)
+    response_cache.invalidate(TAG_JOBS)
+    job_facets.refresh_jobs([job_id])
     return {"message": "Job updated successfully"}
 
 
@@ -264,10 +538,12 @@ async def update_job(job_id: str, job_data: dict):
 async def delete_job(job_id: str):
     """Delete a job."""
     # TODO: Implement soft delete
-    db.client.table("job_postings")\
+    await adb.table("job_postings")\
         .delete()\
         .eq("id", job_id)\
         .execute()
+    response_cache.invalidate(TAG_JOBS)
+    job_facets.refresh_jobs([job_id])
     
     return {"message": "Job deleted"}
 
@@ -275,14 +551,16 @@ async def delete_job(job_id: str):
 @router.post("/{job_id}/archive")
 async def archive_job(job_id: str):
     """Archive a job (mark as inactive)."""
-    db.mark_jobs_inactive([UUID(job_id)])
+    await adb.run(db.mark_jobs_inactive, [UUID(job_id)])
+    job_facets.refresh_jobs([job_id])
     return {"message": "Job archived"}
 
 
 @router.post("/bulk/archive")
 async def archive_multiple_jobs(job_ids: List[str]):
     """Archive multiple jobs."""
-    db.mark_jobs_inactive([UUID(jid) for jid in job_ids])
+    await adb.run(db.mark_jobs_inactive, [UUID(jid) for jid in job_ids])
+    job_facets.refresh_jobs(job_ids)
     return {"message": f"Archived {len(job_ids)} jobs"}
 
 
@@ -290,10 +568,12 @@ async def archive_multiple_jobs(job_ids: List[str]):
 async def delete_multiple_jobs(job_ids: List[str]):
     """Delete multiple jobs."""
     for job_id in job_ids:
-        db.client.table("job_postings")\
+        await adb.table("job_postings")\
             .delete()\
             .eq("id", job_id)\
             .execute()
+    response_cache.invalidate(TAG_JOBS)
+    job_facets.refresh_jobs(job_ids)
     
     return {"message": f"Deleted {len(job_ids)} jobs"}
 
@@ -301,7 +581,7 @@ async def delete_multiple_jobs(job_ids: List[str]):
 @router.get("/companies/autocomplete")
 async def autocomplete_companies(q: str = Query(..., min_length=2)):
     """Autocomplete company names."""
-    result = db.client.table("companies")\
+    result = await adb.table("companies")\
         .select("id, name, logo_url")\
         .ilike("name", f"%{q}%")\
         .limit(10)\
@@ -313,7 +593,7 @@ async def autocomplete_companies(q: str = Query(..., min_length=2)):
 @router.get("/locations/autocomplete")
 async def autocomplete_locations(q: str = Query(..., min_length=2)):
     """Autocomplete locations."""
-    result = db.client.table("locations")\
+    result = await adb.table("locations")\
         .select("id, full_location_string, city, region, country")\
         .ilike("full_location_string", f"%{q}%")\
         .limit(10)\
@@ -325,7 +605,7 @@ async def autocomplete_locations(q: str = Query(..., min_length=2)):
 @router.get("/types")
 async def get_job_types():
     """Get all job types."""
-    result = db.client.table("job_types")\
+    result = await adb.table("job_types")\
         .select("id, name, description, color")\
         .eq("is_active", True)\
         .order("name")\
@@ -402,7 +682,7 @@ async def get_unenriched_jobs_list(limit: int = 100):
     from ingestion.llm_enrichment import get_unenriched_jobs
     
     try:
-        job_ids = get_unenriched_jobs(limit=limit)
+        job_ids = await adb.run(get_unenriched_jobs, limit=limit)
         return {
             "count": len(job_ids),
             "job_ids": job_ids
@@ -416,14 +696,14 @@ async def get_enrichment_stats():
     """Get enrichment statistics (only for 'Data' classified jobs)."""
     try:
         # Total 'Data' jobs
-        total_result = db.client.table("llm_enrichment")\
+        total_result = await adb.table("llm_enrichment")\
             .select("id, job_postings!inner(title_classification)", count="exact")\
             .eq("job_postings.title_classification", "Data")\
             .execute()
         total = total_result.count or 0
         
         # Enriched 'Data' jobs
-        enriched_result = db.client.table("llm_enrichment")\
+        enriched_result = await adb.table("llm_enrichment")\
             .select("id, job_postings!inner(title_classification)", count="exact")\
             .eq("job_postings.title_classification", "Data")\
             .not_.is_("enrichment_completed_at", "null")\
@@ -443,6 +723,17 @@ async def get_enrichment_stats():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/enrich/cache")
+async def get_llm_cache_stats():
+    """Get LLM response cache statistics (hits/misses since startup, per prompt)."""
+    from ingestion.llm_cache import llm_cache
+    
+    try:
+        return llm_cache.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/classify")
 async def classify_selected_jobs(request: ClassifyJobsRequest, background_tasks: BackgroundTasks):
     """Classify selected jobs using LLM title check."""
@@ -451,7 +742,7 @@ async def classify_selected_jobs(request: ClassifyJobsRequest, background_tasks:
             raise HTTPException(status_code=400, detail="No job IDs provided")
         
         # Get job titles for the selected jobs
-        jobs = db.client.table("job_postings")\
+        jobs = await adb.table("job_postings")\
             .select("id, title")\
             .in_("id", request.job_ids)\
             .execute()
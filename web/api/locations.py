@@ -5,11 +5,15 @@ from pydantic import BaseModel
 from typing import Optional, List
 from loguru import logger
 
-from database.client import db
+from database.async_client import adb
+from database.pagination import CountMode, InvalidCursorError, SortKey, apply_keyset, count_method, next_cursor
 from ingestion.location_enrichment import enrich_location
 
 router = APIRouter()
 
+# Location list order (id makes the keyset unique for locations in the same city)
+LOCATION_SORT_KEYS = [SortKey("city"), SortKey("id")]
+
 
 class LocationUpdate(BaseModel):
     """Model for updating location data."""
@@ -42,11 +46,13 @@ async def get_all_locations(
     offset: int = 0,
     search: Optional[str] = None,
     country_code: Optional[str] = None,
-    ai_enriched: Optional[bool] = None
+    ai_enriched: Optional[bool] = None,
+    cursor: Optional[str] = None,  # next_cursor of the previous page (replaces offset)
+    count: CountMode = "none"  # exact, planned or estimated to include a total
 ):
     """Get all locations with optional filtering."""
     try:
-        query = db.client.table("locations").select("*")
+        query = adb.table("locations").select("*", count=count_method(count))
         
         # Apply filters
         if search:
@@ -58,18 +64,28 @@ async def get_all_locations(
         if ai_enriched is not None:
             query = query.eq("ai_enriched", ai_enriched)
         
-        # Apply pagination
-        query = query.range(offset, offset + limit - 1)
-        
-        # Order by city name
-        query = query.order("city")
+        # Order by city name, then id
+        query = apply_keyset(query, LOCATION_SORT_KEYS, cursor)
         
-        result = query.execute()
-        
-        return {
-            "locations": result.data if result.data else [],
-            "count": len(result.data) if result.data else 0
+        # Apply pagination
+        if cursor:
+            query = query.limit(limit)
+        else:
+            query = query.range(offset, offset + limit - 1)
+        
+        result = await query.execute()
+        locations = result.data if result.data else []
+        
+        response = {
+            "locations": locations,
+            "count": len(locations),
+            "next_cursor": next_cursor(locations, LOCATION_SORT_KEYS, limit)
         }
+        if count != "none":
+            response["total"] = result.count
+        return response
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to get locations: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -79,7 +95,7 @@ async def get_all_locations(
 async def get_location(location_id: str):
     """Get a single location by ID."""
     try:
-        result = db.client.table("locations")\
+        result = await adb.table("locations")\
             .select("*")\
             .eq("id", location_id)\
             .single()\
@@ -106,7 +122,7 @@ async def update_location(location_id: str, location_data: LocationUpdate):
         if not update_data:
             raise HTTPException(status_code=400, detail="No data to update")
         
-        result = db.client.table("locations")\
+        result = await adb.table("locations")\
             .update(update_data)\
             .eq("id", location_id)\
             .execute()
@@ -126,7 +142,7 @@ async def update_location(location_id: str, location_data: LocationUpdate):
 async def delete_location(location_id: str):
     """Delete a location."""
     try:
-        result = db.client.table("locations")\
+        result = await adb.table("locations")\
             .delete()\
             .eq("id", location_id)\
             .execute()
@@ -144,7 +160,7 @@ async def enrich_location_endpoint(location_id: str, background_tasks: Backgroun
     """Manually trigger enrichment for a specific location."""
     try:
         # Get location data
-        result = db.client.table("locations")\
+        result = await adb.table("locations")\
             .select("id, city, country_code, region")\
             .eq("id", location_id)\
             .single()\
@@ -183,7 +199,7 @@ async def get_location_stats():
     """Get statistics about locations with data quality metrics."""
     try:
         # Get all locations to analyze data quality
-        all_locations = db.client.table("locations")\
+        all_locations = await adb.table("locations")\
             .select("subdivision_name, subdivision_name_fr, subdivision_name_en, timezone, city_name_nl, city_name_fr, city_name_en, country_name_nl")\
             .execute()
         
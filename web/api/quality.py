@@ -4,7 +4,9 @@ from fastapi import APIRouter
 from typing import List
 from uuid import UUID
 
-from database import db
+from database import adb
+from database.job_facets import job_facets
+from utils.response_cache import response_cache, TAG_JOBS
 from scraper import mark_inactive_jobs, get_inactive_jobs_summary
 
 router = APIRouter()
@@ -40,10 +42,10 @@ async def mark_not_duplicate(job_id_1: str, job_id_2: str):
 async def get_inactive_jobs(threshold_days: int = 14, limit: int = 50, offset: int = 0):
     """Get jobs that haven't been seen recently."""
     # Get summary
-    summary = get_inactive_jobs_summary()
+    summary = await adb.run(get_inactive_jobs_summary)
     
     # Get inactive jobs
-    result = db.client.table("job_postings")\
+    result = await adb.table("job_postings")\
         .select("*, companies(name), locations!job_postings_location_id_fkey(full_location_string)")\
         .eq("is_active", False)\
         .order("detected_inactive_at", desc=True)\
@@ -60,7 +62,8 @@ async def get_inactive_jobs(threshold_days: int = 14, limit: int = 50, offset: i
 @router.post("/inactive/mark")
 async def mark_jobs_inactive_now(threshold_days: int = 14):
     """Manually trigger inactive job marking."""
-    count = mark_inactive_jobs(threshold_days=threshold_days)
+    count = await adb.run(mark_inactive_jobs, threshold_days=threshold_days)
+    job_facets.invalidate()
     return {
         "message": f"Marked {count} jobs as inactive",
         "count": count
@@ -71,10 +74,12 @@ async def mark_jobs_inactive_now(threshold_days: int = 14):
 async def reactivate_jobs(job_ids: List[str]):
     """Reactivate inactive jobs."""
     for job_id in job_ids:
-        db.client.table("job_postings")\
+        await adb.table("job_postings")\
             .update({"is_active": True, "detected_inactive_at": None})\
             .eq("id", job_id)\
             .execute()
+    response_cache.invalidate(TAG_JOBS)
+    job_facets.refresh_jobs(job_ids)
     
     return {"message": f"Reactivated {len(job_ids)} jobs"}
 
@@ -96,8 +101,8 @@ async def remove_test_data():
 @router.get("/stats")
 async def get_quality_stats():
     """Get data quality statistics."""
-    stats = db.get_stats()
-    inactive_summary = get_inactive_jobs_summary()
+    stats = await adb.get_stats()
+    inactive_summary = await adb.run(get_inactive_jobs_summary)
     
     return {
         "total_jobs": stats.get("total_jobs", 0),
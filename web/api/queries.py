@@ -7,12 +7,15 @@ from uuid import UUID
 from datetime import datetime, time
 from loguru import logger
 
-from database import db
+from database import adb
 from scraper import execute_scrape_run
 from scheduler import get_scheduler
 
 router = APIRouter()
 
+# Queries without runs
+EMPTY_RUN_STATS = {"last_run": None, "total_jobs": 0, "run_count": 0}
+
 
 class QueryCreate(BaseModel):
     """Schema for creating a new query."""
@@ -50,7 +53,7 @@ async def list_queries(
     """List all LinkedIn search queries with stats."""
     try:
         # Get LinkedIn queries only (filter by source)
-        query_builder = db.client.table("search_queries")\
+        query_builder = adb.table("search_queries")\
             .select("*")\
             .or_("source.eq.linkedin,source.is.null")  # Include null for backward compatibility
         
@@ -59,37 +62,16 @@ async def list_queries(
         elif status == "inactive":
             query_builder = query_builder.eq("is_active", False)
         
-        queries = query_builder.order("created_at", desc=True)\
+        queries = await query_builder.order("created_at", desc=True)\
             .range(offset, offset + limit - 1)\
             .execute()
         
-        # Get stats for each query
-        result = []
-        for query in queries.data:
-            # Get latest run
-            latest_run = db.client.table("scrape_runs")\
-                .select("*")\
-                .eq("search_query", query["search_query"])\
-                .eq("location_query", query["location_query"])\
-                .order("started_at", desc=True)\
-                .limit(1)\
-                .execute()
-            
-            # Count total jobs found
-            all_runs = db.client.table("scrape_runs")\
-                .select("jobs_found")\
-                .eq("search_query", query["search_query"])\
-                .eq("location_query", query["location_query"])\
-                .execute()
-            
-            total_jobs = sum(r.get("jobs_found", 0) for r in all_runs.data)
-            
-            result.append({
-                **query,
-                "last_run": latest_run.data[0] if latest_run.data else None,
-                "total_jobs": total_jobs,
-                "run_count": len(all_runs.data)
-            })
+        # Last run, run count and total jobs for the whole page in one call
+        run_stats = await adb.get_query_run_stats(queries.data, match_by_text=True)
+        result = [
+            {**query, **run_stats.get(query["id"], EMPTY_RUN_STATS)}
+            for query in queries.data
+        ]
         
         # Get overall stats
         stats = {
@@ -113,7 +95,7 @@ async def create_query(query: QueryCreate):
     """Create a new search query."""
     try:
         # Verify job type exists
-        type_check = db.client.table("job_types")\
+        type_check = await adb.table("job_types")\
             .select("id")\
             .eq("id", query.job_type_id)\
             .eq("is_active", True)\
@@ -123,7 +105,7 @@ async def create_query(query: QueryCreate):
             raise HTTPException(status_code=400, detail="Invalid or inactive job type")
         
         # Insert into search_queries table
-        result = db.client.table("search_queries")\
+        result = await adb.table("search_queries")\
             .insert({
                 "job_type_id": query.job_type_id,
                 "search_query": query.search_query,
@@ -152,7 +134,7 @@ async def create_query(query: QueryCreate):
 async def get_query(query_id: str):
     """Get a specific query by ID."""
     try:
-        query = db.client.table("search_queries")\
+        query = await adb.table("search_queries")\
             .select("*")\
             .eq("id", query_id)\
             .single()\
@@ -179,7 +161,7 @@ async def update_query(query_id: str, query: QueryUpdate):
         if not update_data:
             raise HTTPException(status_code=400, detail="No fields to update")
         
-        result = db.client.table("search_queries")\
+        result = await adb.table("search_queries")\
             .update(update_data)\
             .eq("id", query_id)\
             .execute()
@@ -205,7 +187,7 @@ async def delete_query(query_id: str):
         scheduler.unschedule_query(query_id)
         
         # Delete query
-        result = db.client.table("search_queries")\
+        result = await adb.table("search_queries")\
             .delete()\
             .eq("id", query_id)\
             .execute()
@@ -227,7 +209,7 @@ async def run_query(query_id: str, background_tasks: BackgroundTasks):
     """Trigger a scrape run for this query."""
     try:
         # Get query from database
-        query = db.client.table("search_queries")\
+        query = await adb.table("search_queries")\
             .select("*")\
             .eq("id", query_id)\
             .single()\
@@ -279,7 +261,7 @@ async def update_schedule(query_id: str, schedule: ScheduleConfig):
         
         # Update database
         update_data = schedule.model_dump()
-        result = db.client.table("search_queries")\
+        result = await adb.table("search_queries")\
             .update(update_data)\
             .eq("id", query_id)\
             .execute()
@@ -290,7 +272,7 @@ async def update_schedule(query_id: str, schedule: ScheduleConfig):
         # Update scheduler
         scheduler = get_scheduler()
         if schedule.schedule_enabled:
-            scheduler.schedule_query(result.data[0])
+            await adb.run(scheduler.schedule_query, result.data[0])
             logger.info(f"Scheduled query {query_id}")
         else:
             scheduler.unschedule_query(query_id)
@@ -308,7 +290,7 @@ async def update_schedule(query_id: str, schedule: ScheduleConfig):
 async def get_schedule(query_id: str):
     """Get schedule information for a query."""
     try:
-        query = db.client.table("search_queries")\
+        query = await adb.table("search_queries")\
             .select("schedule_enabled, schedule_type, schedule_time, schedule_interval_hours, schedule_days_of_week, next_run_at, last_run_at")\
             .eq("id", query_id)\
             .single()\
@@ -337,7 +319,7 @@ async def run_multiple_queries(query_ids: List[str], background_tasks: Backgroun
     """Run multiple queries."""
     try:
         # Get queries from database
-        queries = db.client.table("search_queries")\
+        queries = await adb.table("search_queries")\
             .select("*")\
             .in_("id", query_ids)\
             .execute()
@@ -375,7 +357,7 @@ async def delete_multiple_queries(query_ids: List[str]):
             scheduler.unschedule_query(query_id)
         
         # Delete queries
-        result = db.client.table("search_queries")\
+        result = await adb.table("search_queries")\
             .delete()\
             .in_("id", query_ids)\
             .execute()
@@ -6,28 +6,11 @@ from datetime import datetime
 from loguru import logger
 
 from ranking.job_ranker import calculate_and_save_rankings
-import os
-import shutil
+from utils.response_cache import response_cache, TAG_RANKINGS
 
 router = APIRouter()
 
 
-def calculate_and_clear_cache():
-    """Calculate rankings and automatically clear cache when done"""
-    try:
-        # Run ranking
-        calculate_and_save_rankings()
-        
-        # Clear cache silently after successful ranking
-        cache_dir = os.path.join(os.path.dirname(__file__), '..', '..', '.cache')
-        if os.path.exists(cache_dir):
-            shutil.rmtree(cache_dir)
-            logger.info("✅ Cache cleared automatically after ranking completion")
-    except Exception as e:
-        logger.error(f"Error in ranking or cache clear: {e}")
-        raise
-
-
 class RankingStatus(BaseModel):
     """Ranking status response"""
     status: str
@@ -45,8 +28,8 @@ async def trigger_ranking_calculation(background_tasks: BackgroundTasks):
     """
     logger.info("🎯 Manual ranking calculation triggered via API")
     
-    # Run in background with auto-cache clear
-    background_tasks.add_task(calculate_and_clear_cache)
+    # Run in background (invalidates the cached ranking status when done)
+    background_tasks.add_task(calculate_and_save_rankings)
     
     return RankingStatus(
         status="started",
@@ -60,39 +43,43 @@ async def get_ranking_status():
     Get status of last ranking calculation
     
     Returns when rankings were last updated and how many jobs were ranked.
+    Cached until the next ranking run.
     """
-    from database.client import db
-    
     try:
-        # Get most recent ranking update
-        result = db.client.table("job_postings")\
-            .select("ranking_updated_at, ranking_position")\
-            .not_.is_("ranking_updated_at", "null")\
-            .order("ranking_updated_at", desc=True)\
-            .limit(1)\
-            .execute()
-        
-        if result.data:
-            last_updated = result.data[0]['ranking_updated_at']
-            
-            # Count ranked jobs
-            count_result = db.client.table("job_postings")\
-                .select("id", count="exact")\
-                .not_.is_("ranking_score", "null")\
-                .execute()
-            
-            return RankingStatus(
-                status="completed",
-                message="Rankings are up to date",
-                last_updated=last_updated,
-                jobs_ranked=count_result.count
-            )
-        else:
-            return RankingStatus(
-                status="never_run",
-                message="Rankings have never been calculated"
-            )
-            
+        return await response_cache.get_or_compute("ranking_status", _load_ranking_status, tags=(TAG_RANKINGS,))
     except Exception as e:
         logger.error(f"Error getting ranking status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _load_ranking_status() -> RankingStatus:
+    from database.async_client import adb
+    
+    # Get most recent ranking update
+    result = await adb.table("job_postings")\
+        .select("ranking_updated_at, ranking_position")\
+        .not_.is_("ranking_updated_at", "null")\
+        .order("ranking_updated_at", desc=True)\
+        .limit(1)\
+        .execute()
+    
+    if result.data:
+        last_updated = result.data[0]['ranking_updated_at']
+        
+        # Count ranked jobs
+        count_result = await adb.table("job_postings")\
+            .select("id", count="exact")\
+            .not_.is_("ranking_score", "null")\
+            .execute()
+        
+        return RankingStatus(
+            status="completed",
+            message="Rankings are up to date",
+            last_updated=last_updated,
+            jobs_ranked=count_result.count
+        )
+    else:
+        return RankingStatus(
+            status="never_run",
+            message="Rankings have never been calculated"
+        )
@@ -1,40 +1,48 @@
 """API endpoints for scrape runs monitoring."""
 
 from fastapi import APIRouter, HTTPException
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime, timedelta
 from loguru import logger
 
-from database import db
+from database import db, adb
+from database.client import SCRAPE_RUN_SORT_KEYS
+from database.pagination import InvalidCursorError, next_cursor
 
 router = APIRouter()
 
 
+async def _get_job_types(runs: List[dict]) -> Dict[str, dict]:
+    """Job type (id, name, color) per job_type_id used by the runs."""
+    job_type_ids = [run["job_type_id"] for run in runs if run.get("job_type_id")]
+    if not job_type_ids:
+        return {}
+    return await adb.run(db.get_cached_job_types, job_type_ids)
+
+
 @router.get("/")
 async def list_runs(
     status: Optional[str] = None,
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
     limit: int = 50,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None  # next_cursor of the previous page (replaces offset)
 ):
     """List scrape runs with filtering."""
     # Get runs from database - order by created_at desc to show newest first
-    runs = db.get_scrape_runs(status=status, limit=limit, offset=offset)
+    try:
+        runs = await adb.run(db.get_scrape_runs, status=status, limit=limit, offset=offset, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Job types of all runs from the cached job-type dictionary
+    job_types = await _get_job_types(runs)
     
     # Convert to list of dicts with proper formatting
     runs_list = []
     for run in runs:
-        # Get job type if available
-        job_type = None
-        if run.get("job_type_id"):
-            type_result = db.client.table("job_types")\
-                .select("id, name, color")\
-                .eq("id", run.get("job_type_id"))\
-                .single()\
-                .execute()
-            if type_result.data:
-                job_type = type_result.data
+        job_type = job_types.get(run.get("job_type_id"))
         
         runs_list.append({
             "id": str(run.get("id")),
@@ -83,6 +91,7 @@ async def list_runs(
     return {
         "runs": runs_list,
         "total": len(runs_list),
+        "next_cursor": next_cursor(runs, SCRAPE_RUN_SORT_KEYS, limit),
         "stats": {
             "active_runs": len(active_runs),
             "completed_24h": completed_24h,
@@ -95,7 +104,7 @@ async def list_runs(
 async def get_active_runs():
     """Get currently running LinkedIn scrapes."""
     # Get LinkedIn runs only (filter by platform)
-    runs_result = db.client.table("scrape_runs")\
+    runs_result = await adb.table("scrape_runs")\
         .select("*")\
         .eq("status", "running")\
         .or_("platform.eq.linkedin_brightdata,platform.is.null")\
@@ -105,19 +114,12 @@ async def get_active_runs():
     
     runs = runs_result.data if runs_result.data else []
     
+    job_types = await _get_job_types(runs)
+    
     # Format runs
     runs_list = []
     for run in runs:
-        # Get job type if available
-        job_type = None
-        if run.get("job_type_id"):
-            type_result = db.client.table("job_types")\
-                .select("id, name, color")\
-                .eq("id", run.get("job_type_id"))\
-                .single()\
-                .execute()
-            if type_result.data:
-                job_type = type_result.data
+        job_type = job_types.get(run.get("job_type_id"))
         
         runs_list.append({
             "id": str(run.get("id")),
@@ -143,7 +145,7 @@ async def get_active_runs():
 async def get_run_detail(run_id: str):
     """Get detailed information about a specific run."""
     # Get run from database
-    result = db.client.table("scrape_runs")\
+    result = await adb.table("scrape_runs")\
         .select("*")\
         .eq("id", run_id)\
         .single()\
@@ -208,7 +210,7 @@ async def stop_run(run_id: str):
     """
     try:
         # Get current run (don't check status - allow stopping any run)
-        current = db.client.table("scrape_runs")\
+        current = await adb.table("scrape_runs")\
             .select("*")\
             .eq("id", run_id)\
             .execute()
@@ -226,7 +228,7 @@ async def stop_run(run_id: str):
             }
         
         # Hard stop: update status immediately
-        result = db.client.table("scrape_runs")\
+        result = await adb.table("scrape_runs")\
             .update({
                 "status": "failed",
                 "completed_at": datetime.utcnow().isoformat(),
@@ -258,7 +260,7 @@ async def archive_run(run_id: str, body: ArchiveRequest):
     """Archive or unarchive a scrape run."""
     try:
         # Update the archived status
-        result = db.client.table("scrape_runs")\
+        result = await adb.table("scrape_runs")\
             .update({"archived": body.archived})\
             .eq("id", run_id)\
             .execute()
@@ -298,7 +300,7 @@ async def cleanup_stuck_linkedin_runs(hours: int = 2):
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
         
         # Find stuck LinkedIn runs
-        stuck_runs = db.client.table("scrape_runs")\
+        stuck_runs = await adb.table("scrape_runs")\
             .select("id, search_query, location_query, started_at")\
             .eq("status", "running")\
             .or_("platform.eq.linkedin_brightdata,platform.is.null")\
@@ -315,7 +317,7 @@ async def cleanup_stuck_linkedin_runs(hours: int = 2):
         cleaned_count = 0
         for run in stuck_runs.data:
             try:
-                db.client.table("scrape_runs")\
+                await adb.table("scrape_runs")\
                     .update({
                         "status": "failed",
                         "completed_at": datetime.utcnow().isoformat(),
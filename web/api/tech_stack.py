@@ -1,15 +1,15 @@
 """API endpoints for tech stack masterdata management."""
 
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from fastapi.responses import Response
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query, Request
 from typing import List, Optional
 from pydantic import BaseModel
-import io
-import base64
+import asyncio
 import re
-from PIL import Image
 
-from database.client import db
+from database.client import db, TECH_STACK_COLUMNS, with_has_logo
+from database.async_client import adb
+from utils.response_cache import response_cache, TAG_TECH_STACK
+from web.logos import logo_response, save_logo, delete_logo
 
 router = APIRouter()
 
@@ -93,15 +93,15 @@ class EcosystemUpdate(BaseModel):
 @router.get("/programming-languages")
 async def list_programming_languages(active_only: bool = True):
     """Get all programming languages."""
-    languages = db.get_all_programming_languages(active_only=active_only)
+    languages = await adb.run(db.get_all_programming_languages, active_only=active_only)
     return {"languages": languages, "total": len(languages)}
 
 
 @router.get("/programming-languages/{language_id}")
 async def get_programming_language(language_id: str):
     """Get a specific programming language by ID."""
-    result = db.client.table("programming_languages")\
-        .select("*")\
+    result = await adb.table("programming_languages")\
+        .select(TECH_STACK_COLUMNS)\
         .eq("id", language_id)\
         .single()\
         .execute()
@@ -109,14 +109,15 @@ async def get_programming_language(language_id: str):
     if not result.data:
         raise HTTPException(status_code=404, detail="Programming language not found")
     
-    return result.data
+    return with_has_logo(result.data)
 
 
 @router.post("/programming-languages")
 async def create_programming_language(language: ProgrammingLanguageCreate):
     """Create a new programming language."""
     try:
-        language_id = db.insert_programming_language(language.model_dump())
+        language_id = await adb.run(db.insert_programming_language, language.model_dump())
+        response_cache.invalidate(TAG_TECH_STACK)
         return {"id": str(language_id), "message": "Programming language created successfully"}
     except Exception as e:
         if "duplicate" in str(e).lower() or "unique" in str(e).lower():
@@ -130,10 +131,12 @@ async def update_programming_language(language_id: str, updates: ProgrammingLang
     try:
         update_data = {k: v for k, v in updates.model_dump().items() if v is not None}
         
-        db.client.table("programming_languages")\
+        await adb.table("programming_languages")\
             .update(update_data)\
             .eq("id", language_id)\
             .execute()
+        db.master_data.invalidate("programming_languages")
+        response_cache.invalidate(TAG_TECH_STACK)
         
         return {"message": "Programming language updated successfully"}
     except Exception as e:
@@ -145,17 +148,20 @@ async def delete_programming_language(language_id: str, hard_delete: bool = Fals
     """Delete (soft or hard) a programming language."""
     try:
         if hard_delete:
-            db.client.table("programming_languages")\
+            await adb.table("programming_languages")\
                 .delete()\
                 .eq("id", language_id)\
                 .execute()
         else:
             # Soft delete
-            db.client.table("programming_languages")\
+            await adb.table("programming_languages")\
                 .update({"is_active": False})\
                 .eq("id", language_id)\
                 .execute()
         
+        db.master_data.invalidate("programming_languages")
+        response_cache.invalidate(TAG_TECH_STACK)
+        
         return {"message": "Programming language deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -182,11 +188,8 @@ async def upload_programming_language_logo(language_id: str, file: UploadFile =
                 detail=f"File too large. Maximum size: {MAX_FILE_SIZE / 1024 / 1024}MB"
             )
         
-        # Convert to base64 for PostgreSQL bytea storage
-        logo_base64 = base64.b64encode(logo_data).decode('utf-8')
-        
         # Get language name for SEO filename
-        lang_result = db.client.table("programming_languages")\
+        lang_result = await adb.table("programming_languages")\
             .select("name")\
             .eq("id", language_id)\
             .single()\
@@ -195,21 +198,11 @@ async def upload_programming_language_logo(language_id: str, file: UploadFile =
         if not lang_result.data:
             raise HTTPException(status_code=404, detail="Programming language not found")
         
-        # Generate SEO-friendly filename
-        file_extension = file.filename.split('.')[-1].lower() if '.' in file.filename else 'png'
-        seo_filename = generate_seo_filename(lang_result.data["name"], file_extension)
+        # SEO-friendly filename; save_logo sets the extension of the normalized logo
+        seo_filename = generate_seo_filename(lang_result.data["name"], "png")
+        seo_filename = await save_logo("programming_languages", language_id, logo_data, file.content_type, seo_filename)
         
-        # Update database with base64-encoded data
-        db.client.table("programming_languages")\
-            .update({
-                "logo_data": logo_base64,
-                "logo_filename": seo_filename,
-                "logo_content_type": file.content_type
-            })\
-            .eq("id", language_id)\
-            .execute()
-        
-        return {"message": "Logo uploaded successfully", "filename": file.filename}
+        return {"message": "Logo uploaded successfully", "filename": seo_filename}
     except HTTPException:
         raise
     except Exception as e:
@@ -217,61 +210,15 @@ async def upload_programming_language_logo(language_id: str, file: UploadFile =
 
 
 @router.get("/programming-languages/{language_id}/logo")
-async def get_programming_language_logo(language_id: str):
-    """Get the logo for a programming language."""
+async def get_programming_language_logo(
+    language_id: str,
+    request: Request,
+    size: Optional[int] = Query(None, ge=1),
+    fmt: Optional[str] = Query(None, alias="format")
+):
+    """Get the logo for a programming language as a fixed-size thumbnail (ETag / 304 aware)."""
     try:
-        result = db.client.table("programming_languages")\
-            .select("logo_data, logo_content_type, logo_filename")\
-            .eq("id", language_id)\
-            .single()\
-            .execute()
-        
-        if not result.data or not result.data.get("logo_data"):
-            raise HTTPException(status_code=404, detail="Logo not found")
-        
-        logo_data = result.data["logo_data"]
-        
-        # Handle different data formats
-        try:
-            # Try to decode as base64 first
-            logo_bytes = base64.b64decode(logo_data)
-        except Exception:
-            # If that fails, it might be hex-encoded (Supabase bytea format)
-            try:
-                # Remove \x prefix if present
-                if logo_data.startswith('\\x'):
-                    hex_str = logo_data[2:]
-                else:
-                    hex_str = logo_data
-                
-                # Decode hex to get ASCII (which might be base64)
-                ascii_bytes = bytes.fromhex(hex_str)
-                
-                # Try to decode as base64
-                try:
-                    logo_bytes = base64.b64decode(ascii_bytes)
-                except Exception:
-                    # If not base64, use the raw bytes
-                    logo_bytes = ascii_bytes
-            except Exception:
-                # Last resort: treat as raw bytes
-                logo_bytes = logo_data.encode() if isinstance(logo_data, str) else logo_data
-        
-        # Determine correct content type
-        content_type = result.data.get("logo_content_type", "image/png")
-        
-        # Get SEO-friendly filename for Content-Disposition header
-        seo_filename = result.data.get("logo_filename", "logo.png")
-        
-        return Response(
-            content=logo_bytes,
-            media_type=content_type,
-            headers={
-                "Cache-Control": "public, max-age=86400",  # Cache for 24 hours
-                "Access-Control-Allow-Origin": "*",
-                "Content-Disposition": f'inline; filename="{seo_filename}"'  # SEO-friendly filename
-            }
-        )
+        return await logo_response("programming_languages", language_id, request, size, fmt)
     except HTTPException:
         raise
     except Exception as e:
@@ -282,14 +229,7 @@ async def get_programming_language_logo(language_id: str):
 async def delete_programming_language_logo(language_id: str):
     """Delete the logo for a programming language."""
     try:
-        db.client.table("programming_languages")\
-            .update({
-                "logo_data": None,
-                "logo_filename": None,
-                "logo_content_type": None
-            })\
-            .eq("id", language_id)\
-            .execute()
+        await delete_logo("programming_languages", language_id)
         
         return {"message": "Logo deleted successfully"}
     except Exception as e:
@@ -301,15 +241,15 @@ async def delete_programming_language_logo(language_id: str):
 @router.get("/ecosystems")
 async def list_ecosystems(active_only: bool = True):
     """Get all ecosystems."""
-    ecosystems = db.get_all_ecosystems(active_only=active_only)
+    ecosystems = await adb.run(db.get_all_ecosystems, active_only=active_only)
     return {"ecosystems": ecosystems, "total": len(ecosystems)}
 
 
 @router.get("/ecosystems/{ecosystem_id}")
 async def get_ecosystem(ecosystem_id: str):
     """Get a specific ecosystem by ID."""
-    result = db.client.table("ecosystems")\
-        .select("*")\
+    result = await adb.table("ecosystems")\
+        .select(TECH_STACK_COLUMNS)\
         .eq("id", ecosystem_id)\
         .single()\
         .execute()
@@ -317,14 +257,15 @@ async def get_ecosystem(ecosystem_id: str):
     if not result.data:
         raise HTTPException(status_code=404, detail="Ecosystem not found")
     
-    return result.data
+    return with_has_logo(result.data)
 
 
 @router.post("/ecosystems")
 async def create_ecosystem(ecosystem: EcosystemCreate):
     """Create a new ecosystem."""
     try:
-        ecosystem_id = db.insert_ecosystem(ecosystem.model_dump())
+        ecosystem_id = await adb.run(db.insert_ecosystem, ecosystem.model_dump())
+        response_cache.invalidate(TAG_TECH_STACK)
         return {"id": str(ecosystem_id), "message": "Ecosystem created successfully"}
     except Exception as e:
         if "duplicate" in str(e).lower() or "unique" in str(e).lower():
@@ -338,10 +279,12 @@ async def update_ecosystem(ecosystem_id: str, updates: EcosystemUpdate):
     try:
         update_data = {k: v for k, v in updates.model_dump().items() if v is not None}
         
-        db.client.table("ecosystems")\
+        await adb.table("ecosystems")\
             .update(update_data)\
             .eq("id", ecosystem_id)\
             .execute()
+        db.master_data.invalidate("ecosystems")
+        response_cache.invalidate(TAG_TECH_STACK)
         
         return {"message": "Ecosystem updated successfully"}
     except Exception as e:
@@ -353,17 +296,20 @@ async def delete_ecosystem(ecosystem_id: str, hard_delete: bool = False):
     """Delete (soft or hard) an ecosystem."""
     try:
         if hard_delete:
-            db.client.table("ecosystems")\
+            await adb.table("ecosystems")\
                 .delete()\
                 .eq("id", ecosystem_id)\
                 .execute()
         else:
             # Soft delete
-            db.client.table("ecosystems")\
+            await adb.table("ecosystems")\
                 .update({"is_active": False})\
                 .eq("id", ecosystem_id)\
                 .execute()
         
+        db.master_data.invalidate("ecosystems")
+        response_cache.invalidate(TAG_TECH_STACK)
+        
         return {"message": "Ecosystem deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -390,11 +336,8 @@ async def upload_ecosystem_logo(ecosystem_id: str, file: UploadFile = File(...))
                 detail=f"File too large. Maximum size: {MAX_FILE_SIZE / 1024 / 1024}MB"
             )
         
-        # Convert to base64 for PostgreSQL bytea storage
-        logo_base64 = base64.b64encode(logo_data).decode('utf-8')
-        
         # Get ecosystem name for SEO filename
-        eco_result = db.client.table("ecosystems")\
+        eco_result = await adb.table("ecosystems")\
             .select("name")\
             .eq("id", ecosystem_id)\
             .single()\
@@ -403,19 +346,9 @@ async def upload_ecosystem_logo(ecosystem_id: str, file: UploadFile = File(...))
         if not eco_result.data:
             raise HTTPException(status_code=404, detail="Ecosystem not found")
         
-        # Generate SEO-friendly filename
-        file_extension = file.filename.split('.')[-1].lower() if '.' in file.filename else 'png'
-        seo_filename = generate_seo_filename(eco_result.data["name"], file_extension)
-        
-        # Update database with base64-encoded data
-        db.client.table("ecosystems")\
-            .update({
-                "logo_data": logo_base64,
-                "logo_filename": seo_filename,
-                "logo_content_type": file.content_type
-            })\
-            .eq("id", ecosystem_id)\
-            .execute()
+        # SEO-friendly filename; save_logo sets the extension of the normalized logo
+        seo_filename = generate_seo_filename(eco_result.data["name"], "png")
+        seo_filename = await save_logo("ecosystems", ecosystem_id, logo_data, file.content_type, seo_filename)
         
         return {"message": "Logo uploaded successfully", "filename": seo_filename}
     except HTTPException:
@@ -425,61 +358,15 @@ async def upload_ecosystem_logo(ecosystem_id: str, file: UploadFile = File(...))
 
 
 @router.get("/ecosystems/{ecosystem_id}/logo")
-async def get_ecosystem_logo(ecosystem_id: str):
-    """Get the logo for an ecosystem."""
+async def get_ecosystem_logo(
+    ecosystem_id: str,
+    request: Request,
+    size: Optional[int] = Query(None, ge=1),
+    fmt: Optional[str] = Query(None, alias="format")
+):
+    """Get the logo for an ecosystem as a fixed-size thumbnail (ETag / 304 aware)."""
     try:
-        result = db.client.table("ecosystems")\
-            .select("logo_data, logo_content_type, logo_filename")\
-            .eq("id", ecosystem_id)\
-            .single()\
-            .execute()
-        
-        if not result.data or not result.data.get("logo_data"):
-            raise HTTPException(status_code=404, detail="Logo not found")
-        
-        logo_data = result.data["logo_data"]
-        
-        # Handle different data formats
-        try:
-            # Try to decode as base64 first
-            logo_bytes = base64.b64decode(logo_data)
-        except Exception:
-            # If that fails, it might be hex-encoded (Supabase bytea format)
-            try:
-                # Remove \x prefix if present
-                if logo_data.startswith('\\x'):
-                    hex_str = logo_data[2:]
-                else:
-                    hex_str = logo_data
-                
-                # Decode hex to get ASCII (which might be base64)
-                ascii_bytes = bytes.fromhex(hex_str)
-                
-                # Try to decode as base64
-                try:
-                    logo_bytes = base64.b64decode(ascii_bytes)
-                except Exception:
-                    # If not base64, use the raw bytes
-                    logo_bytes = ascii_bytes
-            except Exception:
-                # Last resort: treat as raw bytes
-                logo_bytes = logo_data.encode() if isinstance(logo_data, str) else logo_data
-        
-        # Determine correct content type
-        content_type = result.data.get("logo_content_type", "image/png")
-        
-        # Get SEO-friendly filename for Content-Disposition header
-        seo_filename = result.data.get("logo_filename", "logo.png")
-        
-        return Response(
-            content=logo_bytes,
-            media_type=content_type,
-            headers={
-                "Cache-Control": "public, max-age=86400",  # Cache for 24 hours
-                "Access-Control-Allow-Origin": "*",
-                "Content-Disposition": f'inline; filename="{seo_filename}"'  # SEO-friendly filename
-            }
-        )
+        return await logo_response("ecosystems", ecosystem_id, request, size, fmt)
     except HTTPException:
         raise
     except Exception as e:
@@ -490,14 +377,7 @@ async def get_ecosystem_logo(ecosystem_id: str):
 async def delete_ecosystem_logo(ecosystem_id: str):
     """Delete the logo for an ecosystem."""
     try:
-        db.client.table("ecosystems")\
-            .update({
-                "logo_data": None,
-                "logo_filename": None,
-                "logo_content_type": None
-            })\
-            .eq("id", ecosystem_id)\
-            .execute()
+        await delete_logo("ecosystems", ecosystem_id)
         
         return {"message": "Logo deleted successfully"}
     except Exception as e:
@@ -508,50 +388,45 @@ async def delete_ecosystem_logo(ecosystem_id: str):
 
 @router.get("/stats")
 async def get_tech_stack_stats():
-    """Get statistics about tech stack masterdata."""
+    """Get statistics about tech stack masterdata (cached until masterdata or assignments change)."""
     try:
+        return await response_cache.get_or_compute("tech_stack_stats", _load_tech_stack_stats, tags=(TAG_TECH_STACK,))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _load_tech_stack_stats() -> dict:
+    """Six exact counts, run concurrently."""
+    (
+        lang_result,
+        lang_active_result,
+        eco_result,
+        eco_active_result,
+        job_lang_result,
+        job_eco_result
+    ) = await asyncio.gather(
         # Count programming languages
-        lang_result = db.client.table("programming_languages")\
-            .select("id", count="exact")\
-            .execute()
-        
-        lang_active_result = db.client.table("programming_languages")\
-            .select("id", count="exact")\
-            .eq("is_active", True)\
-            .execute()
-        
+        adb.table("programming_languages").select("id", count="exact").execute(),
+        adb.table("programming_languages").select("id", count="exact").eq("is_active", True).execute(),
         # Count ecosystems
-        eco_result = db.client.table("ecosystems")\
-            .select("id", count="exact")\
-            .execute()
-        
-        eco_active_result = db.client.table("ecosystems")\
-            .select("id", count="exact")\
-            .eq("is_active", True)\
-            .execute()
-        
+        adb.table("ecosystems").select("id", count="exact").execute(),
+        adb.table("ecosystems").select("id", count="exact").eq("is_active", True).execute(),
         # Count job assignments
-        job_lang_result = db.client.table("job_programming_languages")\
-            .select("id", count="exact")\
-            .execute()
-        
-        job_eco_result = db.client.table("job_ecosystems")\
-            .select("id", count="exact")\
-            .execute()
-        
-        return {
-            "programming_languages": {
-                "total": lang_result.count or 0,
-                "active": lang_active_result.count or 0
-            },
-            "ecosystems": {
-                "total": eco_result.count or 0,
-                "active": eco_active_result.count or 0
-            },
-            "assignments": {
-                "job_languages": job_lang_result.count or 0,
-                "job_ecosystems": job_eco_result.count or 0
-            }
+        adb.table("job_programming_languages").select("id", count="exact").execute(),
+        adb.table("job_ecosystems").select("id", count="exact").execute()
+    )
+    
+    return {
+        "programming_languages": {
+            "total": lang_result.count or 0,
+            "active": lang_active_result.count or 0
+        },
+        "ecosystems": {
+            "total": eco_result.count or 0,
+            "active": eco_active_result.count or 0
+        },
+        "assignments": {
+            "job_languages": job_lang_result.count or 0,
+            "job_ecosystems": job_eco_result.count or 0
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    }
@@ -10,6 +10,7 @@ from pathlib import Path
 from contextlib import asynccontextmanager
 from loguru import logger
 
+from database.async_client import adb
 from web.api import queries, runs, jobs, quality, job_types, companies, tech_stack, locations, indeed_queries, indeed_runs, ranking
 import asyncio
 
@@ -95,6 +96,9 @@ async def lifespan(app: FastAPI):
             logger.info("✅ Scheduler stopped")
     else:
         logger.info("⏸️  Background services were disabled")
+    
+    # Close pooled database connections
+    await adb.aclose()
 
 
 # Create FastAPI app
@@ -0,0 +1,209 @@
+"""
+Serving and storing uploaded logos (companies, programming languages, ecosystems).
+
+GET requests only read the row's logo_hash (migration 072) to build a strong ETag;
+a matching If-None-Match is answered with 304 and everything else is served from
+utils.logo_cache. The logo_data blob is read from the database only when its hash
+is not cached locally yet.
+"""
+
+import asyncio
+import os
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+from loguru import logger
+
+from config.settings import settings
+from database.async_client import adb
+from utils.logo_cache import (
+    THUMBNAIL_FORMATS,
+    SVG_CONTENT_TYPE,
+    InvalidLogoError,
+    LogoVersion,
+    decode_logo_data,
+    encode_logo_data,
+    is_svg,
+    logo_cache,
+    logo_hash,
+    normalize_logo,
+    render_thumbnail,
+    source_name,
+    stored_logo_bytes,
+    thumbnail_name,
+    thumbnail_size
+)
+
+
+def negotiate_format(fmt: Optional[str], accept: Optional[str]) -> str:
+    """Thumbnail format: the requested one, else WebP when the client accepts it."""
+    if fmt:
+        if fmt not in THUMBNAIL_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Invalid format. Allowed: {', '.join(THUMBNAIL_FORMATS)}")
+        return fmt
+    return "webp" if "image/webp" in (accept or "") else "png"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+
+
+async def get_logo_version(table: str, entity_id: str) -> Optional[LogoVersion]:
+    """The logo a row currently has (None if it has none), cached for logo_cache_version_ttl_seconds."""
+    found, version = logo_cache.get_version(table, entity_id)
+    if found:
+        return version
+    
+    try:
+        result = await adb.table(table)\
+            .select("logo_hash, logo_filename, logo_content_type")\
+            .eq("id", entity_id)\
+            .limit(1)\
+            .execute()
+        row = result.data[0] if result.data else None
+        version = LogoVersion(row["logo_hash"], row.get("logo_filename"), row.get("logo_content_type")) \
+            if row and row.get("logo_hash") else None
+    except Exception as e:
+        logger.warning(f"logo_hash unavailable on {table}, reading logo_data: {e}")
+        loaded = await load_logo_source(table, entity_id)
+        version = loaded[0] if loaded else None
+    
+    logo_cache.set_version(table, entity_id, version)
+    return version
+
+
+async def load_logo_source(table: str, entity_id: str) -> Optional[Tuple[LogoVersion, bytes]]:
+    """Read a row's logo_data from the database and keep the decoded logo in the cache."""
+    result = await adb.table(table)\
+        .select("logo_data, logo_filename, logo_content_type")\
+        .eq("id", entity_id)\
+        .limit(1)\
+        .execute()
+    row = result.data[0] if result.data else None
+    if not row or not row.get("logo_data"):
+        return None
+    
+    stored = stored_logo_bytes(row["logo_data"])
+    version = LogoVersion(logo_hash(stored), row.get("logo_filename"), row.get("logo_content_type"))
+    source = decode_logo_data(stored)
+    logo_cache.put(source_name(version.hash), source)
+    return version, source
+
+
+async def logo_response(
+    table: str,
+    entity_id: str,
+    request: Request,
+    size: Optional[int] = None,
+    fmt: Optional[str] = None
+) -> Response:
+    """
+    Logo of a row as a fixed-size thumbnail (WebP or PNG; SVGs as-is).
+    
+    Raises:
+        HTTPException: 404 if the row has no logo, 400 for an unknown format
+    """
+    fmt = negotiate_format(fmt, request.headers.get("accept"))
+    size = thumbnail_size(size)
+    
+    version = await get_logo_version(table, entity_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Logo not found")
+    
+    headers = _logo_headers(version, size, fmt)
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    name = thumbnail_name(version.hash, size, "svg" if version.is_svg else fmt)
+    data = logo_cache.get(name)
+    if data is not None:
+        return Response(content=data, media_type=SVG_CONTENT_TYPE if version.is_svg else THUMBNAIL_FORMATS[fmt], headers=headers)
+    
+    source = logo_cache.get(source_name(version.hash))
+    if source is None:
+        loaded = await load_logo_source(table, entity_id)
+        if loaded is None:
+            logo_cache.set_version(table, entity_id, None)
+            raise HTTPException(status_code=404, detail="Logo not found")
+        
+        # The logo may have changed since the version was cached
+        if loaded[0] != version:
+            version = loaded[0]
+            logo_cache.set_version(table, entity_id, version)
+            headers = _logo_headers(version, size, fmt)
+            name = thumbnail_name(version.hash, size, "svg" if version.is_svg else fmt)
+        source = loaded[1]
+    
+    if version.is_svg or is_svg(source):
+        media_type, data = SVG_CONTENT_TYPE, source
+    else:
+        try:
+            media_type, data = THUMBNAIL_FORMATS[fmt], await asyncio.to_thread(render_thumbnail, source, size, fmt)
+        except InvalidLogoError as e:
+            # Serve undecodable legacy data as stored instead of failing the page
+            logger.warning(f"Could not render logo of {table} {entity_id}: {e}")
+            return Response(content=source, media_type=version.content_type or "application/octet-stream", headers=headers)
+    
+    logo_cache.put(name, data)
+    return Response(content=data, media_type=media_type, headers=headers)
+
+
+def _logo_headers(version: LogoVersion, size: int, fmt: str) -> dict:
+    extension = "svg" if version.is_svg else fmt
+    filename = f"{os.path.splitext(version.filename or 'logo')[0]}.{extension}"
+    return {
+        "ETag": f'"{version.hash[:32]}-{size}-{extension}"',
+        "Cache-Control": f"public, max-age={settings.logo_max_age_seconds}",
+        "Vary": "Accept",
+        "Access-Control-Allow-Origin": "*",
+        "Content-Disposition": f'inline; filename="{filename}"'  # SEO-friendly filename
+    }
+
+
+async def save_logo(table: str, entity_id: str, data: bytes, content_type: Optional[str], filename: Optional[str]) -> str:
+    """
+    Normalize an uploaded logo and store it on the row.
+    
+    Returns:
+        Stored filename (extension matching the stored PNG or SVG)
+    
+    Raises:
+        HTTPException: 400 if the upload is not a valid image
+    """
+    try:
+        normalized, normalized_type = await asyncio.to_thread(normalize_logo, data, content_type)
+    except InvalidLogoError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    extension = "svg" if normalized_type == SVG_CONTENT_TYPE else "png"
+    filename = f"{os.path.splitext(filename or 'logo')[0]}.{extension}"
+    
+    await adb.table(table)\
+        .update({
+            "logo_data": encode_logo_data(normalized),
+            "logo_filename": filename,
+            "logo_content_type": normalized_type
+        })\
+        .eq("id", entity_id)\
+        .execute()
+    
+    version = LogoVersion(logo_hash(normalized), filename, normalized_type)
+    logo_cache.put(source_name(version.hash), normalized)
+    logo_cache.set_version(table, entity_id, version)
+    return filename
+
+
+async def delete_logo(table: str, entity_id: str):
+    """Remove the uploaded logo from a row."""
+    await adb.table(table)\
+        .update({
+            "logo_data": None,
+            "logo_filename": None,
+            "logo_content_type": None
+        })\
+        .eq("id", entity_id)\
+        .execute()
+    logo_cache.set_version(table, entity_id, None)